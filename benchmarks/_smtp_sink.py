@@ -0,0 +1,69 @@
+"""A minimal local SMTP server that accepts and discards every message.
+
+Speaks just enough plain-text SMTP (EHLO/HELO, AUTH, MAIL, RCPT, DATA,
+RSET, NOOP, QUIT) for smtplib clients, and counts messages and bytes.
+"""
+
+import socketserver
+import threading
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str) -> None:
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self) -> None:
+        self._reply("220 localhost sink ready")
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            command = raw.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+
+            if verb == "EHLO":
+                self.wfile.write(b"250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+            elif verb == "AUTH":
+                self._reply("235 authenticated")
+            elif verb == "DATA":
+                self._reply("354 end with <CRLF>.<CRLF>")
+                size = 0
+                for line in self.rfile:
+                    if line == b".\r\n":
+                        break
+                    size += len(line)
+                self.server.record(size)
+                self._reply("250 queued")
+            elif verb == "QUIT":
+                self._reply("221 bye")
+                return
+            else:
+                self._reply("250 ok")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self._lock = threading.Lock()
+        self.messages = 0
+        self.bytes_received = 0
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def record(self, size: int) -> None:
+        with self._lock:
+            self.messages += 1
+            self.bytes_received += size
+
+    def __enter__(self) -> "SMTPSink":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,126 @@
+"""Synthetic OHLCV generators for offline benchmarks.
+
+Series are sized to the trading-day counts the scraper uses for each period,
+end on the most recent business day, and follow a seeded random walk so runs
+are reproducible.
+"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from tools._playwright_scraper import _PERIOD_ROWS
+
+PERIODS = list(_PERIOD_ROWS)
+
+
+def synthetic_history(symbol: str = "SYN", period: str = "1y", seed: int = 0) -> dict:
+    """Return a get_stock_history-shaped dict with _PERIOD_ROWS[period] rows."""
+    n = _PERIOD_ROWS[period]
+    rng = np.random.default_rng(seed)
+
+    dates = pd.bdate_range(end=date.today(), periods=n)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, n)))
+    open_ = close * (1 + rng.normal(0, 0.005, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n)))
+    volume = rng.integers(500_000, 5_000_000, n)
+
+    data = {
+        d.strftime("%Y-%m-%d"): {
+            "open": round(float(o), 2),
+            "high": round(float(h), 2),
+            "low": round(float(lo), 2),
+            "close": round(float(c), 2),
+            "volume": int(v),
+        }
+        for d, o, h, lo, c, v in zip(dates, open_, high, low, close, volume)
+    }
+    return {"symbol": symbol, "period": period, "data": data}
+
+
+def synthetic_bars(period: str = "1y", symbols: int = 1, seed: int = 0) -> dict[str, np.ndarray]:
+    """Return OHLCV arrays for one symbol (shape (T,)) or several on one date axis (shape (symbols, T))."""
+    n = _PERIOD_ROWS[period]
+    rng = np.random.default_rng(seed)
+    shape = (symbols, n)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, shape), axis=-1))
+    open_ = close * (1 + rng.normal(0, 0.005, shape))
+    bars = {
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, shape))),
+        "low": np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, shape))),
+        "close": close,
+        "volume": rng.integers(500_000, 5_000_000, shape).astype(float),
+    }
+    return {field: values[0] for field, values in bars.items()} if symbols == 1 else bars
+
+
+def synthetic_quotes(n: int = 4000, seed: int = 0) -> list[dict]:
+    """Return yf.screen()-shaped quotes for n NASDAQ equities, plus a few that the filters drop."""
+    rng = np.random.default_rng(seed)
+    price = np.round(rng.lognormal(3, 1, n), 2)
+    change_pct = np.round(rng.normal(0, 3, n), 2)
+    avg_volume = rng.integers(10_000, 20_000_000, n)
+    volume = (avg_volume * rng.lognormal(0, 0.5, n)).astype(int)
+    quotes = [
+        {
+            "symbol": f"S{i:04d}",
+            "longName": f"Synthetic {i} Inc.",
+            "exchange": ("NMS", "NGM", "NCM")[i % 3],
+            "quoteType": "EQUITY",
+            "regularMarketPrice": float(price[i]),
+            "regularMarketChange": round(float(price[i] * change_pct[i] / 100), 2),
+            "regularMarketChangePercent": float(change_pct[i]),
+            "regularMarketVolume": int(volume[i]),
+            "averageDailyVolume3Month": int(avg_volume[i]),
+            "marketCap": int(price[i] * rng.integers(1_000_000, 1_000_000_000)),
+        }
+        for i in range(n)
+    ]
+    quotes += [
+        {**quotes[0], "symbol": "SYNW", "regularMarketChangePercent": 99.0},
+        {**quotes[0], "symbol": "NYSE", "exchange": "NYQ", "regularMarketChangePercent": 98.0},
+        {**quotes[0], "symbol": "ETF", "quoteType": "ETF", "regularMarketChangePercent": 97.0},
+    ]
+    return quotes
+
+
+def synthetic_frame(period: str = "1y", seed: int = 0) -> pd.DataFrame:
+    """Return a DataFrame shaped like yfinance's Ticker.history() output."""
+    data = synthetic_history(period=period, seed=seed)["data"]
+    return pd.DataFrame(
+        {
+            "Open": [row["open"] for row in data.values()],
+            "High": [row["high"] for row in data.values()],
+            "Low": [row["low"] for row in data.values()],
+            "Close": [row["close"] for row in data.values()],
+            "Volume": [row["volume"] for row in data.values()],
+        },
+        index=pd.DatetimeIndex(list(data), tz="America/New_York"),
+    )
+
+
+# Formatted strings as they appear on the scraped Yahoo and Futunn pages
+NUMBER_STRINGS = [
+    "84.23", "+56.88%", "-3.5%", "24.89M", "6.33B", "1.5K", "72,239,400", "--", "N/A", "",
+]
+
+_HEADLINE_PARTS = (
+    ["Apple", "Nvidia", "Tesla", "Microsoft", "Amazon", "Meta", "AMD", "Netflix"],
+    ["shares", "stock", "revenue", "guidance", "Q3 earnings", "price target", "outlook"],
+    ["surge", "plunge", "beats estimates", "misses forecasts", "rise", "fall", "holds steady",
+     "is upgraded", "is downgraded", "does not disappoint"],
+    ["as Fed signals rate cuts", "after analyst call", "amid tariff fears", "on record demand", "", ""],
+)
+
+
+def synthetic_headlines(n: int, seed: int = 0) -> list[str]:
+    """Return n reproducible finance-style headlines mixing lexicon words, themes and filler."""
+    rng = np.random.default_rng(seed)
+    picks = [rng.integers(0, len(part), n) for part in _HEADLINE_PARTS]
+    return [
+        " ".join(w for w in (part[i] for part, i in zip(_HEADLINE_PARTS, row)) if w)
+        for row in zip(*picks)
+    ]
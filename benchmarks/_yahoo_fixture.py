@@ -0,0 +1,107 @@
+"""A local stand-in for Yahoo Finance's history page.
+
+Serves /quote/<SYMBOL>/history/?period1=..&period2=.. with one row per
+business day in the range (newest first, listing date 1990-01-02), in
+the table markup scrape_stock_history reads. Like the real page, only the
+first _BATCH rows are rendered up front; scrolling to the bottom appends
+the next batch after a short delay. Prices are a deterministic function
+of the date, so repeated runs return the same rows.
+"""
+
+import json
+import math
+import threading
+from datetime import date, datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+_LISTED = date(1990, 1, 2)
+_BATCH = 100
+_APPEND_DELAY_MS = 50
+
+_PAGE = """<!doctype html>
+<html><body>
+<table><thead><tr><th>Date</th><th>Open</th><th>High</th><th>Low</th><th>Close</th>
+<th>Adj Close</th><th>Volume</th></tr></thead><tbody>{rows}</tbody></table>
+<div style="height: 2000px"></div>
+<script>
+const pending = {pending};
+const tbody = document.querySelector("tbody");
+let loading = false;
+function render(cells) {{
+  const tr = document.createElement("tr");
+  for (const text of cells) {{ const td = document.createElement("td"); td.textContent = text; tr.appendChild(td); }}
+  tbody.appendChild(tr);
+}}
+window.addEventListener("scroll", () => {{
+  if (loading || !pending.length) return;
+  if (window.innerHeight + window.scrollY < document.body.scrollHeight - 10) return;
+  loading = true;
+  setTimeout(() => {{ pending.splice(0, {batch}).forEach(render); loading = false; }}, {delay});
+}});
+</script>
+</body></html>
+"""
+
+
+def _cells(day: pd.Timestamp) -> list[str]:
+    n = (day.date() - _LISTED).days
+    close = 50 + 30 * math.sin(n / 90) + n / 100
+    open_ = close * (1 + 0.01 * math.sin(n))
+    high, low = max(open_, close) * 1.01, min(open_, close) * 0.99
+    volume = 1_000_000 + (n * 7919) % 5_000_000
+    return [day.strftime("%b %d, %Y"), *(f"{v:,.2f}" for v in (open_, high, low, close, close)), f"{volume:,}"]
+
+
+def history_rows(period1: int, period2: int) -> list[list[str]]:
+    start = max(datetime.fromtimestamp(period1, timezone.utc).date(), _LISTED)
+    end = datetime.fromtimestamp(period2, timezone.utc).date()
+    days = pd.bdate_range(start, end, inclusive="left")[::-1]
+    return [_cells(day) for day in days]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if not url.path.endswith("/history/") or "period1" not in query:
+            self.send_error(404)
+            return
+        rows = history_rows(int(query["period1"][0]), int(query["period2"][0]))
+        self.server.requested_rows.append(len(rows))
+        html = _PAGE.format(
+            rows="".join("<tr>" + "".join(f"<td>{c}</td>" for c in row) + "</tr>" for row in rows[:_BATCH]),
+            pending=json.dumps(rows[_BATCH:]),
+            batch=_BATCH,
+            delay=_APPEND_DELAY_MS,
+        )
+        payload = html.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class YahooFixture(ThreadingHTTPServer):
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.requested_rows: list[int] = []
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self) -> "YahooFixture":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+        self.server_close()
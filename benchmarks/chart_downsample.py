@@ -0,0 +1,44 @@
+"""Render time and PNG size per period, with and without point reduction.
+
+Usage:
+    uv run python -m benchmarks.chart_downsample [--repeat 3]
+"""
+
+import argparse
+import time
+
+from benchmarks._synthetic import PERIODS, synthetic_history
+from tools._chart_render import render_chart
+
+
+def _measure(data: dict, chart_type: str, downsample: bool, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        png = render_chart(data, chart_type, "SYN", downsample=downsample)
+        best = min(best, (time.perf_counter() - t) * 1000)
+    return best, len(png)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    render_chart(synthetic_history(period="5d")["data"], "line", "warmup")
+
+    print(f"{'period':<7}{'type':<13}{'rows':>6}{'full ms':>10}{'full KB':>9}{'reduced ms':>12}{'reduced KB':>12}")
+    for period in PERIODS:
+        data = synthetic_history(period=period)["data"]
+        for chart_type in ("line", "candlestick"):
+            full_ms, full_bytes = _measure(data, chart_type, False, args.repeat)
+            red_ms, red_bytes = _measure(data, chart_type, True, args.repeat)
+            print(
+                f"{period:<7}{chart_type:<13}{len(data):>6}"
+                f"{full_ms:>10.1f}{full_bytes / 1024:>9.1f}"
+                f"{red_ms:>12.1f}{red_bytes / 1024:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Compare in-process chart rendering with the pre-warmed worker pool.
+
+Usage:
+    uv run python -m benchmarks.chart_pool [--workers 2] [--symbols 8]
+"""
+
+import argparse
+import time
+
+from benchmarks._synthetic import synthetic_history
+from tools._chart_pool import ChartJob, ChartPool
+from tools._chart_render import render_chart
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--symbols", type=int, default=8)
+    parser.add_argument("--period", type=str, default="3mo")
+    args = parser.parse_args()
+
+    jobs = [
+        ChartJob(
+            data=synthetic_history(f"SYN{i}", args.period, seed=i)["data"],
+            chart_type="candlestick" if i % 2 else "line",
+            title=f"SYN{i} {args.period}",
+        )
+        for i in range(args.symbols)
+    ]
+
+    t = time.perf_counter()
+    render_chart(jobs[0].data, jobs[0].chart_type, jobs[0].title)
+    cold_ms = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    for job in jobs:
+        render_chart(job.data, job.chart_type, job.title)
+    serial_ms = (time.perf_counter() - t) * 1000
+
+    pool = ChartPool(args.workers)
+    t = time.perf_counter()
+    pool.warm()
+    warm_ms = (time.perf_counter() - t) * 1000
+
+    t = time.perf_counter()
+    results = pool.render_batch(jobs)
+    batch_ms = (time.perf_counter() - t) * 1000
+    stats = pool.stats()
+    pool.shutdown()
+
+    print(f"first in-process render (cold): {cold_ms:8.1f} ms")
+    print(f"in-process serial, {len(jobs)} charts:  {serial_ms:8.1f} ms")
+    print(f"pool warm-up, {args.workers} workers:     {warm_ms:8.1f} ms")
+    print(f"pool batch, {len(jobs)} charts:         {batch_ms:8.1f} ms")
+    print()
+    print(f"{'job':<6}{'type':<13}{'worker':>8}{'render ms':>11}{'bytes':>9}")
+    for i, (job, r) in enumerate(zip(jobs, results)):
+        size = len(r.png) if r.png else 0
+        print(f"{i:<6}{job.chart_type:<13}{r.worker_pid:>8}{r.render_ms:>11.1f}{size:>9}")
+    print()
+    print(f"pool stats: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Rolling beta/correlation throughput: pandas per (symbol, benchmark) pair vs the NumPy engine.
+
+pandas is the per-pair code python_analyzer would run: Series.rolling(w).cov
+and .corr for each symbol against each benchmark, on an aligned DataFrame of
+returns. The engine computes every pair from one (symbols, days) matrix,
+for the full rolling series and for the latest window only (what
+compare_assets reports for the whole universe). A fraction of closes is
+dropped at random to exercise the missing-day handling.
+
+Usage:
+    uv run python -m benchmarks.cross_asset [--symbols 500] [--benchmarks 12] [--period 1y] [--window 63] [--repeat 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks._synthetic import synthetic_bars
+from tools._cross_asset import relative_strength, returns, rolling_beta_corr
+
+
+def _pandas(rx: pd.DataFrame, ry: pd.DataFrame, window: int, min_periods: int) -> dict:
+    out = {}
+    for s in rx:
+        for b in ry:
+            rolling = rx[s].rolling(window, min_periods=min_periods)
+            var = ry[b].where(rx[s].notna()).rolling(window, min_periods=min_periods).var()
+            out[s, b] = (rolling.cov(ry[b]) / var, rolling.corr(ry[b]))
+    return out
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - t) * 1000)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--benchmarks", type=int, default=12)
+    parser.add_argument("--period", default="1y")
+    parser.add_argument("--window", type=int, default=63)
+    parser.add_argument("--missing", type=float, default=0.02, help="Fraction of symbol closes dropped")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    closes = synthetic_bars(args.period, symbols=args.symbols + args.benchmarks)["close"]
+    closes[args.benchmarks:][rng.random(closes[args.benchmarks:].shape) < args.missing] = np.nan
+    r = returns(closes)
+    rx, ry = r[args.benchmarks:], r[:args.benchmarks]
+    min_periods = max(args.window * 3 // 4, 2)
+    frame_x, frame_y = pd.DataFrame(rx.T), pd.DataFrame(ry.T)
+    pairs = args.symbols * args.benchmarks
+
+    # Same numbers either way, up to float rounding
+    sub_x, sub_y = frame_x.iloc[:, :5], frame_y
+    reference = _pandas(sub_x, sub_y, args.window, min_periods)
+    beta, corr = rolling_beta_corr(rx[:5], ry, args.window, min_periods)
+    worst = max(
+        float(np.nanmax(np.abs(np.r_[beta[s, b] - pb.to_numpy(), corr[s, b] - pc.to_numpy()])))
+        for (s, b), (pb, pc) in reference.items()
+    )
+
+    recent_x, recent_y = rx[:, -args.window:], ry[:, -args.window:]
+    runs = [
+        # pandas takes seconds at the default size, so it runs once
+        ("pandas, per pair", lambda: _pandas(frame_x, frame_y, args.window, min_periods), 1),
+        ("engine, rolling", lambda: rolling_beta_corr(rx, ry, args.window, min_periods), args.repeat),
+        ("engine, latest window", lambda: rolling_beta_corr(recent_x, recent_y, args.window, min_periods), args.repeat),
+        ("engine, rel. strength", lambda: relative_strength(closes, 0), args.repeat),
+    ]
+    print(
+        f"{args.symbols} symbols x {args.benchmarks} benchmarks x {closes.shape[1]} days ({args.period}), "
+        f"window {args.window}, {args.missing:.0%} closes missing; max abs difference vs pandas {worst:.1e}\n"
+    )
+    print(f"{'method':<24}{'total ms':>10}{'us/pair':>10}{'pairs/s':>12}")
+    for name, fn, repeat in runs:
+        ms = _best_ms(fn, repeat)
+        print(f"{name:<24}{ms:>10.1f}{ms / pairs * 1000:>10.1f}{pairs / ms * 1000:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
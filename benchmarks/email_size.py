@@ -0,0 +1,70 @@
+"""Message size and send time: attached full chart vs inline compressed preview.
+
+Sends every variant to a local SMTP sink, so no mail leaves the machine.
+
+Usage:
+    uv run python -m benchmarks.email_size [--recipients 50]
+"""
+
+import argparse
+import smtplib
+import time
+from email.mime.image import MIMEImage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from benchmarks._smtp_sink import SMTPSink
+from benchmarks._synthetic import synthetic_history
+from tools._chart_render import render_chart
+from tools.send_email import _build_message
+
+_BODY = "<h2>Price Action</h2><p>" + "Analysis paragraph. " * 200 + "</p>"
+
+
+def _attachment_message(to: str, png: bytes) -> MIMEMultipart:
+    """The message layout send_email used before inline charts."""
+    msg = MIMEMultipart("mixed")
+    msg["Subject"] = "bench"
+    msg["From"] = "bench@localhost"
+    msg["To"] = to
+    msg.attach(MIMEText(_BODY, "html"))
+    msg.attach(MIMEImage(png, name="chart.png"))
+    return msg
+
+
+def _send_ms(port: int, to: str, payload: str) -> float:
+    t = time.perf_counter()
+    with smtplib.SMTP("127.0.0.1", port) as smtp:
+        smtp.login("bench", "bench")
+        smtp.sendmail("bench@localhost", to.split(","), payload)
+    return (time.perf_counter() - t) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipients", type=int, default=50)
+    args = parser.parse_args()
+    to = ",".join(f"user{i}@example.com" for i in range(args.recipients))
+
+    print(f"{'period':<7}{'type':<13}{'layout':<20}{'message KB':>11}{'build ms':>10}{'send ms':>9}")
+    with SMTPSink() as sink:
+        for period, chart_type in (("5d", "candlestick"), ("1y", "line"), ("10y", "line")):
+            png = render_chart(synthetic_history(period=period)["data"], chart_type, "SYN")
+            layouts = {
+                "attachment (old)": lambda: _attachment_message(to, png),
+                "inline preview": lambda: _build_message("bench@localhost", to, "bench", _BODY, png),
+                "inline + full": lambda: _build_message("bench@localhost", to, "bench", _BODY, png, True),
+            }
+            for name, build in layouts.items():
+                t = time.perf_counter()
+                payload = build().as_string()
+                build_ms = (time.perf_counter() - t) * 1000
+                send_ms = _send_ms(sink.port, to, payload)
+                print(
+                    f"{period:<7}{chart_type:<13}{name:<20}"
+                    f"{len(payload) / 1024:>11.1f}{build_ms:>10.1f}{send_ms:>9.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
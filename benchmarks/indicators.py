@@ -0,0 +1,89 @@
+"""Indicator throughput on 10y series: pandas per symbol vs the NumPy engine.
+
+pandas is the per-symbol code python_analyzer runs today (rolling, ewm and
+friends over a DataFrame). The engine is timed one symbol at a time, on all
+symbols at once as one (symbols, bars) matrix, and appending one new bar
+to every symbol from the previous outputs.
+
+Usage:
+    uv run python -m benchmarks.indicators [--symbols 200] [--period 10y] [--repeat 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks._synthetic import synthetic_bars
+from tools._indicators import FIELDS, compute
+
+
+def _pandas(df: pd.DataFrame) -> pd.DataFrame:
+    close, high, low = df["close"], df["high"], df["low"]
+    out = pd.DataFrame(index=df.index)
+    for n in (20, 50):
+        out[f"sma_{n}"] = close.rolling(n).mean()
+    for n in (12, 26):
+        out[f"ema_{n}"] = close.ewm(span=n, adjust=False).mean()
+    out["macd"] = out["ema_12"] - out["ema_26"]
+    out["macd_signal"] = out["macd"].ewm(span=9, adjust=False).mean()
+    out["macd_hist"] = out["macd"] - out["macd_signal"]
+    std = close.rolling(20).std(ddof=0)
+    out["bb_middle"] = out["sma_20"]
+    out["bb_upper"] = out["sma_20"] + 2 * std
+    out["bb_lower"] = out["sma_20"] - 2 * std
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    loss = (-delta).clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    out["rsi_14"] = 100 - 100 / (1 + gain / loss)
+    prev_close = close.shift()
+    true_range = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+    out["atr_14"] = true_range.ewm(alpha=1 / 14, adjust=False).mean()
+    typical = (high + low + close) / 3
+    out["vwap"] = (typical * df["volume"]).cumsum() / df["volume"].cumsum()
+    return out
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - t) * 1000)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--period", default="10y")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    matrix = synthetic_bars(args.period, symbols=args.symbols)
+    n_bars = matrix["close"].shape[-1]
+    singles = [{f: matrix[f][i] for f in FIELDS} for i in range(args.symbols)]
+    frames = [pd.DataFrame(bars) for bars in singles]
+    prev = {name: series[..., :-1] for name, series in compute(matrix).items()}
+
+    # Same numbers either way, up to float rounding
+    reference = _pandas(frames[0])
+    ours = compute(singles[0])
+    worst = max(float(np.nanmax(np.abs(ours[c] - reference[c].to_numpy()))) for c in reference)
+
+    runs = [
+        ("pandas, per symbol", lambda: [_pandas(df) for df in frames]),
+        ("engine, per symbol", lambda: [compute(bars) for bars in singles]),
+        ("engine, one matrix", lambda: compute(matrix)),
+        ("engine, append 1 bar", lambda: compute(matrix, prev, start=n_bars - 1)),
+    ]
+    print(f"{args.symbols} symbols x {n_bars} bars ({args.period}); max abs difference vs pandas {worst:.1e}\n")
+    print(f"{'method':<24}{'total ms':>10}{'ms/symbol':>11}{'symbols/s':>11}")
+    for name, fn in runs:
+        ms = _best_ms(fn, args.repeat)
+        print(f"{name:<24}{ms:>10.1f}{ms / args.symbols:>11.3f}{args.symbols / ms * 1000:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""End-to-end load harness for main.run_agent.
+
+Runs the real agent loop and the real tools many times concurrently, with
+every external service replaced by a local stand-in:
+
+- LLM: ScriptedChatModel replays the 7-step tool-call sequence from the
+  system prompt (top gainer, both histories, news, analysis, chart, email),
+  building each call from the previous tool results.
+- Market data: yfinance is swapped for FakeMarket, which serves synthetic
+  histories, a screener result and news headlines.
+- Email: send_email talks plain SMTP to a local SMTPSink.
+- Tracing: runs get no callbacks, so nothing is sent to LangFuse.
+- Caches: STOCK_ANALYZER_CACHE_DIR points at a temporary directory,
+  removed afterwards, so synthetic histories, headlines and results never
+  reach the real result cache, news store or bar store.
+- Sandbox: python_analyzer uses Docker if the sandbox image is present,
+  otherwise the local worker pool; --sandbox fake swaps in a stub that
+  returns canned output after --sandbox-ms. Each run's analysis code is
+  unique, as an LLM's would be, so the result cache does not hide it.
+
+Reports runs per minute, run and per-node latency percentiles, and peak
+memory. Node names match run_agent's output: 'model', 'tools → <tool name>'.
+
+Usage:
+    uv run python -m benchmarks.load_harness --runs 40 --concurrency 8
+    uv run python -m benchmarks.load_harness --period 1y --llm-ms 800 --market-ms 150 --json out.json
+"""
+
+import argparse
+import json
+import os
+import resource
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from unittest import mock
+
+import numpy as np
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from benchmarks._smtp_sink import SMTPSink
+from benchmarks._synthetic import PERIODS, synthetic_frame
+
+_GAINERS = ["NVDA", "AMD", "PLTR", "SMCI", "TSLA", "MRVL", "ARM", "COIN"]
+_CANDLE_PERIODS = {"1d", "5d", "1mo"}
+_ANALYSIS_CODE = """\
+stock = data_obj["stock"]["data"]
+spy = data_obj["spy"]["data"]
+closes = [row["close"] for row in stock.values()]
+spy_closes = [row["close"] for row in spy.values()]
+print(f"total_return: {(closes[-1] / closes[0] - 1) * 100:.2f}%")
+print(f"spy_return: {(spy_closes[-1] / spy_closes[0] - 1) * 100:.2f}%")
+"""
+
+
+def _tool_results(messages: list) -> dict[str, list[dict]]:
+    results: dict[str, list[dict]] = {}
+    for msg in messages:
+        if isinstance(msg, ToolMessage):
+            try:
+                content = json.loads(msg.content)
+            except (TypeError, ValueError):
+                content = {"error": str(msg.content)}
+            results.setdefault(msg.name, []).append(content)
+    return results
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that plays the system prompt's steps as tool calls.
+
+    Each turn looks at which tools have already answered and issues the next
+    step, so it works unchanged whatever the tools return (including errors).
+    """
+
+    period: str = "5d"
+    recipients: list[str] = ["load@example.com"]
+    latency_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs) -> "ScriptedChatModel":
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        message = self._next_step(_tool_results(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _next_step(self, done: dict[str, list[dict]]) -> AIMessage:
+        gainer = (done.get("get_top_gainers") or [{}])[0]
+        symbol = gainer.get("symbol", "SPY")
+        histories = done.get("get_stock_history", [])
+        handles = [h.get("handle", "") for h in histories] + ["", ""]
+
+        if "get_top_gainers" not in done:
+            return _calls(("get_top_gainers", {}))
+        if not histories:
+            return _calls(
+                ("get_stock_history", {"symbol": symbol, "period": self.period}),
+                ("get_stock_history", {"symbol": "SPY", "period": self.period}),
+            )
+        if "get_stock_news" not in done:
+            return _calls(("get_stock_news", {"ticker": symbol}))
+        if "python_analyzer" not in done:
+            data = json.dumps({"stock": handles[0], "spy": handles[1]})
+            code = f"{_ANALYSIS_CODE}# {handles[0]}\n"
+            return _calls(
+                ("python_analyzer", {"code": code, "data": data}),
+                ("get_indicators", {"data": handles[0], "indicators": ["rsi", "macd", "sma", "bollinger"]}),
+                ("compare_assets", {"symbol": symbol}),
+            )
+        if "generate_chart" not in done:
+            chart_type = "candlestick" if self.period in _CANDLE_PERIODS else "line"
+            title = f"{symbol} {self.period} Price Chart"
+            return _calls(("generate_chart", {"data": handles[0], "chart_type": chart_type, "title": title}))
+        if "send_email" not in done:
+            chart_path = done["generate_chart"][0].get("chart_path", "")
+            analysis = done["python_analyzer"][0].get("result", "")
+            body = f"<h2>Price Action</h2><p>{analysis}</p>" + "<p>Analysis paragraph.</p>" * 40
+            return _calls(("send_email", {
+                "to": ", ".join(self.recipients),
+                "subject": f"{symbol} Daily Analysis",
+                "body": body,
+                "chart_path": chart_path,
+            }))
+        return AIMessage(content="Analysis emailed.")
+
+
+_call_ids = iter(range(1, 1 << 62))
+_call_ids_lock = threading.Lock()
+
+
+def _calls(*steps: tuple[str, dict]) -> AIMessage:
+    with _call_ids_lock:
+        ids = [f"call_{next(_call_ids)}" for _ in steps]
+    return AIMessage(
+        content="",
+        tool_calls=[{"name": name, "args": args, "id": i} for (name, args), i in zip(steps, ids)],
+    )
+
+
+class FakeMarket:
+    """Stands in for the yfinance module in the tool modules."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self._frames = {}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _wait(self) -> None:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def frame(self, symbol: str, period: str):
+        key = (symbol, period)
+        if key not in self._frames:
+            self._frames[key] = synthetic_frame(period, seed=zlib.crc32(symbol.encode()))
+        return self._frames[key]
+
+    def Ticker(self, symbol: str) -> "_FakeTicker":
+        return _FakeTicker(self, symbol)
+
+    def EquityQuery(self, *args, **kwargs) -> None:
+        return None
+
+    def screen(self, query, **kwargs) -> dict:
+        self._wait()
+        with self._lock:
+            symbol = _GAINERS[self._next % len(_GAINERS)]
+            self._next += 1
+        return {"quotes": [{
+            "symbol": symbol,
+            "longName": f"{symbol} Holdings Inc.",
+            "exchange": "NMS",
+            "quoteType": "EQUITY",
+            "regularMarketPrice": 123.45,
+            "regularMarketChange": 9.87,
+            "regularMarketChangePercent": 8.69,
+            "regularMarketVolume": 45_678_900,
+            "marketCap": 98_765_432_100,
+        }]}
+
+
+# Distinct stories, so none are folded together as syndicated duplicates
+_FAKE_STORIES = [
+    "beats quarterly estimates", "shares slide on supply worries", "upgraded to buy at major broker",
+    "announces new product line", "CEO to present at industry conference", "expands buyback program",
+    "faces regulatory probe in Europe", "signs cloud partnership", "guidance tops analyst forecasts",
+    "options activity spikes ahead of Fed decision",
+]
+
+
+class _FakeTicker:
+    def __init__(self, market: FakeMarket, symbol: str):
+        self._market = market
+        self._symbol = symbol
+
+    def history(self, period: str = "5d"):
+        self._market._wait()
+        return self._market.frame(self._symbol, period).copy()
+
+    def get_news(self, count: int = 10, tab: str = "news") -> list[dict]:
+        self._market._wait()
+        return [
+            {"content": {
+                "title": f"{self._symbol} {story}",
+                "provider": {"displayName": "Wire"},
+                "pubDate": "2026-01-01T00:00:00Z",
+                "canonicalUrl": {"url": f"https://example.com/{self._symbol}/{i}"},
+            }}
+            for i, story in enumerate(_FAKE_STORIES[:count])
+        ]
+
+
+def _fake_sandbox(delay_ms: float):
+    from tools._sandbox import SandboxResult
+
+    def run(cmd, timeout, max_bytes=None):
+        time.sleep(delay_ms / 1000)
+        return SandboxResult(0, stdout="total_return: 1.00%\nspy_return: 0.50%\n", stderr="")
+    return run
+
+
+def _percentiles(values: list[float]) -> dict:
+    arr = np.array(values) * 1000
+    return {
+        "count": len(values),
+        "p50_ms": round(float(np.percentile(arr, 50)), 1),
+        "p95_ms": round(float(np.percentile(arr, 95)), 1),
+        "p99_ms": round(float(np.percentile(arr, 99)), 1),
+        "max_ms": round(float(arr.max()), 1),
+    }
+
+
+def run_load(
+    runs: int,
+    concurrency: int,
+    period: str = "5d",
+    llm_ms: float = 0.0,
+    market_ms: float = 0.0,
+    sandbox: str = "auto",
+    sandbox_ms: float = 300.0,
+    warmup: int = 1,
+    trace_memory: bool = False,
+) -> dict:
+    """Run the agent runs times, concurrency at a time, and return the report dict."""
+    # Set before the tools modules are imported, so none of their stores ever
+    # points at the user's cache
+    with tempfile.TemporaryDirectory(prefix="stock-analyzer-load-") as cache, \
+            mock.patch.dict(os.environ, {"STOCK_ANALYZER_CACHE_DIR": cache}):
+        return _run_load(
+            runs, concurrency, period, llm_ms, market_ms, sandbox, sandbox_ms, warmup, trace_memory
+        )
+
+
+def _run_load(
+    runs: int,
+    concurrency: int,
+    period: str,
+    llm_ms: float,
+    market_ms: float,
+    sandbox: str,
+    sandbox_ms: float,
+    warmup: int,
+    trace_memory: bool,
+) -> dict:
+    import main
+    from benchmarks.suite import _docker_sandbox_available
+    from tools._sandbox import get_backend
+
+    if sandbox == "auto":
+        if _docker_sandbox_available():
+            sandbox = "docker"
+        else:
+            sandbox = "local" if get_backend("local").warm() else "fake"
+
+    config = main.Config(period=period, recipients=["load@example.com"])
+    main._compile_agent.cache_clear()
+    node_times: dict[str, list[float]] = {}
+    run_times: list[float] = []
+    failures: list[str] = []
+    lock = threading.Lock()
+
+    def on_node(name: str, elapsed: float) -> None:
+        with lock:
+            node_times.setdefault(name, []).append(elapsed)
+
+    def one_run(record: bool) -> None:
+        t = time.perf_counter()
+        try:
+            final = main.run_agent(
+                [("human", "Run the analysis")], config, callbacks=[],
+                on_node=on_node if record else lambda name, elapsed: None,
+                on_turn=lambda turn: None,
+            )
+        except Exception as e:
+            final, error = None, f"{type(e).__name__}: {e}"
+        else:
+            error = None if final else "run returned no final state"
+        if record:
+            with lock:
+                run_times.append(time.perf_counter() - t)
+                if error:
+                    failures.append(error)
+
+    market = FakeMarket(market_ms)
+    with ExitStack() as stack, SMTPSink() as sink:
+        stack.enter_context(mock.patch.dict(os.environ, {
+            "GMAIL_SENDER": "load@example.com",
+            "GMAIL_APP_PASSWORD": "unused",
+            "SMTP_HOST": "127.0.0.1",
+            "SMTP_PORT": str(sink.port),
+            "SMTP_SSL": "0",
+            "SANDBOX_BACKEND": "local" if sandbox == "local" else "docker",
+        }))
+        os.environ.pop("USE_SCRAPER", None)
+        for module in ("tools.stock_history", "tools.top_gainers", "tools.stock_news"):
+            stack.enter_context(mock.patch(f"{module}.yf", market))
+        stack.enter_context(mock.patch.object(main, "_CANDIDATES", [("scripted", "none")]))
+        stack.enter_context(mock.patch.object(main, "_current_idx", 0))
+        stack.enter_context(mock.patch.object(
+            main, "_make_llm",
+            lambda model, key: ScriptedChatModel(period=period, recipients=config.recipients, latency_ms=llm_ms),
+        ))
+        if sandbox == "fake":
+            stack.enter_context(mock.patch("tools._sandbox.run_bounded", _fake_sandbox(sandbox_ms)))
+
+        for _ in range(warmup):
+            one_run(record=False)
+        warmup_messages = sink.messages
+
+        if trace_memory:
+            tracemalloc.start()
+        t = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(lambda _: one_run(record=True), range(runs)))
+        wall = time.perf_counter() - t
+        traced_peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+
+        emails = sink.messages - warmup_messages
+        email_bytes = sink.bytes_received
+
+    # ru_maxrss is KiB on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    report = {
+        "runs": runs,
+        "concurrency": concurrency,
+        "period": period,
+        "sandbox": sandbox,
+        "llm_ms": llm_ms,
+        "market_ms": market_ms,
+        "wall_s": round(wall, 2),
+        "runs_per_min": round(runs / wall * 60, 1),
+        "failures": len(failures),
+        "failure_samples": failures[:5],
+        "emails_sent": emails,
+        "email_kb_total": round(email_bytes / 1024, 1),
+        "run": _percentiles(run_times),
+        "nodes": {name: _percentiles(times) for name, times in sorted(node_times.items())},
+        "peak_rss_mb": round(peak_rss_mb, 1),
+    }
+    if traced_peak is not None:
+        report["peak_traced_mb"] = round(traced_peak / 1024 / 1024, 1)
+    return report
+
+
+def _print_report(report: dict) -> None:
+    print(
+        f"{report['runs']} runs, concurrency {report['concurrency']}, period {report['period']}, "
+        f"sandbox {report['sandbox']}: {report['wall_s']}s wall, {report['runs_per_min']} runs/min"
+    )
+    print(f"failures: {report['failures']}  emails: {report['emails_sent']}  peak RSS: {report['peak_rss_mb']} MB", end="")
+    print(f"  peak traced: {report['peak_traced_mb']} MB" if "peak_traced_mb" in report else "")
+    for sample in report["failure_samples"]:
+        print(f"  ! {sample}")
+    print()
+    print(f"{'node':<32}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, stats in [("run (end to end)", report["run"]), *report["nodes"].items()]:
+        print(
+            f"{name:<32}{stats['count']:>7}{stats['p50_ms']:>10.1f}"
+            f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--period", default="5d", choices=PERIODS)
+    parser.add_argument("--llm-ms", type=float, default=0.0, help="simulated latency per model turn")
+    parser.add_argument("--market-ms", type=float, default=0.0, help="simulated latency per market-data call")
+    parser.add_argument("--sandbox", default="auto", choices=("auto", "docker", "local", "fake"))
+    parser.add_argument("--sandbox-ms", type=float, default=300.0, help="run time of the fake sandbox")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--tracemalloc", action="store_true", help="also report peak traced Python memory (slower)")
+    parser.add_argument("--json", help="write the report to this path")
+    args = parser.parse_args()
+
+    report = run_load(
+        args.runs, args.concurrency, args.period, args.llm_ms, args.market_ms,
+        args.sandbox, args.sandbox_ms, args.warmup, args.tracemalloc,
+    )
+    _print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""System prompt cacheability, and live prompt cache hits and time to first token per turn.
+
+Offline, the system prompt is rendered for every period, with and without a
+fixed symbol, for two recipient lists and two dates, and the report shows how
+much of it is a prefix shared by all of them (what a provider can cache
+across runs and days) against the per-run suffix.
+
+With --live, the same system prompt is sent --turns times through
+main._make_llm to each --model on OpenRouter (OPENROUTER_API_KEY must be
+set), and every turn's prompt tokens, cached prompt tokens and time to first
+token are printed. The first turn writes the cache; later ones should read it.
+
+Usage:
+    uv run python -m benchmarks.prompt_cache
+    uv run python -m benchmarks.prompt_cache --live --turns 4 --model anthropic/claude-sonnet-4.6
+"""
+
+import argparse
+import os
+import sys
+from datetime import date
+from os.path import commonprefix
+from unittest import mock
+
+from prompts import system
+from prompts.system import SYSTEM_PROMPT_PREFIX, get_system_prompt, system_prompt_parts
+
+
+def _rendered() -> list[str]:
+    import main
+
+    prompts = []
+    for today in (date(2025, 1, 2), date(2025, 1, 3)):
+        with mock.patch.object(system, "date", mock.Mock(today=lambda t=today: t)):
+            for period in sorted(main._VALID_PERIODS):
+                for symbol in (None, "AAPL"):
+                    for recipients in (["a@example.com"], ["a@example.com", "b@example.com"]):
+                        prompts.append(get_system_prompt(period, recipients, symbol))
+    return prompts
+
+
+def _offline() -> None:
+    prompts = _rendered()
+    shared = len(commonprefix(prompts))
+    longest = max(len(p) for p in prompts)
+    suffix = longest - len(SYSTEM_PROMPT_PREFIX)
+    print(f"{len(prompts)} rendered system prompts (9 periods x subject x recipients x 2 days)\n")
+    print(f"{'part':<28}{'chars':>8}{'~tokens':>9}")
+    print(f"{'shared prefix':<28}{shared:>8}{shared // 4:>9}")
+    print(f"{'per-run suffix (longest)':<28}{suffix:>8}{suffix // 4:>9}")
+    print(f"\ncacheable share of the prompt: {shared / longest:.1%}")
+
+
+def _live(models: list[str], turns: int) -> None:
+    import main
+
+    models = models or main._MODELS[:1]
+    key = os.getenv("OPENROUTER_API_KEY")
+    if not key:
+        sys.exit("--live needs OPENROUTER_API_KEY")
+    prefix, suffix = system_prompt_parts("1y", ["a@example.com"])
+    print(f"{'model':<40}{'turn':>5}{'prompt':>8}{'cached':>8}{'ratio':>7}{'ttft s':>8}{'total s':>9}")
+    for model in models:
+        metrics = main.TurnMetrics(model, lambda turn: None)
+        llm = main._make_llm(model, key)
+        messages = [main._system_message(model, prefix, suffix), ("human", "Reply with OK only.")]
+        for _ in range(turns):
+            llm.invoke(messages, config={"callbacks": [metrics]})
+        for t in metrics.turns:
+            ratio = f"{t.cached_ratio:.0%}" if t.cached_ratio is not None else "n/a"
+            ttft = f"{t.ttft_s:.2f}" if t.ttft_s is not None else "n/a"
+            print(
+                f"{model:<40}{t.index:>5}{t.prompt_tokens or 0:>8}{t.cached_tokens or 0:>8}"
+                f"{ratio:>7}{ttft:>8}{t.duration_s:>9.2f}"
+            )
+    print(f"\n{main.llm_stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", action="store_true", help="Send real requests to OpenRouter")
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--model", action="append", help="OpenRouter model id (repeatable; default: main._MODELS[0])")
+    args = parser.parse_args()
+
+    _offline()
+    if args.live:
+        print()
+        _live(args.model, args.turns)
+
+
+if __name__ == "__main__":
+    main()
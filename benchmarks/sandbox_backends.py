@@ -0,0 +1,69 @@
+"""python_analyzer sandbox backends side by side: docker vs the local worker pool.
+
+Times backend.run() directly, so the result cache is not involved. Each
+backend is warmed first; "cold" is the first run after warming, "warm" the
+distribution over the remaining runs. Backends that cannot run on this host
+are reported and skipped.
+
+Usage:
+    uv run python -m benchmarks.sandbox_backends [--runs 20] [--period 1y]
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from benchmarks._synthetic import PERIODS, synthetic_history
+from tools._sandbox import BACKENDS, get_backend
+
+_CODE = """
+import pandas as pd
+stock = pd.DataFrame.from_dict(data_obj["stock"]["data"], orient="index")
+returns = stock["close"].pct_change().dropna()
+print(f"{returns.std() * 252 ** 0.5:.4f}")
+"""
+
+
+def _script(period: str) -> str:
+    data = json.dumps({"stock": synthetic_history(period=period)})
+    return f"data = {json.dumps(data)}\ndata_obj = {json.loads(data)}\n\n{_CODE}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--period", default="1y", choices=PERIODS)
+    parser.add_argument("--gap-ms", type=float, default=0.0, help="pause between runs (lets the local pool refill)")
+    args = parser.parse_args()
+    script = _script(args.period)
+
+    print(f"{'backend':<9}{'warm-up ms':>11}{'cold ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    for name in BACKENDS:
+        backend = get_backend(name)
+        t = time.perf_counter()
+        if not backend.warm():
+            print(f"{name:<9}unavailable on this host")
+            continue
+        warm_ms = (time.perf_counter() - t) * 1000
+
+        timings = []
+        for _ in range(args.runs):
+            t = time.perf_counter()
+            result = backend.run(script, timeout=30)
+            timings.append((time.perf_counter() - t) * 1000)
+            if result.returncode != 0:
+                raise SystemExit(f"{name} run failed: {result.stderr}")
+            time.sleep(args.gap_ms / 1000)
+        backend.close()
+
+        warm = sorted(timings[1:]) or timings
+        p95 = warm[min(len(warm) - 1, int(len(warm) * 0.95))]
+        print(
+            f"{name:<9}{warm_ms:>11.0f}{timings[0]:>9.1f}"
+            f"{statistics.median(warm):>9.1f}{p95:>9.1f}{max(warm):>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""scrape_stock_history against a local Yahoo stand-in, per period.
+
+Reports the rows the bounded URL asked the page to render, the rows
+collected, and scrape time (median of --runs, browser kept warm) for each
+period. Needs Playwright's Chromium (uv run playwright install chromium).
+
+Usage:
+    uv run python -m benchmarks.scrape_history [--runs 3] [--periods 1mo,1y,10y]
+"""
+
+import argparse
+import statistics
+import time
+from unittest import mock
+
+from benchmarks._synthetic import PERIODS
+from benchmarks._yahoo_fixture import YahooFixture
+from tools import _playwright_scraper as scraper
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--periods", default=",".join(PERIODS))
+    args = parser.parse_args()
+
+    print(f"{'period':<8}{'expected':>9}{'rendered':>10}{'rows':>7}{'median ms':>11}{'min ms':>9}")
+    with YahooFixture() as fixture, mock.patch.object(scraper, "_YAHOO", fixture.url):
+        scraper.start_shared_browser()
+        try:
+            for period in args.periods.split(","):
+                timings = []
+                for _ in range(args.runs):
+                    t = time.perf_counter()
+                    result = scraper.scrape_stock_history("SYN", period)
+                    timings.append((time.perf_counter() - t) * 1000)
+                    if "error" in result:
+                        raise SystemExit(f"{period}: {result['error']}")
+                print(
+                    f"{period:<8}{scraper._PERIOD_ROWS[period]:>9}{fixture.requested_rows[-1]:>10}"
+                    f"{len(result['data']):>7}{statistics.median(timings):>11.0f}{min(timings):>9.0f}"
+                )
+        finally:
+            scraper.stop_shared_browser()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""Offline micro-benchmark suite for every tool.
+
+Every case runs on synthetic data sized to the _PERIOD_ROWS entry for each
+period; nothing touches the network. Results are written as JSON and can be
+compared against a saved baseline, flagging cases whose median time grew by
+more than the threshold.
+
+Usage:
+    uv run python -m benchmarks --save                # record the baseline (needed before comparing)
+    uv run python -m benchmarks                       # run and compare to baseline
+    uv run python -m benchmarks --filter chart --threshold 0.5
+
+A baseline is specific to the machine it was recorded on, so none is
+committed. --save with --filter updates only the matching cases.
+"""
+
+import argparse
+import functools
+import itertools
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator
+
+from benchmarks._synthetic import (
+    NUMBER_STRINGS,
+    PERIODS,
+    synthetic_bars,
+    synthetic_frame,
+    synthetic_headlines,
+    synthetic_history,
+    synthetic_quotes,
+)
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+DEFAULT_THRESHOLD = 0.25
+# Fast cases are looped until one sample takes at least this long, to keep timer noise down
+_MIN_SAMPLE_MS = 5.0
+
+
+@dataclass
+class Case:
+    name: str
+    # Builds the case's inputs and returns the function to time, or None to skip the case
+    setup: Callable[[], Callable[[], object] | None]
+    repeat: int = 20
+    items: int = 1
+
+
+def _docker_sandbox_available() -> bool:
+    from tools._sandbox import SANDBOX_IMAGE
+
+    if not shutil.which("docker"):
+        return False
+    probe = subprocess.run(
+        ["docker", "image", "inspect", SANDBOX_IMAGE], capture_output=True, timeout=10
+    )
+    return probe.returncode == 0
+
+
+def _all_cases() -> Iterator[Case]:
+    """Every case. A setup is mostly `lambda: <function to time>`; inputs bound
+    as the inner function's defaults are built only when the setup runs.
+    """
+    from tools._chart_render import render_chart
+    from tools._cross_asset import relative_strength, returns, rolling_beta_corr
+    from tools._indicators import compute
+    from tools._playwright_scraper import _parse_number
+    from tools._result_cache import ResultCache, content_key
+    from tools._screener import QuoteSnapshot
+    from tools._news_dedupe import cluster
+    from tools._sentiment import annotate_news, score_headlines
+    from tools.python_analyzer import python_analyzer
+    from tools.send_email import _build_message
+    from tools.stock_history import _from_dataframe
+    from tools.validate import StockHistoryResult, validate_stock_history
+
+    for period in PERIODS:
+        def convert(p=period):
+            df = synthetic_frame(p)
+            return lambda: _from_dataframe("SYN", p, df)
+
+        yield Case(f"history.convert[{period}]", convert)
+
+    for period in PERIODS:
+        history = functools.cache(lambda p=period: synthetic_history(period=p))
+        yield Case(f"history.validate[{period}]", lambda h=history: lambda r=h(): validate_stock_history(r))
+        yield Case(f"history.validate_models[{period}]", lambda h=history: lambda r=h(): StockHistoryResult(**r))
+
+    strings = NUMBER_STRINGS * 1000
+    yield Case(
+        "scraper.parse_number",
+        lambda: lambda: [_parse_number(s) for s in strings],
+        items=len(strings),
+    )
+
+    for period in PERIODS:
+        data = functools.cache(lambda p=period: synthetic_history(period=p)["data"])
+        for chart_type in ("line", "candlestick"):
+            yield Case(
+                f"chart.{chart_type}[{period}]",
+                lambda d=data, t=chart_type: lambda d=d(): render_chart(d, t, "SYN"),
+                repeat=5,
+            )
+
+    for n in (10, 1000):
+        yield Case(f"news.score[{n}]", lambda n=n: lambda h=synthetic_headlines(n): score_headlines(h), items=n)
+    for n in (30, 2000):
+        yield Case(f"news.dedupe[{n}]", lambda n=n: lambda h=synthetic_headlines(n): cluster(h), repeat=5, items=n)
+
+    def annotate():
+        news = {"symbol": "SYN", "news": [{"title": t} for t in synthetic_headlines(10)]}
+        return lambda: annotate_news(news)
+
+    yield Case("news.annotate[10]", annotate, items=10)
+
+    for period in ("1y", "10y"):
+        yield Case(f"indicators.compute[{period}]", lambda p=period: lambda b=synthetic_bars(p): compute(b))
+    yield Case(
+        "indicators.compute[10y x 100]",
+        lambda: lambda b=synthetic_bars("10y", symbols=100): compute(b),
+        repeat=5,
+        items=100,
+    )
+
+    def append():
+        bars = synthetic_bars("10y")
+        n = len(bars["close"])
+        prev = {name: series[:-1] for name, series in compute(bars).items()}
+        return lambda: compute(bars, prev, start=n - 1)
+
+    yield Case("indicators.append[10y]", append)
+
+    closes = functools.cache(lambda: synthetic_bars("1y", symbols=512)["close"])
+    r = functools.cache(lambda: returns(closes()))
+    yield Case(
+        "cross_asset.rolling[500 x 12, 1y]",
+        lambda: lambda r=r(): rolling_beta_corr(r[12:], r[:12], 63, 47),
+        repeat=5,
+        items=500,
+    )
+    yield Case(
+        "cross_asset.latest[500 x 12]",
+        lambda: lambda recent=r()[:, -63:]: rolling_beta_corr(recent[12:], recent[:12], 63, 47),
+        items=500,
+    )
+    yield Case("cross_asset.relative_strength[512]", lambda: lambda c=closes(): relative_strength(c, 0), items=512)
+
+    quotes = functools.cache(lambda: synthetic_quotes(4000))
+    snapshot = functools.cache(lambda: QuoteSnapshot.from_quotes(quotes()))
+    yield Case("screener.snapshot[4000]", lambda: lambda q=quotes(): QuoteSnapshot.from_quotes(q), repeat=5, items=4000)
+    yield Case("screener.rank[gainers]", lambda: lambda s=snapshot(): s.rank("gainers", limit=1, min_change_pct=3))
+    yield Case(
+        "screener.rank[volume filtered]",
+        lambda: lambda s=snapshot(): s.rank("unusual_volume", limit=10, min_market_cap=1e9, min_volume=100_000),
+    )
+
+    body = "<h2>Price Action</h2><p>" + "Analysis paragraph. " * 200 + "</p>"
+    yield Case("email.mime[no chart]", lambda: lambda: _build_message("a@x", "b@x", "S", body).as_string())
+    yield Case(
+        "email.mime[inline chart]",
+        lambda: lambda chart=render_chart(synthetic_history(period="1y")["data"], "line", "SYN"): (
+            _build_message("a@x", "b@x", "S", body, chart).as_string()
+        ),
+        repeat=5,
+    )
+
+    @functools.cache
+    def analyzer_cache() -> tuple:
+        payload = json.dumps({"stock": synthetic_history(period="1y")})
+        code = "print(len(data_obj['stock']['data']))"
+        cache = ResultCache("bench", ttl_seconds=3600, max_bytes=10**8, root=Path(tempfile.mkdtemp()))
+        key = content_key("sha256:bench", code, payload)
+        cache.put(key, {"result": "252\n"})
+        return cache, key, code, payload
+
+    def key_setup():
+        _, _, code, payload = analyzer_cache()
+        return lambda: content_key("sha256:bench", code, payload)
+
+    def memory_hit():
+        cache, key, _, _ = analyzer_cache()
+        return lambda: cache.get(key)
+
+    def disk_hit():
+        cache, key, _, _ = analyzer_cache()
+
+        def hit():
+            cache.clear_memory()
+            return cache.get(key)
+
+        return hit
+
+    yield Case("analyzer.cache_key[1y]", key_setup)
+    yield Case("analyzer.cache_hit[memory]", memory_hit)
+    yield Case("analyzer.cache_hit[disk]", disk_hit)
+
+    def container_start():
+        if not _docker_sandbox_available():
+            return None
+        # A fresh comment per call keeps every run a cache miss
+        calls = itertools.count()
+        return lambda: python_analyzer.invoke({"code": f"print(1)  # {next(calls)}"})
+
+    yield Case("analyzer.container_start", container_start, repeat=3)
+
+
+def cases(name_filter: str = "") -> Iterator[Case]:
+    """Cases whose name contains name_filter."""
+    return (case for case in _all_cases() if name_filter in case.name)
+
+
+def run_case(case: Case) -> dict | None:
+    """Time the function case.setup() returns; reported times are per call. None if the case is skipped."""
+    fn = case.setup()
+    if fn is None:
+        return None
+    t = time.perf_counter()
+    fn()  # warm-up, also sizes the inner loop
+    warmup_ms = (time.perf_counter() - t) * 1000
+    number = max(1, int(_MIN_SAMPLE_MS / max(warmup_ms, 1e-6)))
+
+    timings = []
+    for _ in range(case.repeat):
+        t = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - t) * 1000 / number)
+    median = statistics.median(timings)
+    result = {"median_ms": round(median, 4), "min_ms": round(min(timings), 4), "repeat": case.repeat, "number": number}
+    if case.items > 1:
+        result["items_per_s"] = round(case.items / (median / 1000))
+    return result
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Return names of cases whose median grew by more than threshold vs baseline."""
+    regressions = []
+    for name, result in current.items():
+        base = baseline.get(name)
+        if base and result["median_ms"] > base["median_ms"] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--output", type=Path, default=None, help="Also write results to this JSON file")
+    parser.add_argument("--save", action="store_true", help="Overwrite the baseline with these results")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed median slowdown before flagging (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--filter", type=str, default="", help="Only run cases whose name contains this")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())["cases"]
+    elif not args.save:
+        print(f"no baseline at {args.baseline}: record one with --save", file=sys.stderr)
+
+    results = {}
+    print(f"{'case':<36}{'median ms':>12}{'min ms':>11}{'baseline':>11}{'delta':>9}")
+    for case in cases(args.filter):
+        result = run_case(case)
+        if result is None:
+            print(f"skipping {case.name}: not available here", file=sys.stderr)
+            continue
+        results[case.name] = result
+        base = None if args.save else baseline.get(case.name)
+        delta = ""
+        base_ms = ""
+        if base:
+            base_ms = f"{base['median_ms']:.3f}"
+            change = result["median_ms"] / base["median_ms"] - 1
+            delta = f"{change:+.0%}" + (" !" if change > args.threshold else "")
+        print(f"{case.name:<36}{result['median_ms']:>12.3f}{result['min_ms']:>11.3f}{base_ms:>11}{delta:>9}")
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "cases": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.save:
+        # A filtered run replaces only its own cases in the baseline
+        saved = {**baseline, **results} if args.filter else results
+        args.baseline.write_text(json.dumps({**report, "cases": saved}, indent=2) + "\n")
+        print(f"\nbaseline saved to {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Column-wise validate_stock_history vs the per-row pydantic models.
+
+Usage:
+    uv run python -m benchmarks.validate [--repeat 20]
+"""
+
+import argparse
+import timeit
+
+from benchmarks._synthetic import PERIODS, synthetic_history
+from tools.validate import StockHistoryResult, validate_stock_history
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'period':<7}{'rows':>6}{'models ms':>11}{'columnar ms':>13}{'speedup':>9}")
+    for period in PERIODS:
+        result = synthetic_history(period=period)
+        assert validate_stock_history(result) == []
+
+        model_ms = min(timeit.repeat(lambda: StockHistoryResult(**result), number=1, repeat=args.repeat)) * 1000
+        fast_ms = min(timeit.repeat(lambda: validate_stock_history(result), number=1, repeat=args.repeat)) * 1000
+        print(
+            f"{period:<7}{len(result['data']):>6}{model_ms:>11.3f}{fast_ms:>13.3f}"
+            f"{model_ms / fast_ms:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""JSON payload size, parse time and LLM token count: rows vs columnar layout.
+
+Tokens are counted with tiktoken's o200k_base encoding when it is available
+locally, otherwise estimated as bytes / 4.
+
+Usage:
+    uv run python -m benchmarks.wire_format
+"""
+
+import json
+import timeit
+
+from benchmarks._synthetic import PERIODS, synthetic_history
+from tools._ohlcv import to_columnar
+
+
+def _token_counter():
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("o200k_base")
+        return lambda text: len(encoding.encode(text)), "o200k_base"
+    except Exception:
+        return lambda text: len(text) // 4, "bytes/4 estimate"
+
+
+def main() -> None:
+    count_tokens, method = _token_counter()
+    print(f"token counts: {method}\n")
+    print(
+        f"{'period':<7}{'rows':>6}{'rows KB':>9}{'col KB':>8}"
+        f"{'rows tok':>10}{'col tok':>9}{'rows parse ms':>15}{'col parse ms':>14}"
+    )
+    for period in PERIODS:
+        rows = synthetic_history(period=period)
+        columnar = {**rows, "data": to_columnar(rows["data"])}
+        rows_json = json.dumps(rows)
+        col_json = json.dumps(columnar)
+
+        rows_parse = min(timeit.repeat(lambda: json.loads(rows_json), number=1, repeat=20)) * 1000
+        col_parse = min(timeit.repeat(lambda: json.loads(col_json), number=1, repeat=20)) * 1000
+        print(
+            f"{period:<7}{len(rows['data']):>6}"
+            f"{len(rows_json) / 1024:>9.1f}{len(col_json) / 1024:>8.1f}"
+            f"{count_tokens(rows_json):>10}{count_tokens(col_json):>9}"
+            f"{rows_parse:>15.3f}{col_parse:>14.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
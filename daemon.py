@@ -0,0 +1,329 @@
+"""Resident daemon: runs the analysis on a timetable with resources kept warm.
+
+Imports, the LangFuse check, LLM clients and the compiled agent, the
+scraper's Chromium, the python_analyzer sandbox and the chart pool are set up
+once at start and reused by every run. Runs execute one at a time in the
+order they were triggered, by the schedule or through the local control API:
+
+    POST /run     queue an ad-hoc run; optional JSON body {"period": "1y", "email": "a@x.com,b@y.com"}
+    GET  /runs    recent runs, newest first
+    GET  /stats   run counts, durations, per-node latency, warm-up timings
+
+Usage:
+    uv run python daemon.py --schedule 09:45,15:55 --period 5d
+    curl -X POST localhost:8765/run -d '{"period": "1y"}'
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from datetime import time as dtime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import main
+from server import parse_job_request
+from tools._breaker import breaker_stats
+from tools._chart_pool import get_chart_pool
+from tools._hedge import hedge_stats
+from tools._playwright_scraper import start_shared_browser, stop_shared_browser, use_scraper
+from tools.cross_asset import cross_asset_stats
+from tools.indicators import indicator_stats
+from tools.python_analyzer import cache_stats, sandbox_stats, warm_sandbox
+from tools.stock_history import history_stats
+from tools.stock_news import news_stats
+from tools.top_gainers import screener_stats
+
+DAEMON_PORT = int(os.getenv("DAEMON_PORT", "8765"))
+DAEMON_SCHEDULE = os.getenv("DAEMON_SCHEDULE", "09:45")
+_RECENT_RUNS = 50
+
+
+def parse_schedule(spec: str) -> list[dtime]:
+    """Parse 'HH:MM,HH:MM,...' (local time) into sorted times.
+
+    Raises ValueError for an empty or malformed spec.
+    """
+    times = []
+    for part in spec.split(","):
+        part = part.strip()
+        if part:
+            times.append(datetime.strptime(part, "%H:%M").time())
+    if not times:
+        raise ValueError(f"empty schedule {spec!r}: expected HH:MM[,HH:MM...]")
+    return sorted(set(times))
+
+
+def next_run_after(now: datetime, times: list[dtime], weekdays_only: bool = True) -> datetime:
+    """Return the first scheduled datetime strictly after now."""
+    day = now.date()
+    while True:
+        if not weekdays_only or day.weekday() < 5:
+            for t in times:
+                candidate = datetime.combine(day, t)
+                if candidate > now:
+                    return candidate
+        day += timedelta(days=1)
+
+
+@dataclass
+class RunRecord:
+    id: int
+    trigger: str
+    period: str
+    recipients: list[str]
+    queued_at: str
+    started_at: str | None = None
+    duration_s: float | None = None
+    status: str = "queued"
+    error: str | None = None
+    nodes: dict[str, float] = field(default_factory=dict)
+    # Per LLM call: prompt tokens, cached prompt tokens, seconds to first token
+    turns: list[dict] = field(default_factory=list)
+
+
+class Daemon:
+    def __init__(self, config: main.Config, schedule: list[dtime], weekdays_only: bool = True):
+        self.config = config
+        self.schedule = schedule
+        self.weekdays_only = weekdays_only
+        self.started_at = datetime.now()
+        self.warmup_ms: dict[str, float] = {}
+        self.next_scheduled: datetime | None = None
+
+        self._queue: queue.Queue[RunRecord | None] = queue.Queue()
+        self._runs: deque[RunRecord] = deque(maxlen=_RECENT_RUNS)
+        self._node_times: dict[str, list[float]] = {}
+        self._durations: list[float] = []
+        self._counts = {"ok": 0, "failed": 0}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def _timed(self, name: str, fn) -> object:
+        t = time.perf_counter()
+        result = fn()
+        self.warmup_ms[name] = round((time.perf_counter() - t) * 1000, 1)
+        return result
+
+    def warm(self) -> None:
+        """Build everything a run needs before the first run asks for it."""
+        for model, key in main._CANDIDATES:
+            self._timed(f"llm:{model}", lambda: main._make_llm(model, key))
+        if main._CANDIDATES:
+            model, key = main._CANDIDATES[min(main._start_idx(), len(main._CANDIDATES) - 1)]
+            self._timed("agent", lambda: main._make_agent(model, key, self.config))
+        # The browser is only launched eagerly when scraping is the primary source
+        self._timed("browser", lambda: start_shared_browser(warm=use_scraper()))
+        self._timed("sandbox", warm_sandbox)
+        self._timed("chart_pool", get_chart_pool)
+
+    def start(self) -> None:
+        self.warm()
+        self.next_scheduled = next_run_after(datetime.now(), self.schedule, self.weekdays_only)
+        for target in (self._work, self._schedule_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        stop_shared_browser()
+        pool = get_chart_pool()
+        if pool is not None:
+            pool.shutdown()
+
+    def submit(self, trigger: str, period: str | None = None, recipients: list[str] | None = None) -> RunRecord:
+        with self._lock:
+            record = RunRecord(
+                id=self._next_id,
+                trigger=trigger,
+                period=period or self.config.period,
+                recipients=recipients or self.config.recipients,
+                queued_at=datetime.now().isoformat(timespec="seconds"),
+            )
+            self._next_id += 1
+            self._runs.appendleft(record)
+        self._queue.put(record)
+        return record
+
+    def _schedule_loop(self) -> None:
+        while not self._stop.is_set():
+            self.next_scheduled = next_run_after(datetime.now(), self.schedule, self.weekdays_only)
+            delay = (self.next_scheduled - datetime.now()).total_seconds()
+            if self._stop.wait(max(delay, 0)):
+                return
+            self.submit("schedule")
+
+    def _work(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is None:
+                return
+            self._execute(record)
+
+    def _execute(self, record: RunRecord) -> None:
+        def on_node(name: str, elapsed: float) -> None:
+            main._print_node(name, elapsed)
+            record.nodes[name] = round(record.nodes.get(name, 0.0) + elapsed, 3)
+            with self._lock:
+                self._node_times.setdefault(name, []).append(elapsed)
+
+        def on_turn(turn: main.Turn) -> None:
+            main._print_turn(turn)
+            record.turns.append({
+                "prompt_tokens": turn.prompt_tokens,
+                "cached_tokens": turn.cached_tokens,
+                "ttft_s": round(turn.ttft_s, 3) if turn.ttft_s is not None else None,
+            })
+
+        config = main.Config(period=record.period, recipients=record.recipients)
+        record.status = "running"
+        record.started_at = datetime.now().isoformat(timespec="seconds")
+        print(f"Run {record.id} ({record.trigger}): {record.period} analysis for {', '.join(record.recipients)}")
+        t = time.perf_counter()
+        try:
+            history = main.run_agent(
+                [("human", f"Run the {record.period} analysis.")], config, on_node=on_node, on_turn=on_turn
+            )
+            if history is None:
+                raise RuntimeError("no model candidates configured")
+            record.status = "ok"
+        except Exception as e:
+            record.status = "failed"
+            record.error = f"{type(e).__name__}: {e}"
+        record.duration_s = round(time.perf_counter() - t, 2)
+        with self._lock:
+            self._counts[record.status] += 1
+            self._durations.append(record.duration_s)
+        print(f"Run {record.id} {record.status} in {record.duration_s}s")
+
+    def runs(self) -> list[dict]:
+        with self._lock:
+            return [asdict(r) for r in self._runs]
+
+    def stats(self) -> dict:
+        with self._lock:
+            durations = list(self._durations)
+            nodes = {
+                name: {
+                    "count": len(times),
+                    "avg_ms": round(float(np.mean(times)) * 1000, 1),
+                    "p95_ms": round(float(np.percentile(times, 95)) * 1000, 1),
+                }
+                for name, times in sorted(self._node_times.items())
+            }
+            counts = dict(self._counts)
+            running = [r.id for r in self._runs if r.status == "running"]
+        pool = get_chart_pool()
+        return {
+            "uptime_s": round((datetime.now() - self.started_at).total_seconds()),
+            "runs": {**counts, "queued": self._queue.qsize(), "running": running},
+            "duration_s": {
+                "avg": round(float(np.mean(durations)), 2) if durations else None,
+                "p95": round(float(np.percentile(durations, 95)), 2) if durations else None,
+            },
+            "nodes": nodes,
+            "next_scheduled": self.next_scheduled.isoformat(timespec="minutes") if self.next_scheduled else None,
+            "warmup_ms": self.warmup_ms,
+            "llm": main.llm_stats(),
+            "chart_pool": pool.stats() if pool else None,
+            "analyzer_cache": cache_stats(),
+            "sandbox": sandbox_stats(),
+            "bar_store": history_stats(),
+            "screener": screener_stats(),
+            "news": news_stats(),
+            "indicators": indicator_stats(),
+            "cross_asset": cross_asset_stats(),
+            "hedging": hedge_stats(),
+            "breakers": breaker_stats(),
+        }
+
+
+def _make_handler(daemon: Daemon) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: object) -> None:
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self) -> None:
+            if self.path == "/stats":
+                self._send(200, daemon.stats())
+            elif self.path == "/runs":
+                self._send(200, daemon.runs())
+            else:
+                self._send(404, {"error": f"unknown path {self.path}"})
+
+        def do_POST(self) -> None:
+            if self.path != "/run":
+                self._send(404, {"error": f"unknown path {self.path}"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                period, recipients, symbol = parse_job_request(
+                    json.loads(self.rfile.read(length) or b"{}"), daemon.config.period, daemon.config.recipients
+                )
+                if symbol is not None:
+                    raise ValueError("symbol is not supported by the daemon: use server.py")
+            except json.JSONDecodeError as e:
+                self._send(400, {"error": f"invalid JSON body: {e}"})
+                return
+            except ValueError as e:
+                self._send(400, {"error": str(e)})
+                return
+            record = daemon.submit("manual", period, recipients)
+            self._send(202, asdict(record))
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return Handler
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the analysis on a schedule with warm resources")
+    parser.add_argument("--schedule", default=DAEMON_SCHEDULE, help=f"Comma-separated local HH:MM run times (default: {DAEMON_SCHEDULE})")
+    parser.add_argument("--all-days", action="store_true", help="Also run on weekends")
+    parser.add_argument("--period", default="5d", choices=sorted(main._VALID_PERIODS))
+    parser.add_argument("--email", default=None, help=f"Comma-separated recipient emails (default: {main.DEFAULT_RECIPIENT})")
+    parser.add_argument("--port", type=int, default=DAEMON_PORT, help="Control API port on 127.0.0.1")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    main.require_langfuse()
+    recipients = args.email.split(",") if args.email else [main.DEFAULT_RECIPIENT]
+    daemon = Daemon(
+        main.Config(period=args.period, recipients=recipients),
+        parse_schedule(args.schedule),
+        weekdays_only=not args.all_days,
+    )
+    daemon.start()
+    print(f"Warm-up (ms): {daemon.warmup_ms}")
+    print(f"Next scheduled run: {daemon.next_scheduled}")
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), _make_handler(daemon))
+    print(f"Control API on http://127.0.0.1:{args.port} (POST /run, GET /runs, GET /stats)\n")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.shutdown()
@@ -1,24 +1,35 @@
 import argparse
 import os
 import sys
+import threading
 import time
+from collections import deque
 from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable
 
 import httpx
+import numpy as np
 from dotenv import load_dotenv
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import SystemMessage
 from langchain_openai import ChatOpenAI
 from langchain.agents import create_agent
 from openai import RateLimitError
 from langfuse.langchain import CallbackHandler
 
-from prompts.system import get_system_prompt
+from prompts.system import system_prompt_parts
+from tools._data_store import run_scope
 from tools import (
     get_stock_history,
     get_top_gainers,
+    screen_stocks,
     python_analyzer,
     send_email,
     get_stock_news,
     generate_chart,
+    get_indicators,
+    compare_assets,
 )
 
 load_dotenv()
@@ -36,16 +47,22 @@ def check_langfuse_health():
         pass
     return False
 
-if not check_langfuse_health():
-    print(f"❌ LangFuse is not running at {LANGFUSE_HOST}")
-    print("\nStart it with:")
-    print("   docker compose up -d")
-    print("\nThen try again.")
-    sys.exit(1)
 
-print(f"✓ LangFuse running at {LANGFUSE_HOST}\n")
+def require_langfuse():
+    """Exit unless LangFuse is reachable, so runs are never silently untraced."""
+    if not check_langfuse_health():
+        print(f"❌ LangFuse is not running at {LANGFUSE_HOST}")
+        print("\nStart it with:")
+        print("   docker compose up -d")
+        print("\nThen try again.")
+        sys.exit(1)
 
-langfuse_handler = CallbackHandler()
+    print(f"✓ LangFuse running at {LANGFUSE_HOST}\n")
+
+
+@lru_cache(maxsize=1)
+def _langfuse_handler() -> CallbackHandler:
+    return CallbackHandler()
 
 _MODELS = [
     # "anthropic/claude-sonnet-4.6",
@@ -67,14 +84,63 @@ _CANDIDATES: list[tuple[str, str]] = [
     for key in _KEYS
 ]
 
-_current_idx = 0   # module-level sticky index — advances forward only
+# Seconds after the last rate limit before runs start from the first candidate again
+MODEL_COOLDOWN = float(os.getenv("MODEL_COOLDOWN", "600"))
+
+_current_idx = 0   # module-level sticky index — advances past rate-limited candidates
+_advanced_at = 0.0
+# Server jobs run agents concurrently; each keeps its own position and only
+# reads or advances the shared index under this lock
+_candidates_lock = threading.Lock()
+
+
+class CandidatesExhausted(RuntimeError):
+    """Every model/key candidate is rate limited until MODEL_COOLDOWN has passed."""
+
+
+def _start_idx() -> int:
+    """Index the next run starts at: back to 0 once MODEL_COOLDOWN has passed since the last rate limit."""
+    global _current_idx
+    with _candidates_lock:
+        if _current_idx and time.monotonic() - _advanced_at >= MODEL_COOLDOWN:
+            _current_idx = 0
+        return _current_idx
+
+
+def _advance_past(idx: int) -> None:
+    """Record that candidate idx is rate limited, so runs starting later skip it.
+
+    Concurrent runs limited on the same candidate move the index past it once.
+    """
+    global _current_idx, _advanced_at
+    with _candidates_lock:
+        _current_idx = max(_current_idx, idx + 1)
+        _advanced_at = time.monotonic()
+
+
+def _exhausted() -> CandidatesExhausted:
+    with _candidates_lock:
+        wait = max(0.0, MODEL_COOLDOWN - (time.monotonic() - _advanced_at))
+    return CandidatesExhausted(
+        f"all {len(_CANDIDATES)} model candidates exhausted by rate limits; retrying from the first in {wait:.0f}s"
+    )
 
 _REASONING_MODELS = {
     "nvidia/nemotron-3-nano-30b-a3b:free",
 }
 
+# OpenRouter providers that only cache prompt prefixes marked with cache_control.
+# The others (OpenAI, DeepSeek, Grok, ...) cache long repeated prefixes on their own.
+_CACHE_CONTROL_PREFIXES = ("anthropic/", "google/gemini")
+
 
+@lru_cache(maxsize=None)
 def _make_llm(model: str, key: str) -> ChatOpenAI:
+    """Build the client once per (model, key) so its HTTP connection pool stays warm.
+
+    Responses are streamed, so TurnMetrics sees the first token, and carry
+    usage with the prompt tokens served from the provider's cache.
+    """
     kwargs = {}
     if model in _REASONING_MODELS:
         kwargs["reasoning"] = {"max_tokens": 5000}
@@ -82,10 +148,21 @@ def _make_llm(model: str, key: str) -> ChatOpenAI:
         model=model,
         openai_api_key=key,
         openai_api_base="https://openrouter.ai/api/v1",
+        streaming=True,
+        stream_usage=True,
+        extra_body={"usage": {"include": True}},
         **kwargs,
     )
 
 
+def _system_message(model: str, prefix: str, suffix: str) -> SystemMessage:
+    """The system prompt as a static block and a run-settings block, cache-marked for providers that need it."""
+    static = {"type": "text", "text": prefix}
+    if model.startswith(_CACHE_CONTROL_PREFIXES):
+        static["cache_control"] = {"type": "ephemeral"}
+    return SystemMessage(content=[static, {"type": "text", "text": suffix}])
+
+
 _VALID_PERIODS = {"1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y"}
 
 
@@ -93,6 +170,8 @@ _VALID_PERIODS = {"1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y"}
 class Config:
     period: str = "5d"
     recipients: list[str] = field(default_factory=lambda: [DEFAULT_RECIPIENT])
+    # Analyse this symbol instead of the current top gainer
+    symbol: str | None = None
 
 
 def _parse_config() -> Config:
@@ -105,32 +184,179 @@ def _parse_config() -> Config:
         help="History period (default: 5d). One of: 1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y",
     )
     parser.add_argument("--email", type=str, default=None, help=f"Comma-separated recipient emails (default: {DEFAULT_RECIPIENT})")
+    parser.add_argument("--symbol", type=str, default=None, help="Analyse this symbol instead of the top NASDAQ gainer")
     args = parser.parse_args()
 
     recipients = args.email.split(",") if args.email else [DEFAULT_RECIPIENT]
-    return Config(period=args.period, recipients=recipients)
+    symbol = args.symbol.upper() if args.symbol else None
+    return Config(period=args.period, recipients=recipients, symbol=symbol)
 
 
 def _make_agent(model: str, key: str, config: Config):
+    prefix, suffix = system_prompt_parts(
+        period=config.period, recipients=config.recipients, symbol=config.symbol
+    )
+    return _compile_agent(model, key, prefix, suffix)
+
+
+@lru_cache(maxsize=32)
+def _compile_agent(model: str, key: str, prefix: str, suffix: str):
+    # Compiled graphs hold no run state, so one per prompt is reused across runs
     return create_agent(
         model=_make_llm(model, key),
         tools=[
             get_stock_history,
             get_top_gainers,
+            screen_stocks,
             python_analyzer,
             send_email,
             get_stock_news,
             generate_chart,
+            get_indicators,
+            compare_assets,
         ],
-        system_prompt=get_system_prompt(period=config.period, recipients=config.recipients),
+        system_prompt=_system_message(model, prefix, suffix),
     )
 
 
-def run_agent(history, config: Config):
-    global _current_idx
-
-    while _current_idx < len(_CANDIDATES):
-        model, key = _CANDIDATES[_current_idx]
+@dataclass
+class Turn:
+    """One LLM call: prompt tokens, how many the provider served from its cache, and time to first token."""
+    model: str
+    index: int
+    prompt_tokens: int | None = None
+    cached_tokens: int | None = None
+    ttft_s: float | None = None
+    duration_s: float = 0.0
+
+    @property
+    def cached_ratio(self) -> float | None:
+        if not self.prompt_tokens or self.cached_tokens is None:
+            return None
+        return self.cached_tokens / self.prompt_tokens
+
+
+# Recent turns across runs, for llm_stats()
+_turns: deque[Turn] = deque(maxlen=1000)
+_turns_lock = threading.Lock()
+
+
+def _prompt_usage(response) -> tuple[int | None, int | None]:
+    """(prompt tokens, cached prompt tokens) from an LLMResult, None where the provider did not say."""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens"), usage.get("input_token_details", {}).get("cache_read")
+    return None, None
+
+
+class TurnMetrics(BaseCallbackHandler):
+    """Records a Turn for every chat model call of one run and passes it to on_turn."""
+
+    def __init__(self, model: str, on_turn: Callable[[Turn], None]):
+        self.model = model
+        self._on_turn = on_turn
+        self._started: dict = {}
+        self._first_token: dict = {}
+        self.turns: list[Turn] = []
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs) -> None:
+        self._first_token.setdefault(run_id, time.perf_counter())
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        started = self._started.pop(run_id, None)
+        first_token = self._first_token.pop(run_id, None)
+        if started is None:
+            return
+        prompt_tokens, cached_tokens = _prompt_usage(response)
+        turn = Turn(
+            model=self.model,
+            index=len(self.turns) + 1,
+            prompt_tokens=prompt_tokens,
+            cached_tokens=cached_tokens,
+            ttft_s=first_token - started if first_token is not None else None,
+            duration_s=time.perf_counter() - started,
+        )
+        self.turns.append(turn)
+        with _turns_lock:
+            _turns.append(turn)
+        self._on_turn(turn)
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        self._started.pop(run_id, None)
+        self._first_token.pop(run_id, None)
+
+
+def llm_stats() -> dict:
+    """Prompt cache hit ratio and time to first token over recent turns."""
+    with _turns_lock:
+        turns = list(_turns)
+    prompt = sum(t.prompt_tokens for t in turns if t.prompt_tokens and t.cached_tokens is not None)
+    cached = sum(t.cached_tokens for t in turns if t.prompt_tokens and t.cached_tokens is not None)
+    ttfts = [t.ttft_s for t in turns if t.ttft_s is not None]
+    return {
+        "turns": len(turns),
+        "prompt_tokens": prompt,
+        "cached_tokens": cached,
+        "cached_ratio": round(cached / prompt, 3) if prompt else None,
+        "ttft_s": {
+            "p50": round(float(np.percentile(ttfts, 50)), 3) if ttfts else None,
+            "p95": round(float(np.percentile(ttfts, 95)), 3) if ttfts else None,
+        },
+    }
+
+
+def _print_node(name: str, elapsed: float) -> None:
+    print(f"[node: {name}] ({elapsed:.2f}s)")
+
+
+def _print_turn(turn: Turn) -> None:
+    cached = (
+        f"{turn.cached_tokens} cached ({turn.cached_ratio:.0%})" if turn.cached_ratio is not None else "cache n/a"
+    )
+    ttft = f"{turn.ttft_s:.2f}s" if turn.ttft_s is not None else "n/a"
+    print(f"[llm: turn {turn.index}] {turn.prompt_tokens or '?'} prompt tokens, {cached}, first token {ttft}")
+
+
+def run_agent(
+    history,
+    config: Config,
+    callbacks: list | None = None,
+    on_node: Callable[[str, float], None] = _print_node,
+    on_turn: Callable[[Turn], None] = _print_turn,
+):
+    """Run the agent to completion and return the final message list.
+
+    callbacks defaults to the LangFuse handler. on_node is called with the
+    node name ('model', or 'tools → <tool name>' once per tool result) and
+    the seconds spent in it. on_turn is called with a Turn after each LLM
+    call, for its prompt cache hits and time to first token.
+    """
+    if callbacks is None:
+        callbacks = [_langfuse_handler()]
+    with run_scope():
+        return _run_agent(history, config, callbacks, on_node, on_turn)
+
+
+def _run_agent(
+    history,
+    config: Config,
+    callbacks: list,
+    on_node: Callable[[str, float], None],
+    on_turn: Callable[[Turn], None],
+):
+    if not _CANDIDATES:
+        return None
+    idx = _start_idx()
+    if idx >= len(_CANDIDATES):
+        raise _exhausted()
+
+    while idx < len(_CANDIDATES):
+        model, key = _CANDIDATES[idx]
         agent = _make_agent(model, key, config)
 
         try:
@@ -139,7 +365,7 @@ def run_agent(history, config: Config):
 
             for chunk in agent.stream(
                 {"messages": history},
-                config={"callbacks": [langfuse_handler]},
+                config={"callbacks": [*callbacks, TurnMetrics(model, on_turn)]},
                 stream_mode="updates",
             ):
                 elapsed = time.perf_counter() - t
@@ -148,9 +374,9 @@ def run_agent(history, config: Config):
 
                 if node_name == "tools":
                     for msg in node_data["messages"]:
-                        print(f"[node: tools] → {msg.name} ({elapsed:.2f}s)")
+                        on_node(f"tools → {msg.name}", elapsed)
                 else:
-                    print(f"[node: {node_name}] ({elapsed:.2f}s)")
+                    on_node(node_name, elapsed)
 
                 final_state = chunk
                 t = time.perf_counter()
@@ -160,16 +386,18 @@ def run_agent(history, config: Config):
         except RateLimitError as e:
             key_hint = key[-4:] if len(key) >= 4 else "****"
             print(f"Rate limited on {model} (key ...{key_hint}): {e}")
-            _current_idx += 1
-            if _current_idx >= len(_CANDIDATES):
+            _advance_past(idx)
+            idx += 1
+            if idx >= len(_CANDIDATES):
                 print("All models and keys exhausted.")
-                raise
-            next_model, next_key = _CANDIDATES[_current_idx]
+                raise _exhausted() from e
+            next_model, next_key = _CANDIDATES[idx]
             next_key_hint = next_key[-4:] if len(next_key) >= 4 else "****"
             print(f"Switching to {next_model} (key ...{next_key_hint})\n")
 
 
 if __name__ == "__main__":
+    require_langfuse()
     config = _parse_config()
 
     print(f"Running {config.period} NASDAQ analysis...\n")
@@ -177,3 +405,6 @@ if __name__ == "__main__":
 
     history = run_agent([("human", f"Run the {config.period} analysis.")], config)
     print(f"\n{history[-1].content}\n")
+    stats = llm_stats()
+    if stats["cached_ratio"] is not None:
+        print(f"Prompt cache: {stats['cached_tokens']}/{stats['prompt_tokens']} prompt tokens ({stats['cached_ratio']:.0%})")
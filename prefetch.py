@@ -0,0 +1,215 @@
+"""Bulk-download daily bars for a symbol universe into the local bar store.
+
+Run off-hours (e.g. from cron after the close) so that get_stock_history is
+answered locally during the day; a run during market hours stores bars up
+to the previous close, as today's bar is still partial. Symbols are downloaded in chunks with one
+yfinance bulk request each, spread over a thread pool and rate-limited to
+--rate requests per second across all workers. Each chunk is written to the
+store as soon as it arrives, so an interrupted run resumes where it stopped:
+symbols fetched within --fresh-hours for this period or a longer one are
+skipped.
+
+Usage:
+    uv run python prefetch.py --universe nasdaq --period 1y
+    uv run python prefetch.py --universe symbols.txt --extra SPY --chunk 50 --workers 4 --rate 1
+"""
+
+import argparse
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import httpx
+import pandas as pd
+import yfinance as yf
+
+from tools._bar_store import BAR_STORE_MAX_AGE, BarStore
+from tools._breaker import protected_call
+from tools._playwright_scraper import _PERIOD_ROWS
+from tools.stock_history import _from_dataframe
+
+NASDAQ_LISTED_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt"
+# SPY plus the SPDR sector ETFs, for market and sector comparisons
+DEFAULT_EXTRA = "SPY,XLB,XLC,XLE,XLF,XLI,XLK,XLP,XLRE,XLU,XLV,XLY"
+
+
+def parse_nasdaq_listed(text: str) -> list[str]:
+    """Symbols from NASDAQ's pipe-delimited nasdaqlisted.txt, without test issues."""
+    lines = text.splitlines()
+    header = lines[0].split("|")
+    symbol_col, test_col = header.index("Symbol"), header.index("Test Issue")
+    symbols = []
+    for line in lines[1:]:
+        fields = line.split("|")
+        if line.startswith("File Creation Time") or len(fields) != len(header) or fields[test_col] == "Y":
+            continue
+        symbols.append(fields[symbol_col])
+    return symbols
+
+
+def load_universe(spec: str, extra: str = "") -> list[str]:
+    """Resolve --universe ('nasdaq' or a file with one symbol per line) plus --extra, deduplicated.
+
+    Share classes are spelled Yahoo's way (BRK.B becomes BRK-B).
+    """
+    if spec == "nasdaq":
+        response = httpx.get(NASDAQ_LISTED_URL, timeout=30)
+        response.raise_for_status()
+        symbols = parse_nasdaq_listed(response.text)
+    elif spec:
+        symbols = Path(spec).read_text(encoding="utf-8").split()
+    else:
+        symbols = []
+    symbols += [s for s in extra.split(",") if s.strip()]
+    return list(dict.fromkeys(s.strip().upper().replace(".", "-") for s in symbols))
+
+
+class RateLimiter:
+    """Spaces acquire() calls at least 1/per_second apart across threads (0 = unlimited)."""
+
+    def __init__(self, per_second: float, clock: Callable[[], float] = time.monotonic):
+        self.interval = 1 / per_second if per_second > 0 else 0.0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def download_chunk(symbols: list[str], period: str) -> pd.DataFrame:
+    """One yfinance bulk request; columns are (symbol, field)."""
+    return yf.download(
+        symbols, period=period, group_by="ticker", auto_adjust=True, threads=False, progress=False
+    )
+
+
+def split_chunk(symbols: list[str], period: str, df: pd.DataFrame) -> tuple[dict[str, dict], dict[str, str]]:
+    """Split a bulk download into validated columnar data per symbol, and errors per symbol."""
+    ok, failed = {}, {}
+    for symbol in symbols:
+        if symbol not in df.columns.get_level_values(0):
+            failed[symbol] = "no data"
+            continue
+        bars = df[symbol].dropna(subset=["Close"])
+        if bars.empty:
+            failed[symbol] = "no data"
+            continue
+        try:
+            result = _from_dataframe(symbol, period, bars)
+        except ValueError as e:
+            failed[symbol] = str(e)
+            continue
+        if "error" in result:
+            failed[symbol] = result["error"]
+        else:
+            ok[symbol] = result["data"]
+    return ok, failed
+
+
+@dataclass
+class PrefetchReport:
+    requested: int = 0
+    skipped: int = 0
+    fetched: int = 0
+    failed: dict[str, str] = field(default_factory=dict)
+    elapsed_s: float = 0.0
+
+    @property
+    def symbols_per_s(self) -> float:
+        done = self.fetched + len(self.failed)
+        return done / self.elapsed_s if self.elapsed_s else 0.0
+
+
+def prefetch(
+    symbols: list[str],
+    store: BarStore,
+    period: str = "1y",
+    chunk_size: int = 50,
+    workers: int = 4,
+    rate: float = 1.0,
+    fresh_s: float = BAR_STORE_MAX_AGE,
+    download: Callable[[list[str], str], pd.DataFrame] = download_chunk,
+    on_chunk: Callable[[PrefetchReport], None] | None = None,
+) -> PrefetchReport:
+    """Download and store bars for every symbol not fetched within fresh_s; report throughput and failures."""
+    t = time.perf_counter()
+    report = PrefetchReport(requested=len(symbols))
+    done = store.fetched_since(time.time() - fresh_s, period) if fresh_s else set()
+    todo = [s for s in symbols if s not in done]
+    report.skipped = len(symbols) - len(todo)
+
+    limiter = RateLimiter(rate)
+    lock = threading.Lock()
+
+    def run(chunk: list[str]) -> None:
+        limiter.acquire()
+        try:
+            df = protected_call("yfinance", lambda: download(chunk, period))
+        except Exception as e:
+            ok, failed = {}, dict.fromkeys(chunk, f"{type(e).__name__}: {e}")
+        else:
+            ok, failed = split_chunk(chunk, period, df)
+        if ok:
+            store.write(ok, period)
+        with lock:
+            report.fetched += len(ok)
+            report.failed.update(failed)
+            report.elapsed_s = time.perf_counter() - t
+            if on_chunk:
+                on_chunk(report)
+
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for future in as_completed([pool.submit(run, chunk) for chunk in chunks]):
+            future.result()
+    report.elapsed_s = time.perf_counter() - t
+    return report
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Prefetch daily bars for a symbol universe into the bar store")
+    parser.add_argument("--universe", default="nasdaq", help="'nasdaq' (NASDAQ-listed symbols) or a file of symbols")
+    parser.add_argument("--extra", default=DEFAULT_EXTRA, help=f"Comma-separated symbols to add (default: {DEFAULT_EXTRA})")
+    parser.add_argument("--period", default="1y", choices=list(_PERIOD_ROWS), help="History period to store (default: 1y)")
+    parser.add_argument("--chunk", type=int, default=50, help="Symbols per bulk request")
+    parser.add_argument("--workers", type=int, default=4, help="Bulk requests in flight at once")
+    parser.add_argument("--rate", type=float, default=1.0, help="Bulk requests started per second, across workers (0 = unlimited)")
+    parser.add_argument(
+        "--fresh-hours", type=float, default=BAR_STORE_MAX_AGE / 3600,
+        help="Skip symbols fetched this recently; 0 refetches everything",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    args = _parse_args()
+    symbols = load_universe(args.universe, args.extra)
+    store = BarStore()
+    print(f"Prefetching {args.period} bars for {len(symbols)} symbols into {store.path}\n")
+
+    def progress(report: PrefetchReport) -> None:
+        done = report.fetched + len(report.failed)
+        print(f"  {done}/{report.requested - report.skipped} symbols  ({report.symbols_per_s:.1f}/s, {len(report.failed)} failed)")
+
+    report = prefetch(
+        symbols, store, args.period, args.chunk, args.workers, args.rate, args.fresh_hours * 3600, on_chunk=progress
+    )
+    print(
+        f"\n{report.fetched} fetched, {len(report.failed)} failed, {report.skipped} already fresh "
+        f"in {report.elapsed_s:.1f}s ({report.symbols_per_s:.1f} symbols/s)"
+    )
+    for symbol, error in sorted(report.failed.items())[:20]:
+        print(f"  {symbol}: {error}")
+    if len(report.failed) > 20:
+        print(f"  ... and {len(report.failed) - 20} more")
@@ -0,0 +1,292 @@
+"""HTTP API that queues analysis jobs and runs them concurrently.
+
+    POST /jobs               {"period": "1y", "email": "a@x.com,b@y.com", "symbol": "AAPL"}  (all optional)
+    GET  /jobs/<id>          job status and timings
+    GET  /jobs/<id>/result   final agent message once the job has finished (409 before)
+    GET  /metrics            job counts, queue wait, run time, concurrency, resource limits, live sandboxes,
+                             data-source hedging and circuit breakers
+
+Up to SERVER_MAX_JOBS jobs run at once; the rest wait in FIFO order. Tools
+also queue for their shared resources (sandbox, browser, chart, smtp) per
+the RESOURCE_LIMIT_* settings. Submitting a job identical to one that is
+still queued or running returns the existing job instead of a new one.
+
+Usage:
+    uv run python server.py --port 8080 --max-jobs 4
+"""
+
+import argparse
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+import numpy as np
+
+import main
+from tools._breaker import breaker_stats
+from tools._hedge import hedge_stats
+from tools._limits import limit_stats
+from tools.cross_asset import cross_asset_stats
+from tools.indicators import indicator_stats
+from tools.python_analyzer import cache_stats, sandbox_stats
+from tools.stock_history import history_stats
+from tools.stock_news import news_stats
+from tools.top_gainers import screener_stats
+
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8080"))
+SERVER_MAX_JOBS = int(os.getenv("SERVER_MAX_JOBS", "4"))
+# Finished jobs kept for status and result lookups
+_MAX_FINISHED = 500
+# Recent jobs the wait and run time percentiles are computed over
+_TIMING_WINDOW = 1000
+_SYMBOL_RE = re.compile(r"^[A-Z][A-Z0-9.\-]{0,9}$")
+_FINISHED = ("succeeded", "failed")
+
+
+@dataclass
+class Job:
+    id: str
+    period: str
+    recipients: list[str]
+    symbol: str | None
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: str | None = None
+    error: str | None = None
+
+    @property
+    def key(self) -> tuple:
+        return (self.period, tuple(sorted(self.recipients)), self.symbol)
+
+    def to_dict(self) -> dict:
+        info = asdict(self)
+        del info["result"]
+        for name in ("created_at", "started_at", "finished_at"):
+            if info[name] is not None:
+                info[name] = datetime.fromtimestamp(info[name]).isoformat(timespec="seconds")
+        info["queue_wait_s"] = round(self.started_at - self.created_at, 2) if self.started_at else None
+        info["run_s"] = round(self.finished_at - self.started_at, 2) if self.finished_at else None
+        return info
+
+
+def parse_job_request(
+    body: dict, period: str = "5d", recipients: list[str] | None = None
+) -> tuple[str, list[str], str | None]:
+    """Validate a POST /jobs body into (period, recipients, symbol).
+
+    period and recipients are the defaults for fields the body leaves out
+    (recipients defaults to DEFAULT_RECIPIENT). Raises ValueError with a
+    client-facing message.
+    """
+    if not isinstance(body, dict):
+        raise ValueError("body must be a JSON object")
+    period = body.get("period", period)
+    if period not in main._VALID_PERIODS:
+        raise ValueError(f"invalid period {period!r}: use one of {', '.join(sorted(main._VALID_PERIODS))}")
+    email = body.get("email")
+    if email is not None and not isinstance(email, str):
+        raise ValueError("email must be a comma-separated string")
+    if email:
+        recipients = [e.strip() for e in email.split(",") if e.strip()]
+    recipients = recipients or [main.DEFAULT_RECIPIENT]
+    symbol = body.get("symbol")
+    if symbol is not None:
+        if not isinstance(symbol, str) or not _SYMBOL_RE.match(symbol.upper()):
+            raise ValueError(f"invalid symbol {symbol!r}")
+        symbol = symbol.upper()
+    return period, recipients, symbol
+
+
+def _run_job(job: Job) -> str:
+    config = main.Config(period=job.period, recipients=job.recipients, symbol=job.symbol)
+    history = main.run_agent(
+        [("human", f"Run the {job.period} analysis.")],
+        config,
+        on_node=lambda name, elapsed: None,
+        on_turn=lambda turn: None,
+    )
+    if history is None:
+        raise RuntimeError("no model candidates configured")
+    return str(history[-1].content)
+
+
+class JobManager:
+    def __init__(self, max_jobs: int = SERVER_MAX_JOBS, run_fn: Callable[[Job], str] = _run_job):
+        self.max_jobs = max_jobs
+        self._run_fn = run_fn
+        self._executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="job")
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._active: dict[tuple, Job] = {}
+        self._queue_waits: deque[float] = deque(maxlen=_TIMING_WINDOW)
+        self._run_times: deque[float] = deque(maxlen=_TIMING_WINDOW)
+        self._peak_running = 0
+        self.deduplicated = 0
+        self._lock = threading.Lock()
+
+    def submit(self, period: str, recipients: list[str], symbol: str | None = None) -> tuple[Job, bool]:
+        """Queue a job, or return the identical queued/running one. Returns (job, created)."""
+        job = Job(id=secrets.token_hex(6), period=period, recipients=recipients, symbol=symbol)
+        with self._lock:
+            existing = self._active.get(job.key)
+            if existing is not None:
+                self.deduplicated += 1
+                return existing, False
+            self._active[job.key] = job
+            self._jobs[job.id] = job
+        self._executor.submit(self._execute, job)
+        return job, True
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _execute(self, job: Job) -> None:
+        with self._lock:
+            job.status = "running"
+            job.started_at = time.time()
+            self._queue_waits.append(job.started_at - job.created_at)
+            running = sum(1 for j in self._active.values() if j.status == "running")
+            self._peak_running = max(self._peak_running, running)
+        try:
+            result, error, status = self._run_fn(job), None, "succeeded"
+        except Exception as e:
+            result, error, status = None, f"{type(e).__name__}: {e}", "failed"
+        with self._lock:
+            job.result, job.error, job.status = result, error, status
+            job.finished_at = time.time()
+            self._run_times.append(job.finished_at - job.started_at)
+            del self._active[job.key]
+            self._evict()
+
+    def _evict(self) -> None:
+        finished = [j.id for j in self._jobs.values() if j.status in _FINISHED]
+        for job_id in finished[: max(len(finished) - _MAX_FINISHED, 0)]:
+            del self._jobs[job_id]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            counts = {s: 0 for s in ("queued", "running", *_FINISHED)}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            waits, runs = list(self._queue_waits), list(self._run_times)
+            peak = self._peak_running
+        return {
+            "jobs": counts,
+            "deduplicated": self.deduplicated,
+            "concurrency": {"max": self.max_jobs, "running": counts["running"], "peak": peak},
+            "queue_wait_s": _summary(waits),
+            "run_s": _summary(runs),
+            "llm": main.llm_stats(),
+            "resources": limit_stats(),
+            "analyzer_cache": cache_stats(),
+            "sandbox": sandbox_stats(),
+            "bar_store": history_stats(),
+            "screener": screener_stats(),
+            "news": news_stats(),
+            "indicators": indicator_stats(),
+            "cross_asset": cross_asset_stats(),
+            "hedging": hedge_stats(),
+            "breakers": breaker_stats(),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _summary(values: list[float]) -> dict:
+    if not values:
+        return {"count": 0, "avg": None, "p50": None, "p95": None, "max": None}
+    return {
+        "count": len(values),
+        "avg": round(float(np.mean(values)), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "max": round(float(np.max(values)), 3),
+    }
+
+
+def _make_handler(manager: JobManager) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: object) -> None:
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self) -> None:
+            parts = self.path.strip("/").split("/")
+            if parts == ["metrics"]:
+                self._send(200, manager.metrics())
+                return
+            if len(parts) in (2, 3) and parts[0] == "jobs":
+                job = manager.get(parts[1])
+                if job is None:
+                    self._send(404, {"error": f"unknown job {parts[1]!r}"})
+                elif len(parts) == 2:
+                    self._send(200, job.to_dict())
+                elif parts[2] != "result":
+                    self._send(404, {"error": f"unknown path {self.path}"})
+                elif job.status not in _FINISHED:
+                    self._send(409, {"error": f"job is {job.status}", "status": job.status})
+                else:
+                    self._send(200, {"id": job.id, "status": job.status, "result": job.result, "error": job.error})
+                return
+            self._send(404, {"error": f"unknown path {self.path}"})
+
+        def do_POST(self) -> None:
+            if self.path.rstrip("/") != "/jobs":
+                self._send(404, {"error": f"unknown path {self.path}"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                period, recipients, symbol = parse_job_request(json.loads(self.rfile.read(length) or b"{}"))
+            except json.JSONDecodeError as e:
+                self._send(400, {"error": f"invalid JSON body: {e}"})
+                return
+            except ValueError as e:
+                self._send(400, {"error": str(e)})
+                return
+            job, created = manager.submit(period, recipients, symbol)
+            self._send(202 if created else 200, {**job.to_dict(), "deduplicated": not created})
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return Handler
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve analysis jobs over HTTP")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--max-jobs", type=int, default=SERVER_MAX_JOBS, help="Jobs run concurrently")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    main.require_langfuse()
+    manager = JobManager(args.max_jobs)
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(manager))
+    print(f"Serving jobs on http://{args.host}:{args.port} (max {args.max_jobs} concurrent)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        manager.shutdown()
@@ -1,5 +1,18 @@
+import importlib
+
 import pytest
 
+from tools import _breaker, _hedge, _sandbox
+
+# tools/__init__ re-exports the tool under the module's name
+_python_analyzer = importlib.import_module("tools.python_analyzer")
+_cross_asset = importlib.import_module("tools.cross_asset")
+_indicators = importlib.import_module("tools.indicators")
+_stock_history = importlib.import_module("tools.stock_history")
+_stock_news = importlib.import_module("tools.stock_news")
+_top_gainers = importlib.import_module("tools.top_gainers")
+
+
 
 def pytest_configure(config):
     config.addinivalue_line(
@@ -8,6 +21,25 @@ def pytest_configure(config):
     )
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keep on-disk caches out of ~/.cache, and in-memory caches and breakers out of other tests."""
+    monkeypatch.setenv("STOCK_ANALYZER_CACHE_DIR", str(tmp_path / "cache"))
+    _sandbox.reset()
+    _python_analyzer._cache.clear_memory()
+    _stock_news._store.clear_memory()
+    _stock_history._bars.clear_memory()
+    _indicators._cache.clear()
+    _cross_asset._matrices.clear()
+    _top_gainers._screener.clear()
+    _breaker.reset()
+    _hedge.reset()
+    yield
+    _sandbox.reset()
+    _python_analyzer._cache.clear_memory()
+    _stock_news._store.clear_memory()
+
+
 @pytest.fixture
 def fake_ohlcv_response():
     return {
@@ -0,0 +1,114 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from tools._bar_store import BarStore, latest_session, open_session
+
+
+def _columnar(n: int, start_day: int = 1) -> dict:
+    days = range(start_day, start_day + n)
+    return {
+        "dates": [f"2025-01-{d:02d}" for d in days],
+        "open": [100.0 + d for d in days],
+        "high": [101.0 + d for d in days],
+        "low": [99.0 + d for d in days],
+        "close": [100.5 + d for d in days],
+        "volume": [1_000_000 + d for d in days],
+    }
+
+
+def test_read_returns_latest_rows_oldest_first(tmp_path):
+    store = BarStore(tmp_path / "bars.sqlite3")
+    store.write({"AAPL": _columnar(25)}, "1mo")
+
+    data = store.read("AAPL", "5d")
+
+    assert data["dates"] == [f"2025-01-{d:02d}" for d in range(21, 26)]
+    assert data["close"] == [121.5, 122.5, 123.5, 124.5, 125.5]
+    assert data["volume"][-1] == 1_000_025
+
+
+def test_read_misses_unknown_symbol_and_missing_file(tmp_path):
+    store = BarStore(tmp_path / "bars.sqlite3")
+    assert store.read("AAPL", "5d") is None
+    store.write({"AAPL": _columnar(5)}, "5d")
+    assert store.read("MSFT", "5d") is None
+    assert store.stats()["misses"] == 2
+
+
+def test_read_misses_when_fetched_period_is_shorter(tmp_path):
+    store = BarStore(tmp_path / "bars.sqlite3")
+    store.write({"AAPL": _columnar(5)}, "5d")
+    assert store.read("AAPL", "1mo") is None
+    assert store.read("AAPL", "1d") is not None
+
+
+def test_read_misses_when_stale(tmp_path, monkeypatch):
+    store = BarStore(tmp_path / "bars.sqlite3", max_age_s=60)
+    store.write({"AAPL": _columnar(5)}, "5d")
+    real_time = time.time
+    monkeypatch.setattr("tools._bar_store.time.time", lambda: real_time() + 120)
+    assert store.read("AAPL", "5d") is None
+
+
+def test_zero_max_age_disables_reads(tmp_path):
+    store = BarStore(tmp_path / "bars.sqlite3", max_age_s=0)
+    store.write({"AAPL": _columnar(5)}, "5d")
+    assert store.read("AAPL", "5d") is None
+
+
+def test_rewrite_replaces_overlapping_bars(tmp_path):
+    store = BarStore(tmp_path / "bars.sqlite3")
+    store.write({"AAPL": _columnar(5)}, "5d")
+    updated = _columnar(5, start_day=3)
+    updated["close"] = [1.0] * 5
+    store.write({"AAPL": updated}, "5d")
+
+    data = store.read("AAPL", "5d")
+
+    assert data["dates"] == [f"2025-01-{d:02d}" for d in range(3, 8)]
+    assert data["close"] == [1.0] * 5
+
+
+def test_fetched_since_counts_longer_periods(tmp_path):
+    store = BarStore(tmp_path / "bars.sqlite3")
+    store.write({"AAPL": _columnar(25)}, "1mo")
+    store.write({"MSFT": _columnar(5)}, "5d")
+
+    assert store.fetched_since(0, "5d") == {"AAPL", "MSFT"}
+    assert store.fetched_since(0, "1mo") == {"AAPL"}
+    assert store.fetched_since(time.time() + 60, "5d") == set()
+
+
+@pytest.mark.parametrize("utc, session", [
+    ("2025-01-07T14:29", "2025-01-06"),  # Tuesday 09:29 New York, before the open
+    ("2025-01-07T14:30", "2025-01-07"),  # Tuesday 09:30, the session has opened
+    ("2025-01-07T23:00", "2025-01-07"),  # after the close
+    ("2025-01-06T03:00", "2025-01-03"),  # Sunday night in New York
+    ("2025-07-07T13:30", "2025-07-07"),  # 09:30 EDT
+])
+def test_latest_session(utc, session):
+    now = datetime.fromisoformat(utc).replace(tzinfo=timezone.utc)
+    assert latest_session(now) == session
+
+
+@pytest.mark.parametrize("utc, session", [
+    ("2025-01-07T14:29", None),  # Tuesday 09:29 New York
+    ("2025-01-07T14:30", "2025-01-07"),
+    ("2025-01-07T20:59", "2025-01-07"),  # 15:59
+    ("2025-01-07T21:00", None),  # 16:00, closed
+    ("2025-01-04T16:00", None),  # Saturday
+])
+def test_open_session(utc, session):
+    now = datetime.fromisoformat(utc).replace(tzinfo=timezone.utc)
+    assert open_session(now) == session
+
+
+def test_write_drops_the_bar_of_the_session_in_progress(tmp_path, monkeypatch):
+    store = BarStore(tmp_path / "bars.sqlite3")
+    monkeypatch.setattr("tools._bar_store.open_session", lambda: "2025-01-05")
+
+    store.write({"AAPL": _columnar(5)}, "5d")
+
+    assert store.read("AAPL", "5d")["dates"] == ["2025-01-01", "2025-01-02", "2025-01-03", "2025-01-04"]
@@ -0,0 +1,135 @@
+import pytest
+
+from tools import _breaker
+from tools._breaker import CircuitBreaker, SourceUnavailable, breaker_stats, protected_call
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("test", failures=3, cooldown_s=60, clock=clock)
+
+
+def _fail(breaker, n):
+    for _ in range(n):
+        assert breaker.allow()
+        breaker.failure()
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self, breaker):
+        _fail(breaker, 2)
+        assert breaker.state == "closed"
+
+        _fail(breaker, 1)
+
+        assert breaker.state == "open"
+        assert not breaker.allow()
+        assert breaker.stats()["short_circuited"] == 1
+
+    def test_success_resets_count(self, breaker):
+        _fail(breaker, 2)
+        breaker.success()
+        _fail(breaker, 2)
+
+        assert breaker.state == "closed"
+
+    def test_half_open_admits_one_probe_after_cooldown(self, breaker, clock):
+        _fail(breaker, 3)
+        clock.now += 60
+
+        assert breaker.allow()
+        assert breaker.state == "half_open"
+        assert not breaker.allow()
+
+        breaker.success()
+        assert breaker.state == "closed"
+        assert breaker.allow()
+
+    def test_failed_probe_reopens_with_doubled_cooldown(self, breaker, clock):
+        _fail(breaker, 3)
+        clock.now += 60
+        _fail(breaker, 1)
+
+        assert breaker.state == "open"
+        assert breaker.stats()["cooldown_s"] == 120
+        clock.now += 60
+        assert not breaker.allow()
+        clock.now += 60
+        assert breaker.allow()
+
+    def test_cooldown_growth_capped(self, breaker, clock):
+        _fail(breaker, 3)
+        for _ in range(6):
+            clock.now += 10_000
+            _fail(breaker, 1)
+
+        assert breaker.stats()["cooldown_s"] == 60 * 8
+
+    def test_stale_probe_does_not_block_forever(self, breaker, clock):
+        _fail(breaker, 3)
+        clock.now += 60
+        assert breaker.allow()  # probe that never reports back
+
+        clock.now += 60
+        assert breaker.allow()
+
+
+class TestProtectedCall:
+    @pytest.fixture(autouse=True)
+    def no_sleep(self, mocker):
+        return mocker.patch("tools._breaker.time.sleep")
+
+    def test_transient_errors_retried_with_growing_jitter(self, no_sleep):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise TimeoutError("read timed out")
+            return "ok"
+
+        assert protected_call("src", flaky, retries=2) == "ok"
+        delays = [c.args[0] for c in no_sleep.call_args_list]
+        assert len(delays) == 2
+        assert 0 <= delays[0] <= 0.25 and 0 <= delays[1] <= 0.5
+        assert breaker_stats()["src"]["retries"] == 2
+        assert breaker_stats()["src"]["consecutive_failures"] == 0
+
+    def test_other_errors_not_retried(self, no_sleep):
+        calls = []
+
+        def broken():
+            calls.append(1)
+            raise ValueError("bad payload")
+
+        with pytest.raises(ValueError):
+            protected_call("src", broken, retries=2)
+        assert len(calls) == 1
+        no_sleep.assert_not_called()
+
+    def test_open_breaker_short_circuits(self, monkeypatch):
+        monkeypatch.setattr(_breaker, "BREAKER_FAILURES", 2)
+
+        def broken():
+            raise ValueError("bad payload")
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                protected_call("src", broken)
+
+        with pytest.raises(SourceUnavailable):
+            protected_call("src", lambda: "never called")
+        assert breaker_stats()["src"]["state"] == "open"
@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools import _data_store
+from tools._cross_asset import (
+    ReturnMatrixCache,
+    align_closes,
+    relative_strength,
+    returns,
+    rolling_beta_corr,
+    trailing_returns,
+)
+from tools.cross_asset import compare_assets
+
+DATES = [str(d.date()) for d in pd.bdate_range("2024-01-01", periods=260)]
+
+
+def _prices(daily_returns: np.ndarray) -> np.ndarray:
+    return 100 * np.cumprod(1 + daily_returns)
+
+
+def _history(closes: np.ndarray, dates: list[str] = DATES) -> dict:
+    closes = np.round(closes, 4).tolist()
+    return {"dates": list(dates), "open": closes, "high": closes, "low": closes, "close": closes, "volume": [1e6] * len(closes)}
+
+
+@pytest.fixture
+def market():
+    """SPY, two sector ETFs, and a stock with beta 1.5 to SPY that tracks XLK closely."""
+    rng = np.random.default_rng(0)
+    spy = rng.normal(0.0005, 0.01, len(DATES))
+    xlk = spy + rng.normal(0, 0.004, len(DATES))
+    xle = rng.normal(0, 0.012, len(DATES))
+    stock = 1.5 * spy + (xlk - spy) * 2 + rng.normal(0.001, 0.002, len(DATES))
+    return {
+        "SPY": _history(_prices(spy)),
+        "XLK": _history(_prices(xlk)),
+        "XLE": _history(_prices(xle)),
+        "AAA": _history(_prices(stock)),
+        # Skips every fifth day
+        "GAP": _history(_prices(spy)[::5] * 1.1, DATES[::5]),
+    }
+
+
+@pytest.fixture
+def fetches(market, monkeypatch):
+    calls = []
+
+    def fake_fetch(symbol, period, scrape=True):
+        calls.append((symbol, scrape))
+        if symbol not in market:
+            return {"error": f"no data for {symbol}"}
+        return {"symbol": symbol, "period": period, "data": market[symbol]}
+
+    monkeypatch.setattr("tools.cross_asset.fetch_history", fake_fetch)
+    return calls
+
+
+def test_align_closes_puts_histories_on_the_union_of_dates():
+    dates, closes = align_closes({
+        "A": {"dates": ["2024-01-02", "2024-01-04"], "close": [1.0, 2.0]},
+        "B": {"dates": ["2024-01-03", "2024-01-04"], "close": [3.0, 4.0]},
+    })
+    assert dates.tolist() == ["2024-01-02", "2024-01-03", "2024-01-04"]
+    np.testing.assert_array_equal(closes, [[1.0, np.nan, 2.0], [np.nan, 3.0, 4.0]])
+
+
+def test_returns_skip_days_around_a_gap():
+    r = returns(np.array([100.0, 110.0, np.nan, 121.0, 133.1]))
+    assert np.isnan(r[[0, 2, 3]]).all()
+    np.testing.assert_allclose(r[[1, 4]], [0.1, 0.1])
+
+
+def test_rolling_beta_corr_matches_pandas_pairwise_with_missing_days():
+    rng = np.random.default_rng(1)
+    x = rng.normal(0, 0.01, (5, 200))
+    y = rng.normal(0, 0.01, (3, 200))
+    x[0] += 1.2 * y[0]
+    x[rng.random(x.shape) < 0.05] = np.nan
+    y[rng.random(y.shape) < 0.02] = np.nan
+
+    beta, corr = rolling_beta_corr(x, y, 40, min_periods=30)
+
+    assert beta.shape == corr.shape == (5, 3, 200)
+    for i in range(5):
+        for j in range(3):
+            xs, ys = pd.Series(x[i]), pd.Series(y[j])
+            rolling = xs.rolling(40, min_periods=30)
+            expected_corr = rolling.corr(ys).to_numpy()
+            expected_beta = (rolling.cov(ys) / ys.where(xs.notna()).rolling(40, min_periods=30).var()).to_numpy()
+            np.testing.assert_allclose(corr[i, j], expected_corr, atol=1e-10, equal_nan=True)
+            np.testing.assert_allclose(beta[i, j], expected_beta, atol=1e-10, equal_nan=True)
+
+
+def test_rolling_beta_is_nan_until_the_window_has_enough_days():
+    y = np.random.default_rng(2).normal(0, 0.01, (1, 50))
+    beta, corr = rolling_beta_corr(2 * y, y, 20)
+    assert np.isnan(beta[0, 0, :19]).all()
+    np.testing.assert_allclose(beta[0, 0, 19:], 2.0)
+    np.testing.assert_allclose(corr[0, 0, 19:], 1.0)
+
+
+def test_trailing_returns_carry_the_last_close_forward():
+    closes = np.array([
+        [100.0, 105.0, 110.0, 121.0],
+        [50.0, np.nan, 60.0, np.nan],
+        [np.nan, np.nan, np.nan, 10.0],
+    ])
+    out = trailing_returns(closes, lookbacks=(1, 3, 4))
+    np.testing.assert_allclose(out[0], [0.1, 0.21, np.nan])
+    np.testing.assert_allclose(out[1], [0.0, 0.2, np.nan])
+    assert np.isnan(out[2]).all()
+
+
+def test_relative_strength_ranks_by_mean_excess_over_the_benchmark():
+    closes = np.array([
+        [100.0, 101.0, 102.0],  # benchmark, +2%
+        [100.0, 110.0, 120.0],
+        [100.0, 90.0, 95.0],
+        [np.nan, np.nan, 5.0],  # too new to rank
+    ])
+    rs = relative_strength(closes, benchmark=0, lookbacks=(1, 2))
+    np.testing.assert_allclose(rs["excess"][1], [120 / 110 / (102 / 101) - 1, 1.2 / 1.02 - 1])
+    assert rs["rank"].tolist() == [2, 1, 3, 0]
+    assert np.isnan(rs["score"][3])
+
+
+def test_return_matrix_cache_reuses_matrices_until_they_expire(market):
+    loads = []
+
+    def load(symbols, period):
+        loads.append(symbols)
+        return {s: market[s] for s in symbols if s in market}, {s: "no data" for s in symbols if s not in market}
+
+    cache = ReturnMatrixCache(load, ttl_s=60)
+    first = cache.get(["AAA", "NOPE", "SPY"], "1y")
+    assert first.symbols == ("AAA", "SPY")
+    assert first.missing == {"NOPE": "no data"}
+    assert first.closes.shape == (2, len(DATES))
+    assert cache.get(["AAA", "NOPE", "SPY"], "1y") is first
+    cache.get(["AAA", "SPY"], "1y")
+    assert len(loads) == 2
+    assert cache.stats()["hits"] == 1
+
+    cache.ttl_s = 0
+    assert cache.get(["AAA", "NOPE", "SPY"], "1y") is not first
+    assert len(loads) == 3
+
+
+def test_compare_assets_reports_beta_correlation_and_relative_strength(fetches):
+    result = compare_assets.invoke({"symbol": "aaa", "peers": ["GAP", "NOPE"], "benchmarks": ["SPY", "XLK", "XLE"]})
+
+    assert result["symbol"] == "AAA"
+    assert result["as_of"] == DATES[-1]
+    assert set(result["benchmarks"]) == {"SPY", "XLK", "XLE"}
+    assert result["benchmarks"]["SPY"]["beta"] == pytest.approx(1.5, abs=0.3)
+    assert result["benchmarks"]["XLK"]["correlation"] > 0.9
+    assert result["closest_sector"] == "XLK"
+    assert result["missing"] == {"NOPE": "no data for NOPE"}
+
+    rs = result["relative_strength"]
+    assert rs["benchmark"] == "SPY"
+    assert set(rs["excess_pct"]) == {"21d", "63d", "126d", "252d"}
+    assert rs["of"] == 5
+    assert 1 <= rs["rank"] <= 5
+    assert rs["leaders"][0]["symbol"] in {"AAA", "SPY", "XLK", "XLE", "GAP"}
+
+    rolling = _data_store.get(result["rolling"])["data"]
+    assert len(rolling["dates"]) == len(rolling["beta_SPY"]) == len(DATES)
+    assert rolling["beta_SPY"][0] is None
+    universe = _data_store.get(result["universe"])["data"]
+    assert universe["symbols"] == ["AAA", "GAP", "SPY", "XLK", "XLE"]
+    # GAP trades every fifth day, so its one-day returns never fill a window
+    assert universe["beta_SPY"][1] is None
+    assert universe["beta_SPY"][2] == pytest.approx(1.0)
+
+
+def test_only_the_stock_and_benchmarks_may_be_scraped(fetches):
+    compare_assets.invoke({"symbol": "AAA", "peers": ["GAP", "XLK"], "benchmarks": ["SPY", "XLK"]})
+    assert sorted(fetches) == [("AAA", True), ("GAP", False), ("SPY", True), ("XLK", True)]
+
+
+def test_compare_assets_reuses_the_return_matrix(fetches):
+    args = {"symbol": "AAA", "benchmarks": ["SPY", "XLK"]}
+    compare_assets.invoke(args)
+    compare_assets.invoke(args)
+    assert sorted(symbol for symbol, _ in fetches) == ["AAA", "SPY", "XLK"]
+
+
+@pytest.mark.parametrize("args, message", [
+    ({"symbol": "NOPE", "benchmarks": ["SPY"]}, "no data for NOPE"),
+    ({"symbol": "AAA", "benchmarks": ["XXX"]}, "no data for XXX"),
+    ({"symbol": "AAA", "window": 5}, "window must be between"),
+    ({"symbol": "AAA", "benchmarks": [" "]}, "no benchmarks given"),
+    ({"symbol": "AAA", "peers": [f"P{i}" for i in range(51)]}, "at most 50 peers"),
+])
+def test_compare_assets_errors(fetches, args, message):
+    result = compare_assets.invoke(args)
+    assert message in result["error"]
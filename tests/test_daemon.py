@@ -0,0 +1,76 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime, time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import main
+from daemon import Daemon, _make_handler, next_run_after, parse_schedule
+
+
+class TestParseSchedule:
+    def test_sorts_and_dedupes(self):
+        assert parse_schedule("15:55, 09:45,15:55") == [time(9, 45), time(15, 55)]
+
+    @pytest.mark.parametrize("spec", ["", " , ", "9am", "25:00"])
+    def test_invalid_spec_raises(self, spec):
+        with pytest.raises(ValueError):
+            parse_schedule(spec)
+
+
+class TestNextRunAfter:
+    times = [time(9, 45), time(15, 55)]
+
+    def test_later_slot_same_day(self):
+        now = datetime(2026, 3, 4, 10, 0)  # Wednesday
+        assert next_run_after(now, self.times) == datetime(2026, 3, 4, 15, 55)
+
+    def test_exact_slot_time_moves_to_next_slot(self):
+        now = datetime(2026, 3, 4, 9, 45)
+        assert next_run_after(now, self.times) == datetime(2026, 3, 4, 15, 55)
+
+    def test_friday_evening_skips_weekend(self):
+        now = datetime(2026, 3, 6, 17, 0)  # Friday
+        assert next_run_after(now, self.times) == datetime(2026, 3, 9, 9, 45)
+
+    def test_all_days_includes_weekend(self):
+        now = datetime(2026, 3, 6, 17, 0)
+        assert next_run_after(now, self.times, weekdays_only=False) == datetime(2026, 3, 7, 9, 45)
+
+
+class TestHTTP:
+    @pytest.fixture
+    def base_url(self):
+        daemon = Daemon(main.Config(period="5d", recipients=["ops@x.com"]), [time(9, 45)])
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(daemon))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    def _post(self, url, data):
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, data=data)) as resp:
+                return resp.status, json.loads(resp.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_run_queued_with_stripped_recipients(self, base_url):
+        body = json.dumps({"period": "1y", "email": "a@x.com, b@y.com"}).encode()
+        status, record = self._post(f"{base_url}/run", body)
+        assert status == 202
+        assert (record["period"], record["recipients"]) == ("1y", ["a@x.com", "b@y.com"])
+
+    def test_empty_body_uses_daemon_defaults(self, base_url):
+        status, record = self._post(f"{base_url}/run", b"")
+        assert status == 202
+        assert (record["period"], record["recipients"]) == ("5d", ["ops@x.com"])
+
+    @pytest.mark.parametrize(
+        "data", [b"[]", b'"x"', b"5", b"{bad", b'{"email": 5}', b'{"period": "7d"}', b'{"symbol": "AAPL"}']
+    )
+    def test_bad_body_is_400(self, base_url, data):
+        assert self._post(f"{base_url}/run", data)[0] == 400
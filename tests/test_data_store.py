@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from tools import _data_store
+from tools._data_store import DataStore, is_handle, load_data_arg, resolve, run_scope
+
+
+class TestDataStore:
+    def test_put_and_get(self):
+        store = DataStore()
+
+        handle = store.put({"x": 1}, "AAPL-5d")
+
+        assert handle.startswith("handle:AAPL-5d:")
+        assert store.get(handle) == {"x": 1}
+
+    def test_oldest_entries_evicted(self):
+        store = DataStore(max_entries=2)
+
+        first = store.put(1, "a")
+        store.put(2, "b")
+        store.put(3, "c")
+
+        assert len(store) == 2
+        with pytest.raises(KeyError):
+            store.get(first)
+
+
+class TestResolve:
+    def test_nested_handles_replaced(self):
+        handle = _data_store.put({"symbol": "AAPL"}, "AAPL-5d")
+
+        resolved = resolve({"stock": handle, "other": [handle, 3], "plain": "text"})
+
+        assert resolved == {
+            "stock": {"symbol": "AAPL"},
+            "other": [{"symbol": "AAPL"}, 3],
+            "plain": "text",
+        }
+
+    def test_load_data_arg_accepts_bare_and_quoted_handle(self):
+        handle = _data_store.put({"symbol": "AAPL"}, "AAPL-5d")
+
+        assert load_data_arg(handle) == {"symbol": "AAPL"}
+        assert load_data_arg(json.dumps(handle)) == {"symbol": "AAPL"}
+
+    def test_unknown_handle_raises_key_error(self):
+        with pytest.raises(KeyError):
+            load_data_arg('{"stock": "handle:NOPE-5d:000000"}')
+
+    def test_is_handle(self):
+        assert is_handle("handle:AAPL-5d:abc123")
+        assert not is_handle("AAPL")
+        assert not is_handle(None)
+
+
+class TestRunScope:
+    def test_handles_dropped_when_scope_exits(self):
+        with run_scope():
+            handle = _data_store.put({"x": 1}, "AAPL-5d")
+            assert _data_store.get(handle) == {"x": 1}
+
+        with pytest.raises(KeyError):
+            _data_store.get(handle)
+
+    def test_handles_outside_scope_survive_other_scopes(self):
+        outside = _data_store.put({"x": 1}, "AAPL-5d")
+
+        with run_scope():
+            pass
+
+        assert _data_store.get(outside) == {"x": 1}
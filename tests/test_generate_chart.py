@@ -1,6 +1,15 @@
 import json
 import os
+import signal
 
+import numpy as np
+import pandas as pd
+
+from tools import _data_store
+from tools._chart_pool import ChartJob, ChartPool, ChartResult
+from tools._chart_render import CANDLE_MAX_BARS, render_chart
+from tools._downsample import aggregate_ohlcv, lttb
+from tools._ohlcv import to_columnar
 from tools.generate_chart import generate_chart
 
 
@@ -28,6 +37,40 @@ class TestGenerateChart:
         assert "chart_path" in result
         assert os.path.exists(result["chart_path"])
 
+    def test_columnar_data_creates_png(self, fake_ohlcv_response):
+        payload = {**fake_ohlcv_response, "data": to_columnar(fake_ohlcv_response["data"])}
+
+        result = generate_chart.invoke(
+            {"data": json.dumps(payload), "chart_type": "candlestick", "title": "AAPL Columnar"}
+        )
+
+        assert "error" not in result
+        assert os.path.exists(result["chart_path"])
+
+    def test_malformed_columnar_data_returns_error(self):
+        payload = {"data": {"dates": ["2025-01-01"], "close": [1.0]}}
+
+        result = generate_chart.invoke(
+            {"data": json.dumps(payload), "chart_type": "line", "title": "X"}
+        )
+
+        assert "invalid data" in result["error"]
+
+    def test_handle_resolved_to_stored_history(self, fake_ohlcv_response):
+        handle = _data_store.put(fake_ohlcv_response, "AAPL-5d")
+
+        result = generate_chart.invoke({"data": handle, "chart_type": "line", "title": "AAPL"})
+
+        assert "error" not in result
+        assert os.path.exists(result["chart_path"])
+
+    def test_unknown_handle_returns_error(self):
+        result = generate_chart.invoke(
+            {"data": "handle:AAPL-5d:000000", "chart_type": "line", "title": "AAPL"}
+        )
+
+        assert "unknown data handle" in result["error"]
+
     def test_invalid_json_returns_error(self):
         result = generate_chart.invoke(
             {"data": "{not valid", "chart_type": "line", "title": "X"}
@@ -51,3 +94,127 @@ class TestGenerateChart:
 
         assert "error" in result
         assert "unknown chart_type" in result["error"]
+
+
+class TestChartPool:
+    def test_render_batch_returns_png_bytes_in_order(self, fake_ohlcv_response):
+        pool = ChartPool(workers=1)
+        try:
+            results = pool.render_batch([
+                ChartJob(data=fake_ohlcv_response["data"], chart_type="line", title="A"),
+                ChartJob(data=fake_ohlcv_response["data"], chart_type="bar", title="B"),
+            ])
+            stats = pool.stats()
+        finally:
+            pool.shutdown()
+
+        assert results[0].error is None
+        assert results[0].png.startswith(b"\x89PNG")
+        assert results[0].render_ms > 0
+        assert results[1].png is None
+        assert "unknown chart_type" in results[1].error
+        assert stats["jobs"] == 2
+        assert stats["errors"] == 1
+
+    def test_generate_chart_uses_pool_when_configured(self, mocker, fake_ohlcv_response):
+        mock_pool = mocker.MagicMock()
+        mock_pool.render.return_value = ChartResult(
+            png=b"\x89PNGfake", error=None, render_ms=1.0, worker_pid=1
+        )
+        mocker.patch("tools.generate_chart.get_chart_pool", return_value=mock_pool)
+
+        result = generate_chart.invoke(
+            {"data": json.dumps(fake_ohlcv_response), "chart_type": "line", "title": "X"}
+        )
+
+        mock_pool.render.assert_called_once()
+        with open(result["chart_path"], "rb") as f:
+            assert f.read() == b"\x89PNGfake"
+
+
+    def test_killed_worker_falls_back_in_process_and_pool_recovers(self, mocker, fake_ohlcv_response):
+        pool = ChartPool(workers=1)
+        mocker.patch("tools.generate_chart.get_chart_pool", return_value=pool)
+        args = {"data": json.dumps(fake_ohlcv_response), "chart_type": "line", "title": "X"}
+        try:
+            (pid,) = pool.warm()
+            os.kill(pid, signal.SIGKILL)
+
+            result = generate_chart.invoke(args)
+            again = pool.render(ChartJob(data=fake_ohlcv_response["data"], chart_type="line", title="Y"))
+            stats = pool.stats()
+        finally:
+            pool.shutdown()
+
+        with open(result["chart_path"], "rb") as f:
+            assert f.read().startswith(b"\x89PNG")
+        assert again.png.startswith(b"\x89PNG")
+        assert again.worker_pid != pid
+        assert stats["restarts"] == 1
+
+    def test_pool_errors_fall_back_to_in_process_rendering(self, mocker, fake_ohlcv_response):
+        mock_pool = mocker.MagicMock()
+        mock_pool.render.side_effect = RuntimeError("cannot schedule new futures after shutdown")
+        mocker.patch("tools.generate_chart.get_chart_pool", return_value=mock_pool)
+
+        result = generate_chart.invoke(
+            {"data": json.dumps(fake_ohlcv_response), "chart_type": "line", "title": "X"}
+        )
+
+        with open(result["chart_path"], "rb") as f:
+            assert f.read().startswith(b"\x89PNG")
+
+
+class TestDownsample:
+    def test_lttb_keeps_endpoints_and_target_count(self):
+        x = np.arange(1000)
+        y = np.sin(x / 50.0)
+
+        keep = lttb(x, y, 100)
+
+        assert len(keep) == 100
+        assert keep[0] == 0
+        assert keep[-1] == 999
+        assert np.all(np.diff(keep) > 0)
+
+    def test_lttb_keeps_spike(self):
+        y = np.zeros(1000)
+        y[437] = 50.0
+
+        keep = lttb(np.arange(1000), y, 50)
+
+        assert 437 in keep
+
+    def test_lttb_short_series_unchanged(self):
+        keep = lttb(np.arange(10), np.arange(10), 100)
+
+        assert list(keep) == list(range(10))
+
+    def test_aggregate_ohlcv_weekly(self):
+        index = pd.bdate_range("2025-01-06", periods=10)  # Mon 6th .. Fri 17th
+        df = pd.DataFrame(
+            {
+                "Open": np.arange(10, dtype=float),
+                "High": np.arange(10, dtype=float) + 5,
+                "Low": np.arange(10, dtype=float) - 5,
+                "Close": np.arange(10, dtype=float) + 1,
+                "Volume": np.full(10, 100),
+            },
+            index=index,
+        )
+
+        bars = aggregate_ohlcv(df, "W-FRI")
+
+        assert list(bars.index.strftime("%Y-%m-%d")) == ["2025-01-10", "2025-01-17"]
+        assert bars.iloc[0].tolist() == [0.0, 9.0, -5.0, 5.0, 500]
+        assert bars.iloc[1].tolist() == [5.0, 14.0, 0.0, 10.0, 500]
+
+    def test_long_candlestick_chart_renders(self):
+        data = {
+            d.strftime("%Y-%m-%d"): {"open": 10.0, "high": 11.0, "low": 9.0, "close": 10.5, "volume": 1000}
+            for d in pd.bdate_range("2020-01-01", periods=CANDLE_MAX_BARS * 3)
+        }
+
+        png = render_chart(data, "candlestick", "Long")
+
+        assert png.startswith(b"\x89PNG")
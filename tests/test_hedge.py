@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from tools import _hedge
+from tools._hedge import hedge_stats, hedged
+
+
+@pytest.fixture(autouse=True)
+def fresh_hedges(monkeypatch):
+    monkeypatch.setenv("HEDGE_BUDGET_TEST", "0.05")
+    _hedge.reset()
+    yield
+    _hedge.reset()
+
+
+def _slow(result, seconds, calls=None, name=None):
+    def fn():
+        if calls is not None:
+            calls.append(name)
+        time.sleep(seconds)
+        return result
+    return fn
+
+
+class TestHedged:
+    def test_fast_primary_never_starts_fallback(self):
+        calls = []
+
+        result = hedged("test", _slow({"source": "yf"}, 0), _slow({"source": "scraper"}, 0, calls, "fallback"))
+
+        assert result == {"source": "yf"}
+        assert calls == []
+        assert hedge_stats()["test"]["primary_wins"] == 1
+
+    @pytest.mark.parametrize("primary", [_slow(None, 0), lambda: 1 / 0])
+    def test_failed_primary_falls_back_without_waiting(self, primary):
+        start = time.monotonic()
+
+        result = hedged("test", primary, _slow({"source": "scraper"}, 0))
+
+        assert result == {"source": "scraper"}
+        assert time.monotonic() - start < 0.05
+        assert hedge_stats()["test"]["hedged"] == 0
+
+    def test_hung_primary_loses_to_fallback(self):
+        primary_done = threading.Event()
+
+        def primary():
+            time.sleep(0.5)
+            primary_done.set()
+            return {"source": "yf"}
+
+        start = time.monotonic()
+        result = hedged("test", primary, _slow({"source": "scraper"}, 0.05))
+
+        assert result == {"source": "scraper"}
+        assert time.monotonic() - start < 0.3
+        stats = hedge_stats()["test"]
+        assert (stats["hedged"], stats["fallback_wins"]) == (1, 1)
+
+        primary_done.wait(2)
+        time.sleep(0.05)
+        # yfinance ended ~0.45s after the scraper started; sequentially that is what it would have added
+        assert 0.3 < hedge_stats()["test"]["time_saved_s"] < 0.6
+
+    def test_slow_primary_still_wins_if_fallback_slower(self):
+        result = hedged("test", _slow({"source": "yf"}, 0.1), _slow({"source": "scraper"}, 0.5))
+
+        assert result == {"source": "yf"}
+        stats = hedge_stats()["test"]
+        assert (stats["hedged"], stats["primary_wins"]) == (1, 1)
+
+    def test_fallback_error_waits_for_primary(self):
+        result = hedged("test", _slow({"source": "yf"}, 0.15), _slow({"error": "scrape failed"}, 0))
+
+        assert result == {"source": "yf"}
+
+    def test_both_failing_returns_fallback_error(self):
+        result = hedged("test", _slow(None, 0.1), _slow({"error": "scrape failed"}, 0))
+
+        assert result == {"error": "scrape failed"}
+
+    def test_zero_budget_disables_hedging(self, monkeypatch):
+        monkeypatch.setenv("HEDGE_BUDGET_TEST", "0")
+        _hedge.reset()
+        calls = []
+
+        result = hedged("test", _slow({"source": "yf"}, 0.1), _slow({"source": "scraper"}, 0, calls, "fallback"))
+
+        assert result == {"source": "yf"}
+        assert calls == []
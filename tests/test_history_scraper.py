@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+
+from tools._playwright_scraper import _PERIOD_ROWS, _history_range, _parse_history_row
+
+_NOW = datetime(2025, 6, 16, 15, 30, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("period", list(_PERIOD_ROWS))
+def test_history_range_covers_requested_trading_days(period):
+    period1, period2 = _history_range(period, _NOW)
+    start = datetime.fromtimestamp(period1, timezone.utc).date()
+    end = datetime.fromtimestamp(period2, timezone.utc).date()
+    assert len(pd.bdate_range(start, end, inclusive="left")) >= _PERIOD_ROWS[period]
+
+
+def test_history_range_includes_today():
+    _, period2 = _history_range("1mo", _NOW)
+    assert period2 > _NOW.timestamp()
+
+
+def test_history_range_is_bounded():
+    period1, _ = _history_range("1mo", _NOW)
+    assert _NOW.timestamp() - period1 < 60 * 86400
+
+
+def test_parse_history_row():
+    cells = ["Jun 13, 2025", "199.73", "200.37", "195.70", "196.45", "196.45", "51,447,300"]
+    assert _parse_history_row(cells) == (
+        "2025-06-13",
+        {"open": 199.73, "high": 200.37, "low": 195.7, "close": 196.45, "volume": 51_447_300},
+    )
+
+
+def test_parse_history_row_skips_dividend_row():
+    assert _parse_history_row(["May 12, 2025", "0.26 Dividend"]) is None
+
+
+def test_parse_history_row_skips_bad_date():
+    assert _parse_history_row(["Date", "Open", "High", "Low", "Close", "Adj Close", "Volume"]) is None
+
+
+def test_parse_history_row_skips_missing_values():
+    assert _parse_history_row(["Jun 13, 2025", "-", "-", "-", "-", "-", "-"]) is None
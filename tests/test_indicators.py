@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools import _data_store
+from tools._indicators import FIELDS, WARMUP, IndicatorCache, compute, smooth
+from tools._ohlcv import to_columnar, to_rows
+from tools.indicators import get_indicators
+
+
+def synthetic_bars(n: int, symbols: int = 1, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    shape = (symbols, n)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, shape), axis=-1))
+    bars = {
+        "open": close * (1 + rng.normal(0, 0.005, shape)),
+        "high": close * (1 + rng.uniform(0, 0.02, shape)),
+        "low": close * (1 - rng.uniform(0, 0.02, shape)),
+        "close": close,
+        "volume": rng.integers(500_000, 5_000_000, shape).astype(float),
+    }
+    return {f: v[0] for f, v in bars.items()} if symbols == 1 else bars
+
+
+def synthetic_history(n: int) -> dict:
+    columns = {"dates": [str(d.date()) for d in pd.bdate_range("2024-01-01", periods=n)]}
+    columns.update({f: np.round(v, 2).tolist() for f, v in synthetic_bars(n).items()})
+    return {"symbol": "SYN", "period": "1y", "data": to_rows(columns)}
+
+
+def _columns(bars: dict, start: int = 0, stop: int | None = None) -> dict:
+    n = len(bars["close"])
+    dates = [f"d{i:05d}" for i in range(n)][start:stop]
+    return {"dates": dates, **{f: bars[f][start:stop].tolist() for f in FIELDS}}
+
+
+@pytest.fixture
+def bars():
+    return synthetic_bars(252)
+
+
+def test_smooth_matches_loop_over_several_blocks():
+    x = np.random.default_rng(1).normal(size=1000)
+    y, expected = smooth(x, 2 / 3, 5.0), []
+    prev = 5.0
+    for v in x:
+        prev = prev / 3 + 2 / 3 * v
+        expected.append(prev)
+    np.testing.assert_allclose(y, expected, rtol=1e-9, atol=1e-12)
+
+
+def test_matches_pandas(bars):
+    out = compute(bars)
+    close = pd.Series(bars["close"])
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    loss = (-delta).clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    expected = {
+        "sma_50": close.rolling(50).mean(),
+        "ema_26": close.ewm(span=26, adjust=False).mean(),
+        "macd_signal": macd.ewm(span=9, adjust=False).mean(),
+        "bb_upper": close.rolling(20).mean() + 2 * close.rolling(20).std(ddof=0),
+        "rsi_14": 100 - 100 / (1 + gain / loss),
+    }
+    for name, series in expected.items():
+        np.testing.assert_allclose(out[name], series.to_numpy(), rtol=1e-9, equal_nan=True, err_msg=name)
+
+
+def test_atr_and_vwap_first_bars(bars):
+    out = compute(bars)
+    assert out["atr_14"][0] == pytest.approx(bars["high"][0] - bars["low"][0])
+    typical = (bars["high"][0] + bars["low"][0] + bars["close"][0]) / 3
+    assert out["vwap"][0] == pytest.approx(typical)
+    assert np.isnan(out["rsi_14"][0]) and not np.isnan(out["rsi_14"][1])
+
+
+def test_flat_prices_give_neutral_rsi():
+    flat = {f: np.full(30, 10.0) for f in FIELDS}
+    assert compute(flat)["rsi_14"][-1] == 50.0
+
+
+def test_matrix_rows_match_single_series():
+    matrix = synthetic_bars(126, symbols=20)
+    out = compute(matrix)
+    single = compute({f: matrix[f][13] for f in FIELDS})
+    for name in single:
+        np.testing.assert_allclose(out[name][13], single[name], equal_nan=True, err_msg=name)
+
+
+def test_resume_matches_full_computation(bars):
+    full = compute(bars)
+    start = len(bars["close"]) - 7
+    prev = {name: series[:start] for name, series in full.items()}
+    resumed = compute(bars, prev, start=start)
+    for name in full:
+        np.testing.assert_allclose(resumed[name], full[name][start:], rtol=1e-9, equal_nan=True, err_msg=name)
+
+
+def test_resume_inside_warmup_rejected(bars):
+    with pytest.raises(ValueError):
+        compute(bars, compute(bars), start=WARMUP - 1)
+
+
+def test_cache_appends_new_bars_incrementally(bars):
+    cache = IndicatorCache()
+    n = len(bars["close"])
+    cache.get("SYN", "1y", _columns(bars, 0, n - 3))
+
+    # The window slides forward three bars
+    out = cache.get("SYN", "1y", _columns(bars, 3, n))
+
+    full = compute(bars)
+    fresh = compute({f: bars[f][3:] for f in FIELDS})
+    for name in ("sma_20", "sma_50", "bb_upper", "rsi_14"):
+        # Undefined over the window's own warm-up, as a fresh computation would be
+        assert np.isnan(out[name]).sum() == np.isnan(fresh[name]).sum()
+    np.testing.assert_allclose(out["sma_50"], fresh["sma_50"], equal_nan=True)
+    np.testing.assert_allclose(out["ema_12"], full["ema_12"][3:])
+    assert out["vwap"][0] == pytest.approx((bars["high"][3] + bars["low"][3] + bars["close"][3]) / 3)
+    assert cache.stats() == {"entries": 1, "hits": 0, "incremental": 1, "full": 1, "bars_computed": n - 3 + 3}
+
+
+def test_cache_recomputes_revised_last_bar_and_hits_unchanged(bars):
+    cache = IndicatorCache()
+    columns = _columns(bars)
+    cache.get("SYN", "1y", columns)
+    cache.get("SYN", "1y", columns)
+    revised = {**columns, "close": columns["close"][:-1] + [columns["close"][-1] * 1.1]}
+
+    out = cache.get("SYN", "1y", revised)
+
+    assert out["sma_20"][-1] == pytest.approx(np.mean(revised["close"][-20:]))
+    stats = cache.stats()
+    assert (stats["hits"], stats["incremental"], stats["full"]) == (1, 1, 1)
+
+
+def test_tool_with_handle():
+    history = synthetic_history(252)
+    handle = _data_store.put(history, "SYN-1y")
+
+    result = get_indicators.invoke({"data": handle, "indicators": ["rsi", "bollinger"]})
+
+    assert set(result["latest"]) == {"rsi_14", "bb_upper", "bb_middle", "bb_lower"}
+    assert result["rows"] == len(history["data"])
+    assert "series" not in result
+    series = _data_store.get(result["handle"])["data"]
+    assert series["dates"] == list(history["data"])
+    assert series["bb_middle"][:19] == [None] * 19
+
+
+def test_tool_short_series_inline_in_columnar_layout():
+    history = synthetic_history(5)
+    history["data"] = to_columnar(history["data"])
+
+    result = get_indicators.invoke({"data": _data_store.put(history, "SYN-5d")})
+
+    assert result["series"]["sma_20"] == [None] * 5
+    assert result["latest"]["vwap"] is not None
+
+
+@pytest.mark.parametrize("layout", ["rows", "columnar"])
+@pytest.mark.parametrize("newest_first", [False, True])
+def test_tool_computes_oldest_first_whatever_the_input_order(layout, newest_first):
+    dates = [str(d.date()) for d in pd.bdate_range("2024-01-01", periods=60)]
+    closes = [100.0 + i for i in range(60)]
+    columns = {"dates": dates, "open": closes, "high": [c + 1 for c in closes], "low": [c - 1 for c in closes],
+               "close": closes, "volume": [1000.0] * 60}
+    if newest_first:
+        columns = {key: values[::-1] for key, values in columns.items()}
+    data = columns if layout == "columnar" else to_rows(columns)
+
+    result = get_indicators.invoke({"data": _data_store.put({"symbol": "UP", "period": "3mo", "data": data}, "UP")})
+
+    # A steadily rising close: no losses, so RSI is 100, and the latest SMA is over the newest 20 closes
+    assert result["latest"]["rsi_14"] == 100.0
+    assert result["latest"]["sma_20"] == pytest.approx(sum(closes[-20:]) / 20)
+    series = _data_store.get(result["handle"])["data"]
+    assert series["dates"] == dates
+
+
+def test_tool_unknown_indicator():
+    result = get_indicators.invoke({"data": _data_store.put(synthetic_history(5), "SYN"), "indicators": ["adx"]})
+    assert "error" in result
@@ -0,0 +1,55 @@
+import threading
+import time
+
+import pytest
+
+from tools import _limits
+from tools._limits import limit, limit_stats
+
+
+@pytest.fixture(autouse=True)
+def fresh_limits():
+    _limits.reset()
+    yield
+    _limits.reset()
+
+
+class TestLimit:
+    def test_caps_concurrent_holders(self, monkeypatch):
+        monkeypatch.setenv("RESOURCE_LIMIT_SANDBOX", "2")
+        peak = 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal peak
+            with limit("sandbox"):
+                with lock:
+                    peak = max(peak, limit_stats()["sandbox"]["in_use"])
+                time.sleep(0.02)
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = limit_stats()["sandbox"]
+        assert peak == 2
+        assert stats["limit"] == 2
+        assert stats["acquired"] == 6
+        assert stats["in_use"] == 0
+        assert stats["avg_wait_ms"] > 0
+
+    def test_zero_means_unlimited(self, monkeypatch):
+        monkeypatch.setenv("RESOURCE_LIMIT_CHART", "0")
+        with limit("chart"), limit("chart"), limit("chart"):
+            assert limit_stats()["chart"]["in_use"] == 3
+        assert limit_stats()["chart"]["limit"] is None
+
+    def test_slot_released_on_exception(self, monkeypatch):
+        monkeypatch.setenv("RESOURCE_LIMIT_SMTP", "1")
+        with pytest.raises(RuntimeError):
+            with limit("smtp"):
+                raise RuntimeError("boom")
+        with limit("smtp"):
+            assert limit_stats()["smtp"]["in_use"] == 1
@@ -0,0 +1,94 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessage
+from openai import RateLimitError
+
+import main
+
+CANDIDATES = [("m0", "key0"), ("m1", "key1")]
+
+
+def _rate_limit() -> RateLimitError:
+    response = httpx.Response(429, request=httpx.Request("POST", "https://openrouter.ai/api/v1/chat/completions"))
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+class FakeAgent:
+    def __init__(self, model: str, limited: set[str], barrier: threading.Barrier | None = None):
+        self.model = model
+        self.limited = limited
+        self.barrier = barrier
+
+    def stream(self, state, config, stream_mode):
+        if self.model in self.limited:
+            if self.barrier is not None:
+                self.barrier.wait(timeout=5)
+            raise _rate_limit()
+        yield {"model": {"messages": [AIMessage(content=f"done by {self.model}")]}}
+
+
+@pytest.fixture
+def limited(monkeypatch):
+    """Models that answer with a rate limit; main's sticky index starts fresh."""
+    models: set[str] = set()
+    monkeypatch.setattr(main, "_CANDIDATES", list(CANDIDATES))
+    monkeypatch.setattr(main, "_current_idx", 0)
+    monkeypatch.setattr(main, "_advanced_at", 0.0)
+    monkeypatch.setattr(main, "MODEL_COOLDOWN", 60.0)
+    monkeypatch.setattr(main, "_make_agent", lambda model, key, config: FakeAgent(model, models))
+    return models
+
+
+def _run() -> str:
+    history = main._run_agent([("human", "go")], None, [], lambda name, elapsed: None, lambda turn: None)
+    return history[-1].content
+
+
+def test_rate_limit_moves_this_and_later_runs_to_the_next_candidate(limited):
+    limited.add("m0")
+    assert _run() == "done by m1"
+    limited.clear()
+    assert _run() == "done by m1"
+    assert main._current_idx == 1
+
+
+def test_exhausted_candidates_fail_with_exhausted_not_unconfigured(limited):
+    limited.update({"m0", "m1"})
+    with pytest.raises(main.CandidatesExhausted, match="all 2 model candidates exhausted"):
+        _run()
+    limited.clear()
+    # Still inside the cooldown: nothing is retried
+    with pytest.raises(main.CandidatesExhausted, match="retrying from the first in"):
+        _run()
+
+
+def test_rotation_restarts_from_the_first_candidate_after_the_cooldown(limited, monkeypatch):
+    limited.update({"m0", "m1"})
+    with pytest.raises(main.CandidatesExhausted):
+        _run()
+    limited.clear()
+    monkeypatch.setattr(main, "_advanced_at", main._advanced_at - 61)
+    assert _run() == "done by m0"
+    assert main._current_idx == 0
+
+
+def test_concurrent_runs_limited_on_the_same_candidate_advance_past_it_once(limited, monkeypatch):
+    monkeypatch.setattr(main, "_CANDIDATES", [*CANDIDATES, ("m2", "key2")])
+    # Both jobs are inside m0's call when it rate limits them
+    barrier = threading.Barrier(2)
+    monkeypatch.setattr(main, "_make_agent", lambda model, key, config: FakeAgent(model, limited, barrier))
+    limited.add("m0")
+
+    with ThreadPoolExecutor(2) as pool:
+        results = [f.result() for f in [pool.submit(_run), pool.submit(_run)]]
+
+    assert results == ["done by m1", "done by m1"]
+    assert main._current_idx == 1
+
+
+def test_no_candidates_returns_none(limited, monkeypatch):
+    monkeypatch.setattr(main, "_CANDIDATES", [])
+    assert main._run_agent([("human", "go")], None, [], lambda n, e: None, lambda t: None) is None
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from tools._news_dedupe import MAX_DISTANCE, cluster, simhash
+
+
+def _distance(a, b):
+    h = simhash([a, b])
+    return int(np.bitwise_count(h[0] ^ h[1]))
+
+
+class TestSimhash:
+    def test_case_punctuation_and_publisher_suffix_ignored(self):
+        assert _distance(
+            "Apple beats Q3 estimates as iPhone sales jump",
+            "Apple Beats Q3 Estimates, as iPhone Sales Jump - Reuters",
+        ) == 0
+
+    @pytest.mark.parametrize("a, b", [
+        ("Apple beats Q3 estimates as iPhone sales jump", "Apple beats third-quarter estimates as iPhone sales jump"),
+        ("Nvidia stock hits record on AI chip demand", "Nvidia stock hits a record on AI chip demand"),
+    ])
+    def test_light_edits_are_near(self, a, b):
+        assert _distance(a, b) <= MAX_DISTANCE
+
+    @pytest.mark.parametrize("a, b", [
+        ("Apple beats Q3 estimates as iPhone sales jump", "Nvidia shares surge after record data center revenue"),
+        ("Apple stock rises", "Apple stock falls"),
+    ])
+    def test_different_stories_are_far(self, a, b):
+        assert _distance(a, b) > MAX_DISTANCE
+
+    def test_empty_titles_hash_to_zero(self):
+        assert simhash([None, ""]).tolist() == [0, 0]
+        assert len(simhash([])) == 0
+
+
+class TestCluster:
+    def test_first_member_represents_cluster(self):
+        titles = [
+            "Tesla recalls 200,000 vehicles over software issue",
+            "Fed holds rates steady",
+            "Tesla Recalls 200,000 Vehicles Over Software Issue - CNBC",
+            "Tesla recalls 200,000 vehicles over software issue | Yahoo Finance",
+        ]
+
+        assert cluster(titles) == [0, 1, 0, 0]
+
+    def test_distinct_titles_each_their_own(self):
+        titles = ["Apple stock rises", "Apple stock falls", "Microsoft signs cloud deal"]
+
+        assert cluster(titles) == [0, 1, 2]
@@ -0,0 +1,131 @@
+import threading
+import time
+
+from tools._news_store import MAX_ITEMS, NewsStore
+
+
+_STORIES = [
+    "Chipmaker beats quarterly estimates", "Regulators open antitrust probe", "Board approves stock buyback",
+    "Analyst upgrades shares to buy", "Factory fire disrupts supply chain", "CEO steps down unexpectedly",
+    "New phone launch draws long lines", "Union reaches wage deal with automaker", "Cloud unit signs defense contract",
+    "Retail sales data lifts consumer names", "Drug trial misses primary endpoint", "Airline cancels summer routes",
+    "Bank raises dividend after stress test", "Streaming service hikes subscription prices", "Oil major writes down assets",
+]
+
+
+def _item(n, title=None):
+    return {"title": title or _STORIES[n], "publisher": "Wire", "published_at": None, "url": f"https://example.com/{n}"}
+
+
+def _fetcher(*batches):
+    calls = []
+
+    def fetch(symbol):
+        calls.append(symbol)
+        return {"symbol": symbol, "timestamp": "now", "news": batches[min(len(calls), len(batches)) - 1]}
+
+    return fetch, calls
+
+
+class TestNewsStore:
+    def test_first_fetch_marks_everything_new(self):
+        fetch, _ = _fetcher([_item(2), _item(1)])
+
+        result = NewsStore().get("AAPL", fetch)
+
+        assert [i["title"] for i in result["news"]] == [_STORIES[2], _STORIES[1]]
+        assert all(i["new"] for i in result["news"])
+        assert result["new_count"] == 2
+
+    def test_repeat_within_ttl_served_from_store(self):
+        store = NewsStore(ttl_seconds=60)
+        fetch, calls = _fetcher([_item(1)])
+
+        store.get("AAPL", fetch)
+        result = store.get("AAPL", fetch)
+
+        assert calls == ["AAPL"]
+        assert store.stats()["hits"] == 1
+        # The first call already returned it
+        assert result["new_count"] == 0
+        assert not result["news"][0]["new"]
+        assert store.get("AAPL", fetch)["new_count"] == 0
+
+    def test_refetch_adds_only_unseen_items_first(self):
+        store = NewsStore(ttl_seconds=0)
+        fetch, _ = _fetcher([_item(2), _item(1)], [_item(3), _item(2), _item(1)])
+
+        store.get("AAPL", fetch)
+        result = store.get("AAPL", fetch)
+
+        assert [(i["title"], i["new"]) for i in result["news"]] == [
+            (_STORIES[3], True), (_STORIES[2], False), (_STORIES[1], False),
+        ]
+        assert result["new_count"] == 1
+        assert store.stats()["new_items"] == 3
+
+    def test_seen_items_survive_process_restart(self):
+        fetch, _ = _fetcher([_item(1)], [_item(2), _item(1)])
+        NewsStore(ttl_seconds=0).get("AAPL", fetch)
+
+        result = NewsStore(ttl_seconds=0).get("AAPL", fetch)
+
+        assert result["new_count"] == 1
+
+    def test_syndicated_copies_returned_once_with_count(self):
+        fetch, _ = _fetcher([
+            _item(0),
+            _item(2, "Chipmaker Beats Quarterly Estimates - Reuters"),
+            _item(3),
+            _item(4, "Chipmaker beats quarterly estimates | MarketWatch"),
+        ])
+
+        result = NewsStore().get("AAPL", fetch)
+
+        assert [(i["title"], i["duplicates"]) for i in result["news"]] == [(_STORIES[0], 2), (_STORIES[3], 0)]
+        assert result["new_count"] == 2
+
+    def test_copy_of_stored_story_is_not_new(self):
+        store = NewsStore(ttl_seconds=0)
+        fetch, _ = _fetcher([_item(0)], [_item(2, "Chipmaker beats quarterly estimates - Bloomberg"), _item(0)])
+
+        store.get("AAPL", fetch)
+        result = store.get("AAPL", fetch)
+
+        assert result["new_count"] == 0
+        assert [(i["title"], i["duplicates"]) for i in result["news"]] == [(_STORIES[0], 1)]
+        assert store.stats()["duplicates"] == 1
+
+    def test_errors_returned_and_not_stored(self):
+        store = NewsStore()
+        calls = []
+
+        def fetch(symbol):
+            calls.append(symbol)
+            return {"error": "down"}
+
+        assert store.get("AAPL", fetch) == {"error": "down"}
+        store.get("AAPL", fetch)
+        assert len(calls) == 2
+
+    def test_returns_at_most_max_items(self):
+        fetch, _ = _fetcher([_item(n) for n in range(MAX_ITEMS + 5)])
+
+        assert len(NewsStore().get("AAPL", fetch)["news"]) == MAX_ITEMS
+
+    def test_concurrent_requests_share_one_fetch(self):
+        store = NewsStore(ttl_seconds=60)
+        calls = []
+
+        def fetch(symbol):
+            calls.append(symbol)
+            time.sleep(0.1)
+            return {"symbol": symbol, "timestamp": "now", "news": [_item(1)]}
+
+        threads = [threading.Thread(target=store.get, args=("AAPL", fetch)) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert calls == ["AAPL"]
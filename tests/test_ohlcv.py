@@ -0,0 +1,54 @@
+import pytest
+
+from tools._ohlcv import as_rows, is_columnar, sort_by_date, to_columnar, to_rows
+
+
+class TestLayoutConversion:
+    def test_round_trip(self, fake_ohlcv_response):
+        rows = fake_ohlcv_response["data"]
+
+        columns = to_columnar(rows)
+
+        assert columns["dates"] == ["2025-01-01", "2025-01-02"]
+        assert columns["close"] == [153.00, 157.00]
+        assert columns["volume"] == [1000000, 1200000]
+        assert to_rows(columns) == rows
+
+    def test_is_columnar(self, fake_ohlcv_response):
+        rows = fake_ohlcv_response["data"]
+
+        assert not is_columnar(rows)
+        assert is_columnar(to_columnar(rows))
+
+    def test_as_rows_accepts_both_layouts(self, fake_ohlcv_response):
+        rows = fake_ohlcv_response["data"]
+
+        assert as_rows(rows) is rows
+        assert as_rows(to_columnar(rows)) == rows
+
+    def test_unequal_lengths_raise(self, fake_ohlcv_response):
+        columns = to_columnar(fake_ohlcv_response["data"])
+        columns["volume"].pop()
+
+        with pytest.raises(ValueError, match="equal-length"):
+            to_rows(columns)
+
+    def test_missing_field_raises(self, fake_ohlcv_response):
+        columns = to_columnar(fake_ohlcv_response["data"])
+        del columns["high"]
+
+        with pytest.raises(ValueError, match="equal-length"):
+            to_rows(columns)
+
+    def test_sort_by_date_reorders_newest_first_data(self, fake_ohlcv_response):
+        rows = fake_ohlcv_response["data"]
+        newest_first = dict(reversed(list(rows.items())))
+
+        assert list(sort_by_date(newest_first)) == ["2025-01-01", "2025-01-02"]
+        columns = sort_by_date(to_columnar(newest_first))
+        assert columns["dates"] == ["2025-01-01", "2025-01-02"]
+        assert columns["close"] == [153.00, 157.00]
+
+    def test_sort_by_date_keeps_ordered_columns(self, fake_ohlcv_response):
+        columns = to_columnar(fake_ohlcv_response["data"])
+        assert sort_by_date(columns) is columns
@@ -0,0 +1,99 @@
+import pandas as pd
+import pytest
+
+import prefetch
+from tools._bar_store import BarStore
+
+_NASDAQ_LISTED = """Symbol|Security Name|Market Category|Test Issue|Financial Status|Round Lot Size|ETF|NextShares
+AAPL|Apple Inc. - Common Stock|Q|N|N|100|N|N
+ZXZZT|NASDAQ TEST STOCK|G|Y|N|100|N|N
+QQQ|Invesco QQQ Trust, Series 1|G|N|N|100|Y|N
+File Creation Time: 0619202522:02|||||||
+"""
+
+
+def _bulk(symbols: list[str], period: str, rows: int = 5) -> pd.DataFrame:
+    """Shaped like yf.download(group_by="ticker"); a symbol with no data gets all-NaN columns."""
+    index = pd.bdate_range("2025-01-06", periods=rows)
+    frames = {}
+    for symbol in symbols:
+        frame = pd.DataFrame(
+            {
+                "Open": [100.0 + i for i in range(rows)],
+                "High": [102.0 + i for i in range(rows)],
+                "Low": [99.0 + i for i in range(rows)],
+                "Close": [101.0 + i for i in range(rows)],
+                "Volume": [1_000_000.0] * rows,
+            },
+            index=index,
+        )
+        frames[symbol] = frame * float("nan") if symbol == "DELISTED" else frame
+    return pd.concat(frames, axis=1)
+
+
+def test_parse_nasdaq_listed_skips_test_issues_and_footer():
+    assert prefetch.parse_nasdaq_listed(_NASDAQ_LISTED) == ["AAPL", "QQQ"]
+
+
+def test_load_universe_from_file_with_extras(tmp_path):
+    universe = tmp_path / "symbols.txt"
+    universe.write_text("aapl\nBRK.B\nSPY\n")
+    assert prefetch.load_universe(str(universe), "SPY,XLK") == ["AAPL", "BRK-B", "SPY", "XLK"]
+
+
+def test_rate_limiter_spaces_acquires():
+    clock = iter([0.0, 0.0, 0.0])
+    limiter = prefetch.RateLimiter(10, clock=lambda: next(clock))
+    sleeps = []
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(prefetch.time, "sleep", sleeps.append)
+        for _ in range(3):
+            limiter.acquire()
+    assert sleeps == pytest.approx([0.1, 0.2])
+
+
+def test_prefetch_stores_bars_and_reports_failures(tmp_path):
+    store = BarStore(tmp_path / "bars.sqlite3")
+    calls = []
+
+    def download(chunk, period):
+        calls.append(list(chunk))
+        return _bulk(chunk, period)
+
+    report = prefetch.prefetch(
+        ["AAPL", "MSFT", "DELISTED"], store, period="5d", chunk_size=2, workers=2, rate=0, download=download
+    )
+
+    assert sorted(map(len, calls)) == [1, 2]
+    assert report.fetched == 2
+    assert report.failed == {"DELISTED": "no data"}
+    assert report.symbols_per_s > 0
+    assert store.read("MSFT", "5d")["close"] == [101.0, 102.0, 103.0, 104.0, 105.0]
+
+
+def test_prefetch_resumes_skipping_fresh_symbols(tmp_path):
+    store = BarStore(tmp_path / "bars.sqlite3")
+    prefetch.prefetch(["AAPL"], store, period="5d", rate=0, download=_bulk)
+    calls = []
+
+    def download(chunk, period):
+        calls.append(list(chunk))
+        return _bulk(chunk, period)
+
+    report = prefetch.prefetch(["AAPL", "MSFT"], store, period="5d", rate=0, download=download)
+
+    assert calls == [["MSFT"]]
+    assert report.skipped == 1
+    assert report.fetched == 1
+
+
+def test_failed_download_marks_whole_chunk(tmp_path):
+    store = BarStore(tmp_path / "bars.sqlite3")
+
+    def download(chunk, period):
+        raise RuntimeError("rate limited")
+
+    report = prefetch.prefetch(["AAPL", "MSFT"], store, period="5d", rate=0, download=download)
+
+    assert report.fetched == 0
+    assert report.failed == {"AAPL": "RuntimeError: rate limited", "MSFT": "RuntimeError: rate limited"}
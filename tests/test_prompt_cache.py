@@ -0,0 +1,89 @@
+import uuid
+from datetime import date
+from unittest import mock
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+import main
+from prompts import system
+from prompts.system import SYSTEM_PROMPT_PREFIX, get_system_prompt, system_prompt_parts
+
+
+@pytest.fixture(autouse=True)
+def no_recorded_turns():
+    main._turns.clear()
+    yield
+    main._turns.clear()
+
+
+def test_prefix_is_identical_for_every_run_setting():
+    with mock.patch.object(system, "date", mock.Mock(today=lambda: date(2025, 1, 2))):
+        first = system_prompt_parts("5d", ["a@example.com"], None)
+    with mock.patch.object(system, "date", mock.Mock(today=lambda: date(2025, 1, 3))):
+        second = system_prompt_parts("1y", ["b@example.com", "c@example.com"], "AAPL")
+
+    assert first[0] == second[0] == SYSTEM_PROMPT_PREFIX
+    assert "2025-01-02" in first[1] and "5d" in first[1] and "a@example.com" in first[1]
+    assert "top NASDAQ gainer" in first[1]
+    assert "2025-01-03" in second[1] and "Subject symbol: AAPL" in second[1]
+    assert "b@example.com, c@example.com" in second[1]
+
+
+def test_system_prompt_is_prefix_then_run_settings():
+    prompt = get_system_prompt("6mo", ["a@example.com"], "MSFT")
+    prefix, suffix = system_prompt_parts("6mo", ["a@example.com"], "MSFT")
+    assert prompt == f"{prefix}\n\n{suffix}"
+    assert prompt.endswith("- Email recipients: a@example.com")
+    assert "6mo\"" not in SYSTEM_PROMPT_PREFIX and "MSFT" not in SYSTEM_PROMPT_PREFIX
+
+
+@pytest.mark.parametrize("model, marked", [
+    ("anthropic/claude-sonnet-4.6", True),
+    ("google/gemini-2.5-flash", True),
+    ("openai/gpt-4o-mini", False),
+    ("nvidia/nemotron-3-nano-30b-a3b:free", False),
+])
+def test_system_message_marks_the_static_block_for_explicit_cache_providers(model, marked):
+    message = main._system_message(model, "static", "settings")
+    static, settings = message.content
+    assert static["text"] == "static" and settings["text"] == "settings"
+    assert ("cache_control" in static) is marked
+    assert "cache_control" not in settings
+
+
+def _finish(metrics: main.TurnMetrics, usage: dict | None, token: bool = True) -> None:
+    run_id = uuid.uuid4()
+    metrics.on_chat_model_start({}, [[]], run_id=run_id)
+    if token:
+        metrics.on_llm_new_token("", run_id=run_id)
+    message = AIMessage(content="ok", usage_metadata=usage) if usage else AIMessage(content="ok")
+    metrics.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=run_id)
+
+
+def test_turn_metrics_record_cached_tokens_and_time_to_first_token():
+    seen = []
+    metrics = main.TurnMetrics("m", seen.append)
+    usage = {"input_tokens": 2000, "output_tokens": 10, "total_tokens": 2010}
+    _finish(metrics, {**usage, "input_token_details": {"cache_read": 0}})
+    _finish(metrics, {**usage, "input_token_details": {"cache_read": 1800}})
+    _finish(metrics, None, token=False)
+
+    assert [t.index for t in seen] == [1, 2, 3]
+    assert seen[0].cached_ratio == 0 and seen[1].cached_ratio == pytest.approx(0.9)
+    assert seen[1].ttft_s is not None and seen[1].ttft_s <= seen[1].duration_s
+    assert seen[2].prompt_tokens is None and seen[2].ttft_s is None and seen[2].cached_ratio is None
+
+    stats = main.llm_stats()
+    assert stats["turns"] == 3
+    assert stats["prompt_tokens"] == 4000 and stats["cached_tokens"] == 1800
+    assert stats["cached_ratio"] == pytest.approx(0.45)
+    assert stats["ttft_s"]["p50"] is not None
+
+
+def test_llm_stats_without_turns():
+    assert main.llm_stats() == {
+        "turns": 0, "prompt_tokens": 0, "cached_tokens": 0, "cached_ratio": None,
+        "ttft_s": {"p50": None, "p95": None},
+    }
@@ -1,22 +1,27 @@
+import json
 import subprocess
+from pathlib import Path
 
 import pytest
 
-from tools.python_analyzer import MAX_OUTPUT_BYTES, python_analyzer
+from tools import _data_store
+from tools._sandbox import SandboxResult
+from tools.python_analyzer import MAX_OUTPUT_BYTES, TRUNCATION_MARKER, python_analyzer
 
 
-def _mock_proc(mocker, returncode=0, stdout="", stderr=""):
-    mock = mocker.MagicMock()
-    mock.returncode = returncode
-    mock.stdout = stdout
-    mock.stderr = stderr
-    return mock
+def _mock_proc(mocker, returncode=0, stdout="", stderr="", truncated=False):
+    return SandboxResult(returncode, stdout, stderr, truncated)
 
 
 class TestPythonAnalyzerUnit:
+    @pytest.fixture(autouse=True)
+    def no_image(self, mocker):
+        """No sandbox image digest, so every call reaches the patched run_bounded uncached."""
+        mocker.patch("tools._sandbox.DockerBackend.version", return_value=None)
+
     def test_success_returns_result(self, mocker):
         mocker.patch(
-            "tools.python_analyzer.subprocess.run",
+            "tools._sandbox.run_bounded",
             return_value=_mock_proc(mocker, returncode=0, stdout="hello\n"),
         )
 
@@ -26,7 +31,7 @@ class TestPythonAnalyzerUnit:
 
     def test_nonzero_exit_returns_error(self, mocker):
         mocker.patch(
-            "tools.python_analyzer.subprocess.run",
+            "tools._sandbox.run_bounded",
             return_value=_mock_proc(mocker, returncode=1, stderr="SyntaxError: invalid"),
         )
 
@@ -35,21 +40,36 @@ class TestPythonAnalyzerUnit:
         assert "error" in result
         assert "SyntaxError" in result["error"]
 
-    def test_stdout_truncated_when_too_large(self, mocker):
-        big_output = "x" * (MAX_OUTPUT_BYTES + 100)
+    def test_output_cap_passed_to_sandbox(self, mocker):
+        mock_run = mocker.patch("tools._sandbox.run_bounded", return_value=_mock_proc(mocker, stdout="1\n"))
+
+        python_analyzer.invoke({"code": "print(1)"})
+
+        assert mock_run.call_args.args[2] == MAX_OUTPUT_BYTES
+
+    def test_truncated_run_returns_partial_stdout_with_marker(self, mocker):
         mocker.patch(
-            "tools.python_analyzer.subprocess.run",
-            return_value=_mock_proc(mocker, returncode=0, stdout=big_output),
+            "tools._sandbox.run_bounded",
+            return_value=_mock_proc(mocker, returncode=-9, stdout="x" * MAX_OUTPUT_BYTES, truncated=True),
         )
 
-        result = python_analyzer.invoke({"code": "print('x' * 99999)"})
+        result = python_analyzer.invoke({"code": "while True: print('x')"})
 
-        assert result["result"].endswith("... [output truncated]")
-        assert len(result["result"]) <= MAX_OUTPUT_BYTES + len("\n... [output truncated]")
+        assert result == {"result": "x" * MAX_OUTPUT_BYTES + TRUNCATION_MARKER}
+
+    def test_truncated_run_without_stdout_returns_stderr_error(self, mocker):
+        mocker.patch(
+            "tools._sandbox.run_bounded",
+            return_value=_mock_proc(mocker, returncode=-9, stderr="warn\n" * 10, truncated=True),
+        )
+
+        result = python_analyzer.invoke({"code": "..."})
+
+        assert result["error"].endswith(TRUNCATION_MARKER)
 
     def test_empty_stdout_returns_no_output_message(self, mocker):
         mocker.patch(
-            "tools.python_analyzer.subprocess.run",
+            "tools._sandbox.run_bounded",
             return_value=_mock_proc(mocker, returncode=0, stdout=""),
         )
 
@@ -59,7 +79,7 @@ class TestPythonAnalyzerUnit:
 
     def test_timeout_returns_error(self, mocker):
         mocker.patch(
-            "tools.python_analyzer.subprocess.run",
+            "tools._sandbox.run_bounded",
             side_effect=subprocess.TimeoutExpired(cmd="docker", timeout=15),
         )
 
@@ -70,7 +90,7 @@ class TestPythonAnalyzerUnit:
 
     def test_docker_not_found_returns_error(self, mocker):
         mocker.patch(
-            "tools.python_analyzer.subprocess.run",
+            "tools._sandbox.run_bounded",
             side_effect=FileNotFoundError("docker not found"),
         )
 
@@ -80,7 +100,7 @@ class TestPythonAnalyzerUnit:
         assert "Docker" in result["error"]
 
     def test_invalid_json_data_returns_error(self, mocker):
-        mock_run = mocker.patch("tools.python_analyzer.subprocess.run")
+        mock_run = mocker.patch("tools._sandbox.run_bounded")
 
         result = python_analyzer.invoke({"code": "print(1)", "data": "{not valid json"})
 
@@ -89,7 +109,7 @@ class TestPythonAnalyzerUnit:
         mock_run.assert_not_called()
 
     def test_data_not_dict_returns_error(self, mocker):
-        mock_run = mocker.patch("tools.python_analyzer.subprocess.run")
+        mock_run = mocker.patch("tools._sandbox.run_bounded")
 
         result = python_analyzer.invoke({"code": "print(1)", "data": "[1, 2, 3]"})
 
@@ -97,9 +117,34 @@ class TestPythonAnalyzerUnit:
         assert "expected a JSON object" in result["error"]
         mock_run.assert_not_called()
 
+    def test_handles_in_data_resolved_before_run(self, mocker, fake_ohlcv_response):
+        handle = _data_store.put(fake_ohlcv_response, "AAPL-5d")
+        scripts = []
+
+        def fake_run(cmd, *args):
+            mount = cmd[cmd.index("-v") + 1].split(":")[0]
+            scripts.append(Path(mount, "run.py").read_text())
+            return _mock_proc(mocker, returncode=0, stdout="ok\n")
+
+        mocker.patch("tools._sandbox.run_bounded", side_effect=fake_run)
+
+        result = python_analyzer.invoke({"code": "print('ok')", "data": json.dumps({"stock": handle})})
+
+        assert result == {"result": "ok\n"}
+        assert "'2025-01-02'" in scripts[0]
+        assert handle not in scripts[0]
+
+    def test_unknown_handle_returns_error(self, mocker):
+        mock_run = mocker.patch("tools._sandbox.run_bounded")
+
+        result = python_analyzer.invoke({"code": "print(1)", "data": '{"stock": "handle:X-5d:000000"}'})
+
+        assert "unknown data handle" in result["error"]
+        mock_run.assert_not_called()
+
     def test_stderr_on_success_adds_warnings(self, mocker):
         mocker.patch(
-            "tools.python_analyzer.subprocess.run",
+            "tools._sandbox.run_bounded",
             return_value=_mock_proc(
                 mocker, returncode=0, stdout="result\n", stderr="DeprecationWarning"
             ),
@@ -112,6 +157,26 @@ class TestPythonAnalyzerUnit:
         assert "DeprecationWarning" in result["warnings"]
 
 
+class TestPythonAnalyzerBackends:
+    def test_local_backend_runs_with_data(self, monkeypatch, fake_ohlcv_response):
+        monkeypatch.setenv("SANDBOX_BACKEND", "local")
+        handle = _data_store.put(fake_ohlcv_response, "AAPL-5d")
+
+        result = python_analyzer.invoke({
+            "code": "print(len(data_obj['stock']['data']))",
+            "data": json.dumps({"stock": handle}),
+        })
+
+        assert result == {"result": "2\n"}
+
+    def test_unknown_backend_returns_error(self, monkeypatch):
+        monkeypatch.setenv("SANDBOX_BACKEND", "vm")
+
+        result = python_analyzer.invoke({"code": "print(1)"})
+
+        assert "unknown SANDBOX_BACKEND" in result["error"]
+
+
 @pytest.mark.integration
 class TestPythonAnalyzerIntegration:
     def test_real_docker_run_hello(self):
@@ -124,3 +189,79 @@ class TestPythonAnalyzerIntegration:
         result = python_analyzer.invoke({"code": "def bad("})
 
         assert "error" in result
+
+
+class TestPythonAnalyzerCache:
+    @pytest.fixture
+    def digest(self, mocker):
+        return mocker.patch("tools._sandbox.DockerBackend.version", return_value="sha256:aaa")
+
+    def test_repeat_call_served_from_cache(self, mocker, digest):
+        mock_run = mocker.patch(
+            "tools._sandbox.run_bounded",
+            return_value=_mock_proc(mocker, returncode=0, stdout="42\n"),
+        )
+        args = {"code": "print(42)", "data": '{"x": 1}'}
+
+        first = python_analyzer.invoke(args)
+        second = python_analyzer.invoke(args)
+
+        assert first == second == {"result": "42\n"}
+        mock_run.assert_called_once()
+
+    def test_hit_survives_process_restart(self, mocker, digest):
+        from tools.python_analyzer import _cache
+
+        mock_run = mocker.patch(
+            "tools._sandbox.run_bounded",
+            return_value=_mock_proc(mocker, returncode=0, stdout="42\n"),
+        )
+        python_analyzer.invoke({"code": "print(42)"})
+        _cache.clear_memory()
+
+        assert python_analyzer.invoke({"code": "print(42)"}) == {"result": "42\n"}
+        mock_run.assert_called_once()
+        assert _cache.stats()["disk_hits"] == 1
+
+    def test_new_image_digest_misses(self, mocker, digest):
+        mock_run = mocker.patch(
+            "tools._sandbox.run_bounded",
+            return_value=_mock_proc(mocker, returncode=0, stdout="42\n"),
+        )
+        python_analyzer.invoke({"code": "print(42)"})
+        digest.return_value = "sha256:bbb"
+        python_analyzer.invoke({"code": "print(42)"})
+
+        assert mock_run.call_count == 2
+
+    def test_same_data_under_different_handles_hits(self, mocker, digest, fake_ohlcv_response):
+        mock_run = mocker.patch(
+            "tools._sandbox.run_bounded",
+            return_value=_mock_proc(mocker, returncode=0, stdout="ok\n"),
+        )
+        for _ in range(2):
+            handle = _data_store.put(fake_ohlcv_response, "AAPL-5d")
+            python_analyzer.invoke({"code": "print('ok')", "data": json.dumps({"stock": handle})})
+
+        mock_run.assert_called_once()
+
+    def test_errors_not_cached(self, mocker, digest):
+        mock_run = mocker.patch(
+            "tools._sandbox.run_bounded",
+            side_effect=subprocess.TimeoutExpired(cmd="docker", timeout=15),
+        )
+        python_analyzer.invoke({"code": "print(1)"})
+        python_analyzer.invoke({"code": "print(1)"})
+
+        assert mock_run.call_count == 2
+
+    def test_no_docker_disables_cache(self, mocker):
+        mocker.patch("tools._sandbox.DockerBackend.version", return_value=None)
+        mock_run = mocker.patch(
+            "tools._sandbox.run_bounded",
+            return_value=_mock_proc(mocker, returncode=0, stdout="1\n"),
+        )
+        python_analyzer.invoke({"code": "print(1)"})
+        python_analyzer.invoke({"code": "print(1)"})
+
+        assert mock_run.call_count == 2
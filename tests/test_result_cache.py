@@ -0,0 +1,60 @@
+import time
+
+from tools._result_cache import ResultCache, cache_dir, content_key
+
+
+class TestContentKey:
+    def test_part_boundaries_matter(self):
+        assert content_key("ab", "c") != content_key("a", "bc")
+
+    def test_stable(self):
+        assert content_key("x", "y") == content_key("x", "y")
+
+
+class TestResultCache:
+    def test_cache_dir_from_env(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("STOCK_ANALYZER_CACHE_DIR", str(tmp_path))
+        assert cache_dir() == tmp_path
+
+    def test_put_then_get(self):
+        cache = ResultCache("t", ttl_seconds=60, max_bytes=10_000)
+        cache.put("k", {"result": "1"})
+
+        assert cache.get("k") == {"result": "1"}
+        assert cache.get("missing") is None
+        stats = cache.stats()
+        assert stats["memory_hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_expired_entry_is_a_miss_and_removed(self, monkeypatch):
+        cache = ResultCache("t", ttl_seconds=10, max_bytes=10_000)
+        cache.put("k", {"result": "1"})
+        now = time.time()
+        monkeypatch.setattr("tools._result_cache.time.time", lambda: now + 11)
+        cache.clear_memory()
+
+        assert cache.get("k") is None
+        assert not (cache.directory / "k.json").exists()
+
+    def test_expired_memory_entry_not_served(self, monkeypatch):
+        cache = ResultCache("t", ttl_seconds=10, max_bytes=10_000)
+        cache.put("k", {"result": "1"})
+        now = time.time()
+        monkeypatch.setattr("tools._result_cache.time.time", lambda: now + 11)
+
+        assert cache.get("k") is None
+
+    def test_oldest_entries_evicted_past_byte_budget(self):
+        cache = ResultCache("t", ttl_seconds=60, max_bytes=600)
+        for i in range(10):
+            cache.put(f"k{i}", {"result": "x" * 100})
+            time.sleep(0.01)
+
+        files = sorted(p.stem for p in cache.directory.glob("*.json"))
+        assert 0 < len(files) < 10
+        assert "k9" in files
+        assert "k0" not in files
+        assert cache.stats()["evictions"] == 10 - len(files)
+        cache.clear_memory()
+        assert cache.get("k0") is None
@@ -0,0 +1,293 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from tools._sandbox import (
+    SANDBOX_LABEL,
+    DockerBackend,
+    LocalPoolBackend,
+    SandboxBackend,
+    SandboxResult,
+    SandboxTimeout,
+    get_backend,
+    run_bounded,
+)
+
+
+@pytest.fixture
+def local():
+    backend = LocalPoolBackend(workers=1)
+    yield backend
+    backend.close()
+
+
+class TestGetBackend:
+    def test_default_is_docker(self, monkeypatch):
+        monkeypatch.delenv("SANDBOX_BACKEND", raising=False)
+        assert isinstance(get_backend(), DockerBackend)
+
+    def test_env_selects_local_and_is_shared(self, monkeypatch):
+        monkeypatch.setenv("SANDBOX_BACKEND", "local")
+        assert isinstance(get_backend(), LocalPoolBackend)
+        assert get_backend() is get_backend()
+
+    def test_unknown_backend_raises(self, monkeypatch):
+        monkeypatch.setenv("SANDBOX_BACKEND", "vm")
+        with pytest.raises(ValueError, match="unknown SANDBOX_BACKEND"):
+            get_backend()
+
+    def test_backend_must_implement_run_and_version(self):
+        class RunOnly(SandboxBackend):
+            def run(self, script, timeout, max_output_bytes=0):
+                return SandboxResult(0, "", "")
+
+        with pytest.raises(TypeError, match="version"):
+            RunOnly()
+
+
+class TestDockerLifecycle:
+    @pytest.fixture
+    def docker(self):
+        backend = DockerBackend(reap_interval=0)
+        yield backend
+        backend.close()
+
+    @staticmethod
+    def _container(cmd):
+        return cmd[cmd.index("--name") + 1]
+
+    def test_container_named_and_labelled(self, docker, mocker):
+        mock_run = mocker.patch("tools._sandbox.run_bounded", return_value=SandboxResult(0, "ok\n", ""))
+        rm = mocker.patch("tools._sandbox.subprocess.run")
+
+        docker.run("print('ok')", 10)
+
+        cmd = mock_run.call_args.args[0]
+        assert self._container(cmd).startswith("stock-analyzer-sandbox-")
+        assert cmd[cmd.index("--label") + 1].startswith(f"{SANDBOX_LABEL}=")
+        rm.assert_not_called()
+        assert docker.stats()["live"] == 0
+
+    @pytest.mark.parametrize("outcome", [
+        {"side_effect": subprocess.TimeoutExpired(cmd="docker", timeout=15)},
+        {"return_value": SandboxResult(-9, "x" * 10, "", truncated=True)},
+    ])
+    def test_timed_out_or_truncated_container_removed(self, docker, mocker, outcome):
+        mock_run = mocker.patch("tools._sandbox.run_bounded", **outcome)
+        rm = mocker.patch("tools._sandbox.subprocess.run")
+
+        try:
+            docker.run("while True: print('x')", 10)
+        except SandboxTimeout:
+            pass
+
+        container = self._container(mock_run.call_args.args[0])
+        assert rm.call_args.args[0] == ["docker", "rm", "-f", container]
+        assert docker.stats()["removed"] == 1
+        assert docker.stats()["live"] == 0
+
+    def test_live_gauge_counts_running_containers(self, docker, mocker):
+        seen = []
+        mocker.patch(
+            "tools._sandbox.run_bounded",
+            side_effect=lambda *args: seen.append(docker.stats()["live"]) or SandboxResult(0, "", ""),
+        )
+
+        docker.run("print(1)", 10)
+
+        assert seen == [1]
+
+    def test_reap_removes_only_old_untracked_containers(self, docker, mocker):
+        now = time.time()
+        docker._live.add("stock-analyzer-sandbox-running")
+        listing = "\n".join([
+            f"stock-analyzer-sandbox-orphan\t{int(now - 600)}",
+            f"stock-analyzer-sandbox-running\t{int(now - 600)}",
+            f"stock-analyzer-sandbox-fresh\t{int(now)}",
+        ])
+        mock_run = mocker.patch(
+            "tools._sandbox.subprocess.run",
+            side_effect=[subprocess.CompletedProcess([], 0, stdout=listing), subprocess.CompletedProcess([], 0)],
+        )
+
+        assert docker.reap() == 1
+        assert mock_run.call_args.args[0] == ["docker", "rm", "-f", "stock-analyzer-sandbox-orphan"]
+        assert docker.stats()["reaped"] == 1
+
+    def test_version_is_the_image_id_checked_once_per_ttl(self, docker, mocker):
+        inspect = mocker.patch(
+            "tools._sandbox.subprocess.run", return_value=subprocess.CompletedProcess([], 0, stdout="sha256:abc\n")
+        )
+
+        assert docker.version() == "sha256:abc"
+        assert docker.version() == "sha256:abc"
+        inspect.assert_called_once()
+        assert inspect.call_args.args[0][:3] == ["docker", "image", "inspect"]
+        assert inspect.call_args.kwargs["timeout"] > 0
+
+    @pytest.mark.parametrize("outcome", [
+        {"side_effect": FileNotFoundError},
+        {"side_effect": subprocess.TimeoutExpired(cmd="docker", timeout=10)},
+        {"return_value": subprocess.CompletedProcess([], 1, stdout="")},
+    ])
+    def test_version_none_without_docker_or_image(self, docker, mocker, outcome):
+        mocker.patch("tools._sandbox.subprocess.run", **outcome)
+
+        assert docker.version() is None
+
+    def test_slow_image_inspect_does_not_block_runs_or_stats(self, docker, mocker):
+        inspecting, release = threading.Event(), threading.Event()
+
+        def slow_inspect(*args, **kwargs):
+            inspecting.set()
+            release.wait(5)
+            return subprocess.CompletedProcess([], 0, stdout="sha256:abc\n")
+
+        mocker.patch("tools._sandbox.subprocess.run", side_effect=slow_inspect)
+        mocker.patch("tools._sandbox.run_bounded", return_value=SandboxResult(0, "ok\n", ""))
+        checker = threading.Thread(target=docker.version)
+        checker.start()
+        inspecting.wait(5)
+
+        runner = threading.Thread(target=lambda: docker.run("print('ok')", 10) and docker.stats())
+        runner.start()
+        runner.join(2)
+        try:
+            assert not runner.is_alive()
+            assert docker.stats()["started"] == 1
+        finally:
+            release.set()
+            checker.join()
+
+    def test_warm_container_named_labelled_and_limited_like_runs(self, docker, mocker):
+        mock_run = mocker.patch("tools._sandbox.subprocess.run", return_value=subprocess.CompletedProcess([], 0))
+
+        assert docker.warm() is True
+
+        cmd = mock_run.call_args.args[0]
+        assert self._container(cmd).startswith("stock-analyzer-sandbox-")
+        assert cmd[cmd.index("--label") + 1].startswith(f"{SANDBOX_LABEL}=")
+        assert cmd[cmd.index("--memory") + 1] == "128m"
+        assert docker.stats()["live"] == 0
+
+    def test_timed_out_warm_container_removed(self, docker, mocker):
+        mock_run = mocker.patch(
+            "tools._sandbox.subprocess.run",
+            side_effect=[subprocess.TimeoutExpired(cmd="docker", timeout=60), subprocess.CompletedProcess([], 0)],
+        )
+
+        assert docker.warm() is False
+
+        container = self._container(mock_run.call_args_list[0].args[0])
+        assert mock_run.call_args.args[0] == ["docker", "rm", "-f", container]
+        assert docker.stats()["removed"] == 1
+        assert docker.stats()["live"] == 0
+
+    def test_reap_without_docker_is_noop(self, docker, mocker):
+        mocker.patch("tools._sandbox.subprocess.run", side_effect=FileNotFoundError)
+
+        assert docker.reap() == 0
+
+
+class TestRunBounded:
+    def test_small_output_captured_whole(self):
+        result = run_bounded([sys.executable, "-c", "import sys; print('out'); print('err', file=sys.stderr)"], 10)
+
+        assert (result.returncode, result.stdout, result.stderr, result.truncated) == (0, "out\n", "err\n", False)
+
+    def test_runaway_output_killed_at_cap(self):
+        start = time.monotonic()
+        result = run_bounded([sys.executable, "-c", "while True: print('x' * 1000)"], 10, max_bytes=5000)
+
+        assert result.truncated
+        assert result.stdout == ("x" * 1000 + "\n") * 4 + "x" * 996
+        assert result.returncode != 0
+        assert time.monotonic() - start < 5
+
+    def test_stderr_has_its_own_cap(self):
+        result = run_bounded(
+            [sys.executable, "-c", "import sys\nprint('ok')\nwhile True: sys.stderr.write('e' * 100)"],
+            10, max_bytes=1000,
+        )
+
+        assert result.truncated
+        assert result.stdout == "ok\n"
+        assert len(result.stderr) == 1000
+
+    def test_timeout_raises_and_kills(self):
+        with pytest.raises(subprocess.TimeoutExpired):
+            run_bounded([sys.executable, "-c", "import time; time.sleep(30)"], 0.5)
+
+
+class TestLocalPoolBackend:
+    def test_runs_script_with_pandas(self, local):
+        result = local.run("import pandas as pd\nprint(pd.Series([1, 2, 3]).sum())", timeout=10)
+
+        assert result.returncode == 0
+        assert result.stdout == "6\n"
+
+    def test_exception_reports_traceback_and_exit_code(self, local):
+        result = local.run("raise ValueError('boom')", timeout=10)
+
+        assert result.returncode == 1
+        assert "ValueError: boom" in result.stderr
+        assert "_sandbox_worker" not in result.stderr
+
+    def test_environment_is_empty_of_host_variables(self, local, monkeypatch):
+        monkeypatch.setenv("GMAIL_APP_PASSWORD", "secret")
+        result = local.run("import os\nprint(sorted(os.environ))", timeout=10)
+
+        assert "GMAIL_APP_PASSWORD" not in result.stdout
+
+    @pytest.mark.parametrize("code", [
+        "open('out.txt', 'w')",
+        "import os; os.open('/tmp/sandbox-escape', os.O_CREAT | os.O_WRONLY)",
+        "import subprocess; subprocess.run(['true'])",
+        "import socket; socket.create_connection(('127.0.0.1', 80), timeout=1)",
+        "import _posixsubprocess",
+    ])
+    def test_writes_processes_and_network_refused(self, local, code):
+        result = local.run(code, timeout=10)
+
+        assert result.returncode == 1
+        assert "not allowed in the sandbox" in result.stderr or "Network is unreachable" in result.stderr
+
+    def test_host_files_outside_the_scratch_directory_unreadable(self, local, tmp_path):
+        secret = tmp_path / ".env"
+        secret.write_text("GMAIL_APP_PASSWORD=secret")
+
+        result = local.run(f"print(open({str(secret)!r}).read())", timeout=10)
+
+        assert result.returncode == 1
+        assert "secret" not in result.stdout
+        assert "not allowed in the sandbox" in result.stderr
+
+    @pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() != 0, reason="only a root host drops to nobody")
+    def test_root_host_runs_scripts_as_nobody(self, local):
+        result = local.run("import os\nprint(os.getuid(), os.path.exists('/etc/passwd'))", timeout=10)
+
+        assert result.stdout == "65534 False\n"
+
+    def test_memory_capped(self, local):
+        result = local.run("x = bytearray(2 * 1024 ** 3)", timeout=10)
+
+        assert result.returncode == 1
+        assert "MemoryError" in result.stderr
+
+    def test_print_loop_truncated(self, local):
+        result = local.run("while True: print('x' * 100)", timeout=10, max_output_bytes=2000)
+
+        assert result.truncated
+        assert len(result.stdout) == 2000
+
+    def test_timeout_kills_worker(self, local):
+        with pytest.raises(SandboxTimeout):
+            local.run("import time\ntime.sleep(30)", timeout=1)
+
+    def test_version_names_runtime(self, local):
+        assert local.version().startswith("python-")
+        assert "pandas-" in local.version()
@@ -0,0 +1,143 @@
+import time
+
+import pytest
+
+from tools import _breaker
+from tools._screener import QuoteScreener, QuoteSnapshot
+from tools.top_gainers import _load_universe, get_top_gainers, screen_stocks, screener_stats
+
+
+def _quote(symbol, change_pct=1.0, volume=1_000_000, avg_volume=1_000_000, market_cap=1_000_000_000, **extra):
+    return {
+        "symbol": symbol,
+        "longName": f"{symbol} Inc.",
+        "exchange": "NMS",
+        "quoteType": "EQUITY",
+        "regularMarketPrice": 10.0,
+        "regularMarketChange": change_pct / 10,
+        "regularMarketChangePercent": change_pct,
+        "regularMarketVolume": volume,
+        "averageDailyVolume3Month": avg_volume,
+        "marketCap": market_cap,
+        **extra,
+    }
+
+
+@pytest.fixture
+def snapshot():
+    return QuoteSnapshot.from_quotes([
+        _quote("AAA", change_pct=5.0, market_cap=50_000_000_000),
+        _quote("BBB", change_pct=12.0, market_cap=200_000_000, volume=50_000),
+        _quote("CCC", change_pct=-8.0, volume=9_000_000),
+        _quote("DDD", change_pct=-2.0, avg_volume=None),
+        _quote("EEE", change_pct=3.5, volume=4_000_000),
+        _quote("XYZW", change_pct=40.0),
+        _quote("NYQ", change_pct=30.0, exchange="NYQ"),
+        _quote("FUND", change_pct=20.0, quoteType="ETF"),
+        _quote("AAA", change_pct=99.0),
+    ])
+
+
+def _symbols(snapshot, indices):
+    return [snapshot.symbol[i] for i in indices]
+
+
+def test_snapshot_applies_nasdaq_equity_filters(snapshot):
+    assert list(snapshot.symbol) == ["AAA", "BBB", "CCC", "DDD", "EEE"]
+
+
+def test_rankings(snapshot):
+    assert _symbols(snapshot, snapshot.rank("gainers", limit=3)) == ["BBB", "AAA", "EEE"]
+    assert _symbols(snapshot, snapshot.rank("losers", limit=2)) == ["CCC", "DDD"]
+    # DDD has no average volume, so no ratio to rank by
+    assert _symbols(snapshot, snapshot.rank("unusual_volume", limit=10)) == ["CCC", "EEE", "AAA", "BBB"]
+
+
+def test_thresholds(snapshot):
+    assert _symbols(snapshot, snapshot.rank("gainers", min_change_pct=3, max_change_pct=10)) == ["AAA", "EEE"]
+    assert _symbols(snapshot, snapshot.rank("gainers", min_market_cap=1e9, max_market_cap=1e10)) == ["EEE", "DDD", "CCC"]
+    assert _symbols(snapshot, snapshot.rank("gainers", min_volume=100_000, min_change_pct=0)) == ["AAA", "EEE"]
+
+
+def test_unknown_ranking(snapshot):
+    with pytest.raises(ValueError):
+        snapshot.rank("most_shorted")
+
+
+def test_screener_refreshes_only_when_stale():
+    loads = []
+    screener = QuoteScreener(lambda: loads.append(1) or [_quote("AAA")], ttl_s=60)
+
+    assert screener.fresh() is None
+    first = screener.snapshot()
+    assert screener.fresh() is first
+    assert screener.snapshot() is first
+    object.__setattr__(first, "taken_at", time.time() - 61)
+    assert screener.snapshot() is not first
+
+    assert len(loads) == 2
+    assert screener.stats()["refreshes"] == 2
+
+
+def test_load_universe_fetches_every_page(mocker):
+    mocker.patch("tools.top_gainers.yf.EquityQuery")
+    pages = {
+        offset: {"total": 600, "quotes": [_quote(f"S{offset + i}") for i in range(250 if offset < 500 else 100)]}
+        for offset in (0, 250, 500)
+    }
+    screen = mocker.patch("tools.top_gainers.yf.screen", side_effect=lambda q, offset, **kw: pages[offset])
+
+    quotes = _load_universe()
+
+    assert len(quotes) == 600
+    assert sorted(call.kwargs["offset"] for call in screen.call_args_list) == [0, 250, 500]
+
+
+def test_top_gainer_needs_three_percent(mocker, fake_top_gainer_response):
+    mocker.patch("tools.top_gainers.yf.EquityQuery")
+    mocker.patch("tools.top_gainers.yf.screen", return_value={"quotes": [_quote("AAA", change_pct=2.9)]})
+    scraper = mocker.patch("tools.top_gainers.scrape_top_gainer", return_value=fake_top_gainer_response)
+
+    get_top_gainers.invoke({})
+
+    scraper.assert_called_once()
+
+
+def test_cold_top_gainer_sends_one_small_query(mocker):
+    mocker.patch("tools.top_gainers.yf.EquityQuery")
+    screen = mocker.patch("tools.top_gainers.yf.screen", return_value={"quotes": [_quote("AAA", change_pct=5.0)]})
+
+    assert get_top_gainers.invoke({})["symbol"] == "AAA"
+    screen.assert_called_once()
+    assert screen.call_args.kwargs["sortField"] == "percentchange"
+    assert screen.call_args.kwargs["size"] <= 25
+    assert screener_stats()["refreshes"] == 0
+
+
+def test_top_gainer_ranks_a_warm_snapshot(mocker):
+    mocker.patch("tools.top_gainers.yf.EquityQuery")
+    screen = mocker.patch(
+        "tools.top_gainers.yf.screen",
+        return_value={"quotes": [_quote("AAA", change_pct=5.0), _quote("CCC", change_pct=-8.0, volume=3_000_000)]},
+    )
+
+    losers = screen_stocks.invoke({"ranking": "losers", "limit": 1})
+    gainer = get_top_gainers.invoke({})
+
+    assert gainer["symbol"] == "AAA"
+    assert losers["universe"] == 2
+    assert losers["stocks"] == [{
+        "symbol": "CCC", "name": "CCC Inc.", "exchange": "NMS", "price": 10.0, "change_absolute": -0.8,
+        "change_pct": -8.0, "volume": 3_000_000, "market_cap": 1_000_000_000, "volume_ratio": 3.0,
+    }]
+    screen.assert_called_once()
+
+
+def test_screen_stocks_reports_unavailable_quotes(mocker):
+    mocker.patch("tools.top_gainers.yf.EquityQuery")
+    mocker.patch("tools.top_gainers.yf.screen", side_effect=ValueError("bad response"))
+
+    result = screen_stocks.invoke({})
+
+    assert result["error"].startswith("quote snapshot unavailable")
+    assert _breaker.get_breaker("yfinance").stats()["failures"] == 1
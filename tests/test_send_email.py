@@ -1,9 +1,12 @@
+import io
 import os
 import smtplib
 
 import pytest
+from PIL import Image
 
-from tools.send_email import send_email
+from tools._image import compress_png
+from tools.send_email import _build_message, send_email
 
 
 class TestSendEmailUnit:
@@ -28,6 +31,20 @@ class TestSendEmailUnit:
         mock_smtp.return_value.__enter__.return_value.sendmail.assert_called_once()
         assert result == {"result": "Email sent to recv@example.com"}
 
+    def test_smtp_ssl_disabled_uses_plain_smtp(self, monkeypatch, mocker):
+        monkeypatch.setenv("GMAIL_SENDER", "sender@gmail.com")
+        monkeypatch.setenv("GMAIL_APP_PASSWORD", "secret")
+        monkeypatch.setenv("SMTP_SSL", "0")
+
+        mock_ssl = mocker.patch("tools.send_email.smtplib.SMTP_SSL")
+        mock_plain = mocker.patch("tools.send_email.smtplib.SMTP")
+
+        result = send_email.invoke({"to": "recv@example.com", "subject": "S", "body": "<p>hi</p>"})
+
+        mock_plain.return_value.__enter__.return_value.sendmail.assert_called_once()
+        mock_ssl.assert_not_called()
+        assert result == {"result": "Email sent to recv@example.com"}
+
     def test_chart_path_exists_attaches_and_deletes_file(self, monkeypatch, mocker, tmp_path):
         monkeypatch.setenv("GMAIL_SENDER", "sender@gmail.com")
         monkeypatch.setenv("GMAIL_APP_PASSWORD", "secret")
@@ -71,3 +88,67 @@ class TestSendEmailUnit:
         result = send_email.invoke({"to": "recv@example.com", "subject": "S", "body": "<p>hi</p>"})
 
         assert "error" in result
+
+
+def _real_png(width=1500, height=600) -> bytes:
+    import numpy as np
+
+    x = np.linspace(0, 255, width, dtype=np.uint8)
+    y = np.linspace(0, 255, height, dtype=np.uint8)
+    pixels = np.stack(np.broadcast_arrays(x[None, :], y[:, None], (x[None, :] ^ y[:, None])), axis=-1)
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class TestBuildMessage:
+    def test_chart_embedded_inline_with_content_id(self):
+        msg = _build_message("s@x.com", "r@x.com", "S", "<p>hi</p>", b"\x89PNG\r\n\x1a\n")
+
+        related = msg.get_payload()[0]
+        html, image = related.get_payload()
+        assert related.get_content_type() == "multipart/related"
+        assert 'src="cid:chart"' in html.get_payload(decode=True).decode()
+        assert image["Content-ID"] == "<chart>"
+        assert image.get_content_disposition() == "inline"
+        assert len(msg.get_payload()) == 1
+
+    def test_chart_tag_inserted_before_closing_body(self):
+        msg = _build_message("s@x.com", "r@x.com", "S", "<html><body><p>hi</p></BODY></html>", b"\x89PNG")
+
+        html = msg.get_payload()[0].get_payload()[0].get_payload(decode=True).decode()
+        assert html.index("cid:chart") < html.index("</BODY>")
+
+    def test_full_chart_attached_only_when_requested(self):
+        png = b"\x89PNG\r\n\x1a\n"
+        msg = _build_message("s@x.com", "r@x.com", "S", "<p>hi</p>", png, attach_full_chart=True)
+
+        attachment = msg.get_payload()[1]
+        assert attachment.get_filename() == "chart.png"
+        assert attachment.get_payload(decode=True) == png
+
+    def test_no_chart_is_plain_html(self):
+        msg = _build_message("s@x.com", "r@x.com", "S", "<p>hi</p>")
+
+        assert [p.get_content_type() for p in msg.get_payload()] == ["text/html"]
+
+
+class TestCompressPng:
+    def test_output_fits_budget(self):
+        png = _real_png()
+
+        out = compress_png(png, 12_000)
+
+        assert len(png) > 12_000
+        assert len(out) <= 12_000
+        assert Image.open(io.BytesIO(out)).format == "PNG"
+
+    def test_small_image_returned_unchanged(self):
+        png = _real_png(10, 10)
+
+        assert compress_png(png, 1_000_000) is png
+
+    def test_unreadable_bytes_returned_unchanged(self):
+        data = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+
+        assert compress_png(data, 10) == data
@@ -0,0 +1,84 @@
+import pytest
+
+from tools._sentiment import annotate_news, label, score_headlines, tag_themes
+
+
+class TestScoreHeadlines:
+    def test_bullish_bearish_and_neutral(self):
+        scores = score_headlines([
+            "Apple beats estimates and raises guidance",
+            "Shares plunge after downgrade",
+            "Company names new CFO",
+        ])
+
+        assert scores[0] > 0.5
+        assert scores[1] < -0.5
+        assert scores[2] == 0.0
+
+    def test_negator_flips_following_words(self):
+        plain, negated = score_headlines(["Results disappoint investors, shares miss", "Results do not miss"])
+
+        assert plain < 0
+        assert negated > 0
+
+    def test_negation_does_not_cross_headlines(self):
+        scores = score_headlines(["No comment", "Stock surges"])
+
+        assert scores[1] > 0
+
+    def test_scores_bounded_and_one_per_title(self):
+        scores = score_headlines(["surge soar rally record beats " * 10, None, ""])
+
+        assert len(scores) == 3
+        assert scores[0] <= 1.0
+        assert list(scores[1:]) == [0.0, 0.0]
+
+    def test_empty(self):
+        assert len(score_headlines([])) == 0
+
+
+class TestTagThemes:
+    @pytest.mark.parametrize("title, themes", [
+        ("Nvidia Q3 earnings top estimates", ["earnings"]),
+        ("Morgan Stanley upgrades Tesla, lifts price target", ["analyst"]),
+        ("Stocks slide as Fed weighs rate hikes", ["macro"]),
+        ("Analysts cut revenue forecasts on tariff worries", ["earnings", "analyst", "macro"]),
+        ("Company opens new office", []),
+    ])
+    def test_themes(self, title, themes):
+        assert tag_themes(title) == themes
+
+
+class TestAnnotateNews:
+    def test_adds_item_and_aggregate_fields(self):
+        result = annotate_news({"symbol": "AAPL", "news": [
+            {"title": "Apple beats earnings estimates", "url": "u1"},
+            {"title": "Apple shares surge to record", "url": "u2"},
+            {"title": "Apple faces EU probe", "url": "u3"},
+        ]})
+
+        assert [item["url"] for item in result["news"]] == ["u1", "u2", "u3"]
+        assert result["news"][0]["themes"] == ["earnings"]
+        assert result["sentiment"]["label"] == "bullish"
+        assert (result["sentiment"]["bullish"], result["sentiment"]["bearish"]) == (2, 1)
+        assert result["themes"] == {"earnings": 1, "analyst": 0, "macro": 0}
+
+    def test_balanced_headlines_are_mixed(self):
+        result = annotate_news({"news": [{"title": "Stock surges"}, {"title": "Stock plunges"}]})
+
+        assert result["sentiment"]["label"] == "mixed"
+
+    def test_no_items(self):
+        result = annotate_news({"symbol": "AAPL", "news": []})
+
+        assert result["sentiment"]["score"] == 0.0
+        assert result["sentiment"]["label"] == "mixed"
+
+    def test_error_passes_through(self):
+        assert annotate_news({"error": "down"}) == {"error": "down"}
+
+
+def test_label_threshold():
+    assert (label(0.5), label(-0.5), label(0.0), label(0.0, neutral="mixed")) == (
+        "bullish", "bearish", "neutral", "mixed",
+    )
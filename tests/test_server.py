@@ -0,0 +1,137 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from server import JobManager, _make_handler, parse_job_request
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+class TestParseJobRequest:
+    def test_defaults(self):
+        period, recipients, symbol = parse_job_request({})
+        assert period == "5d"
+        assert len(recipients) == 1
+        assert symbol is None
+
+    def test_splits_recipients_and_uppercases_symbol(self):
+        assert parse_job_request({"period": "1y", "email": "a@x.com, b@y.com", "symbol": "aapl"}) == (
+            "1y", ["a@x.com", "b@y.com"], "AAPL",
+        )
+
+    @pytest.mark.parametrize("body", [{"period": "2d"}, {"symbol": "not a symbol"}, {"email": 5}, []])
+    def test_invalid_raises(self, body):
+        with pytest.raises(ValueError):
+            parse_job_request(body)
+
+
+class TestJobManager:
+    def test_runs_job_and_records_result(self):
+        manager = JobManager(max_jobs=2, run_fn=lambda job: f"done {job.period}")
+        job, created = manager.submit("1y", ["a@x.com"])
+
+        _wait_for(lambda: job.status == "succeeded")
+        assert created
+        assert job.result == "done 1y"
+        assert manager.metrics()["run_s"]["count"] == 1
+
+    def test_failed_job_records_error(self):
+        def boom(job):
+            raise RuntimeError("no quota")
+
+        manager = JobManager(max_jobs=1, run_fn=boom)
+        job, _ = manager.submit("5d", ["a@x.com"])
+
+        _wait_for(lambda: job.status == "failed")
+        assert job.error == "RuntimeError: no quota"
+
+    def test_identical_in_flight_job_is_deduplicated(self):
+        release = threading.Event()
+        manager = JobManager(max_jobs=1, run_fn=lambda job: release.wait(5) and "ok")
+
+        first, _ = manager.submit("5d", ["b@x.com", "a@x.com"])
+        second, created = manager.submit("5d", ["a@x.com", "b@x.com"])
+        other, other_created = manager.submit("5d", ["a@x.com"], "AAPL")
+
+        assert second is first and not created
+        assert other is not first and other_created
+        assert manager.metrics()["deduplicated"] == 1
+
+        release.set()
+        _wait_for(lambda: other.status == "succeeded")
+        # Once finished, the same request starts a new job
+        third, created = manager.submit("5d", ["a@x.com", "b@x.com"])
+        assert created and third.id != first.id
+
+    def test_concurrency_capped_and_queue_wait_measured(self):
+        release = threading.Event()
+        manager = JobManager(max_jobs=2, run_fn=lambda job: release.wait(5) and "ok")
+        jobs = [manager.submit(p, ["a@x.com"])[0] for p in ("1d", "5d", "1mo")]
+
+        _wait_for(lambda: manager.metrics()["jobs"]["running"] == 2)
+        assert manager.metrics()["jobs"]["queued"] == 1
+        release.set()
+        _wait_for(lambda: all(j.status == "succeeded" for j in jobs))
+
+        metrics = manager.metrics()
+        assert metrics["concurrency"]["peak"] == 2
+        assert metrics["queue_wait_s"]["count"] == 3
+
+
+class TestHTTP:
+    @pytest.fixture
+    def base_url(self):
+        release = threading.Event()
+        manager = JobManager(max_jobs=1, run_fn=lambda job: release.wait(5) and "report sent")
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(manager))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        yield f"http://127.0.0.1:{server.server_address[1]}", release
+        release.set()
+        server.shutdown()
+        server.server_close()
+
+    def _request(self, url, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, data=data)) as resp:
+                return resp.status, json.loads(resp.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_job_lifecycle(self, base_url):
+        url, release = base_url
+        status, job = self._request(f"{url}/jobs", {"period": "1mo", "symbol": "msft"})
+        assert status == 202
+        assert job["symbol"] == "MSFT"
+
+        status, dup = self._request(f"{url}/jobs", {"period": "1mo", "symbol": "MSFT"})
+        assert status == 200 and dup["id"] == job["id"] and dup["deduplicated"]
+
+        status, body = self._request(f"{url}/jobs/{job['id']}/result")
+        assert status == 409
+
+        release.set()
+        _wait_for(lambda: self._request(f"{url}/jobs/{job['id']}")[1]["status"] == "succeeded")
+        status, body = self._request(f"{url}/jobs/{job['id']}/result")
+        assert status == 200
+        assert body["result"] == "report sent"
+
+        status, metrics = self._request(f"{url}/metrics")
+        assert metrics["jobs"]["succeeded"] == 1
+        assert metrics["deduplicated"] == 1
+
+    def test_bad_request_and_unknown_job(self, base_url):
+        url, _ = base_url
+        assert self._request(f"{url}/jobs", {"period": "7d"})[0] == 400
+        assert self._request(f"{url}/jobs/nope")[0] == 404
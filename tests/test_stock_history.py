@@ -1,7 +1,13 @@
+import importlib
+import time
+
 import pandas as pd
 import pytest
 
-from tools.stock_history import get_stock_history
+from tools import _breaker, _data_store, _hedge
+from tools.stock_history import DATA_HANDLE_MIN_ROWS, fetch_history, get_stock_history
+
+_stock_history = importlib.import_module("tools.stock_history")
 
 
 def _make_fake_df():
@@ -32,6 +38,77 @@ class TestGetStockHistoryUnit:
         row = list(result["data"].values())[0]
         assert set(row.keys()) == {"open", "high", "low", "close", "volume"}
 
+    def test_result_includes_handle_and_summary(self, mocker):
+        mock_ticker = mocker.patch("tools.stock_history.yf.Ticker")
+        mock_ticker.return_value.history.return_value = _make_fake_df()
+
+        result = get_stock_history.invoke({"symbol": "AAPL", "period": "5d"})
+
+        stored = _data_store.get(result["handle"])
+        assert stored["data"] == result["data"]
+        assert result["summary"]["rows"] == 2
+        assert result["summary"]["last_close"] == 157.0
+        assert result["summary"]["change_pct"] == 2.61
+
+    def test_long_series_returned_by_handle_only(self, mocker):
+        index = pd.bdate_range("2024-01-01", periods=DATA_HANDLE_MIN_ROWS + 1)
+        df = pd.DataFrame(
+            {"Open": 10.0, "High": 11.0, "Low": 9.0, "Close": 10.5, "Volume": 1000},
+            index=index,
+        )
+        mock_ticker = mocker.patch("tools.stock_history.yf.Ticker")
+        mock_ticker.return_value.history.return_value = df
+
+        result = get_stock_history.invoke({"symbol": "AAPL", "period": "3mo"})
+
+        assert "data" not in result
+        assert len(_data_store.get(result["handle"])["data"]) == DATA_HANDLE_MIN_ROWS + 1
+
+    def test_columnar_layout_returns_parallel_arrays(self, mocker):
+        mock_ticker = mocker.patch("tools.stock_history.yf.Ticker")
+        mock_ticker.return_value.history.return_value = _make_fake_df()
+
+        result = get_stock_history.invoke({"symbol": "AAPL", "period": "5d", "layout": "columnar"})
+
+        assert result["data"] == {
+            "dates": ["2025-01-01", "2025-01-02"],
+            "open": [150.0, 153.0],
+            "high": [155.0, 158.0],
+            "low": [149.0, 152.0],
+            "close": [153.0, 157.0],
+            "volume": [1_000_000, 1_200_000],
+        }
+
+    def test_columnar_layout_converts_scraper_rows(self, mocker, fake_ohlcv_response):
+        mock_ticker = mocker.patch("tools.stock_history.yf.Ticker")
+        mock_ticker.return_value.history.return_value = pd.DataFrame()
+        mocker.patch("tools.stock_history.scrape_stock_history", return_value=fake_ohlcv_response)
+
+        result = get_stock_history.invoke({"symbol": "AAPL", "period": "5d", "layout": "columnar"})
+
+        assert result["data"]["dates"] == ["2025-01-01", "2025-01-02"]
+
+    def test_newest_first_scraper_rows_are_summarised_oldest_first(self, mocker):
+        rows = {
+            "2025-01-03": {"open": 110.0, "high": 111.0, "low": 109.0, "close": 110.0, "volume": 3000},
+            "2025-01-02": {"open": 105.0, "high": 106.0, "low": 104.0, "close": 105.0, "volume": 2000},
+            "2025-01-01": {"open": 100.0, "high": 101.0, "low": 99.0, "close": 100.0, "volume": 1000},
+        }
+        mocker.patch("tools.stock_history.use_scraper", return_value=True)
+        mocker.patch(
+            "tools.stock_history.scrape_stock_history",
+            return_value={"symbol": "AAPL", "period": "5d", "data": rows},
+        )
+
+        result = get_stock_history.invoke({"symbol": "AAPL", "period": "5d", "layout": "columnar"})
+
+        assert result["data"]["dates"] == ["2025-01-01", "2025-01-02", "2025-01-03"]
+        assert result["data"]["close"] == [100.0, 105.0, 110.0]
+        summary = result["summary"]
+        assert (summary["start"], summary["end"]) == ("2025-01-01", "2025-01-03")
+        assert (summary["first_close"], summary["last_close"], summary["last_volume"]) == (100.0, 110.0, 3000)
+        assert summary["change_pct"] == 10.0
+
     def test_empty_dataframe_falls_back_to_scraper(self, mocker):
         mock_ticker = mocker.patch("tools.stock_history.yf.Ticker")
         mock_ticker.return_value.history.return_value = pd.DataFrame()
@@ -59,6 +136,44 @@ class TestGetStockHistoryUnit:
 
         mock_scraper.assert_called_once()
 
+    def test_fetch_without_scrape_never_starts_the_scraper(self, mocker):
+        mock_ticker = mocker.patch("tools.stock_history.yf.Ticker")
+        mock_ticker.return_value.history.side_effect = RuntimeError("network error")
+        mock_scraper = mocker.patch("tools.stock_history.scrape_stock_history")
+
+        result = fetch_history("AAPL", "5d", scrape=False)
+
+        mock_scraper.assert_not_called()
+        assert "error" in result
+
+    def test_hung_yfinance_hedged_with_scraper(self, mocker, monkeypatch, fake_ohlcv_response):
+        monkeypatch.setenv("HEDGE_BUDGET_HISTORY", "0.05")
+        _hedge.reset()
+        mock_ticker = mocker.patch("tools.stock_history.yf.Ticker")
+        mock_ticker.return_value.history.side_effect = lambda period: time.sleep(1) or _make_fake_df()
+        mocker.patch("tools.stock_history.scrape_stock_history", return_value=fake_ohlcv_response)
+
+        start = time.monotonic()
+        result = get_stock_history.invoke({"symbol": "AAPL", "period": "5d"})
+
+        assert result["data"] == fake_ohlcv_response["data"]
+        assert time.monotonic() - start < 0.5
+        assert _hedge.hedge_stats()["history"]["fallback_wins"] == 1
+        _hedge.reset()
+
+    def test_open_breaker_skips_yfinance(self, mocker, monkeypatch, fake_ohlcv_response):
+        monkeypatch.setattr(_breaker, "BREAKER_FAILURES", 2)
+        mock_ticker = mocker.patch("tools.stock_history.yf.Ticker")
+        mock_ticker.return_value.history.side_effect = RuntimeError("Expecting value: line 1 column 1")
+        mock_scraper = mocker.patch("tools.stock_history.scrape_stock_history", return_value=fake_ohlcv_response)
+
+        for _ in range(4):
+            get_stock_history.invoke({"symbol": "AAPL", "period": "5d"})
+
+        assert mock_ticker.return_value.history.call_count == 2
+        assert mock_scraper.call_count == 4
+        assert _breaker.breaker_stats()["yfinance"]["state"] == "open"
+
     def test_nan_volume_in_dataframe_falls_back_to_scraper(self, mocker):
         import numpy as np
 
@@ -94,6 +209,55 @@ class TestGetStockHistoryUnit:
         mock_scraper.assert_called_once()
         assert result == {"error": "scraper called"}
 
+    def test_prefetched_bars_served_without_network(self, mocker):
+        _stock_history._bars.write(
+            {"AAPL": {"dates": ["2025-01-02", "2025-01-03"], "open": [150.0, 153.0], "high": [155.0, 158.0],
+                      "low": [149.0, 152.0], "close": [153.0, 157.0], "volume": [1_000_000, 1_200_000]}},
+            "5d",
+        )
+        mocker.patch("tools.stock_history.latest_session", return_value="2025-01-03")
+        mock_ticker = mocker.patch("tools.stock_history.yf.Ticker")
+
+        result = get_stock_history.invoke({"symbol": "aapl", "period": "1d"})
+
+        mock_ticker.assert_not_called()
+        assert result["data"] == {
+            "2025-01-03": {"open": 153.0, "high": 158.0, "low": 152.0, "close": 157.0, "volume": 1_200_000}
+        }
+
+    def test_prefetched_bars_missing_today_get_the_recent_bars_live(self, mocker):
+        _stock_history._bars.write(
+            {"AAPL": {"dates": ["2024-12-31", "2025-01-01"], "open": [148.0, 149.0], "high": [150.0, 151.0],
+                      "low": [147.0, 148.0], "close": [149.0, 150.0], "volume": [900_000, 950_000]}},
+            "5d",
+        )
+        # Prefetched overnight; 2025-01-02's session has opened since
+        mocker.patch("tools.stock_history.latest_session", return_value="2025-01-02")
+        mock_ticker = mocker.patch("tools.stock_history.yf.Ticker")
+        mock_ticker.return_value.history.return_value = _make_fake_df()
+
+        result = get_stock_history.invoke({"symbol": "AAPL", "period": "5d", "layout": "columnar"})
+
+        mock_ticker.return_value.history.assert_called_once_with(period="5d")
+        # 2025-01-01 as fetched live replaces the stored bar; the stored one before it is kept
+        assert result["data"]["dates"] == ["2024-12-31", "2025-01-01", "2025-01-02"]
+        assert result["data"]["close"] == [149.0, 153.0, 157.0]
+        assert result["summary"]["end"] == "2025-01-02"
+
+    def test_prefetched_bars_missing_today_are_not_served_if_the_live_fetch_fails(self, mocker):
+        _stock_history._bars.write(
+            {"AAPL": {"dates": ["2025-01-01"], "open": [149.0], "high": [151.0],
+                      "low": [148.0], "close": [150.0], "volume": [950_000]}},
+            "1d",
+        )
+        mocker.patch("tools.stock_history.latest_session", return_value="2025-01-02")
+        mocker.patch("tools.stock_history.yf.Ticker").return_value.history.return_value = pd.DataFrame()
+        mocker.patch("tools.stock_history.scrape_stock_history", return_value={"error": "scraper failed"})
+
+        result = get_stock_history.invoke({"symbol": "AAPL", "period": "1d"})
+
+        assert result == {"error": "scraper failed"}
+
     def test_use_scraper_env_bypasses_yfinance(self, mocker, monkeypatch):
         monkeypatch.setenv("USE_SCRAPER", "1")
 
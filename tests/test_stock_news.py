@@ -1,6 +1,8 @@
+import time
+
 import pytest
 
-from tools.stock_news import get_stock_news
+from tools.stock_news import get_news_batch, get_stock_news
 
 
 def _make_fake_news_item(title="Stock rises"):
@@ -17,7 +19,7 @@ def _make_fake_news_item(title="Stock rises"):
 class TestGetStockNewsUnit:
     def test_happy_path_with_ticker(self, mocker):
         mock_ticker = mocker.patch("tools.stock_news.yf.Ticker")
-        mock_ticker.return_value.news = [_make_fake_news_item("AAPL rises")]
+        mock_ticker.return_value.get_news.return_value = [_make_fake_news_item("AAPL rises")]
 
         result = get_stock_news.invoke({"ticker": "AAPL"})
 
@@ -25,13 +27,15 @@ class TestGetStockNewsUnit:
         assert len(result["news"]) == 1
         assert result["news"][0]["title"] == "AAPL rises"
         assert result["news"][0]["publisher"] == "Reuters"
+        assert result["news"][0]["sentiment"] > 0
+        assert result["sentiment"]["label"] == "bullish"
 
     def test_no_ticker_fetches_top_gainer_first(self, mocker, fake_top_gainer_response):
         mock_top_gainers = mocker.patch("tools.stock_news.get_top_gainers")
         mock_top_gainers.invoke.return_value = fake_top_gainer_response
 
         mock_ticker = mocker.patch("tools.stock_news.yf.Ticker")
-        mock_ticker.return_value.news = [_make_fake_news_item()]
+        mock_ticker.return_value.get_news.return_value = [_make_fake_news_item()]
 
         result = get_stock_news.invoke({})
 
@@ -47,7 +51,7 @@ class TestGetStockNewsUnit:
 
     def test_yfinance_exception_falls_back_to_scraper(self, mocker):
         mock_ticker = mocker.patch("tools.stock_news.yf.Ticker")
-        mock_ticker.return_value.news = None
+        mock_ticker.return_value.get_news.return_value = None
         mock_ticker.side_effect = RuntimeError("network error")
 
         mock_scraper = mocker.patch(
@@ -61,7 +65,7 @@ class TestGetStockNewsUnit:
 
     def test_empty_news_falls_back_to_scraper(self, mocker):
         mock_ticker = mocker.patch("tools.stock_news.yf.Ticker")
-        mock_ticker.return_value.news = []
+        mock_ticker.return_value.get_news.return_value = []
 
         mock_scraper = mocker.patch(
             "tools.stock_news.scrape_stock_news",
@@ -74,7 +78,7 @@ class TestGetStockNewsUnit:
 
     def test_news_item_with_empty_content_returns_none_fields(self, mocker):
         mock_ticker = mocker.patch("tools.stock_news.yf.Ticker")
-        mock_ticker.return_value.news = [{"content": {}}]
+        mock_ticker.return_value.get_news.return_value = [{"content": {}}]
 
         result = get_stock_news.invoke({"ticker": "AAPL"})
 
@@ -100,6 +104,39 @@ class TestGetStockNewsUnit:
         mock_yf.assert_not_called()
         mock_scraper.assert_called_once_with("AAPL")
 
+    def test_repeat_call_served_from_store(self, mocker):
+        mock_ticker = mocker.patch("tools.stock_news.yf.Ticker")
+        mock_ticker.return_value.get_news.return_value = [_make_fake_news_item("AAPL rises")]
+
+        first = get_stock_news.invoke({"ticker": "AAPL"})
+        second = get_stock_news.invoke({"ticker": "aapl"})
+
+        assert first["news"][0]["title"] == second["news"][0]["title"]
+        assert (first["new_count"], second["new_count"]) == (1, 0)
+        mock_ticker.assert_called_once()
+
+
+class TestGetNewsBatch:
+    def test_fetches_each_symbol_once_concurrently(self, mocker):
+        def slow_ticker(symbol):
+            time.sleep(0.2)
+            ticker = mocker.MagicMock()
+            ticker.get_news.return_value = [_make_fake_news_item(f"{symbol} rises")]
+            return ticker
+
+        mock_ticker = mocker.patch("tools.stock_news.yf.Ticker", side_effect=slow_ticker)
+
+        start = time.monotonic()
+        results = get_news_batch(["AAPL", "msft", "NVDA", "AAPL"])
+
+        assert list(results) == ["AAPL", "MSFT", "NVDA"]
+        assert results["MSFT"]["news"][0]["title"] == "MSFT rises"
+        assert mock_ticker.call_count == 3
+        assert time.monotonic() - start < 0.5
+
+    def test_empty_list(self):
+        assert get_news_batch([]) == {}
+
 
 @pytest.mark.integration
 class TestGetStockNewsIntegration:
@@ -1,7 +1,15 @@
 import pytest
 from pydantic import ValidationError
 
-from tools.validate import AnalyzerInput, StockHistoryResult, TopGainerResult
+from tools._ohlcv import to_columnar
+from tools.validate import (
+    AnalyzerInput,
+    OHLCVRow,
+    StockHistoryResult,
+    TopGainerResult,
+    error_messages,
+    validate_stock_history,
+)
 
 
 class TestStockHistoryResult:
@@ -55,3 +63,121 @@ class TestAnalyzerInput:
     def test_accepts_extra_fields(self):
         obj = AnalyzerInput(foo="bar", baz=123)
         assert obj.foo == "bar"  # type: ignore[attr-defined]
+
+
+def _row(**overrides):
+    row = {"open": 10.0, "high": 11.0, "low": 9.0, "close": 10.5, "volume": 1000}
+    row.update(overrides)
+    return row
+
+
+def _model_messages(payload):
+    try:
+        StockHistoryResult(**payload)
+    except ValidationError as e:
+        return error_messages(e)
+    return []
+
+
+class TestOHLCVRowChecks:
+    def test_nan_price_rejected(self):
+        with pytest.raises(ValidationError, match="finite number"):
+            OHLCVRow(**_row(close=float("nan")))
+
+    def test_negative_volume_rejected(self):
+        with pytest.raises(ValidationError, match="greater than or equal to 0"):
+            OHLCVRow(**_row(volume=-1))
+
+    def test_high_below_low_rejected(self):
+        with pytest.raises(ValidationError, match="high must be >= low"):
+            OHLCVRow(**_row(high=8.0))
+
+    def test_dates_out_of_order_rejected(self):
+        with pytest.raises(ValidationError, match="dates must be in increasing order"):
+            StockHistoryResult(
+                symbol="AAPL",
+                period="5d",
+                data={"2025-01-02": _row(), "2025-01-01": _row()},
+            )
+
+
+class TestValidateStockHistory:
+    def test_valid_payload_has_no_errors(self, fake_ohlcv_response):
+        assert validate_stock_history(fake_ohlcv_response) == []
+
+    @pytest.mark.parametrize(
+        "rows",
+        [
+            {},
+            {"2025-01-01": _row(open=float("nan"))},
+            {"2025-01-01": _row(open=float("inf"), close=float("-inf"))},
+            {"2025-01-01": _row(volume=float("nan"))},
+            {"2025-01-01": _row(volume=1.5)},
+            {"2025-01-01": _row(volume=-5)},
+            {"2025-01-01": _row(volume=-5.5)},
+            {"2025-01-01": _row(high=8.0)},
+            {"2025-01-01": _row(high=float("nan"), low=20.0)},
+            {"2025-01-01": _row(), "2025-01-02": _row(high=1.0), "2025-01-03": _row(volume=-1)},
+            {"2025-01-02": _row(), "2025-01-01": _row()},
+            {"2025-01-01": _row(open="not_a_float")},
+            {"2025-01-01": _row(open="12.5")},
+            {"2025-01-01": _row(open=None)},
+            {"2025-01-01": _row(open=True)},
+            {"2025-01-01": {"open": 1.0}},
+            {"2025-01-01": [1, 2, 3]},
+        ],
+    )
+    def test_messages_match_pydantic_models(self, rows):
+        # Prefix enough valid rows that the columnar path is taken
+        padding = {f"2024-{m:02d}-{d:02d}": _row() for m in (1, 2) for d in range(1, 26)} if rows else {}
+        payload = {"symbol": "AAPL", "period": "5d", "data": {**padding, **rows}}
+
+        assert validate_stock_history(payload) == _model_messages(payload)
+
+    @pytest.mark.parametrize(
+        "rows",
+        [
+            {"2025-01-01": _row(high=8.0)},
+            {"2025-01-01": _row(volume=-1), "2025-01-02": _row(close=float("nan"))},
+            {"2025-01-01": _row(open="12.5")},
+        ],
+    )
+    def test_columnar_messages_match_pydantic_models(self, rows):
+        padding = {f"2024-{m:02d}-{d:02d}": _row() for m in (1, 2) for d in range(1, 26)}
+        payload = {"symbol": "AAPL", "period": "5d", "data": to_columnar({**padding, **rows})}
+
+        assert validate_stock_history(payload) == _model_messages(payload)
+
+    def test_columnar_valid_payload(self, fake_ohlcv_response):
+        payload = {**fake_ohlcv_response, "data": to_columnar(fake_ohlcv_response["data"])}
+
+        assert validate_stock_history(payload) == []
+        assert len(StockHistoryResult(**payload).data) == 2
+
+    def test_columnar_duplicate_dates_rejected(self):
+        columns = to_columnar({f"2024-01-{d:02d}": _row() for d in range(1, 32)})
+        columns["dates"][-1] = columns["dates"][0]
+        payload = {"symbol": "AAPL", "period": "5d", "data": columns}
+
+        assert validate_stock_history(payload) == ["Value error, dates must be in increasing order"]
+        assert _model_messages(payload) == ["Value error, dates must be in increasing order"]
+
+    def test_columnar_unequal_lengths_match_pydantic_models(self):
+        columns = to_columnar({f"2024-01-{d:02d}": _row() for d in range(1, 32)})
+        columns["dates"].pop()
+        payload = {"symbol": "AAPL", "period": "5d", "data": columns}
+
+        assert validate_stock_history(payload) == _model_messages(payload)
+        assert "equal-length" in validate_stock_history(payload)[0]
+
+    def test_short_series_uses_models(self, mocker, fake_ohlcv_response):
+        spy = mocker.patch("tools.validate._model_errors", return_value=[])
+
+        validate_stock_history(fake_ohlcv_response)
+
+        spy.assert_called_once()
+
+    def test_missing_symbol_matches_pydantic_models(self, fake_ohlcv_response):
+        del fake_ohlcv_response["symbol"]
+
+        assert validate_stock_history(fake_ohlcv_response) == ["symbol: Field required"]
@@ -1,16 +1,21 @@
 from .stock_history import get_stock_history
-from .top_gainers import get_top_gainers
+from .top_gainers import get_top_gainers, screen_stocks
 from .python_analyzer import python_analyzer
 from .send_email import send_email
 from .stock_news import get_stock_news
 from .generate_chart import generate_chart
+from .indicators import get_indicators
+from .cross_asset import compare_assets
 
 
 __all__ = [
   "get_stock_history",
   "get_top_gainers",
+  "screen_stocks",
   "python_analyzer",
   "send_email",
   "get_stock_news",
   "generate_chart",
+  "get_indicators",
+  "compare_assets",
 ]
@@ -0,0 +1,165 @@
+"""Persistent daily-bar store that get_stock_history reads before the network.
+
+prefetch.py fills it off-hours with bulk downloads for a whole symbol
+universe; during the day get_stock_history answers from it whenever the
+symbol was fetched within BAR_STORE_MAX_AGE seconds for a period at least
+as long as the one requested (0 disables the store). Bars end at the close
+before the last prefetch, so once a later session has opened
+(latest_session()) the store is missing it and get_stock_history fetches
+the most recent bars live. A bar for a session still in progress
+(open_session()) is partial and never stored, whenever the prefetch runs.
+
+One SQLite file (bars.sqlite3 under the cache directory) holds every bar,
+keyed by (symbol, date), plus one row per symbol recording when and for
+which period it was last fetched, which is what lets an interrupted
+prefetch skip the symbols it already finished.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, time as dtime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from ._playwright_scraper import _PERIOD_ROWS
+from ._result_cache import cache_dir
+
+BAR_STORE_MAX_AGE = float(os.getenv("BAR_STORE_MAX_AGE", "86400"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume INTEGER NOT NULL,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fetches (
+    symbol TEXT PRIMARY KEY,
+    period TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    rows INTEGER NOT NULL
+);
+"""
+_COLUMNS = ("open", "high", "low", "close", "volume")
+_MARKET_TZ = ZoneInfo("America/New_York")
+_MARKET_OPEN = dtime(9, 30)
+_MARKET_CLOSE = dtime(16, 0)
+
+
+def latest_session(now: datetime | None = None) -> str:
+    """Date (YYYY-MM-DD) of the most recent US session that has opened.
+
+    Weekends are skipped but exchange holidays are not, so on a holiday this
+    names a session with no bar; callers only use it to decide whether to
+    fetch the recent bars live.
+    """
+    now = datetime.now(_MARKET_TZ) if now is None else now.astimezone(_MARKET_TZ)
+    day = now.date() if now.time() >= _MARKET_OPEN else now.date() - timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day.isoformat()
+
+
+def open_session(now: datetime | None = None) -> str | None:
+    """Date (YYYY-MM-DD) of the US session in progress, or None outside 09:30-16:00 New York on weekdays."""
+    now = datetime.now(_MARKET_TZ) if now is None else now.astimezone(_MARKET_TZ)
+    if now.weekday() >= 5 or not _MARKET_OPEN <= now.time() < _MARKET_CLOSE:
+        return None
+    return now.date().isoformat()
+
+
+class BarStore:
+    def __init__(self, path: Path | None = None, max_age_s: float = BAR_STORE_MAX_AGE):
+        self._path = path
+        self.max_age_s = max_age_s
+        # SQLite allows one writer at a time; serialize them here instead of waiting on its lock
+        self._write_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "symbols_written": 0, "bars_written": 0}
+
+    @property
+    def path(self) -> Path:
+        return self._path or cache_dir() / "bars.sqlite3"
+
+    def _connect(self) -> sqlite3.Connection:
+        path = self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += n
+
+    def write(self, results: dict[str, dict], period: str) -> None:
+        """Store columnar OHLCV data for each symbol, fetched for period, in one transaction.
+
+        Bars for the session in progress are dropped: they are not final yet.
+        """
+        now = time.time()
+        partial = open_session()
+        rows = {
+            symbol: [row for row in zip(data["dates"], *(data[c] for c in _COLUMNS)) if row[0] != partial]
+            for symbol, data in results.items()
+        }
+        bars = [(symbol, *row) for symbol, symbol_rows in rows.items() for row in symbol_rows]
+        fetches = [(symbol, period, now, len(symbol_rows)) for symbol, symbol_rows in rows.items()]
+        with self._write_lock, closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", bars)
+            conn.executemany("INSERT OR REPLACE INTO fetches VALUES (?, ?, ?, ?)", fetches)
+        self._count("symbols_written", len(fetches))
+        self._count("bars_written", len(bars))
+
+    def fetched_since(self, since: float, period: str) -> set[str]:
+        """Symbols fetched at or after since for period or a longer one."""
+        covering = [p for p, rows in _PERIOD_ROWS.items() if rows >= _PERIOD_ROWS[period]]
+        marks = ", ".join("?" * len(covering))
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT symbol FROM fetches WHERE fetched_at >= ? AND period IN ({marks})", (since, *covering)
+            ).fetchall()
+        return {symbol for (symbol,) in rows}
+
+    def read(self, symbol: str, period: str) -> dict | None:
+        """Return the latest _PERIOD_ROWS[period] bars as columnar data, or None if not stored fresh."""
+        n_rows = _PERIOD_ROWS.get(period)
+        if not self.max_age_s or n_rows is None or not self.path.exists():
+            self._count("misses")
+            return None
+        with closing(self._connect()) as conn:
+            fetch = conn.execute("SELECT period, fetched_at FROM fetches WHERE symbol = ?", (symbol,)).fetchone()
+            fresh = (
+                fetch is not None
+                and time.time() - fetch[1] < self.max_age_s
+                and _PERIOD_ROWS.get(fetch[0], 0) >= n_rows
+            )
+            rows = []
+            if fresh:
+                rows = conn.execute(
+                    "SELECT date, open, high, low, close, volume FROM bars WHERE symbol = ? ORDER BY date DESC LIMIT ?",
+                    (symbol, n_rows),
+                ).fetchall()
+        if not rows:
+            self._count("misses")
+            return None
+        self._count("hits")
+        columns = list(zip(*reversed(rows)))
+        return {"dates": list(columns[0]), **{c: list(v) for c, v in zip(_COLUMNS, columns[1:])}}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"max_age_s": self.max_age_s or None, **self._counts}
+
+    def clear_memory(self) -> None:
+        """Reset counters, as a fresh process would start."""
+        with self._lock:
+            self._counts = dict.fromkeys(self._counts, 0)
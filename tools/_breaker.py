@@ -0,0 +1,164 @@
+"""Circuit breakers and retries for upstream data sources (yfinance).
+
+protected_call(source, fn) runs fn under the source's shared breaker:
+
+closed
+    Calls go through. Transient errors (network-level OSErrors: timeouts,
+    dropped connections, DNS) are retried up to BREAKER_RETRIES times with
+    full-jitter exponential backoff before they count as a failure. After
+    BREAKER_FAILURES consecutive failures the breaker opens.
+open
+    Calls fail immediately with SourceUnavailable, so tools go straight to
+    their fallback, until the cooldown (BREAKER_COOLDOWN seconds) has passed.
+half-open
+    One call is let through as a probe. Success closes the breaker; failure
+    opens it again with the cooldown doubled, up to 8x.
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Callable, TypeVar
+
+_T = TypeVar("_T")
+
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", "120"))
+BREAKER_RETRIES = int(os.getenv("BREAKER_RETRIES", "2"))
+# First retry waits up to this long; each further retry doubles the ceiling
+_RETRY_BASE_DELAY = 0.25
+_MAX_COOLDOWN_FACTOR = 8
+
+
+class SourceUnavailable(Exception):
+    """The source's breaker is open; the call was not attempted."""
+
+
+def is_transient(error: Exception) -> bool:
+    # curl_cffi's timeout and connection errors (used by yfinance) are OSErrors too
+    return isinstance(error, OSError)
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failures: int = BREAKER_FAILURES,
+        cooldown_s: float = BREAKER_COOLDOWN,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failures)
+        self.cooldown_s = cooldown_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self._consecutive = 0
+        self._reopens = 0
+        self._opened_at = 0.0
+        self._probe_started: float | None = None
+        self._counts = {"calls": 0, "failures": 0, "retries": 0, "short_circuited": 0, "opened": 0}
+
+    def _cooldown(self) -> float:
+        return self.cooldown_s * min(2 ** self._reopens, _MAX_COOLDOWN_FACTOR)
+
+    def allow(self) -> bool:
+        """Whether a call may go to the source now. In half-open, admits one probe at a time."""
+        with self._lock:
+            now = self._clock()
+            if self.state == "open" and now - self._opened_at >= self._cooldown():
+                self.state = "half_open"
+                self._probe_started = None
+            # A probe that never reported back does not block the source forever
+            probe_stale = self._probe_started is not None and now - self._probe_started >= self._cooldown()
+            if self.state == "closed" or (self.state == "half_open" and (self._probe_started is None or probe_stale)):
+                if self.state == "half_open":
+                    self._probe_started = now
+                self._counts["calls"] += 1
+                return True
+            self._counts["short_circuited"] += 1
+            return False
+
+    def success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self._consecutive = 0
+            self._reopens = 0
+            self._probe_started = None
+
+    def failure(self) -> None:
+        with self._lock:
+            self._counts["failures"] += 1
+            self._consecutive += 1
+            if self.state == "half_open":
+                self._reopens += 1
+                self._open()
+            elif self.state == "closed" and self._consecutive >= self.failure_threshold:
+                self._open()
+
+    def _open(self) -> None:
+        self.state = "open"
+        self._opened_at = self._clock()
+        self._probe_started = None
+        self._counts["opened"] += 1
+
+    def retried(self) -> None:
+        with self._lock:
+            self._counts["retries"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._consecutive,
+                "cooldown_s": self._cooldown(),
+                **self._counts,
+            }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(source: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if source not in _breakers:
+            _breakers[source] = CircuitBreaker(source, BREAKER_FAILURES, BREAKER_COOLDOWN)
+        return _breakers[source]
+
+
+def protected_call(source: str, fn: Callable[[], _T], retries: int = BREAKER_RETRIES) -> _T:
+    """Call fn through the source's breaker, retrying transient errors.
+
+    Raises SourceUnavailable if the breaker is open, or fn's last error.
+    """
+    breaker = get_breaker(source)
+    if not breaker.allow():
+        raise SourceUnavailable(f"{source} circuit breaker is open")
+    attempt = 0
+    while True:
+        try:
+            result = fn()
+        except Exception as e:
+            if attempt < retries and is_transient(e):
+                breaker.retried()
+                time.sleep(random.uniform(0, _RETRY_BASE_DELAY * 2 ** attempt))
+                attempt += 1
+                continue
+            breaker.failure()
+            raise
+        breaker.success()
+        return result
+
+
+def breaker_stats() -> dict[str, dict]:
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.stats() for name, breaker in sorted(breakers.items())}
+
+
+def reset() -> None:
+    """Forget every breaker (for tests)."""
+    with _breakers_lock:
+        _breakers.clear()
@@ -0,0 +1,160 @@
+"""Pre-warmed process pool for chart rendering.
+
+Each worker imports matplotlib/mplfinance, loads the font cache and the
+'yahoo' style, and renders a throwaway chart once at startup, so real jobs
+never pay backend setup costs and rendering stays off the agent thread.
+
+Enabled for generate_chart by setting CHART_POOL_WORKERS to a positive number.
+A worker that dies (killed, out of memory) breaks the whole executor; the
+pool then replaces it with a fresh one, whose workers start on the next job.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+
+@dataclass
+class ChartJob:
+    data: dict
+    chart_type: str
+    title: str
+
+
+@dataclass
+class ChartResult:
+    png: bytes | None
+    error: str | None
+    render_ms: float
+    worker_pid: int
+
+
+def _warm_worker() -> None:
+    from matplotlib import font_manager
+    import mplfinance as mpf
+
+    from ._chart_render import render_chart
+
+    font_manager.findfont(font_manager.FontProperties())
+    mpf.make_mpf_style(base_mpf_style="yahoo")
+
+    sample = {
+        "2025-01-01": {"open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 100},
+        "2025-01-02": {"open": 1.5, "high": 2.5, "low": 1.0, "close": 2.0, "volume": 120},
+    }
+    render_chart(sample, "line", "warmup")
+    render_chart(sample, "candlestick", "warmup")
+
+
+def _worker_pid(_: int) -> int:
+    return os.getpid()
+
+
+def _render_job(job: ChartJob) -> ChartResult:
+    from ._chart_render import render_chart
+
+    t = time.perf_counter()
+    try:
+        png = render_chart(job.data, job.chart_type, job.title)
+        error = None
+    except Exception as e:
+        png = None
+        error = str(e)
+    render_ms = (time.perf_counter() - t) * 1000
+    return ChartResult(png=png, error=error, render_ms=render_ms, worker_pid=os.getpid())
+
+
+class ChartPool:
+    """A fixed-size pool of pre-initialized chart rendering processes."""
+
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self._executor = self._new_executor()
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._jobs = 0
+        self._errors = 0
+        self._busy_ms = 0.0
+        self._restarts = 0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+
+    def _replace(self, broken: ProcessPoolExecutor) -> None:
+        """Swap in a new executor for a broken one, once however many jobs saw it break."""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = self._new_executor()
+            self._restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def warm(self) -> set[int]:
+        """Start every worker now instead of on first use. Returns worker PIDs."""
+        pids = set(self._executor.map(_worker_pid, range(self.workers * 2)))
+        with self._lock:
+            self._started = time.perf_counter()
+        return pids
+
+    def render_batch(self, jobs: list[ChartJob]) -> list[ChartResult]:
+        """Render jobs concurrently across the pool, preserving input order.
+
+        Raises BrokenProcessPool if a worker died; the pool has already been
+        replaced, so the next call starts fresh workers.
+        """
+        executor = self._executor
+        try:
+            futures = [executor.submit(_render_job, job) for job in jobs]
+            results = [f.result() for f in futures]
+        except BrokenProcessPool:
+            self._replace(executor)
+            raise
+        with self._lock:
+            self._jobs += len(results)
+            self._errors += sum(1 for r in results if r.error)
+            self._busy_ms += sum(r.render_ms for r in results)
+        return results
+
+    def render(self, job: ChartJob) -> ChartResult:
+        return self.render_batch([job])[0]
+
+    def stats(self) -> dict:
+        """Per-chart render time and utilization since the pool was warmed."""
+        with self._lock:
+            uptime_ms = (time.perf_counter() - self._started) * 1000
+            return {
+                "workers": self.workers,
+                "jobs": self._jobs,
+                "errors": self._errors,
+                "restarts": self._restarts,
+                "avg_render_ms": round(self._busy_ms / self._jobs, 2) if self._jobs else 0.0,
+                "utilization": round(self._busy_ms / (uptime_ms * self.workers), 4) if uptime_ms else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pool: ChartPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_chart_pool() -> ChartPool | None:
+    """Return the shared pool, or None if CHART_POOL_WORKERS is unset or 0."""
+    global _pool
+    workers = int(os.environ.get("CHART_POOL_WORKERS", "0") or 0)
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ChartPool(workers)
+            _pool.warm()
+        return _pool
@@ -0,0 +1,104 @@
+"""Chart rendering shared by generate_chart and the chart worker pool.
+
+Renders straight to PNG bytes so the same code path works in-process and
+inside pool workers, where results have to cross a process boundary.
+Long series are reduced before plotting: line charts are downsampled with
+LTTB and candlestick charts are aggregated into weekly or monthly bars.
+"""
+
+import io
+import threading
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import mplfinance as mpf  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from ._downsample import aggregate_ohlcv, lttb  # noqa: E402
+
+CHART_TYPES = ("line", "candlestick")
+LINE_DPI = 150
+
+# A 10in-wide line chart at 150 dpi is 1500px; more points than this are invisible
+LINE_MAX_POINTS = 500
+# Above this many candles the bodies shrink below a couple of pixels
+CANDLE_MAX_BARS = 130
+_CANDLE_RULES = (("W-FRI", "weekly"), ("ME", "monthly"))
+
+# pyplot keeps global figure state, so renders in the same process take turns
+_pyplot_lock = threading.Lock()
+
+
+def render_chart(ohlcv: dict, chart_type: str, title: str, downsample: bool = True) -> bytes:
+    """Render OHLCV rows keyed by date string into PNG bytes.
+
+    Raises ValueError for an unknown chart_type or empty data.
+    """
+    if chart_type not in CHART_TYPES:
+        raise ValueError(f"unknown chart_type '{chart_type}': use 'line' or 'candlestick'")
+
+    dates = sorted(ohlcv.keys())
+    if not dates:
+        raise ValueError("no data points found")
+
+    index = pd.DatetimeIndex(dates)
+    buf = io.BytesIO()
+
+    if chart_type == "line":
+        closes = np.array([ohlcv[d]["close"] for d in dates], dtype=float)
+        if downsample and len(closes) > LINE_MAX_POINTS:
+            keep = lttb(index.asi8, closes, LINE_MAX_POINTS)
+            index, closes = index[keep], closes[keep]
+
+        with _pyplot_lock:
+            fig, ax = plt.subplots(figsize=(10, 4))
+            try:
+                ax.plot(index, closes, linewidth=1.5)
+                ax.set_title(title)
+                ax.set_xlabel("Date")
+                ax.set_ylabel("Close Price (USD)")
+                ax.tick_params(axis="x", rotation=45)
+                fig.tight_layout()
+                fig.savefig(buf, format="png", dpi=LINE_DPI)
+            finally:
+                plt.close(fig)
+
+    else:
+        df = pd.DataFrame(
+            {
+                "Open": [ohlcv[d]["open"] for d in dates],
+                "High": [ohlcv[d]["high"] for d in dates],
+                "Low": [ohlcv[d]["low"] for d in dates],
+                "Close": [ohlcv[d]["close"] for d in dates],
+                "Volume": [ohlcv[d]["volume"] for d in dates],
+            },
+            index=index,
+        )
+        if downsample and len(df) > CANDLE_MAX_BARS:
+            daily = df
+            for rule, label in _CANDLE_RULES:
+                df = aggregate_ohlcv(daily, rule)
+                if len(df) <= CANDLE_MAX_BARS:
+                    break
+            title = f"{title} ({label} bars)"
+
+        with _pyplot_lock:
+            try:
+                mpf.plot(
+                    df,
+                    type="candle",
+                    title=title,
+                    ylabel="Price (USD)",
+                    savefig={"fname": buf, "format": "png"},
+                    style="yahoo",
+                    figsize=(10, 5),
+                    warn_too_much_data=len(df) + 1,
+                )
+            finally:
+                plt.close("all")
+
+    return buf.getvalue()
@@ -0,0 +1,218 @@
+"""Beta, correlation and relative strength over aligned return matrices.
+
+Histories are put on one date axis, the union of every symbol's dates,
+as a (symbols, days) close matrix with NaN where a symbol has no bar. A
+day's return is NaN unless the symbol has a close on that day and on the
+previous day of the axis, so a gap drops the days around it instead of
+folding a multi-day move into one return.
+
+rolling_beta_corr() computes every (symbol, benchmark) pair at once from
+running sums of x, y, xy, x^2 and y^2 over the days where both returns
+exist, the same pairwise-complete statistics pandas' rolling cov/corr
+give with min_periods. Rows are processed a few dozen symbols at a time
+to bound memory on long periods.
+
+ReturnMatrixCache keeps the aligned matrices per (period, symbols) for
+CROSS_ASSET_TTL seconds, so repeated comparisons against the same
+benchmarks and peers skip fetching and alignment.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+
+CROSS_ASSET_TTL = float(os.getenv("CROSS_ASSET_TTL", "900"))
+
+# Trading-day lookbacks for relative strength (about 1, 3, 6 and 12 months)
+RS_LOOKBACKS = (21, 63, 126, 252)
+
+_ROWS_PER_PASS = 8
+_MAX_ENTRIES = 16
+
+
+def align_closes(histories: dict[str, dict]) -> tuple[np.ndarray, np.ndarray]:
+    """Return (dates, closes) for columnar histories: the sorted union of dates, and a (symbols, days) matrix."""
+    dates = np.unique(np.concatenate([np.asarray(h["dates"]) for h in histories.values()]))
+    closes = np.full((len(histories), len(dates)), np.nan)
+    for i, history in enumerate(histories.values()):
+        closes[i, np.searchsorted(dates, history["dates"])] = history["close"]
+    return dates, closes
+
+
+def returns(closes: np.ndarray) -> np.ndarray:
+    """Daily simple returns, same shape as closes; NaN on the first day and wherever either close is missing."""
+    out = np.full(closes.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[..., 1:] = closes[..., 1:] / closes[..., :-1] - 1
+    return out
+
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """Sum of the last `window` values (fewer at the start) at each day along the last axis."""
+    sums = np.cumsum(values, axis=-1)
+    sums[..., window:] -= sums[..., :-window].copy()
+    return sums
+
+
+def rolling_beta_corr(
+    x: np.ndarray, y: np.ndarray, window: int, min_periods: int | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Rolling beta of each row of x on each row of y, and their correlation.
+
+    x is (S, T) symbol returns and y (B, T) benchmark returns on the same
+    days. Returns two (S, B, T) arrays; a value is NaN until its window
+    holds min_periods (default: window) days where both returns exist.
+    """
+    min_periods = window if min_periods is None else min_periods
+    beta = np.empty((x.shape[0], y.shape[0], x.shape[1]))
+    corr = np.empty_like(beta)
+    y_valid = ~np.isnan(y)
+    y0 = np.where(y_valid, y, 0.0)
+    for i in range(0, x.shape[0], _ROWS_PER_PASS):
+        xs = x[i:i + _ROWS_PER_PASS, None, :]
+        valid = ~np.isnan(xs) & y_valid
+        xv = np.where(valid, xs, 0.0)
+        yv = np.where(valid, y0, 0.0)
+        n = _window_sums(valid.astype(float), window)
+        sx, sy = _window_sums(xv, window), _window_sums(yv, window)
+        sxy, sxx, syy = _window_sums(xv * yv, window), _window_sums(xv * xv, window), _window_sums(yv * yv, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = sxy - sx * sy / n
+            var_x = sxx - sx * sx / n
+            var_y = syy - sy * sy / n
+            enough = n >= max(min_periods, 2)
+            beta[i:i + _ROWS_PER_PASS] = np.where(enough & (var_y > 0), cov / var_y, np.nan)
+            corr[i:i + _ROWS_PER_PASS] = np.where(
+                enough & (var_x > 0) & (var_y > 0), cov / np.sqrt(var_x * var_y), np.nan
+            )
+    return beta, np.clip(corr, -1, 1)
+
+
+def trailing_returns(closes: np.ndarray, lookbacks: tuple[int, ...] = RS_LOOKBACKS) -> np.ndarray:
+    """(S, len(lookbacks)) returns from `lookback` days before the last day to the last day.
+
+    Missing closes are carried forward from the symbol's previous bar; a
+    lookback reaching before a symbol's first bar, or past the start of
+    the axis, is NaN.
+    """
+    n = closes.shape[-1]
+    # Index of the most recent bar on or before each day, -1 before the first
+    seen = np.where(np.isnan(closes), -1, np.arange(n))
+    last_bar = np.maximum.accumulate(seen, axis=-1)
+    rows = np.arange(closes.shape[0])
+    end = last_bar[:, -1]
+    out = np.full((closes.shape[0], len(lookbacks)), np.nan)
+    for j, lookback in enumerate(lookbacks):
+        if lookback >= n:
+            continue
+        start = last_bar[:, n - 1 - lookback]
+        ok = (start >= 0) & (end >= 0)
+        out[ok, j] = closes[rows[ok], end[ok]] / closes[rows[ok], start[ok]] - 1
+    return out
+
+
+def relative_strength(closes: np.ndarray, benchmark: int, lookbacks: tuple[int, ...] = RS_LOOKBACKS) -> dict:
+    """Relative strength of every row against row `benchmark`.
+
+    Returns 'excess' (S, L): (1 + own return) / (1 + benchmark return) - 1 per
+    lookback; 'score': the mean excess over the lookbacks the period covers;
+    'rank': 1 for the highest score (NaN scores rank last, unranked as 0).
+    """
+    trailing = trailing_returns(closes, lookbacks)
+    excess = (1 + trailing) / (1 + trailing[benchmark]) - 1
+    # Lookbacks the benchmark covers; a symbol missing one of them is scored on the rest
+    usable = ~np.isnan(excess) & ~np.isnan(trailing[benchmark])
+    counts = usable.sum(axis=1)
+    with np.errstate(invalid="ignore"):
+        score = np.where(usable, excess, 0.0).sum(axis=1) / counts
+    order = np.argsort(np.where(np.isnan(score), np.inf, -score), kind="stable")
+    rank = np.zeros(len(score), dtype=int)
+    ranked = order[~np.isnan(score[order])]
+    rank[ranked] = np.arange(1, len(ranked) + 1)
+    return {"excess": excess, "score": score, "rank": rank}
+
+
+@dataclass(frozen=True)
+class ReturnMatrix:
+    symbols: tuple[str, ...]
+    dates: np.ndarray
+    closes: np.ndarray
+    returns: np.ndarray
+    missing: dict[str, str] = field(default_factory=dict)
+    built_at: float = 0.0
+
+    @classmethod
+    def build(cls, histories: dict[str, dict], missing: dict[str, str] | None = None) -> "ReturnMatrix":
+        """Align columnar histories (in the given order) and compute their returns."""
+        if histories:
+            dates, closes = align_closes(histories)
+        else:
+            dates, closes = np.array([], dtype=str), np.empty((0, 0))
+        return cls(tuple(histories), dates, closes, returns(closes), dict(missing or {}), time.time())
+
+    def index(self, symbol: str) -> int | None:
+        return self.symbols.index(symbol) if symbol in self.symbols else None
+
+
+class ReturnMatrixCache:
+    """Aligned return matrices per (period, symbols), rebuilt through load() after ttl_s seconds.
+
+    load(symbols, period, **options) returns ({symbol: columnar history},
+    {symbol: error}); get() passes its keyword options through.
+    """
+
+    def __init__(
+        self,
+        load: Callable[..., tuple[dict[str, dict], dict[str, str]]],
+        ttl_s: float = CROSS_ASSET_TTL,
+        max_entries: int = _MAX_ENTRIES,
+    ):
+        self._load = load
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, tuple[str, ...]], ReturnMatrix] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "builds": 0, "symbols_loaded": 0}
+        self._last_build_s: float | None = None
+
+    def get(self, symbols: list[str], period: str, **options) -> ReturnMatrix:
+        key = (period, tuple(symbols))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry.built_at < self.ttl_s:
+                self._entries.move_to_end(key)
+                self._counts["hits"] += 1
+                return entry
+
+        t = time.perf_counter()
+        histories, missing = self._load(list(symbols), period, **options)
+        entry = ReturnMatrix.build({s: histories[s] for s in symbols if s in histories}, missing)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._counts["builds"] += 1
+            self._counts["symbols_loaded"] += len(symbols)
+            self._last_build_s = time.perf_counter() - t
+        return entry
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "last_build_s": round(self._last_build_s, 3) if self._last_build_s is not None else None,
+                **self._counts,
+            }
+
+    def clear(self) -> None:
+        """Drop every matrix and counter (for tests)."""
+        with self._lock:
+            self._entries.clear()
+            self._last_build_s = None
+            self._counts = dict.fromkeys(self._counts, 0)
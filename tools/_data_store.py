@@ -0,0 +1,112 @@
+"""Run-scoped store that lets tools pass large results by handle.
+
+Tools put large results here and return a short handle string such as
+'handle:AAPL-1y:3fa2c1' to the LLM. Tools that take a JSON `data` argument
+accept a bare handle, or JSON with handles anywhere as values, and resolve
+them back to the stored objects. The LLM never has to copy a raw series
+into its tool arguments.
+
+Handles created inside run_scope() are dropped when the scope exits; the
+store is also size-bounded so handles created outside a scope cannot leak.
+"""
+
+import json
+import secrets
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+HANDLE_PREFIX = "handle:"
+MAX_ENTRIES = 256
+
+
+class DataStore:
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._items: OrderedDict[str, object] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, value: object, label: str) -> str:
+        handle = f"{HANDLE_PREFIX}{label}:{secrets.token_hex(3)}"
+        with self._lock:
+            self._items[handle] = value
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return handle
+
+    def get(self, handle: str) -> object:
+        """Return the stored value. Raises KeyError for unknown or evicted handles."""
+        with self._lock:
+            return self._items[handle]
+
+    def discard(self, handles: set[str]) -> None:
+        with self._lock:
+            for handle in handles:
+                self._items.pop(handle, None)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+_store = DataStore()
+_run_handles: ContextVar[set[str] | None] = ContextVar("run_handles", default=None)
+
+
+def is_handle(value: object) -> bool:
+    return isinstance(value, str) and value.startswith(HANDLE_PREFIX)
+
+
+def put(value: object, label: str) -> str:
+    """Store value and return its handle, registering it with the current run."""
+    handle = _store.put(value, label)
+    handles = _run_handles.get()
+    if handles is not None:
+        handles.add(handle)
+    return handle
+
+
+def get(handle: str) -> object:
+    return _store.get(handle)
+
+
+def resolve(obj: object) -> object:
+    """Recursively replace handle strings in obj with their stored values."""
+    if is_handle(obj):
+        return get(obj)
+    if isinstance(obj, dict):
+        return {k: resolve(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [resolve(v) for v in obj]
+    return obj
+
+
+def load_data_arg(data: str) -> object:
+    """Parse a tool's `data` argument: a bare handle or JSON that may contain handles.
+
+    Raises json.JSONDecodeError for invalid JSON and KeyError for unknown handles.
+    """
+    stripped = data.strip().strip('"')
+    if is_handle(stripped):
+        return get(stripped)
+    return resolve(json.loads(data))
+
+
+def unknown_handle_error(e: KeyError) -> str:
+    return (
+        f"unknown data handle {e.args[0]!r}: it may have expired, "
+        "call get_stock_history again to get a new one"
+    )
+
+
+@contextmanager
+def run_scope() -> Iterator[None]:
+    """Drop every handle created inside the block (one agent run) on exit."""
+    handles: set[str] = set()
+    token = _run_handles.set(handles)
+    try:
+        yield
+    finally:
+        _run_handles.reset(token)
+        _store.discard(handles)
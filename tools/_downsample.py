@@ -0,0 +1,59 @@
+"""Point reduction for long-period charts.
+
+Line charts use Largest-Triangle-Three-Buckets (LTTB), which keeps the
+points that carry the visual shape of the series (peaks, troughs, sharp
+moves) instead of sampling every k-th close. Candlestick charts are
+aggregated into weekly or monthly OHLCV bars.
+"""
+
+import numpy as np
+import pandas as pd
+
+_OHLCV_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Return the indices of the n_out points LTTB keeps from (x, y).
+
+    The first and last points are always kept. If the series already has
+    n_out points or fewer, every index is returned.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Interior points split into n_out - 2 buckets; endpoints are fixed
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        bx = x[start:end]
+        by = y[start:end]
+        area = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+
+    return keep
+
+
+def aggregate_ohlcv(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """Resample a daily OHLCV frame (DatetimeIndex) into bars of `rule`.
+
+    `rule` is a pandas offset alias such as 'W-FRI' or 'ME'. Bars are
+    labelled with the last trading day they contain.
+    """
+    last_day = df.index.to_series().resample(rule).last()
+    bars = df.resample(rule).agg(_OHLCV_AGG)
+    bars.index = pd.DatetimeIndex(last_day.values)
+    return bars.dropna(subset=["Open", "Close"])
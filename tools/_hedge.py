@@ -0,0 +1,173 @@
+"""Hedged requests: yfinance first, the scraper in parallel once it is late.
+
+Each data tool calls hedged(name, primary, fallback). The primary (yfinance)
+runs on its own thread. If it answers within the tool's latency budget,
+read once from HEDGE_BUDGET_<NAME> (e.g. HEDGE_BUDGET_HISTORY=2.5), that
+is the result. If it fails before then, the fallback runs straight after,
+as before. If the budget runs out first, the fallback (the Playwright
+scraper) starts alongside it and whichever returns a usable result first
+wins; a budget of 0 disables hedging.
+
+The primary goes through the source's circuit breaker (see _breaker): its
+transient errors are retried inside the budget, and while the breaker is
+open it fails at once so the fallback starts without waiting.
+
+The loser is cancelled if it has not started yet. A call already in flight
+cannot be interrupted, so it finishes in the background and its result is
+dropped. Its late finish is still used to record how much time the hedge
+saved compared with running the two one after the other.
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Callable
+
+from ._breaker import SourceUnavailable, protected_call
+
+_logger = logging.getLogger(__name__)
+
+_DEFAULT_BUDGETS = {
+    "history": 3.0,
+    "top_gainers": 5.0,
+    "news": 3.0,
+}
+
+
+class _Hedge:
+    def __init__(self, budget_s: float):
+        self.budget_s = budget_s
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.wins = {"primary": 0, "fallback": 0}
+        self.time_saved_s = 0.0
+
+    def record(self, winner: str, hedged: bool = False) -> None:
+        with self._lock:
+            self.calls += 1
+            self.wins[winner] += 1
+            self.hedged += hedged
+
+    def saved(self, seconds: float) -> None:
+        with self._lock:
+            self.time_saved_s += seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "budget_s": self.budget_s or None,
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "primary_wins": self.wins["primary"],
+                "fallback_wins": self.wins["fallback"],
+                "time_saved_s": round(self.time_saved_s, 2),
+            }
+
+
+_hedges: dict[str, _Hedge] = {}
+_hedges_lock = threading.Lock()
+
+
+def _get(name: str) -> _Hedge:
+    with _hedges_lock:
+        if name not in _hedges:
+            budget = float(os.getenv(f"HEDGE_BUDGET_{name.upper()}", str(_DEFAULT_BUDGETS.get(name, 0))) or 0)
+            _hedges[name] = _Hedge(budget)
+        return _hedges[name]
+
+
+def _spawn(fn: Callable[[], object], name: str) -> Future:
+    """Run fn on a daemon thread, so a hung call never blocks interpreter exit."""
+    future: Future = Future()
+    context = contextvars.copy_context()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(context.run(fn))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+    return future
+
+
+def _usable_primary(future: Future, name: str) -> dict | None:
+    try:
+        return future.result()
+    except SourceUnavailable as e:
+        _logger.debug("%s: %s, using scraper", name, e)
+        return None
+    except Exception as e:
+        _logger.warning("%s: yfinance failed, falling back to scraper: %s", name, e)
+        return None
+
+
+def hedged(
+    name: str, primary: Callable[[], dict | None], fallback: Callable[[], dict], source: str = "yfinance"
+) -> dict:
+    """Return primary()'s result, or fallback()'s if the primary fails or is beaten.
+
+    primary returns None (or raises) when it has no usable result. A fallback
+    result is usable unless it contains 'error'; if neither source has a
+    usable result the fallback's error is returned.
+    """
+    hedge = _get(name)
+    primary_future = _spawn(lambda: protected_call(source, primary), f"hedge-{name}-primary")
+    try:
+        primary_future.exception(timeout=hedge.budget_s or None)
+    except FutureTimeout:
+        return _race(name, hedge, primary_future, fallback)
+
+    result = _usable_primary(primary_future, name)
+    if result is not None:
+        hedge.record("primary")
+        return result
+    hedge.record("fallback")
+    return fallback()
+
+
+def _race(name: str, hedge: _Hedge, primary_future: Future, fallback: Callable[[], dict]) -> dict:
+    hedge_start = time.monotonic()
+    _logger.info("%s: yfinance slower than %.1fs, starting scraper in parallel", name, hedge.budget_s)
+    fallback_future = _spawn(fallback, f"hedge-{name}-fallback")
+    fallback_result = None
+    pending = {primary_future, fallback_future}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        if primary_future in done:
+            result = _usable_primary(primary_future, name)
+            if result is not None:
+                fallback_future.cancel()
+                hedge.record("primary", hedged=True)
+                return result
+            if fallback_result is not None:
+                break
+        if fallback_future in done:
+            fallback_result = fallback_future.result()
+            if "error" not in fallback_result:
+                hedge.record("fallback", hedged=True)
+                # Run one after the other, the scraper would have started when yfinance finished
+                # and taken as long as it just did: the saving is yfinance's end minus hedge_start
+                primary_future.add_done_callback(lambda _: hedge.saved(time.monotonic() - hedge_start))
+                return fallback_result
+    hedge.record("fallback", hedged=True)
+    return fallback_result if fallback_result is not None else fallback_future.result()
+
+
+def hedge_stats() -> dict[str, dict]:
+    with _hedges_lock:
+        names = list(_hedges)
+    return {name: _get(name).stats() for name in sorted(names)}
+
+
+def reset() -> None:
+    """Forget every budget and counter so the next use re-reads its env var (for tests)."""
+    with _hedges_lock:
+        _hedges.clear()
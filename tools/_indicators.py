@@ -0,0 +1,305 @@
+"""Technical indicators over OHLCV arrays, with incremental updates.
+
+compute() works along the last axis, so one call handles a single series
+(shape (T,)) or many symbols on a shared date axis (shape (S, T)) at once.
+Moving averages and Bollinger Bands are running-sum windows; EMA, MACD, RSI and
+ATR are first-order recursions y[t] = (1 - a) * y[t-1] + a * x[t], solved
+in long blocks with a cumulative sum instead of a Python loop
+per bar. Conventions follow what pandas code would produce: EMAs are
+ewm(span=n, adjust=False) seeded with the first value, RSI and ATR use
+Wilder's smoothing (alpha = 1/n), Bollinger Bands use the population
+standard deviation, and VWAP is anchored at the first bar of the series.
+
+Given the outputs for the first `start` bars, compute() carries the
+recursions on from there and only does work for the bars after it.
+IndicatorCache uses that to keep one series per (symbol, period) and,
+when the same window comes back with new or revised bars at the end,
+update it instead of recomputing the whole window.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+FIELDS = ("open", "high", "low", "close", "volume")
+SMA_WINDOWS = (20, 50)
+EMA_SPANS = (12, 26)
+MACD_SPANS = (12, 26, 9)
+RSI_WINDOW = 14
+ATR_WINDOW = 14
+BOLLINGER_WINDOW = 20
+BOLLINGER_WIDTH = 2.0
+
+# Indicator name -> the output series it produces
+INDICATORS = {
+    "sma": [f"sma_{n}" for n in SMA_WINDOWS],
+    "ema": [f"ema_{n}" for n in EMA_SPANS],
+    "rsi": [f"rsi_{RSI_WINDOW}"],
+    "macd": ["macd", "macd_signal", "macd_hist"],
+    "bollinger": ["bb_upper", "bb_middle", "bb_lower"],
+    "atr": [f"atr_{ATR_WINDOW}"],
+    "vwap": ["vwap"],
+}
+# Leading bars each series leaves undefined (NaN) when computed from the first bar
+_UNDEFINED_BARS = {
+    **{f"sma_{n}": n - 1 for n in SMA_WINDOWS},
+    **dict.fromkeys(INDICATORS["bollinger"], BOLLINGER_WINDOW - 1),
+    f"rsi_{RSI_WINDOW}": 1,
+}
+# Bars needed before every output is defined; resuming earlier than this recomputes
+WARMUP = max(*SMA_WINDOWS, BOLLINGER_WINDOW, RSI_WINDOW + 1)
+
+_MAX_SCALE = 1e50
+_ROWS_PER_PASS = 8
+_BARS_PER_PASS = 256
+_MAX_ENTRIES = 64
+
+
+def smooth(x: np.ndarray, alpha: float, y0: np.ndarray | float) -> np.ndarray:
+    """Return y with y[t] = (1 - alpha) * y[t-1] + alpha * x[t] along the last axis, y[-1] = y0.
+
+    Within a block, y[j] = d^(j+1) * (y0 + alpha * sum_{i<=j} x[i] / d^(i+1)) with
+    d = 1 - alpha. Each block is as long as it can be while d^-len stays below
+    _MAX_SCALE, far from overflow: a few hundred bars for short spans, the
+    whole series for slow ones.
+    """
+    x = np.asarray(x, dtype=float)
+    if alpha >= 1:
+        return x.copy()
+    out = np.empty_like(x)
+    block_len = max(1, int(np.log(_MAX_SCALE) / -np.log1p(-alpha)))
+    powers = (1 - alpha) ** np.arange(1, min(block_len, x.shape[-1]) + 1)
+    y = np.asarray(y0, dtype=float)
+    for s in range(0, x.shape[-1], block_len):
+        block = x[..., s:s + block_len]
+        p = powers[:block.shape[-1]]
+        out[..., s:s + block_len] = p * (y[..., None] + alpha * np.cumsum(block / p, axis=-1))
+        y = out[..., s + block.shape[-1] - 1]
+    return out
+
+
+def _ema(x: np.ndarray, span: int, prev: np.ndarray | None) -> np.ndarray:
+    # Seeding with y[-1] = x[0] makes y[0] = x[0], as pandas ewm(adjust=False) does
+    return smooth(x, 2 / (span + 1), x[..., 0] if prev is None else prev)
+
+
+def _rolling(x: np.ndarray, window: int, start: int) -> tuple[np.ndarray, np.ndarray]:
+    """Rolling mean and population std for bars start.. (NaN until the window fills).
+
+    Both come from running sums of x and x^2, taken around the segment's mean
+    so the variance's E[x^2] - E[x]^2 does not cancel away the precision.
+    """
+    lead = min(start, window - 1)
+    segment = x[..., start - lead:]
+    shape = (*x.shape[:-1], x.shape[-1] - start)
+    mean, std = np.full(shape, np.nan), np.full(shape, np.nan)
+    if segment.shape[-1] >= window:
+        center = segment.mean(axis=-1, keepdims=True)
+        centered = segment - center
+        zero = np.zeros((*x.shape[:-1], 1))
+        sums = np.concatenate([zero, np.cumsum(centered, axis=-1)], axis=-1)
+        squares = np.concatenate([zero, np.cumsum(centered**2, axis=-1)], axis=-1)
+        m = (sums[..., window:] - sums[..., :-window]) / window
+        var = (squares[..., window:] - squares[..., :-window]) / window - m**2
+        filled = window - 1 - lead
+        mean[..., filled:] = m + center
+        std[..., filled:] = np.sqrt(np.maximum(var, 0))
+    return mean, std
+
+
+def compute(bars: dict[str, np.ndarray], prev: dict[str, np.ndarray] | None = None, start: int = 0) -> dict:
+    """Compute every indicator for bars[..., start:].
+
+    bars maps each of FIELDS to an array of shape (T,) or (S, T). prev, when
+    start > 0, holds compute()'s outputs for bars[..., :start] (at least the
+    last one); it must be given for start >= 1 and start must then be at
+    least WARMUP. Returns outputs for bars start.. only; names starting with
+    '_' are internal state carried between updates.
+    """
+    if start and (prev is None or start < WARMUP):
+        raise ValueError(f"resuming at bar {start} needs prev and at least {WARMUP} earlier bars")
+    rows = np.shape(bars["close"])[0] if np.ndim(bars["close"]) == 2 else 0
+    if rows <= _ROWS_PER_PASS or np.shape(bars["close"])[-1] - start < _BARS_PER_PASS:
+        return _compute(bars, prev, start)
+    # Long series go a few symbols per pass, which keeps the temporaries in CPU cache
+    parts = [
+        _compute(
+            {f: bars[f][i:i + _ROWS_PER_PASS] for f in FIELDS},
+            None if prev is None else {name: series[i:i + _ROWS_PER_PASS] for name, series in prev.items()},
+            start,
+        )
+        for i in range(0, rows, _ROWS_PER_PASS)
+    ]
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def _compute(bars: dict[str, np.ndarray], prev: dict[str, np.ndarray] | None, start: int) -> dict:
+    high, low, close, volume = (np.asarray(bars[f], dtype=float) for f in ("high", "low", "close", "volume"))
+
+    def last(name: str) -> np.ndarray | None:
+        return None if prev is None else prev[name][..., -1]
+
+    out = {}
+    for n in SMA_WINDOWS:
+        out[f"sma_{n}"], _ = _rolling(close, n, start)
+    fast, slow, signal = MACD_SPANS
+    for n in sorted({*EMA_SPANS, fast, slow}):
+        out[f"ema_{n}"] = _ema(close[..., start:], n, last(f"ema_{n}"))
+
+    line = out[f"ema_{fast}"] - out[f"ema_{slow}"]
+    out["macd"] = line
+    out["macd_signal"] = _ema(line, signal, last("macd_signal"))
+    out["macd_hist"] = line - out["macd_signal"]
+
+    middle, std = _rolling(close, BOLLINGER_WINDOW, start)
+    out["bb_middle"] = middle
+    out["bb_upper"] = middle + BOLLINGER_WIDTH * std
+    out["bb_lower"] = middle - BOLLINGER_WIDTH * std
+
+    # RSI: Wilder-smoothed average gain and loss of close-to-close changes, undefined on the first bar
+    delta = np.diff(close[..., max(start - 1, 0):], axis=-1)
+    gain, loss = np.maximum(delta, 0), np.maximum(-delta, 0)
+    alpha = 1 / RSI_WINDOW
+    if start:
+        avg_gain, avg_loss = smooth(gain, alpha, last("_rsi_gain")), smooth(loss, alpha, last("_rsi_loss"))
+    else:
+        nan = np.full((*close.shape[:-1], 1), np.nan)
+        if delta.shape[-1]:
+            avg_gain = np.concatenate([nan, smooth(gain, alpha, gain[..., 0])], axis=-1)
+            avg_loss = np.concatenate([nan, smooth(loss, alpha, loss[..., 0])], axis=-1)
+        else:
+            avg_gain = avg_loss = nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    # No losses in the window: 100, or 50 when the price did not move at all
+    rsi = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), rsi)
+    out[f"rsi_{RSI_WINDOW}"] = np.where(np.isnan(avg_gain), np.nan, rsi)
+    out["_rsi_gain"], out["_rsi_loss"] = avg_gain, avg_loss
+
+    # ATR: Wilder-smoothed true range; the first bar's true range is its high - low
+    prev_close = close[..., max(start - 1, 0):-1]
+    h, l = high[..., start:], low[..., start:]
+    true_range = h - l
+    if start:
+        true_range = np.maximum(true_range, np.maximum(np.abs(h - prev_close), np.abs(l - prev_close)))
+    else:
+        tail = np.maximum(np.abs(h[..., 1:] - prev_close), np.abs(l[..., 1:] - prev_close))
+        true_range[..., 1:] = np.maximum(true_range[..., 1:], tail)
+    atr_seed = last(f"atr_{ATR_WINDOW}")
+    out[f"atr_{ATR_WINDOW}"] = smooth(
+        true_range, 1 / ATR_WINDOW, true_range[..., 0] if atr_seed is None else atr_seed
+    )
+
+    # VWAP anchored at the first bar, on the typical price (high + low + close) / 3
+    typical = (h + l + close[..., start:]) / 3
+    v = volume[..., start:]
+    out["_vwap_pv"] = np.cumsum(typical * v, axis=-1) + (0 if start == 0 else last("_vwap_pv")[..., None])
+    out["_vwap_v"] = np.cumsum(v, axis=-1) + (0 if start == 0 else last("_vwap_v")[..., None])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["vwap"] = out["_vwap_pv"] / out["_vwap_v"]
+    return out
+
+
+class IndicatorCache:
+    """Computed indicator series per (symbol, period), updated incrementally as bars arrive."""
+
+    def __init__(self, max_entries: int = _MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "incremental": 0, "full": 0, "bars_computed": 0}
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += n
+
+    def get(self, symbol: str, period: str, columns: dict) -> dict[str, np.ndarray]:
+        """Return every indicator series for columnar OHLCV data, aligned with its dates.
+
+        When the cached series for (symbol, period) covers the start of this
+        window, only the bars from the first new or changed one are computed.
+        After the window slides forward, EMA-based values and RSI/ATR keep the
+        smoothing of the bars that dropped out, so they can differ slightly
+        (typically in the last decimals) from a fresh computation on the window.
+        The window's first bars are still undefined wherever a fresh
+        computation would leave them undefined.
+        """
+        dates = list(columns["dates"])
+        bars = {f: np.asarray(columns[f], dtype=float) for f in FIELDS}
+        key = (symbol, period)
+        with self._lock:
+            entry = self._entries.get(key)
+
+        resume = self._resume_point(entry, dates, bars) if entry else None
+        if resume is None:
+            outputs = compute(bars)
+            offset = 0
+            self._count("full")
+            self._count("bars_computed", len(dates))
+        else:
+            offset, j = resume
+            new = {f: bars[f][j:] for f in FIELDS}
+            merged = {f: np.concatenate([entry["bars"][f][:offset + j], new[f]]) for f in FIELDS}
+            if j == len(dates):
+                outputs = {name: series[:offset + j] for name, series in entry["outputs"].items()}
+                self._count("hits")
+            else:
+                prev = {name: series[:offset + j] for name, series in entry["outputs"].items()}
+                added = compute(merged, prev, start=offset + j)
+                outputs = {name: np.concatenate([prev[name], added[name]]) for name in added}
+                self._count("incremental")
+                self._count("bars_computed", len(dates) - j)
+            bars = merged
+
+        # Keep from the window's start on; the recursions already carry what came before it
+        window = {name: series[offset:] for name, series in outputs.items()}
+        if offset:
+            # VWAP stays anchored at the window's first bar
+            for name in ("_vwap_pv", "_vwap_v"):
+                window[name] = window[name] - outputs[name][offset - 1]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                window["vwap"] = window["_vwap_pv"] / window["_vwap_v"]
+        stored = {"dates": dates, "bars": {f: bars[f][offset:] for f in FIELDS}, "outputs": window}
+        with self._lock:
+            self._entries[key] = stored
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        result = {name: series for name, series in window.items() if not name.startswith("_")}
+        if offset:
+            # Defined here only because bars before the window were cached
+            for name, n in _UNDEFINED_BARS.items():
+                result[name] = result[name].copy()
+                result[name][:n] = np.nan
+        return result
+
+    @staticmethod
+    def _resume_point(entry: dict, dates: list[str], bars: dict[str, np.ndarray]) -> tuple[int, int] | None:
+        """(offset of dates[0] in the cached series, index in dates of the first new or changed bar).
+
+        None when the window cannot be resumed: it starts outside the cached
+        series, or changes within the warm-up bars.
+        """
+        cached = entry["dates"]
+        try:
+            offset = cached.index(dates[0])
+        except ValueError:
+            return None
+        overlap = min(len(cached) - offset, len(dates))
+        same = np.array(cached[offset:offset + overlap]) == np.array(dates[:overlap])
+        for f in FIELDS:
+            same &= entry["bars"][f][offset:offset + overlap] == bars[f][:overlap]
+        j = int(np.argmin(same)) if not same.all() else overlap
+        if offset + j < WARMUP:
+            return None
+        return offset, j
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), **self._counts}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._counts = dict.fromkeys(self._counts, 0)
@@ -0,0 +1,92 @@
+"""Process-wide concurrency limits for shared resources.
+
+Tools wrap their use of an expensive shared resource in `with limit(name):`
+so that concurrent agent runs queue for it instead of overloading it. Each
+limit is read once from RESOURCE_LIMIT_<NAME> (e.g. RESOURCE_LIMIT_SANDBOX=2);
+0 means unlimited.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+_DEFAULTS = {
+    "sandbox": 4,   # python_analyzer sandbox runs
+    "browser": 2,   # Chromium pages used by the scrapers
+    "chart": 2,     # chart renders, in-process or via the pool
+    "smtp": 4,      # SMTP connections
+}
+
+
+class _Limit:
+    def __init__(self, size: int):
+        self.size = size
+        self._semaphore = threading.BoundedSemaphore(size) if size > 0 else None
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.waiting = 0
+        self.acquired = 0
+        self.wait_s = 0.0
+
+    @contextmanager
+    def hold(self) -> Iterator[None]:
+        with self._lock:
+            self.waiting += 1
+        t = time.perf_counter()
+        if self._semaphore is not None:
+            self._semaphore.acquire()
+        with self._lock:
+            self.waiting -= 1
+            self.in_use += 1
+            self.acquired += 1
+            self.wait_s += time.perf_counter() - t
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.size or None,
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "acquired": self.acquired,
+                "avg_wait_ms": round(self.wait_s / self.acquired * 1000, 1) if self.acquired else 0.0,
+            }
+
+
+_limits: dict[str, _Limit] = {}
+_limits_lock = threading.Lock()
+
+
+def _get(name: str) -> _Limit:
+    with _limits_lock:
+        if name not in _limits:
+            size = int(os.getenv(f"RESOURCE_LIMIT_{name.upper()}", str(_DEFAULTS.get(name, 0))) or 0)
+            _limits[name] = _Limit(size)
+        return _limits[name]
+
+
+@contextmanager
+def limit(name: str) -> Iterator[None]:
+    """Hold one slot of the named resource for the duration of the block."""
+    with _get(name).hold():
+        yield
+
+
+def limit_stats() -> dict[str, dict]:
+    with _limits_lock:
+        names = list(_limits)
+    return {name: _get(name).stats() for name in sorted(names)}
+
+
+def reset() -> None:
+    """Forget every limit so the next use re-reads its env var (for tests)."""
+    with _limits_lock:
+        _limits.clear()
@@ -0,0 +1,70 @@
+"""Near-duplicate headline clustering for the news store.
+
+A syndicated story shows up under several publishers with small edits to
+the headline ("Apple beats Q3 estimates" / "Apple Beats Q3 Estimates -
+Reuters"). Each headline is reduced to a 64-bit SimHash over its words and
+word pairs; headlines whose hashes differ in at most MAX_DISTANCE bits are
+treated as the same story. Features of a whole feed are hashed once and
+the bit votes summed with numpy, and clustering compares each headline
+against every representative so far in one vectorized XOR/popcount.
+"""
+
+import hashlib
+import re
+
+import numpy as np
+
+# Hamming distance (of 64 bits) at or below which two headlines are the same story
+MAX_DISTANCE = 12
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Trailing " - Publisher" / " | Publisher" added by aggregators
+_SUFFIX_RE = re.compile(r"\s+[-|–—]\s+[^-|–—]{1,40}$")
+_STOPWORDS = frozenset({"a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "as", "at", "by", "with", "is"})
+_BIT_MASKS = np.uint64(1) << np.arange(64, dtype=np.uint64)
+
+
+def _features(title: str | None) -> list[str]:
+    words = [w for w in _TOKEN_RE.findall(_SUFFIX_RE.sub("", title or "").lower()) if w not in _STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _hash64(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+
+
+def simhash(titles: list[str | None]) -> np.ndarray:
+    """Return one uint64 SimHash per title (0 for titles with no words)."""
+    features: list[str] = []
+    owners: list[int] = []
+    for i, title in enumerate(titles):
+        found = _features(title)
+        features.extend(found)
+        owners.extend([i] * len(found))
+    if not features:
+        return np.zeros(len(titles), dtype=np.uint64)
+
+    vocab, inverse = np.unique(np.array(features), return_inverse=True)
+    hashes = np.array([_hash64(f) for f in vocab], dtype=np.uint64)[inverse]
+    # +1 for every set bit of a feature's hash, -1 for every clear one, summed per title
+    votes = np.where((hashes[:, None] & _BIT_MASKS) != 0, 1, -1)
+    totals = np.zeros((len(titles), 64), dtype=np.int64)
+    np.add.at(totals, np.array(owners), votes)
+    return ((totals > 0).astype(np.uint64) * _BIT_MASKS).sum(axis=1, dtype=np.uint64)
+
+
+def cluster(titles: list[str | None], max_distance: int = MAX_DISTANCE) -> list[int]:
+    """Map each title to the index of its cluster's representative, its first member in order."""
+    hashes = simhash(titles)
+    reps: list[int] = []
+    assigned = []
+    for i, h in enumerate(hashes):
+        if reps:
+            distances = np.bitwise_count(hashes[reps] ^ h)
+            j = int(np.argmin(distances))
+            if distances[j] <= max_distance:
+                assigned.append(reps[j])
+                continue
+        reps.append(i)
+        assigned.append(i)
+    return assigned
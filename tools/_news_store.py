@@ -0,0 +1,121 @@
+"""Per-symbol news store behind get_stock_news.
+
+Remembers every headline already fetched for a symbol, on disk under the
+cache directory so that later runs the same day see it too. Within
+NEWS_CACHE_TTL seconds of the last fetch a request is answered from the
+store without touching the network. After that the symbol is fetched again
+and only items not seen before are added; they are listed first and
+flagged "new": true in that response only, so the LLM can tell fresh
+headlines from ones earlier calls already returned. Syndicated copies of a story already in the store
+(see _news_dedupe) are not added; the story's "duplicates" count goes up
+instead, so the items returned are distinct stories.
+
+Concurrent requests for the same symbol share one fetch.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from ._news_dedupe import cluster
+from ._result_cache import ResultCache, content_key
+
+NEWS_CACHE_TTL = float(os.getenv("NEWS_CACHE_TTL", "900"))
+# Items returned per request, and items remembered per symbol for de-duplication
+MAX_ITEMS = 10
+_MAX_REMEMBERED = 100
+# How long a symbol's seen headlines are remembered after its last fetch
+_SEEN_TTL_SECONDS = 2 * 86400
+
+
+def item_key(item: dict) -> str:
+    """Identity of a news item: its URL, or its title when there is none."""
+    return item.get("url") or item.get("title") or ""
+
+
+class NewsStore:
+    def __init__(self, ttl_seconds: float = NEWS_CACHE_TTL, cache: ResultCache | None = None):
+        self.ttl_seconds = ttl_seconds
+        self._cache = cache or ResultCache("news", ttl_seconds=_SEEN_TTL_SECONDS, max_bytes=5 * 1024 * 1024)
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._counts = {"hits": 0, "fetches": 0, "new_items": 0, "duplicates": 0}
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def get(self, symbol: str, fetch: Callable[[str], dict]) -> dict:
+        """Return news for symbol, calling fetch(symbol) only when the stored copy is stale.
+
+        fetch returns get_stock_news's result shape. Errors are returned as-is
+        and never stored.
+        """
+        cache_key = content_key("news", symbol)
+        with self._symbol_lock(symbol):
+            entry = self._cache.get(cache_key)
+            if entry is not None and time.time() - entry["fetched_at"] < self.ttl_seconds:
+                self._count("hits")
+                if any(item["new"] for item in entry["items"]):
+                    # Already returned by the call that fetched them
+                    entry = {**entry, "items": [{**item, "new": False} for item in entry["items"]]}
+                    self._cache.put(cache_key, entry)
+                return self._response(symbol, entry)
+
+            fetched = fetch(symbol)
+            if "error" in fetched:
+                return fetched
+            self._count("fetches")
+
+            old = [{"duplicates": 0, **item, "new": False} for item in (entry["items"] if entry else [])]
+            seen = {item_key(item) for item in old}
+            unseen = []
+            for item in fetched.get("news", []):
+                key = item_key(item)
+                if key not in seen:
+                    seen.add(key)
+                    unseen.append({**item, "new": True, "duplicates": 0})
+
+            # Stored items come first, so a syndicated copy folds into the story already reported
+            members = old + unseen
+            new = []
+            for i, rep in enumerate(cluster([item.get("title") for item in members])):
+                if i < len(old):
+                    continue
+                if rep == i:
+                    new.append(members[i])
+                else:
+                    members[rep]["duplicates"] += 1
+            self._count("new_items", len(new))
+            self._count("duplicates", len(unseen) - len(new))
+
+            items = new + old
+            entry = {"fetched_at": time.time(), "items": items[:_MAX_REMEMBERED]}
+            self._cache.put(cache_key, entry)
+            return self._response(symbol, entry)
+
+    @staticmethod
+    def _response(symbol: str, entry: dict) -> dict:
+        news = entry["items"][:MAX_ITEMS]
+        return {
+            "symbol": symbol,
+            "timestamp": datetime.fromtimestamp(entry["fetched_at"], timezone.utc).isoformat(),
+            "news": news,
+            "new_count": sum(1 for item in news if item["new"]),
+        }
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._locks_lock:
+            self._counts[name] += n
+
+    def stats(self) -> dict:
+        with self._locks_lock:
+            return dict(self._counts)
+
+    def clear_memory(self) -> None:
+        """Forget in-memory state, as a fresh process would start."""
+        self._cache.clear_memory()
+        with self._locks_lock:
+            self._counts = dict.fromkeys(self._counts, 0)
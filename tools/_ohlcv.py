@@ -0,0 +1,87 @@
+"""Conversion between the two OHLCV wire layouts.
+
+rows (default):
+    {"YYYY-MM-DD": {"open": .., "high": .., "low": .., "close": .., "volume": ..}, ...}
+
+columnar:
+    {"dates": [...], "open": [...], "high": [...], "low": [...], "close": [...], "volume": [...]}
+
+Columnar drops the five field names repeated on every row, which roughly
+halves the JSON size and LLM token count of long histories. Both layouts
+sit under the same 'data' key, so a payload's layout is detected from the
+presence of a 'dates' key.
+"""
+
+FIELDS = ("open", "high", "low", "close", "volume")
+LAYOUTS = ("rows", "columnar")
+
+
+def is_columnar(data: object) -> bool:
+    return isinstance(data, dict) and "dates" in data
+
+
+def to_columnar(rows: dict) -> dict:
+    """Convert a rows-layout dict to columnar. Dates keep their key order."""
+    values = list(rows.values())
+    columns = {"dates": list(rows)}
+    for field in FIELDS:
+        columns[field] = [row[field] for row in values]
+    return columns
+
+
+def has_columnar_shape(columns: dict) -> bool:
+    """True if dates and every OHLCV field are lists of the same length."""
+    arrays = [columns.get(key) for key in ("dates", *FIELDS)]
+    return all(type(a) is list for a in arrays) and len({len(a) for a in arrays}) == 1
+
+
+def to_rows(columns: dict) -> dict:
+    """Convert a columnar dict to rows layout.
+
+    Raises ValueError unless dates and every field are equal-length lists.
+    """
+    if not has_columnar_shape(columns):
+        raise ValueError(
+            "columnar data must have equal-length dates, open, high, low, close and volume arrays"
+        )
+    arrays = [columns[key] for key in ("dates", *FIELDS)]
+    return {date: dict(zip(FIELDS, values)) for date, *values in zip(*arrays)}
+
+
+def as_rows(data: dict) -> dict:
+    """Return OHLCV data in rows layout, whichever layout it arrived in."""
+    return to_rows(data) if is_columnar(data) else data
+
+
+def sort_by_date(data: dict) -> dict:
+    """Return OHLCV data oldest-first, in the layout it arrived in.
+
+    Yahoo's history page lists newest first; every consumer (summaries,
+    indicators, charts) expects oldest first.
+    """
+    if not is_columnar(data):
+        return dict(sorted(data.items()))
+    dates = data["dates"]
+    if all(a <= b for a, b in zip(dates, dates[1:])):
+        return data
+    order = sorted(range(len(dates)), key=dates.__getitem__)
+    return {key: [values[i] for i in order] if key in ("dates", *FIELDS) else values for key, values in data.items()}
+
+
+def summarize(data: dict) -> dict:
+    """Small description of an oldest-first series for the LLM to read instead of the raw rows."""
+    columns = data if is_columnar(data) else to_columnar(data)
+    closes = columns["close"]
+    volumes = columns["volume"]
+    return {
+        "rows": len(closes),
+        "start": columns["dates"][0],
+        "end": columns["dates"][-1],
+        "first_close": closes[0],
+        "last_close": closes[-1],
+        "change_pct": round((closes[-1] / closes[0] - 1) * 100, 2) if closes[0] else None,
+        "high": max(columns["high"]),
+        "low": min(columns["low"]),
+        "avg_volume": int(sum(volumes) / len(volumes)),
+        "last_volume": volumes[-1],
+    }
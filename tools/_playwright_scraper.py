@@ -4,12 +4,25 @@ Playwright is used for top gainers (Futunn) and stock history (Yahoo Finance).
 RSS via httpx is used for stock news (Yahoo Finance RSS).
 
 Activated automatically on yfinance errors, or forced via USE_SCRAPER=1 env var.
+
+By default each scrape launches and closes its own Chromium. Long-running
+processes can call start_shared_browser() once to keep a single Chromium
+alive instead; each scrape then gets a fresh context in it.
 """
 
+import math
 import os
-from datetime import datetime, timezone
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, TypeVar
+
+from playwright.sync_api import Browser, Page, Playwright, sync_playwright
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
-from playwright.sync_api import sync_playwright
+from ._limits import limit
+
+_T = TypeVar("_T")
 
 # Approximate trading days per period — used to slice history rows
 _PERIOD_ROWS: dict[str, int] = {
@@ -24,12 +37,109 @@ _PERIOD_ROWS: dict[str, int] = {
     "10y": 2520,
 }
 
+_YAHOO = "https://finance.yahoo.com"
+
+_HISTORY_ROWS = "table tbody tr"
+# Cell texts of every history row from index `start` on, in one round trip
+_ROW_CELLS_JS = "(rows, start) => rows.slice(start).map(r => Array.from(r.querySelectorAll('td'), c => c.innerText))"
+# How long to wait for more rows to render after scrolling before taking what is there
+_SCROLL_WAIT_MS = 5000
+
+# News items read from the page; more than get_stock_news returns so duplicates can be dropped
+_NEWS_ITEMS = 30
+
 
 def use_scraper() -> bool:
     """Return True if USE_SCRAPER env var is set to '1' or 'true'."""
     return os.environ.get("USE_SCRAPER", "").lower() in ("1", "true")
 
 
+class _SharedBrowser:
+    """One Chromium kept alive on a dedicated thread.
+
+    Playwright's sync API must be driven from the thread that started it,
+    so page work is submitted to that thread rather than run by the caller.
+    Scrapes are serialised; each gets its own context, closed afterwards.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser")
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self.launches = 0
+
+    def _ensure(self) -> Browser:
+        if self._browser is None or not self._browser.is_connected():
+            if self._playwright is None:
+                self._playwright = sync_playwright().start()
+            self._browser = self._playwright.chromium.launch(headless=True)
+            self.launches += 1
+        return self._browser
+
+    def _call(self, fn: Callable[[Page], _T]) -> _T:
+        context = self._ensure().new_context()
+        try:
+            return fn(context.new_page())
+        finally:
+            context.close()
+
+    def run(self, fn: Callable[[Page], _T]) -> _T:
+        return self._executor.submit(self._call, fn).result()
+
+    def warm(self) -> None:
+        self._executor.submit(self._ensure).result()
+
+    def _stop(self) -> None:
+        if self._browser is not None:
+            self._browser.close()
+        if self._playwright is not None:
+            self._playwright.stop()
+        self._browser = self._playwright = None
+
+    def close(self) -> None:
+        self._executor.submit(self._stop).result()
+        self._executor.shutdown()
+
+
+_shared: _SharedBrowser | None = None
+_shared_lock = threading.Lock()
+
+
+def start_shared_browser(warm: bool = True) -> None:
+    """Make every later scrape reuse one Chromium, until stop_shared_browser().
+
+    With warm=False the browser is launched by the first scrape instead of now.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = _SharedBrowser()
+        if warm:
+            _shared.warm()
+
+
+def stop_shared_browser() -> None:
+    global _shared
+    with _shared_lock:
+        if _shared is not None:
+            _shared.close()
+            _shared = None
+
+
+def _with_page(fn: Callable[[Page], _T]) -> _T:
+    """Run fn on a new page, in the shared browser if one is running."""
+    with limit("browser"):
+        shared = _shared
+        if shared is not None:
+            return shared.run(fn)
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            try:
+                return fn(browser.new_page())
+            finally:
+                browser.close()
+
+
 def _parse_number(s: str) -> float | None:
     """Parse a formatted number string into a float.
 
@@ -70,120 +180,146 @@ def scrape_top_gainer() -> dict:
     """
     url = "https://www.futunn.com/en/quote/us/stock-list/nasdaq/top-gainers"
 
-    browser = None
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto(url, wait_until="domcontentloaded", timeout=60000)
-
-            page.wait_for_function(
-                "document.body.innerText.includes('%')", timeout=20000
-            )
-
-            rows = page.query_selector_all("table tbody tr")
-            if not rows:
-                return {"error": "Futunn: no rows found in gainers table"}
-
-            cells = rows[0].query_selector_all("td")
-            if len(cells) < 9:
-                return {"error": f"Futunn: unexpected column count ({len(cells)})"}
-
-            symbol = cells[1].inner_text().strip()
-            name = cells[2].inner_text().strip()
-            price = _parse_number(cells[3].inner_text())
-            change_absolute = _parse_number(cells[4].inner_text())
-            change_pct = _parse_number(cells[5].inner_text())
-            volume_raw = cells[6].inner_text().strip()
-            volume = _parse_number(volume_raw)
-            market_cap = _parse_number(cells[8].inner_text())
-
-            return {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "symbol": symbol,
-                "name": name,
-                "exchange": "NASDAQ",
-                "price": price,
-                "change_absolute": change_absolute,
-                "change_pct": change_pct,
-                "volume": int(volume) if volume is not None else None,
-                "market_cap": market_cap,
-            }
+    def scrape(page: Page) -> dict:
+        page.goto(url, wait_until="domcontentloaded", timeout=60000)
+
+        page.wait_for_function(
+            "document.body.innerText.includes('%')", timeout=20000
+        )
+
+        rows = page.query_selector_all("table tbody tr")
+        if not rows:
+            return {"error": "Futunn: no rows found in gainers table"}
+
+        cells = rows[0].query_selector_all("td")
+        if len(cells) < 9:
+            return {"error": f"Futunn: unexpected column count ({len(cells)})"}
+
+        symbol = cells[1].inner_text().strip()
+        name = cells[2].inner_text().strip()
+        price = _parse_number(cells[3].inner_text())
+        change_absolute = _parse_number(cells[4].inner_text())
+        change_pct = _parse_number(cells[5].inner_text())
+        volume_raw = cells[6].inner_text().strip()
+        volume = _parse_number(volume_raw)
+        market_cap = _parse_number(cells[8].inner_text())
+
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "symbol": symbol,
+            "name": name,
+            "exchange": "NASDAQ",
+            "price": price,
+            "change_absolute": change_absolute,
+            "change_pct": change_pct,
+            "volume": int(volume) if volume is not None else None,
+            "market_cap": market_cap,
+        }
 
+    try:
+        return _with_page(scrape)
     except Exception as e:
         return {"error": f"Futunn scraper failed: {str(e)}"}
-    finally:
-        if browser:
-            browser.close()
 
 
-def scrape_stock_history(symbol: str, period: str) -> dict:
-    """Scrape historical OHLCV data from Yahoo Finance using Playwright.
+def _history_range(period: str, now: datetime) -> tuple[int, int]:
+    """Return (period1, period2) epoch seconds covering _PERIOD_ROWS[period] trading days up to now.
 
-    Returns the same dict shape as get_stock_history().
+    Trading days are stretched to calendar days (365/252) plus a week for
+    holidays, and period2 is a day past now so today's row is included.
     """
-    url = (
-        f"https://finance.yahoo.com/quote/{symbol.upper()}/history/"
-        "?period1=0&period2=9999999999"
-    )
     n_rows = _PERIOD_ROWS.get(period, 5)
+    days = math.ceil(n_rows * 365 / 252) + 7
+    return int((now - timedelta(days=days)).timestamp()), int((now + timedelta(days=1)).timestamp())
 
-    browser = None
+
+def _parse_history_row(cells: list[str]) -> tuple[str, dict] | None:
+    """Parse one history table row's cell texts into (YYYY-MM-DD, OHLCV), or None to skip it.
+
+    Dividend and split rows have fewer cells and are skipped.
+    """
+    if len(cells) < 7:
+        return None
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto(url, wait_until="networkidle", timeout=30000)
+        date_str = datetime.strptime(cells[0].strip(), "%b %d, %Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
 
-            table = page.query_selector("table")
-            if not table:
-                return {"error": f"Yahoo Finance history: no table found for {symbol}"}
+    open_ = _parse_number(cells[1])
+    high = _parse_number(cells[2])
+    low = _parse_number(cells[3])
+    close = _parse_number(cells[4])
+    volume_raw = _parse_number(cells[6])
 
-            rows = table.query_selector_all("tbody tr")
-            if not rows:
-                return {"error": f"Yahoo Finance history: no rows for {symbol}"}
+    if any(v is None for v in (open_, high, low, close, volume_raw)):
+        return None
 
-            data = {}
-            for row in rows[:n_rows]:
-                cells = row.query_selector_all("td")
-                if len(cells) < 7:
-                    continue
+    return date_str, {
+        "open": round(open_, 2),
+        "high": round(high, 2),
+        "low": round(low, 2),
+        "close": round(close, 2),
+        "volume": int(volume_raw),
+    }
 
-                date_text = cells[0].inner_text().strip()
-                try:
-                    date_str = datetime.strptime(date_text, "%b %d, %Y").strftime(
-                        "%Y-%m-%d"
-                    )
-                except ValueError:
-                    continue
 
-                open_ = _parse_number(cells[1].inner_text())
-                high = _parse_number(cells[2].inner_text())
-                low = _parse_number(cells[3].inner_text())
-                close = _parse_number(cells[4].inner_text())
-                volume_raw = _parse_number(cells[6].inner_text())
+def scrape_stock_history(symbol: str, period: str) -> dict:
+    """Scrape historical OHLCV data from Yahoo Finance using Playwright.
 
-                if any(v is None for v in (open_, high, low, close, volume_raw)):
-                    continue
+    The URL is bounded to the requested range, so Yahoo renders no more than
+    is needed. Rows are read in one evaluate() per batch, and the page is
+    scrolled to load more until _PERIOD_ROWS[period] rows are collected or
+    the table stops growing.
 
-                data[date_str] = {
-                    "open": round(open_, 2),
-                    "high": round(high, 2),
-                    "low": round(low, 2),
-                    "close": round(close, 2),
-                    "volume": int(volume_raw),
-                }
+    Returns the same dict shape as get_stock_history().
+    """
+    period1, period2 = _history_range(period, datetime.now(timezone.utc))
+    url = f"{_YAHOO}/quote/{symbol.upper()}/history/?period1={period1}&period2={period2}"
+    n_rows = _PERIOD_ROWS.get(period, 5)
 
-            if not data:
-                return {"error": f"Yahoo Finance history: no parseable rows for {symbol}"}
+    def scrape(page: Page) -> dict:
+        page.goto(url, wait_until="networkidle", timeout=30000)
+
+        if not page.query_selector("table"):
+            return {"error": f"Yahoo Finance history: no table found for {symbol}"}
+
+        data = {}
+        read = 0
+        while len(data) < n_rows:
+            batch = page.eval_on_selector_all(_HISTORY_ROWS, _ROW_CELLS_JS, read)
+            if not batch:
+                break
+            read += len(batch)
+            for cells in batch:
+                parsed = _parse_history_row(cells)
+                if parsed is not None:
+                    data[parsed[0]] = parsed[1]
+                    if len(data) == n_rows:
+                        break
+            else:
+                # Yahoo renders long tables as the page scrolls: ask for more and wait for them
+                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                try:
+                    page.wait_for_function(
+                        f"n => document.querySelectorAll({_HISTORY_ROWS!r}).length > n",
+                        arg=read,
+                        timeout=_SCROLL_WAIT_MS,
+                    )
+                except PlaywrightTimeoutError:
+                    break
+
+        if not read:
+            return {"error": f"Yahoo Finance history: no rows for {symbol}"}
+        if not data:
+            return {"error": f"Yahoo Finance history: no parseable rows for {symbol}"}
 
-            return {"symbol": symbol.upper(), "period": period, "data": data}
+        # The table lists newest first
+        return {"symbol": symbol.upper(), "period": period, "data": dict(sorted(data.items()))}
 
+    try:
+        return _with_page(scrape)
     except Exception as e:
         return {"error": f"Yahoo Finance history scraper failed: {str(e)}"}
-    finally:
-        if browser:
-            browser.close()
 
 
 def scrape_stock_news(symbol: str) -> dict:
@@ -191,58 +327,53 @@ def scrape_stock_news(symbol: str) -> dict:
 
     Returns the same dict shape as get_stock_news().
     """
-    url = f"https://finance.yahoo.com/quote/{symbol.upper()}/news/"
+    url = f"{_YAHOO}/quote/{symbol.upper()}/news/"
+
+    def scrape(page: Page) -> dict:
+        page.goto(url, wait_until="networkidle", timeout=30000)
+
+        page.wait_for_selector("li h3", timeout=15000)
+
+        items = page.query_selector_all("li:has(h3)")
+        if not items:
+            return {"error": f"Yahoo Finance news: no items found for {symbol}"}
+
+        news = []
+        for item in items[:_NEWS_ITEMS]:
+            h3 = item.query_selector("h3")
+            anchor = item.query_selector("a[href]")
+            publishing = item.query_selector("div.publishing")
+
+            title = h3.inner_text().strip() if h3 else None
+            link = anchor.get_attribute("href") if anchor else None
+            if link and link.startswith("/"):
+                link = _YAHOO + link
+
+            publisher = None
+            published_at = None
+            if publishing:
+                parts = [p.strip() for p in publishing.inner_text().split("•")]
+                publisher = parts[0] if parts else None
+                published_at = parts[1] if len(parts) > 1 else None
+
+            if title:
+                news.append({
+                    "title": title,
+                    "publisher": publisher,
+                    "published_at": published_at,
+                    "url": link,
+                })
+
+        if not news:
+            return {"error": f"Yahoo Finance news: no parseable items for {symbol}"}
+
+        return {
+            "symbol": symbol.upper(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "news": news,
+        }
 
-    browser = None
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto(url, wait_until="networkidle", timeout=30000)
-
-            page.wait_for_selector("li h3", timeout=15000)
-
-            items = page.query_selector_all("li:has(h3)")
-            if not items:
-                return {"error": f"Yahoo Finance news: no items found for {symbol}"}
-
-            news = []
-            for item in items[:10]:
-                h3 = item.query_selector("h3")
-                anchor = item.query_selector("a[href]")
-                publishing = item.query_selector("div.publishing")
-
-                title = h3.inner_text().strip() if h3 else None
-                link = anchor.get_attribute("href") if anchor else None
-                if link and link.startswith("/"):
-                    link = "https://finance.yahoo.com" + link
-
-                publisher = None
-                published_at = None
-                if publishing:
-                    parts = [p.strip() for p in publishing.inner_text().split("•")]
-                    publisher = parts[0] if parts else None
-                    published_at = parts[1] if len(parts) > 1 else None
-
-                if title:
-                    news.append({
-                        "title": title,
-                        "publisher": publisher,
-                        "published_at": published_at,
-                        "url": link,
-                    })
-
-            if not news:
-                return {"error": f"Yahoo Finance news: no parseable items for {symbol}"}
-
-            return {
-                "symbol": symbol.upper(),
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "news": news,
-            }
-
+        return _with_page(scrape)
     except Exception as e:
         return {"error": f"Yahoo Finance news scraper failed: {str(e)}"}
-    finally:
-        if browser:
-            browser.close()
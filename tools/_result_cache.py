@@ -0,0 +1,130 @@
+"""Content-addressed cache for deterministic tool results.
+
+Entries are keyed by the SHA-256 of everything that determines a result,
+stored as one JSON file each under the cache directory, and fronted by a
+small in-memory LRU so repeat hits in the same process skip the disk.
+Entries expire after a TTL; once the directory grows past its byte budget
+the oldest files are evicted.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+_MEMORY_ENTRIES = 256
+
+
+def cache_dir() -> Path:
+    """Root directory for on-disk caches (STOCK_ANALYZER_CACHE_DIR)."""
+    return Path(os.getenv("STOCK_ANALYZER_CACHE_DIR") or Path.home() / ".cache" / "stock-analyzer")
+
+
+def content_key(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        encoded = part.encode()
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") differ
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, namespace: str, ttl_seconds: float, max_bytes: int, root: Path | None = None):
+        self.namespace = namespace
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._memory: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @property
+    def directory(self) -> Path:
+        return (self.root or cache_dir()) / self.namespace
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += n
+
+    def get(self, key: str) -> dict | None:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._memory.move_to_end(key)
+                self._counts["memory_hits"] += 1
+                return entry[1]
+
+        path = self.directory / f"{key}.json"
+        try:
+            stored = json.loads(path.read_text(encoding="utf-8"))
+            expires = stored["created"] + self.ttl_seconds
+            value = stored["value"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self._count("misses")
+            return None
+        if expires <= now:
+            path.unlink(missing_ok=True)
+            self._count("misses")
+            return None
+
+        self._remember(key, expires, value)
+        self._count("disk_hits")
+        return value
+
+    def put(self, key: str, value: dict) -> None:
+        created = time.time()
+        self._remember(key, created + self.ttl_seconds, value)
+        directory = self.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / f".{key}.{threading.get_ident()}.tmp"
+        tmp.write_text(json.dumps({"created": created, "value": value}), encoding="utf-8")
+        os.replace(tmp, directory / f"{key}.json")
+        self._count("stores")
+        self._evict(directory)
+
+    def _remember(self, key: str, expires: float, value: dict) -> None:
+        with self._lock:
+            self._memory[key] = (expires, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > _MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+
+    def _evict(self, directory: Path) -> None:
+        files = []
+        for path in directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        evicted = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            with self._lock:
+                self._memory.pop(path.stem, None)
+            total -= size
+            evicted += 1
+        if evicted:
+            self._count("evictions", evicted)
+
+    def clear_memory(self) -> None:
+        """Drop in-memory entries and counters, as a fresh process would start."""
+        with self._lock:
+            self._memory.clear()
+            self._counts = dict.fromkeys(self._counts, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["memory_hits"] + counts["disk_hits"] + counts["misses"]
+        hits = counts["memory_hits"] + counts["disk_hits"]
+        return {**counts, "hit_rate": round(hits / lookups, 3) if lookups else None}
@@ -0,0 +1,480 @@
+"""Sandbox backends that run python_analyzer scripts.
+
+docker (default)
+    One throwaway container per run: no network, 128 MB, half a CPU, the
+    script mounted read-only. Containers are named and labelled so they can
+    be tracked: one that times out, overflows the output cap or fails is
+    removed with `docker rm -f` (killing the client alone leaves it
+    running), and a background reaper removes labelled containers that have
+    outlived any run, e.g. ones left behind by a crashed process.
+
+local
+    A pre-forked pool of Python worker processes (tools/_sandbox_worker.py)
+    with pandas and numpy already imported, for hosts without Docker and to
+    take container start-up off the critical path. Each worker runs one
+    script and exits; the pool forks its replacement in the background.
+    Workers get an empty environment and rlimits on CPU time, address
+    space, file size, open files and processes. Where the kernel allows
+    namespaces they also get a fresh network namespace and a private
+    read-only root holding only the script and the interpreter's libraries,
+    and drop to nobody if started as root. An audit hook refuses reads
+    outside those paths, file writes, new processes, sockets and ctypes.
+    This is weaker isolation than a container: the worker shares the
+    host's kernel and, where namespaces are unavailable, relies on the
+    audit hook, which code inside the interpreter can work around.
+
+The backend is chosen by SANDBOX_BACKEND. Every backend reports a version
+string that changes whenever the runtime does, so cached results are never
+served across sandbox versions. Both backends read the script's stdout and
+stderr as they arrive and kill it once either passes the output cap, so a
+runaway print loop costs at most the cap in memory, not whatever it wrote
+before the timeout.
+"""
+
+import hashlib
+import math
+import os
+import queue
+import secrets
+import selectors
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from importlib import metadata
+from pathlib import Path
+
+SANDBOX_IMAGE = "stock-analyzer-sandbox"
+BACKENDS = ("docker", "local")
+# Docker label on every sandbox container; its value is the start time (epoch seconds)
+SANDBOX_LABEL = "stock-analyzer.sandbox"
+# Per-stream output cap when the caller does not pass one
+DEFAULT_OUTPUT_CAP = 1024 * 1024
+_READ_CHUNK = 64 * 1024
+
+_WORKER_PATH = Path(__file__).with_name("_sandbox_worker.py")
+# The only variables a local worker sees: single-threaded BLAS keeps its
+# address space small and predictable under RLIMIT_AS
+_WORKER_ENV = {"OPENBLAS_NUM_THREADS": "1", "OMP_NUM_THREADS": "1", "MKL_NUM_THREADS": "1"}
+
+
+class SandboxUnavailable(Exception):
+    """The backend cannot run code on this host; the message is shown to the LLM."""
+
+
+class SandboxTimeout(Exception):
+    pass
+
+
+@dataclass
+class SandboxResult:
+    returncode: int
+    stdout: str
+    stderr: str
+    # The run was killed because stdout or stderr passed the output cap
+    truncated: bool = False
+
+
+def _collect(proc: subprocess.Popen, timeout: float, max_bytes: int) -> SandboxResult:
+    """Read proc's stdout and stderr as they arrive, keeping at most max_bytes of each.
+
+    Kills the process as soon as either stream goes past max_bytes and returns
+    what was read up to the cap. Raises subprocess.TimeoutExpired (after
+    killing it) if the process is still running after timeout seconds.
+    """
+    deadline = time.monotonic() + timeout
+    buffers = {proc.stdout: bytearray(), proc.stderr: bytearray()}
+    truncated = False
+    try:
+        with selectors.DefaultSelector() as selector:
+            for stream in buffers:
+                selector.register(stream, selectors.EVENT_READ)
+            while selector.get_map() and not truncated:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(proc.args, timeout)
+                for key, _ in selector.select(remaining):
+                    chunk = os.read(key.fd, _READ_CHUNK)
+                    if not chunk:
+                        selector.unregister(key.fileobj)
+                        continue
+                    buffer = buffers[key.fileobj]
+                    room = max_bytes - len(buffer)
+                    buffer += chunk[:room]
+                    if len(chunk) > room:
+                        truncated = True
+                        proc.kill()
+                        break
+        returncode = proc.wait(timeout=max(deadline - time.monotonic(), 0))
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        for stream in buffers:
+            stream.close()
+    return SandboxResult(
+        returncode,
+        buffers[proc.stdout].decode("utf-8", errors="replace"),
+        buffers[proc.stderr].decode("utf-8", errors="replace"),
+        truncated,
+    )
+
+
+def run_bounded(cmd: list[str], timeout: float, max_bytes: int = DEFAULT_OUTPUT_CAP) -> SandboxResult:
+    """Run cmd with no stdin and output capped as in _collect.
+
+    Raises subprocess.TimeoutExpired, or OSError if cmd cannot be started.
+    """
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return _collect(proc, timeout, max_bytes)
+
+
+class SandboxBackend(ABC):
+    name = ""
+
+    @abstractmethod
+    def run(self, script: str, timeout: float, max_output_bytes: int = DEFAULT_OUTPUT_CAP) -> SandboxResult:
+        """Run script as __main__ with stdout and stderr each capped at max_output_bytes.
+
+        Raises SandboxTimeout or SandboxUnavailable.
+        """
+
+    @abstractmethod
+    def version(self) -> str | None:
+        """Identifies the runtime for cache keys; None if the backend cannot run."""
+
+    def warm(self) -> bool:
+        """Pay start-up costs now. Returns False if the backend cannot run."""
+        return self.version() is not None
+
+    def stats(self) -> dict:
+        """Gauge of sandboxes running right now, plus backend-specific counters."""
+        return {"backend": self.name}
+
+    def close(self) -> None:
+        pass
+
+
+class DockerBackend(SandboxBackend):
+    name = "docker"
+    # How long a resolved image ID is trusted before docker is asked again
+    DIGEST_TTL_SECONDS = 30.0
+    # A labelled container older than this is not serving any run and is removed
+    ORPHAN_AGE_SECONDS = 120.0
+
+    def __init__(self, image: str = SANDBOX_IMAGE, reap_interval: float = 60.0):
+        self.image = image
+        self.reap_interval = reap_interval
+        self._digest: tuple[float, str | None] = (-math.inf, None)
+        # One image inspect at a time; _lock, which run() and stats() take, is never held across docker calls
+        self._digest_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._live: set[str] = set()
+        self._counts = {"started": 0, "removed": 0, "reaped": 0}
+        self._reaper: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def _start(self) -> str:
+        """Name a new container and count it as live until _finish."""
+        container = f"{self.image}-{secrets.token_hex(6)}"
+        with self._lock:
+            self._live.add(container)
+            self._counts["started"] += 1
+        return container
+
+    def _finish(self, container: str) -> None:
+        with self._lock:
+            self._live.discard(container)
+
+    def _docker_run(self, container: str, command: list[str], mounts: tuple[str, ...] = ()) -> list[str]:
+        """docker run argv for a named, labelled sandbox container, so the reaper can find it."""
+        volumes = [arg for mount in mounts for arg in ("-v", mount)]
+        return [
+            "docker", "run", "--rm",
+            "--name", container,
+            "--label", f"{SANDBOX_LABEL}={int(time.time())}",
+            "--network", "none",
+            "--memory", "128m",
+            "--cpus", "0.5",
+            *volumes,
+            self.image,
+            *command,
+        ]
+
+    def run(self, script: str, timeout: float, max_output_bytes: int = DEFAULT_OUTPUT_CAP) -> SandboxResult:
+        self._start_reaper()
+        container = self._start()
+        clean = False
+        with tempfile.TemporaryDirectory() as tmpdir:
+            Path(tmpdir, "run.py").write_text(script, encoding="utf-8")
+            try:
+                result = run_bounded(
+                    self._docker_run(container, ["python", "/sandbox/run.py"], (f"{tmpdir}:/sandbox:ro",)),
+                    timeout,
+                    max_output_bytes,
+                )
+                # docker run exits 125-127 when the container itself could not be created or started
+                clean = not result.truncated and result.returncode < 125
+                return result
+            except subprocess.TimeoutExpired:
+                raise SandboxTimeout() from None
+            except FileNotFoundError:
+                clean = True  # nothing was started
+                raise SandboxUnavailable("Docker is not installed or not in PATH") from None
+            finally:
+                if not clean:
+                    self._remove([container], "removed")
+                self._finish(container)
+
+    def _remove(self, containers: list[str], counter: str) -> None:
+        """docker rm -f: kills the containers if they are still running, then deletes them."""
+        try:
+            subprocess.run(["docker", "rm", "-f", *containers], capture_output=True, timeout=30)
+        except (OSError, subprocess.TimeoutExpired):
+            return
+        with self._lock:
+            self._counts[counter] += len(containers)
+
+    def reap(self) -> int:
+        """Remove labelled sandbox containers that have outlived any run. Returns how many."""
+        try:
+            result = subprocess.run(
+                ["docker", "ps", "-a", "--filter", f"label={SANDBOX_LABEL}",
+                 "--format", f'{{{{.Names}}}}\t{{{{.Label "{SANDBOX_LABEL}"}}}}'],
+                capture_output=True,
+                text=True,
+                timeout=30,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return 0
+        if result.returncode != 0:
+            return 0
+        cutoff = time.time() - self.ORPHAN_AGE_SECONDS
+        with self._lock:
+            live = set(self._live)
+        orphans = []
+        for line in result.stdout.splitlines():
+            container, _, started = line.partition("\t")
+            try:
+                old = float(started) < cutoff
+            except ValueError:
+                old = True
+            if container and container not in live and old:
+                orphans.append(container)
+        if orphans:
+            self._remove(orphans, "reaped")
+        return len(orphans)
+
+    def _start_reaper(self) -> None:
+        with self._lock:
+            if self._reaper is not None or self.reap_interval <= 0:
+                return
+            self._reaper = threading.Thread(target=self._reap_loop, name="sandbox-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap_loop(self) -> None:
+        while True:
+            self.reap()
+            if self._stop.wait(self.reap_interval):
+                return
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": self.name, "live": len(self._live), **self._counts}
+
+    def close(self) -> None:
+        self._stop.set()
+
+    def version(self) -> str | None:
+        """Image ID of the sandbox image, so rebuilding it invalidates old results."""
+        with self._digest_lock:
+            checked, digest = self._digest
+            if time.monotonic() - checked < self.DIGEST_TTL_SECONDS:
+                return digest
+            try:
+                result = subprocess.run(
+                    ["docker", "image", "inspect", "--format", "{{.Id}}", self.image],
+                    capture_output=True,
+                    text=True,
+                    timeout=10,
+                )
+            except (OSError, subprocess.TimeoutExpired):
+                digest = None
+            else:
+                digest = result.stdout.strip() if result.returncode == 0 and result.stdout.strip() else None
+            self._digest = (time.monotonic(), digest)
+            return digest
+
+    def warm(self) -> bool:
+        """Start and discard one container so the image and runtime are hot.
+
+        Also starts the reaper, which first clears out containers left by
+        earlier processes.
+        """
+        self._start_reaper()
+        container = self._start()
+        try:
+            result = subprocess.run(
+                self._docker_run(container, ["python", "-c", "import pandas"]),
+                capture_output=True,
+                timeout=60,
+            )
+        except FileNotFoundError:
+            return False
+        except subprocess.TimeoutExpired:
+            self._remove([container], "removed")
+            return False
+        finally:
+            self._finish(container)
+        return result.returncode == 0
+
+
+class LocalPoolBackend(SandboxBackend):
+    name = "local"
+
+    def __init__(self, workers: int = 2, memory_mb: int = 256):
+        self.workers = max(1, workers)
+        self.memory_mb = memory_mb
+        self._ready: queue.Queue[subprocess.Popen] = queue.Queue()
+        self._closed = False
+        self._version: str | None = None
+        self._lock = threading.Lock()
+        self._live = 0
+
+    def _spawn(self) -> subprocess.Popen:
+        """Start a worker and wait until its imports are done."""
+        proc = subprocess.Popen(
+            [sys.executable, "-I", "-B", "-X", "utf8", str(_WORKER_PATH), str(self.memory_mb)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=_WORKER_ENV,
+            cwd="/",
+            # Unbuffered, so readline() never reads past the handshake into the script's output
+            bufsize=0,
+        )
+        if proc.stdout.readline().strip() != b"ready":
+            proc.kill()
+            _, err = proc.communicate()
+            err = err.decode("utf-8", errors="replace").strip()
+            raise SandboxUnavailable(f"local sandbox worker failed to start: {err[-500:]}")
+        return proc
+
+    def _refill(self) -> None:
+        try:
+            proc = self._spawn()
+        except (OSError, SandboxUnavailable):
+            return
+        if self._closed:
+            proc.kill()
+            proc.communicate()
+        else:
+            self._ready.put(proc)
+
+    def _take(self) -> subprocess.Popen:
+        while True:
+            try:
+                proc = self._ready.get_nowait()
+            except queue.Empty:
+                return self._spawn()
+            if proc.poll() is None:
+                return proc
+
+    def run(self, script: str, timeout: float, max_output_bytes: int = DEFAULT_OUTPUT_CAP) -> SandboxResult:
+        proc = self._take()
+        threading.Thread(target=self._refill, daemon=True).start()
+        with self._lock:
+            self._live += 1
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            scratch = Path(tmpdir)
+            path = scratch / "run.py"
+            path.write_text(script, encoding="utf-8")
+            path.chmod(0o444)
+            scratch.chmod(0o555)
+            try:
+                try:
+                    proc.stdin.write(f"{path}\n{timeout}\n".encode())
+                    proc.stdin.close()
+                except OSError:
+                    pass  # the worker died; _collect reports its exit code and stderr
+                # RLIMIT_CPU inside the worker stops busy loops; this also stops sleepers
+                return _collect(proc, timeout, max_output_bytes)
+            except subprocess.TimeoutExpired:
+                raise SandboxTimeout() from None
+            finally:
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+                scratch.chmod(0o700)
+                with self._lock:
+                    self._live -= 1
+
+    def version(self) -> str | None:
+        if self._version is None:
+            try:
+                libs = f"pandas-{metadata.version('pandas')}:numpy-{metadata.version('numpy')}"
+            except metadata.PackageNotFoundError:
+                return None
+            worker = hashlib.sha256(_WORKER_PATH.read_bytes()).hexdigest()[:12]
+            self._version = f"python-{sys.version.split()[0]}:{libs}:worker-{worker}"
+        return self._version
+
+    def warm(self) -> bool:
+        while self._ready.qsize() < self.workers:
+            try:
+                self._ready.put(self._spawn())
+            except (OSError, SandboxUnavailable):
+                return False
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": self.name, "live": self._live, "ready": self._ready.qsize()}
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                proc = self._ready.get_nowait()
+            except queue.Empty:
+                return
+            proc.kill()
+            proc.communicate()
+
+
+_backends: dict[str, SandboxBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name: str | None = None) -> SandboxBackend:
+    """Return the shared backend named by name or SANDBOX_BACKEND (default docker).
+
+    Raises ValueError for an unknown name.
+    """
+    name = (name or os.getenv("SANDBOX_BACKEND") or "docker").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"unknown SANDBOX_BACKEND '{name}': use one of {', '.join(BACKENDS)}")
+    with _backends_lock:
+        if name not in _backends:
+            if name == "docker":
+                _backends[name] = DockerBackend(reap_interval=float(os.getenv("SANDBOX_REAP_INTERVAL", "60")))
+            else:
+                _backends[name] = LocalPoolBackend(
+                    workers=int(os.getenv("SANDBOX_LOCAL_WORKERS", "2")),
+                    memory_mb=int(os.getenv("SANDBOX_LOCAL_MEMORY_MB", "256")),
+                )
+        return _backends[name]
+
+
+def reset() -> None:
+    """Close and forget every backend (for tests and shutdown)."""
+    with _backends_lock:
+        backends = list(_backends.values())
+        _backends.clear()
+    for backend in backends:
+        backend.close()
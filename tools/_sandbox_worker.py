@@ -0,0 +1,276 @@
+"""Pre-forked worker for the local sandbox backend (see _sandbox.LocalPoolBackend).
+
+Run by path, never imported: python -I -B _sandbox_worker.py MEMORY_MB
+
+Protocol: once numpy and pandas are imported the worker prints 'ready' and
+blocks on stdin. It then reads the script path and the timeout in seconds,
+one per line, locks itself down and runs the script as __main__. stdout and
+stderr are the script's; the exit code is 1 if the script raised.
+
+Locking down, where the kernel allows it, replaces the filesystem with a
+read-only tmpfs holding only the script, the interpreter's libraries and a
+few devices (bound read-only), detaches the host's root, and, if the worker
+runs as root, switches to the nobody user so RLIMIT_NPROC and file
+permissions apply. Everywhere, an audit hook refuses reads outside those
+paths, writes, new processes, sockets and ctypes.
+"""
+
+import math
+import os
+import platform
+import resource
+import sys
+import sysconfig
+import traceback
+import zoneinfo
+
+_AS_ROOT = hasattr(os, "geteuid") and os.geteuid() == 0
+_NOBODY = 65534
+
+
+def _unshare() -> tuple[bool, bool]:
+    """Move into new network and mount namespaces. Must run before any thread starts.
+
+    Root needs no user namespace; anyone else gets one that maps just their
+    own ids, which is what lets them mount inside it. Returns (network
+    isolated, mounts private).
+    """
+    if not hasattr(os, "unshare"):
+        return False, False
+    if _AS_ROOT:
+        try:
+            os.unshare(os.CLONE_NEWNET | os.CLONE_NEWNS)
+            return True, True
+        except OSError:
+            pass  # e.g. root in a container without CAP_SYS_ADMIN; a user namespace may still work
+    uid, gid = os.geteuid(), os.getegid()
+    try:
+        os.unshare(os.CLONE_NEWUSER | os.CLONE_NEWNET | os.CLONE_NEWNS)
+    except OSError:
+        return False, False
+    try:
+        for name, line in (("setgroups", "deny"), ("uid_map", f"0 {uid} 1"), ("gid_map", f"0 {gid} 1")):
+            with open(f"/proc/self/{name}", "w") as f:
+                f.write(line)
+    except OSError:
+        return True, False
+    return True, True
+
+
+_NETWORK_ISOLATED, _MOUNTS_PRIVATE = _unshare()
+
+import numpy  # noqa: E402,F401  imported now so the script's imports are free
+import pandas  # noqa: E402,F401
+
+_OPEN_FILES = 32
+
+# mount(2) flags; the ST_* flags os.statvfs reports use the same bits
+_MS_RDONLY, _MS_NOSUID, _MS_NODEV, _MS_REMOUNT = 1, 2, 4, 32
+_MS_BIND, _MS_REC, _MS_PRIVATE = 4096, 16384, 1 << 18
+_MNT_DETACH = 2
+# A read-only bind remount must keep these flags of the mount it copies
+_KEPT_FLAGS = os.ST_NOSUID | os.ST_NODEV | os.ST_NOEXEC | os.ST_NOATIME | os.ST_NODIRATIME | os.ST_RELATIME
+_PIVOT_ROOT = {"x86_64": 155, "aarch64": 41, "riscv64": 41}
+# System library directories, for extension modules that load a shared library on first import
+_LIBRARY_DIRS = ("/lib", "/lib64", "/usr/lib", "/usr/lib64")
+_FILES = ("/dev/null", "/dev/zero", "/dev/urandom", "/etc/ld.so.cache")
+
+
+def _visible_paths() -> list[str]:
+    """Host paths a script may read: the interpreter's libraries, time zones and a few devices."""
+    paths = {sysconfig.get_path(name) for name in ("stdlib", "platstdlib", "purelib", "platlib")}
+    paths.update(zoneinfo.TZPATH, _LIBRARY_DIRS, _FILES)
+    existing = {os.path.realpath(p) for p in paths if p and os.path.exists(p)}
+    # Paths inside another one are visible through it
+    return sorted(p for p in existing if not any(p.startswith(q.rstrip("/") + "/") for q in existing))
+
+
+_VISIBLE_PATHS = _visible_paths()
+
+
+def _confine(path: str, source: str) -> bool:
+    """Make a read-only tmpfs holding the script and _VISIBLE_PATHS the root filesystem.
+
+    The host's root is detached, not just hidden, so nothing a script does
+    reaches it. Returns False where the kernel does not allow it.
+    """
+    syscall = _PIVOT_ROOT.get(platform.machine())
+    if not _MOUNTS_PRIVATE or syscall is None:
+        return False
+    import ctypes
+
+    libc = ctypes.CDLL(None, use_errno=True)
+
+    def call(result: int, what: str) -> None:
+        if result != 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"{what}: {os.strerror(errno)}")
+
+    def mount(source: str | None, target: str, fstype: str | None, flags: int, data: str | None = None) -> None:
+        args = [a.encode() if a is not None else None for a in (source, target, fstype)]
+        call(libc.mount(*args, flags, data.encode() if data else None), f"mount {target}")
+
+    scratch = os.path.dirname(path)
+    try:
+        mount(None, "/", None, _MS_REC | _MS_PRIVATE)
+        # The new root is built over the scratch directory, which only this namespace sees
+        mount("sandbox", scratch, "tmpfs", _MS_NOSUID | _MS_NODEV, "size=4m,mode=0755")
+        for link in _LIBRARY_DIRS:
+            if os.path.islink(link):
+                os.makedirs(os.path.dirname(scratch + link), exist_ok=True)
+                os.symlink(os.readlink(link), scratch + link)
+        for host_path in _VISIBLE_PATHS:
+            target = scratch + host_path
+            if os.path.isdir(host_path):
+                os.makedirs(target, exist_ok=True)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                open(target, "a").close()
+            mount(host_path, target, None, _MS_BIND | _MS_REC)
+            kept = os.statvfs(host_path).f_flag & _KEPT_FLAGS
+            mount(None, target, None, _MS_REMOUNT | _MS_BIND | _MS_RDONLY | kept)
+        os.makedirs(scratch + scratch)
+        with open(scratch + path, "w", encoding="utf-8") as f:
+            f.write(source)
+        os.chdir(scratch)
+        call(libc.syscall(syscall, b".", b"."), "pivot_root")
+        call(libc.umount2(b".", _MNT_DETACH), "umount old root")
+        mount(None, "/", None, _MS_REMOUNT | _MS_RDONLY | _MS_NOSUID | _MS_NODEV)
+        os.chdir(scratch)
+    except OSError:
+        return False
+    return True
+
+
+def _drop_root() -> None:
+    """Run as nobody, who owns no files and, unlike root, is bound by RLIMIT_NPROC."""
+    os.setgroups([])
+    os.setgid(_NOBODY)
+    os.setuid(_NOBODY)
+
+
+def _address_space() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * resource.getpagesize()
+    except OSError:
+        return 0
+
+
+def _setrlimit(limit: int, value: int, hard: int | None = None) -> None:
+    try:
+        resource.setrlimit(limit, (value, value if hard is None else hard))
+    except (ValueError, OSError):
+        pass  # not supported on this platform
+
+
+# Audit events refused outright: filesystem changes, new processes, sockets, native code
+_BLOCKED_EVENTS = frozenset({
+    "os.remove", "os.rename", "os.mkdir", "os.rmdir", "os.chmod", "os.chown", "os.link",
+    "os.symlink", "os.truncate", "os.utime", "shutil.rmtree", "shutil.move", "shutil.copyfile",
+    "os.system", "os.exec", "os.fork", "os.forkpty", "os.posix_spawn", "os.spawn", "os.startfile",
+    "subprocess.Popen", "pty.spawn", "os.kill", "os.killpg",
+    "socket.__new__", "socket.connect", "socket.bind", "socket.getaddrinfo",
+    "ctypes.dlopen", "ctypes.dlsym", "ctypes.cdata", "ctypes.call_function", "sqlite3.connect",
+    "gc.get_objects", "gc.get_referrers", "gc.get_referents",
+})
+# Modules whose import is refused: _posixsubprocess forks and execs without an audit event
+_BLOCKED_IMPORTS = frozenset({"_posixsubprocess"})
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND | os.O_TRUNC
+
+
+def _make_audit(readable: tuple[str, ...]):
+    """Audit hook refusing reads outside readable, writes, processes, sockets and ctypes.
+
+    Some of these the namespaces and rlimits already stop, but not on every
+    host. Everything the hook uses is bound here, not looked up in this
+    module, which the script can reach as __main__.
+    """
+    blocked, blocked_imports, write_flags = _BLOCKED_EVENTS, _BLOCKED_IMPORTS, _WRITE_FLAGS
+    realpath, fsdecode = os.path.realpath, os.fsdecode
+    prefixes = tuple(p.rstrip("/") + "/" for p in readable)
+
+    def may_read(path: object) -> bool:
+        if isinstance(path, int) or path is None:
+            return True  # an already open descriptor, or the working directory
+        real = realpath(fsdecode(path))
+        return real in readable or real.startswith(prefixes)
+
+    def audit(event: str, args: tuple) -> None:
+        if event in blocked:
+            raise PermissionError(f"{event} is not allowed in the sandbox")
+        if event == "import" and args[0] in blocked_imports:
+            raise PermissionError(f"importing {args[0]} is not allowed in the sandbox")
+        if event == "open":
+            path, mode, flags = args
+            if (mode and any(c in mode for c in "wax+")) or (flags and flags & write_flags):
+                raise PermissionError("writing files is not allowed in the sandbox")
+            if not may_read(path):
+                raise PermissionError(f"reading {path} is not allowed in the sandbox")
+        elif event in ("os.listdir", "os.scandir") and not may_read(args[0]):
+            raise PermissionError(f"listing {args[0]} is not allowed in the sandbox")
+
+    return audit
+
+
+def _lock_down(path: str, source: str, timeout: float, memory_mb: int) -> None:
+    scratch = os.path.dirname(path)
+    # Measured first: /proc is not mounted in the confined root
+    address_space = _address_space()
+    if _confine(path, source) and _AS_ROOT:
+        _drop_root()
+    else:
+        os.chdir(scratch)
+    # Modules already imported are imported again without an audit event, so the
+    # blocked ones are evicted, along with subprocess's reference to fork_exec
+    for name in _BLOCKED_IMPORTS:
+        sys.modules.pop(name, None)
+    if hasattr(sys.modules.get("subprocess"), "_fork_exec"):
+        del sys.modules["subprocess"]._fork_exec
+
+    cpu_seconds = max(1, math.ceil(timeout))
+    _setrlimit(resource.RLIMIT_CPU, cpu_seconds, cpu_seconds + 1)
+    # Headroom on top of what the interpreter and libraries already map
+    _setrlimit(resource.RLIMIT_AS, address_space + memory_mb * 1024 * 1024)
+    _setrlimit(resource.RLIMIT_FSIZE, 0)
+    _setrlimit(resource.RLIMIT_NOFILE, _OPEN_FILES)
+    _setrlimit(resource.RLIMIT_NPROC, 0)
+    _setrlimit(resource.RLIMIT_CORE, 0)
+    sys.addaudithook(_make_audit((scratch, *_VISIBLE_PATHS)))
+
+
+def main() -> None:
+    memory_mb = int(sys.argv[1])
+    print("ready", flush=True)
+
+    path = sys.stdin.readline().strip()
+    timeout = float(sys.stdin.readline())
+    sys.stdin.close()
+
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    _lock_down(path, source, timeout, memory_mb)
+
+    status = 0
+    try:
+        code = compile(source, path, "exec")
+        exec(code, {"__name__": "__main__", "__file__": path, "__builtins__": __builtins__})
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            status = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            status = 1
+    except BaseException:
+        # Report the script's traceback the way `python run.py` would, without this file's frames
+        etype, value, tb = sys.exc_info()
+        traceback.print_exception(etype, value, tb.tb_next)
+        status = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    # Skip interpreter teardown: unloading pandas takes longer than most scripts
+    os._exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""In-memory quote snapshot that screen_stocks (and a warm get_top_gainers) rank locally.
+
+The whole NASDAQ equity universe is loaded in one bulk refresh (a few
+hundred quotes per screener page, pages fetched concurrently) and kept as
+parallel NumPy arrays. Ranking queries then never leave the process: a
+boolean mask for the thresholds and an argpartition for the top N, a
+millisecond or so over a few thousand quotes. A snapshot older than
+SCREENER_TTL seconds is refreshed on the next snapshot() call; concurrent
+callers share that refresh. fresh() never refreshes, for callers with a
+cheaper query of their own to fall back on.
+
+Quotes are filtered when the snapshot is built, with the same rules the
+remote screener's results always had to pass: NASDAQ exchanges only,
+quoteType EQUITY, and no warrants, rights or units (symbols ending in W,
+R or U).
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+SCREENER_TTL = float(os.getenv("SCREENER_TTL", "60"))
+
+NASDAQ_EXCHANGES = ("NMS", "NGM", "NCM")
+# Ranking name -> (sort key, descending)
+RANKINGS = {
+    "gainers": ("change_pct", True),
+    "losers": ("change_pct", False),
+    "unusual_volume": ("volume_ratio", True),
+}
+
+
+def is_nasdaq_equity(quote: dict) -> bool:
+    # Client-side filter: guard against server-side leakage (yfinance issue #2218)
+    # Also exclude warrants (W), rights (R), units (U) — quoteType check alone isn't always reliable
+    return (
+        quote.get("exchange") in NASDAQ_EXCHANGES
+        and quote.get("quoteType") == "EQUITY"
+        and not quote.get("symbol", "").endswith(("W", "R", "U"))
+    )
+
+
+def _numbers(quotes: list[dict], field: str) -> np.ndarray:
+    return np.array([np.nan if q.get(field) is None else q[field] for q in quotes], dtype=float)
+
+
+def _optional_int(value: float) -> int | None:
+    return None if np.isnan(value) else int(value)
+
+
+@dataclass(frozen=True)
+class QuoteSnapshot:
+    taken_at: float
+    symbol: np.ndarray
+    name: np.ndarray
+    exchange: np.ndarray
+    price: np.ndarray
+    change: np.ndarray
+    change_pct: np.ndarray
+    volume: np.ndarray
+    avg_volume: np.ndarray
+    market_cap: np.ndarray
+
+    @classmethod
+    def from_quotes(cls, quotes: list[dict], taken_at: float | None = None) -> "QuoteSnapshot":
+        """Build a snapshot from raw screener quotes, keeping the first quote per NASDAQ equity."""
+        seen = set()
+        kept = []
+        for quote in quotes:
+            if is_nasdaq_equity(quote) and quote["symbol"] not in seen:
+                seen.add(quote["symbol"])
+                kept.append(quote)
+        return cls(
+            taken_at=time.time() if taken_at is None else taken_at,
+            symbol=np.array([q["symbol"] for q in kept], dtype=object),
+            name=np.array([q.get("longName") or q.get("shortName") for q in kept], dtype=object),
+            exchange=np.array([q.get("exchange") for q in kept], dtype=object),
+            price=_numbers(kept, "regularMarketPrice"),
+            change=_numbers(kept, "regularMarketChange"),
+            change_pct=_numbers(kept, "regularMarketChangePercent"),
+            volume=_numbers(kept, "regularMarketVolume"),
+            avg_volume=_numbers(kept, "averageDailyVolume3Month"),
+            market_cap=_numbers(kept, "marketCap"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.symbol)
+
+    @property
+    def volume_ratio(self) -> np.ndarray:
+        """Today's volume over the 3-month average (NaN where the average is unknown or zero)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.avg_volume > 0, self.volume / self.avg_volume, np.nan)
+
+    def rank(
+        self,
+        ranking: str = "gainers",
+        limit: int = 10,
+        min_change_pct: float | None = None,
+        max_change_pct: float | None = None,
+        min_market_cap: float | None = None,
+        max_market_cap: float | None = None,
+        min_volume: float | None = None,
+    ) -> list[int]:
+        """Indices of the top `limit` quotes for ranking among those within every given threshold.
+
+        Raises ValueError for an unknown ranking.
+        """
+        if ranking not in RANKINGS:
+            raise ValueError(f"unknown ranking {ranking!r}: use one of {list(RANKINGS)}")
+        field, descending = RANKINGS[ranking]
+        key = getattr(self, field)
+        mask = np.isfinite(key) & np.isfinite(self.price) & np.isfinite(self.volume)
+        # NaN compares False, so a quote missing a thresholded field is excluded
+        for values, low, high in (
+            (self.change_pct, min_change_pct, max_change_pct),
+            (self.market_cap, min_market_cap, max_market_cap),
+            (self.volume, min_volume, None),
+        ):
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+
+        candidates = np.flatnonzero(mask)
+        order = -key[candidates] if descending else key[candidates]
+        if 0 < limit < len(candidates):
+            top = np.argpartition(order, limit - 1)[:limit]
+            candidates, order = candidates[top], order[top]
+        return candidates[np.argsort(order, kind="stable")][:max(limit, 0)].tolist()
+
+    def row(self, i: int) -> dict:
+        """One quote in get_top_gainers's result shape."""
+        return {
+            "symbol": self.symbol[i],
+            "name": self.name[i],
+            "exchange": self.exchange[i],
+            "price": float(self.price[i]),
+            "change_absolute": None if np.isnan(self.change[i]) else float(self.change[i]),
+            "change_pct": float(self.change_pct[i]),
+            "volume": int(self.volume[i]),
+            "market_cap": _optional_int(self.market_cap[i]),
+        }
+
+
+class QuoteScreener:
+    """Holds the current snapshot, refreshing it through load() once it is older than ttl_s."""
+
+    def __init__(self, load: Callable[[], list[dict]], ttl_s: float = SCREENER_TTL):
+        self._load = load
+        self.ttl_s = ttl_s
+        self._snapshot: QuoteSnapshot | None = None
+        self._refresh_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._counts = {"refreshes": 0, "queries": 0}
+        self._last_refresh_s: float | None = None
+
+    def fresh(self) -> QuoteSnapshot | None:
+        """Return the snapshot if it is younger than ttl_s, else None, without refreshing it."""
+        current = self._snapshot
+        if current is None or time.time() - current.taken_at >= self.ttl_s:
+            return None
+        self._count("queries")
+        return current
+
+    def snapshot(self) -> QuoteSnapshot:
+        """Return a snapshot no older than ttl_s. Raises whatever load() raises."""
+        current = self.fresh()
+        if current is not None:
+            return current
+        with self._refresh_lock:
+            # Another thread may have refreshed while this one waited
+            current = self._snapshot
+            if current is None or time.time() - current.taken_at >= self.ttl_s:
+                t = time.perf_counter()
+                current = QuoteSnapshot.from_quotes(self._load())
+                self._snapshot = current
+                self._last_refresh_s = time.perf_counter() - t
+                self._count("refreshes")
+        self._count("queries")
+        return current
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self) -> dict:
+        current = self._snapshot
+        with self._lock:
+            return {
+                "quotes": len(current) if current is not None else 0,
+                "age_s": round(time.time() - current.taken_at, 1) if current is not None else None,
+                "last_refresh_s": round(self._last_refresh_s, 3) if self._last_refresh_s is not None else None,
+                **self._counts,
+            }
+
+    def clear(self) -> None:
+        """Drop the snapshot and counters (for tests)."""
+        with self._refresh_lock, self._lock:
+            self._snapshot = None
+            self._last_refresh_s = None
+            self._counts = dict.fromkeys(self._counts, 0)
@@ -0,0 +1,138 @@
+"""Local headline sentiment and theme pre-scoring for get_stock_news.
+
+Headlines are scored against a small finance lexicon: each known word adds
+its weight, a negator ("not", "no", "without", ...) flips the next two
+words, and the sum is squashed to -1..1 with tanh. Every headline in a call
+is tokenized once and scored together with numpy, so a batch of thousands
+costs about as much as the tokenizing. Themes (earnings, analyst, macro)
+are tagged with one precompiled regex each.
+
+The scores are a starting point for the LLM, not a replacement for reading
+the headlines: a lexicon misses sarcasm, context and most of the vocabulary.
+"""
+
+import re
+
+import numpy as np
+
+# Score above which a headline (or the average) counts as bullish, below minus which bearish
+LABEL_THRESHOLD = 0.15
+
+_LEXICON = {
+    # bullish
+    "beat": 1.5, "beats": 1.5, "tops": 1.0, "topped": 1.0, "exceeds": 1.0, "exceeded": 1.0,
+    "surge": 1.5, "surges": 1.5, "surged": 1.5, "soar": 1.5, "soars": 1.5, "soared": 1.5,
+    "jump": 1.0, "jumps": 1.0, "jumped": 1.0, "rally": 1.0, "rallies": 1.0, "rallied": 1.0,
+    "gain": 0.75, "gains": 0.75, "gained": 0.75, "rise": 0.5, "rises": 0.5, "rose": 0.5,
+    "climb": 0.75, "climbs": 0.75, "climbed": 0.75, "rebound": 0.75, "rebounds": 0.75,
+    "record": 1.0, "high": 0.5, "highs": 0.5, "strong": 1.0, "stronger": 1.0, "robust": 1.0,
+    "growth": 0.75, "grows": 0.75, "profit": 0.5, "profitable": 1.0, "raises": 1.0, "raised": 1.0,
+    "upgrade": 1.5, "upgrades": 1.5, "upgraded": 1.5, "outperform": 1.0, "overweight": 1.0,
+    "buy": 0.5, "bullish": 1.5, "optimism": 1.0, "optimistic": 1.0, "boost": 1.0, "boosts": 1.0,
+    "approval": 1.0, "approved": 1.0, "wins": 1.0, "win": 0.75, "partnership": 0.5,
+    "expands": 0.5, "expansion": 0.5, "breakthrough": 1.5, "buyback": 1.0, "dividend": 0.5,
+    # bearish
+    "miss": -1.5, "misses": -1.5, "missed": -1.5, "plunge": -2.0, "plunges": -2.0, "plunged": -2.0,
+    "sink": -1.5, "sinks": -1.5, "sank": -1.5, "tumble": -1.5, "tumbles": -1.5, "tumbled": -1.5,
+    "slump": -1.5, "slumps": -1.5, "slumped": -1.5, "fall": -0.75, "falls": -0.75, "fell": -0.75,
+    "drop": -0.75, "drops": -0.75, "dropped": -0.75, "decline": -0.75, "declines": -0.75,
+    "slide": -0.75, "slides": -0.75, "low": -0.5, "lows": -0.5, "weak": -1.0, "weaker": -1.0,
+    "loss": -1.0, "losses": -1.0, "cuts": -1.0, "cut": -0.75, "lowers": -1.0, "lowered": -1.0,
+    "downgrade": -1.5, "downgrades": -1.5, "downgraded": -1.5, "underperform": -1.0,
+    "underweight": -1.0, "sell": -0.5, "bearish": -1.5, "concern": -0.75, "concerns": -0.75,
+    "fears": -1.0, "warning": -1.0, "warns": -1.0, "lawsuit": -1.0, "sued": -1.0, "probe": -1.0,
+    "investigation": -1.0, "recall": -1.0, "layoffs": -1.0, "delay": -0.75, "delays": -0.75,
+    "halt": -1.0, "halts": -1.0, "bankruptcy": -2.0, "fraud": -2.0, "crash": -2.0, "selloff": -1.5,
+    "volatile": -0.5, "uncertainty": -0.75, "disappointing": -1.5, "disappoints": -1.5,
+}
+_NEGATORS = frozenset({
+    "not", "no", "never", "without", "nor", "isn't", "doesn't", "didn't", "won't", "can't", "fails", "failed",
+})
+# Words a negator reaches past itself
+_NEGATION_SPAN = 2
+
+THEMES = {
+    "earnings": re.compile(
+        r"\b(earnings|eps|revenues?|sales|profits?|quarter(ly)?|q[1-4]|guidance|outlook|results|forecasts?)\b"
+    ),
+    "analyst": re.compile(
+        r"\b(analysts?|upgrade[sd]?|downgrade[sd]?|price target|rating|overweight|underweight"
+        r"|outperform|underperform|initiates?|coverage)\b"
+    ),
+    "macro": re.compile(
+        r"\b(fed|federal reserve|interest rates?|rate (cut|hike)s?|inflation|cpi|ppi|tariffs?|jobs report"
+        r"|payrolls|unemployment|recession|treasury|yields?|economy|economic|gdp|powell)\b"
+    ),
+}
+
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9'\-]*")
+
+
+def _normalize(title: str | None) -> str:
+    return (title or "").lower().replace("’", "'")
+
+
+def score_headlines(titles: list[str | None]) -> np.ndarray:
+    """Return one score in -1..1 per title (0.0 for titles with no known words)."""
+    tokens: list[str] = []
+    owners: list[int] = []
+    for i, title in enumerate(titles):
+        words = _TOKEN_RE.findall(_normalize(title))
+        tokens.extend(words)
+        owners.extend([i] * len(words))
+    if not tokens:
+        return np.zeros(len(titles))
+
+    vocab, inverse = np.unique(np.array(tokens), return_inverse=True)
+    weights = np.array([_LEXICON.get(word, 0.0) for word in vocab])[inverse]
+    negator = np.array([word in _NEGATORS for word in vocab])[inverse]
+    owner = np.array(owners)
+
+    flip = np.zeros(len(tokens), dtype=bool)
+    for shift in range(1, _NEGATION_SPAN + 1):
+        flip[shift:] |= negator[:-shift] & (owner[shift:] == owner[:-shift])
+    weights = np.where(flip, -weights, weights)
+    return np.tanh(np.bincount(owner, weights=weights, minlength=len(titles)) / 2)
+
+
+def tag_themes(title: str | None) -> list[str]:
+    text = _normalize(title)
+    return [name for name, pattern in THEMES.items() if pattern.search(text)]
+
+
+def label(score: float, neutral: str = "neutral") -> str:
+    if score > LABEL_THRESHOLD:
+        return "bullish"
+    if score < -LABEL_THRESHOLD:
+        return "bearish"
+    return neutral
+
+
+def annotate_news(result: dict) -> dict:
+    """Return a copy of a get_stock_news result with per-item and aggregate scores.
+
+    Each item gains 'sentiment' (-1..1) and 'themes'; the result gains
+    'sentiment' {score, label, bullish, bearish, neutral} and 'themes'
+    {theme: count}. Error results are returned unchanged.
+    """
+    if "error" in result:
+        return result
+    items = result.get("news", [])
+    scores = score_headlines([item.get("title") for item in items])
+    news = []
+    counts = {"bullish": 0, "bearish": 0, "neutral": 0}
+    themes = dict.fromkeys(THEMES, 0)
+    for item, score in zip(items, scores.tolist()):
+        item_themes = tag_themes(item.get("title"))
+        for theme in item_themes:
+            themes[theme] += 1
+        counts[label(score)] += 1
+        news.append({**item, "sentiment": round(score, 2), "themes": item_themes})
+
+    average = float(scores.mean()) if len(items) else 0.0
+    return {
+        **result,
+        "news": news,
+        "sentiment": {"score": round(average, 2), "label": label(average, neutral="mixed"), **counts},
+        "themes": themes,
+    }
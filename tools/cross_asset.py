@@ -0,0 +1,172 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
+import math
+import os
+
+import numpy as np
+from langchain_core.tools import tool
+
+from . import _data_store
+from ._cross_asset import RS_LOOKBACKS, ReturnMatrixCache, relative_strength, rolling_beta_corr
+from ._ohlcv import is_columnar, to_columnar
+from .stock_history import fetch_history
+
+# The first symbol is the market benchmark; the rest are SPDR sector ETFs
+CROSS_ASSET_BENCHMARKS = os.getenv("CROSS_ASSET_BENCHMARKS", "SPY,XLB,XLC,XLE,XLF,XLI,XLK,XLP,XLRE,XLU,XLV,XLY")
+# Histories fetched at once when building a return matrix
+CROSS_ASSET_WORKERS = int(os.getenv("CROSS_ASSET_WORKERS", "8"))
+# Peers accepted per call; each is a live history fetch when the matrix is built
+CROSS_ASSET_MAX_PEERS = int(os.getenv("CROSS_ASSET_MAX_PEERS", "50"))
+# Leaders and laggards listed inline; the full ranking is behind the universe handle
+_RS_LISTED = 5
+
+
+def _history(symbol: str, period: str, scrape: bool) -> dict | str:
+    """Columnar history for one symbol, or an error message."""
+    try:
+        result = fetch_history(symbol, period, scrape)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    data = result.get("data")
+    if "error" in result or not data:
+        return result.get("error", "no data")
+    return data if is_columnar(data) else to_columnar(data)
+
+
+def _load(
+    symbols: list[str], period: str, peers: frozenset[str] = frozenset()
+) -> tuple[dict[str, dict], dict[str, str]]:
+    """Histories for symbols; peers never fall back to the Playwright scraper."""
+    with ThreadPoolExecutor(max_workers=max(1, min(CROSS_ASSET_WORKERS, len(symbols)))) as pool:
+        fetched = dict(zip(symbols, pool.map(lambda s: _history(s, period, s not in peers), symbols)))
+    histories = {s: v for s, v in fetched.items() if isinstance(v, dict)}
+    return histories, {s: v for s, v in fetched.items() if isinstance(v, str)}
+
+
+_matrices = ReturnMatrixCache(_load)
+
+
+def _value(x: float, digits: int = 4) -> float | None:
+    return None if math.isnan(x) else round(float(x), digits)
+
+
+@tool
+def compare_assets(
+    symbol: str,
+    peers: list[str] | None = None,
+    benchmarks: list[str] | None = None,
+    period: Literal["3mo", "6mo", "1y", "2y", "5y", "10y"] = "1y",
+    window: int = 63,
+) -> dict:
+    """Compare a stock with the market, sector ETFs and peers: beta, correlation and relative strength.
+
+    Use this tool instead of fetching SPY or sector ETF history and computing
+    beta or correlation with python_analyzer. Daily returns are aligned by
+    date; days a symbol did not trade are skipped, pairwise.
+
+    Args:
+        symbol: Stock ticker symbol (e.g. 'AAPL').
+        peers: Optional extra symbols to rank alongside it (at most 50).
+                Peers are fetched from yfinance only; one without data is
+                listed under 'missing'.
+        benchmarks: Symbols to compare against; the first is the market
+                    benchmark for relative strength. Defaults to SPY and the
+                    SPDR sector ETFs (XLK, XLF, ...).
+        period: History to use - '3mo', '6mo', '1y' (default), '2y', '5y' or '10y'.
+        window: Trading days in each rolling beta/correlation window (10-252, default 63).
+
+    Returns:
+        Dict with symbol, period, window, as_of (last date) and:
+        'benchmarks': {benchmark: {beta, correlation}} over the latest window;
+        'closest_sector': the non-market benchmark most correlated with the stock;
+        'relative_strength': excess return over the market benchmark for
+        21/63/126/252 trading days (percent, null beyond the period), the
+        stock's rank among all compared symbols (1 = strongest), and the
+        leaders and laggards;
+        'rolling': a handle to the stock's rolling beta_<benchmark> and
+        corr_<benchmark> series (columnar, with 'dates');
+        'universe': a handle to every compared symbol's latest beta,
+        correlation and relative-strength score and rank;
+        'missing': symbols without data, with the reason.
+        Handles are usable as values in python_analyzer's data JSON.
+        Returns {'error': message} if the stock or market benchmark has no
+        data, or if there are too many peers.
+    """
+    symbol = symbol.upper()
+    benchmarks = [b.upper() for b in benchmarks or CROSS_ASSET_BENCHMARKS.split(",") if b.strip()]
+    if not benchmarks:
+        return {"error": "no benchmarks given"}
+    if not 10 <= window <= 252:
+        return {"error": f"window must be between 10 and 252 trading days, got {window}"}
+    peers = list(dict.fromkeys(p.upper() for p in peers or []))
+    if len(peers) > CROSS_ASSET_MAX_PEERS:
+        return {"error": f"at most {CROSS_ASSET_MAX_PEERS} peers per call, got {len(peers)}"}
+    universe = list(dict.fromkeys([symbol, *peers, *benchmarks]))
+
+    matrix = _matrices.get(universe, period, peers=frozenset(peers) - {symbol, *benchmarks})
+    for required in (symbol, benchmarks[0]):
+        if matrix.index(required) is None:
+            return {"error": f"no data for {required}: {matrix.missing.get(required, 'unknown')}"}
+    if len(matrix.dates) <= window:
+        return {"error": f"{period} has {len(matrix.dates)} trading days, need more than the {window}-day window"}
+
+    bench = [b for b in benchmarks if matrix.index(b) is not None]
+    bench_rows = [matrix.index(b) for b in bench]
+    min_periods = max(window * 3 // 4, 2)
+    subject = matrix.index(symbol)
+    # Rolling series for the stock only; the latest window for everyone
+    beta, corr = rolling_beta_corr(
+        matrix.returns[[subject]], matrix.returns[bench_rows], window, min_periods
+    )
+    recent = matrix.returns[:, -window:]
+    latest_beta, latest_corr = rolling_beta_corr(recent, recent[bench_rows], window, min_periods)
+    latest_beta, latest_corr = latest_beta[..., -1], latest_corr[..., -1]
+    rs = relative_strength(matrix.closes, matrix.index(bench[0]))
+
+    sectors = {b: latest_corr[subject, j] for j, b in enumerate(bench) if j and not math.isnan(latest_corr[subject, j])}
+    ranked = np.argsort(np.where(rs["rank"] > 0, rs["rank"], len(rs["rank"]) + 1), kind="stable")
+    ranked = [i for i in ranked.tolist() if rs["rank"][i] > 0]
+
+    def listed(rows: list[int]) -> list[dict]:
+        return [{"symbol": matrix.symbols[i], "score_pct": _value(rs["score"][i] * 100, 2)} for i in rows]
+
+    dates = matrix.dates.tolist()
+    rolling = {"dates": dates}
+    for j, b in enumerate(bench):
+        rolling[f"beta_{b}"] = [_value(v) for v in beta[0, j]]
+        rolling[f"corr_{b}"] = [_value(v) for v in corr[0, j]]
+    table = {
+        "symbols": list(matrix.symbols),
+        "rs_score_pct": [_value(v * 100, 2) for v in rs["score"]],
+        "rs_rank": rs["rank"].tolist(),
+        **{f"beta_{b}": [_value(v) for v in latest_beta[:, j]] for j, b in enumerate(bench)},
+        **{f"corr_{b}": [_value(v) for v in latest_corr[:, j]] for j, b in enumerate(bench)},
+    }
+    return {
+        "symbol": symbol,
+        "period": period,
+        "window": window,
+        "as_of": dates[-1],
+        "benchmarks": {
+            b: {"beta": _value(latest_beta[subject, j]), "correlation": _value(latest_corr[subject, j])}
+            for j, b in enumerate(bench)
+        },
+        "closest_sector": max(sectors, key=sectors.get) if sectors else None,
+        "relative_strength": {
+            "benchmark": bench[0],
+            "excess_pct": {
+                f"{lookback}d": _value(rs["excess"][subject, k] * 100, 2) for k, lookback in enumerate(RS_LOOKBACKS)
+            },
+            "rank": int(rs["rank"][subject]) or None,
+            "of": len(ranked),
+            "leaders": listed(ranked[:_RS_LISTED]),
+            "laggards": listed(ranked[-_RS_LISTED:][::-1]) if len(ranked) > _RS_LISTED else [],
+        },
+        "rolling": _data_store.put({"symbol": symbol, "period": period, "data": rolling}, f"{symbol}-{period}-rolling"),
+        "universe": _data_store.put({"period": period, "data": table}, f"{symbol}-{period}-universe"),
+        "missing": matrix.missing,
+    }
+
+
+def cross_asset_stats() -> dict:
+    return _matrices.stats()
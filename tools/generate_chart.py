@@ -1,14 +1,16 @@
 import json
-import os
+import logging
 import tempfile
 
-import matplotlib
-import matplotlib.pyplot as plt
-import mplfinance as mpf
-import pandas as pd
 from langchain_core.tools import tool
 
-matplotlib.use("Agg")
+from ._chart_pool import ChartJob, get_chart_pool
+from ._chart_render import CHART_TYPES, render_chart
+from ._data_store import load_data_arg, unknown_handle_error
+from ._limits import limit
+from ._ohlcv import as_rows
+
+_logger = logging.getLogger(__name__)
 
 
 @tool
@@ -19,8 +21,10 @@ def generate_chart(data: str, chart_type: str, title: str) -> dict:
     Pass the output chart_path directly to send_email's chart_path argument.
 
     Args:
-        data: JSON string in the same shape as get_stock_history output.
-              Must contain a 'data' key mapping date strings to OHLCV dicts.
+        data: The 'handle' returned by get_stock_history (preferred), or a
+              JSON string in the same shape as get_stock_history output.
+              Must contain a 'data' key in either layout: date strings mapped
+              to OHLCV dicts, or columnar 'dates'/'open'/.../'volume' arrays.
         chart_type: 'line' for a closing price line chart,
                     'candlestick' for an OHLC candlestick chart.
         title: Chart title string (e.g. 'AAPL 1-Month Close Price').
@@ -30,66 +34,51 @@ def generate_chart(data: str, chart_type: str, title: str) -> dict:
         or 'error' on failure.
     """
     try:
-        parsed = json.loads(data)
+        parsed = load_data_arg(data)
     except json.JSONDecodeError as e:
         return {"error": f"invalid data JSON: {e}"}
+    except KeyError as e:
+        return {"error": unknown_handle_error(e)}
+
+    if not isinstance(parsed, dict):
+        return {"error": "data JSON missing 'data' key"}
 
     ohlcv = parsed.get("data")
     if not ohlcv:
         return {"error": "data JSON missing 'data' key"}
+    try:
+        ohlcv = as_rows(ohlcv)
+    except ValueError as e:
+        return {"error": f"invalid data: {e}"}
 
-    dates = sorted(ohlcv.keys())
-    if not dates:
-        return {"error": "no data points found"}
+    if chart_type not in CHART_TYPES:
+        return {"error": f"unknown chart_type '{chart_type}': use 'line' or 'candlestick'"}
 
-    tmp = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-    chart_path = tmp.name
-    tmp.close()
+    with limit("chart"):
+        png, error = _render(ohlcv, chart_type, title)
+    if error:
+        return {"error": f"chart generation failed: {error}"}
 
-    try:
-        if chart_type == "line":
-            closes = [ohlcv[d]["close"] for d in dates]
-
-            fig, ax = plt.subplots(figsize=(10, 4))
-            ax.plot(dates, closes, linewidth=1.5)
-            ax.set_title(title)
-            ax.set_xlabel("Date")
-            ax.set_ylabel("Close Price (USD)")
-            ax.tick_params(axis="x", rotation=45)
-            plt.tight_layout()
-            fig.savefig(chart_path, dpi=150)
-            plt.close(fig)
-
-        elif chart_type == "candlestick":
-            df = pd.DataFrame(
-                {
-                    "Open": [ohlcv[d]["open"] for d in dates],
-                    "High": [ohlcv[d]["high"] for d in dates],
-                    "Low": [ohlcv[d]["low"] for d in dates],
-                    "Close": [ohlcv[d]["close"] for d in dates],
-                    "Volume": [ohlcv[d]["volume"] for d in dates],
-                },
-                index=pd.DatetimeIndex(dates),
-            )
-            mpf.plot(
-                df,
-                type="candle",
-                title=title,
-                ylabel="Price (USD)",
-                savefig=chart_path,
-                style="yahoo",
-                figsize=(10, 5),
-            )
-            plt.close("all")
-
-        else:
-            if os.path.exists(chart_path):
-                os.unlink(chart_path)
-            return {"error": f"unknown chart_type '{chart_type}': use 'line' or 'candlestick'"}
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
+        tmp.write(png)
+
+    return {"chart_path": tmp.name}
 
-    except Exception as e:
-        if os.path.exists(chart_path):
-            os.unlink(chart_path)
-        return {"error": f"chart generation failed: {e}"}
 
-    return {"chart_path": chart_path}
+def _render(ohlcv: dict, chart_type: str, title: str) -> tuple[bytes | None, str | None]:
+    """Render in the chart pool if one is configured, else (or if the pool fails) in this process.
+
+    Returns (png, None) or (None, error message).
+    """
+    try:
+        pool = get_chart_pool()
+        if pool is not None:
+            rendered = pool.render(ChartJob(data=ohlcv, chart_type=chart_type, title=title))
+            return rendered.png, rendered.error
+    except Exception as e:
+        # BrokenProcessPool once a worker has died; the pool has replaced itself for the next chart
+        _logger.warning("chart pool failed, rendering in-process: %r", e)
+    try:
+        return render_chart(ohlcv, chart_type, title), None
+    except Exception as e:
+        return None, str(e)
@@ -0,0 +1,86 @@
+import json
+import math
+
+from langchain_core.tools import tool
+
+from . import _data_store
+from ._data_store import load_data_arg, unknown_handle_error
+from ._indicators import INDICATORS, IndicatorCache
+from ._ohlcv import has_columnar_shape, is_columnar, sort_by_date, to_columnar
+from .stock_history import DATA_HANDLE_MIN_ROWS
+
+_cache = IndicatorCache()
+
+
+@tool
+def get_indicators(data: str, indicators: list[str] | None = None) -> dict:
+    """Compute technical indicators over a get_stock_history result.
+
+    Use this tool instead of writing indicator code for python_analyzer.
+    Available indicators and the series they return:
+        sma: sma_20, sma_50 (simple moving averages of close)
+        ema: ema_12, ema_26 (exponential moving averages of close)
+        rsi: rsi_14 (Wilder's RSI, 0-100)
+        macd: macd, macd_signal, macd_hist (12/26/9)
+        bollinger: bb_upper, bb_middle, bb_lower (20 days, 2 standard deviations)
+        atr: atr_14 (Wilder's average true range)
+        vwap: vwap (volume-weighted typical price since the first bar)
+    Series are undefined (null) until enough bars exist, e.g. the first 49 for sma_50.
+
+    Args:
+        data: The 'handle' returned by get_stock_history (preferred), or a
+              JSON string in the same shape as get_stock_history output.
+        indicators: Names from the list above; all of them if omitted.
+
+    Returns:
+        Dict with symbol, period, rows, 'latest' (each series' value on the
+        last bar) and a 'handle' to the full series (columnar, with 'dates'),
+        usable as a value in python_analyzer's data JSON. Short series also
+        include them under 'series'.
+        Returns {'error': message} for invalid data or unknown indicators.
+    """
+    try:
+        parsed = load_data_arg(data)
+    except json.JSONDecodeError as e:
+        return {"error": f"invalid data JSON: {e}"}
+    except KeyError as e:
+        return {"error": unknown_handle_error(e)}
+    if not isinstance(parsed, dict) or not parsed.get("data"):
+        return {"error": "data JSON missing 'data' key"}
+
+    names = indicators or list(INDICATORS)
+    unknown = [name for name in names if name not in INDICATORS]
+    if unknown:
+        return {"error": f"unknown indicators {unknown}: use any of {list(INDICATORS)}"}
+
+    try:
+        columns = parsed["data"] if is_columnar(parsed["data"]) else to_columnar(parsed["data"])
+    except (KeyError, TypeError, AttributeError):
+        return {"error": "invalid data: expected OHLCV rows or columnar arrays"}
+    if not has_columnar_shape(columns) or not columns["dates"]:
+        return {"error": "invalid data: columnar arrays must be non-empty and of equal length"}
+    # The recursions (EMA, RSI, ATR) and 'latest' need the oldest bar first
+    columns = sort_by_date(columns)
+    symbol = str(parsed.get("symbol", "")).upper()
+    period = str(parsed.get("period", ""))
+    computed = _cache.get(symbol, period, columns)
+
+    series = {"dates": columns["dates"]}
+    for name in names:
+        for output in INDICATORS[name]:
+            series[output] = [None if math.isnan(v) else round(v, 4) for v in computed[output].tolist()]
+    label = f"{symbol}-{period}-indicators" if symbol else "indicators"
+    result = {
+        "symbol": symbol,
+        "period": period,
+        "rows": len(columns["dates"]),
+        "latest": {output: values[-1] for output, values in series.items() if output != "dates"},
+        "handle": _data_store.put({"symbol": symbol, "period": period, "data": series}, label),
+    }
+    if result["rows"] <= DATA_HANDLE_MIN_ROWS:
+        result["series"] = series
+    return result
+
+
+def indicator_stats() -> dict:
+    return _cache.stats()
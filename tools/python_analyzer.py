@@ -1,23 +1,34 @@
 import json
-import subprocess
-import tempfile
-from pathlib import Path
+import os
 
 from langchain_core.tools import tool
 
 from pydantic import ValidationError
-from .validate import AnalyzerInput
+from ._data_store import load_data_arg, unknown_handle_error
+from ._limits import limit
+from ._result_cache import ResultCache, content_key
+from ._sandbox import SandboxBackend, SandboxTimeout, SandboxUnavailable, get_backend
+from .validate import AnalyzerInput, error_messages
 
-SANDBOX_IMAGE = "stock-analyzer-sandbox"
 TIMEOUT_SECONDS = 15
+# Cap on each of stdout and stderr; the sandbox is killed as soon as either passes it
 MAX_OUTPUT_BYTES = 20_000
+TRUNCATION_MARKER = "\n... [output truncated]"
+
+# Successful runs are memoized by code + resolved data + sandbox backend version
+_cache = ResultCache(
+    "analyzer",
+    ttl_seconds=float(os.getenv("ANALYZER_CACHE_TTL", "86400")),
+    max_bytes=int(os.getenv("ANALYZER_CACHE_MAX_BYTES", str(50 * 1024 * 1024))),
+)
 
 
 @tool
 def python_analyzer(code: str, data: str = "") -> dict:
-    """Execute Python code to analyze stock data in a sandboxed Docker container.
+    """Execute Python code to analyze stock data in an isolated sandbox.
     Use this tool to perform custom analysis on stock data using pandas and numpy.
-    The data from other tools can be passed as a JSON string.
+    The data from other tools can be passed as a JSON string. Values may be
+    handles from get_stock_history; they are replaced by the full results.
 
     IMPORTANT: Your code must use print() to produce output. Expression values
     are not captured automatically — only what is explicitly printed is returned.
@@ -27,6 +38,8 @@ def python_analyzer(code: str, data: str = "") -> dict:
               Must use print() to produce any output.
         data: Optional JSON string from other tools. Inside your code, use the
               pre-parsed variable `data_obj` (a dict) — do NOT call json.loads().
+              OHLCV sections may be in rows or columnar layout; a columnar
+              section loads directly with pd.DataFrame(section["data"]).
 
     Returns:
         Dict with 'result' (stdout output) or 'error' if execution failed.
@@ -38,57 +51,88 @@ def python_analyzer(code: str, data: str = "") -> dict:
         prices = [d["close"] for d in stock.values()]
         print(f"Average: {sum(prices)/len(prices):.2f}")
         '''
-        data = '{"stock": {"symbol": "AAPL", "data": {...}}, "spy": {...}}'
+        data = '{"stock": "handle:AAPL-1mo:3fa2c1", "spy": "handle:SPY-1mo:9b0e44"}'
     """
     if data:
         try:
-            parsed = json.loads(data)
+            parsed = load_data_arg(data)
             if not isinstance(parsed, dict):
                 return {"error": "invalid input data: expected a JSON object"}
             AnalyzerInput(**parsed)
+            data = json.dumps(parsed)
         except json.JSONDecodeError as e:
             return {"error": f"invalid input data: {e}"}
+        except KeyError as e:
+            return {"error": unknown_handle_error(e)}
         except ValidationError as e:
-            messages = [f"{err['loc'][0]}: {err['msg']}" for err in e.errors()]
-            return {"error": "invalid input data: " + ", ".join(messages)}
+            return {"error": "invalid input data: " + ", ".join(error_messages(e))}
+
+    try:
+        backend = get_backend()
+    except ValueError as e:
+        return {"error": str(e)}
+
+    version = backend.version()
+    key = content_key(backend.name, version, code, data) if version else None
+    if key:
+        cached = _cache.get(key)
+        if cached is not None:
+            return cached
+
+    response = _run_in_sandbox(backend, code, data)
+    if key and "result" in response:
+        _cache.put(key, response)
+    return response
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
+
 
+def sandbox_stats() -> dict:
+    """Live sandboxes and cleanup counters for the configured backend."""
+    try:
+        return get_backend().stats()
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+def _run_in_sandbox(backend: SandboxBackend, code: str, data: str) -> dict:
     _data_json = json.dumps(data) if data else 'None'
     _data_obj = json.loads(data) if data else {}
     run_script = f"data = {_data_json}\ndata_obj = {_data_obj}\n\n{code}"
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        script_path = Path(tmpdir) / "run.py"
-        script_path.write_text(run_script, encoding="utf-8")
+    try:
+        with limit("sandbox"):
+            result = backend.run(run_script, TIMEOUT_SECONDS, MAX_OUTPUT_BYTES)
+    except SandboxTimeout:
+        return {"error": f"Code execution timed out after {TIMEOUT_SECONDS}s"}
+    except SandboxUnavailable as e:
+        return {"error": str(e)}
 
-        try:
-            result = subprocess.run(
-                [
-                    "docker", "run", "--rm",
-                    "--network", "none",
-                    "--memory", "128m",
-                    "--cpus", "0.5",
-                    "-v", f"{tmpdir}:/sandbox:ro",
-                    SANDBOX_IMAGE,
-                    "python", "/sandbox/run.py",
-                ],
-                capture_output=True,
-                text=True,
-                timeout=TIMEOUT_SECONDS,
-            )
-        except subprocess.TimeoutExpired:
-            return {"error": f"Code execution timed out after {TIMEOUT_SECONDS}s"}
-        except FileNotFoundError:
-            return {"error": "Docker is not installed or not in PATH"}
-
-        if result.returncode == 0:
-            stdout = result.stdout
-            if len(stdout) > MAX_OUTPUT_BYTES:
-                stdout = stdout[:MAX_OUTPUT_BYTES] + "\n... [output truncated]"
-            if not stdout.strip():
-                stdout = "(no output — code ran successfully but printed nothing)"
-            response = {"result": stdout}
-            if result.stderr.strip():
-                response["warnings"] = result.stderr.strip()
-            return response
-        else:
-            return {"error": result.stderr or f"Container exited with code {result.returncode}"}
+    if result.truncated:
+        # Killed at the output cap, so the exit code says nothing about the code itself
+        if result.stdout.strip():
+            return {"result": result.stdout + TRUNCATION_MARKER}
+        return {"error": result.stderr + TRUNCATION_MARKER}
+    if result.returncode == 0:
+        stdout = result.stdout
+        if not stdout.strip():
+            stdout = "(no output — code ran successfully but printed nothing)"
+        response = {"result": stdout}
+        if result.stderr.strip():
+            response["warnings"] = result.stderr.strip()
+        return response
+    else:
+        return {"error": result.stderr or f"Sandbox exited with code {result.returncode}"}
+
+
+def warm_sandbox() -> bool:
+    """Pay the configured sandbox backend's start-up costs before the first run.
+
+    Returns False if the backend cannot run on this host.
+    """
+    try:
+        return get_backend().warm()
+    except ValueError:
+        return False
@@ -1,15 +1,78 @@
+import logging
 import os
+import re
 import smtplib
+import time
 from email.mime.image import MIMEImage
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 from langchain_core.tools import tool
 
+from ._image import compress_png
+from ._limits import limit
+
+_logger = logging.getLogger(__name__)
+
+INLINE_CHART_MAX_BYTES = int(os.getenv("INLINE_CHART_MAX_BYTES", "60000"))
+_CHART_CID = "chart"
+_CHART_IMG = f'<p><img src="cid:{_CHART_CID}" alt="Price chart" style="max-width:100%"></p>'
+
+
+def _embed_chart_tag(body: str) -> str:
+    """Place the inline chart <img> before </body>, or at the end of the body."""
+    match = re.search(r"</body\s*>", body, flags=re.IGNORECASE)
+    if match:
+        return body[:match.start()] + _CHART_IMG + body[match.start():]
+    return body + _CHART_IMG
+
+
+def _build_message(
+    sender: str,
+    to: str,
+    subject: str,
+    body: str,
+    chart_png: bytes | None = None,
+    attach_full_chart: bool = False,
+) -> MIMEMultipart:
+    """Build the MIME message.
+
+    With a chart, the body and a size-budgeted preview go in a
+    multipart/related part so clients render the image inline via
+    Content-ID. The full-resolution PNG is only attached on request.
+    """
+    msg = MIMEMultipart("mixed")
+    msg["Subject"] = subject
+    msg["From"] = sender
+    msg["To"] = to
+
+    if chart_png is None:
+        msg.attach(MIMEText(body, "html"))
+        return msg
+
+    related = MIMEMultipart("related")
+    related.attach(MIMEText(_embed_chart_tag(body), "html"))
+    preview = MIMEImage(compress_png(chart_png, INLINE_CHART_MAX_BYTES), _subtype="png")
+    preview.add_header("Content-ID", f"<{_CHART_CID}>")
+    preview.add_header("Content-Disposition", "inline", filename="chart-preview.png")
+    related.attach(preview)
+    msg.attach(related)
+
+    if attach_full_chart:
+        msg.attach(MIMEImage(chart_png, _subtype="png", name="chart.png"))
+
+    return msg
+
 
 @tool
-def send_email(to: str, subject: str, body: str, chart_path: str = "") -> dict:
-    """Send an HTML email with an optional chart attachment via Gmail SMTP.
+def send_email(
+    to: str,
+    subject: str,
+    body: str,
+    chart_path: str = "",
+    attach_full_chart: bool = False,
+) -> dict:
+    """Send an HTML email with an optional inline chart via Gmail SMTP.
 
     Use this tool to email analysis results to the user. Compose the subject
     and body yourself based on the analysis you have already done — do not
@@ -27,13 +90,15 @@ def send_email(to: str, subject: str, body: str, chart_path: str = "") -> dict:
     - Use inline CSS only — no <style> blocks
 
     Chart: If you called generate_chart, pass its chart_path here.
-    The chart will be attached as a PNG image to the email.
+    A compressed preview of the chart is shown inline at the end of the body.
 
     Args:
         to: Recipient email address. Ask the user for this if not provided.
         subject: Agent-generated subject line following the format above.
         body: Agent-generated HTML analysis. Do not ask the user for this.
         chart_path: Optional path to a chart PNG from generate_chart.
+        attach_full_chart: Also attach the full-resolution chart PNG.
+                           Only set this if the user asked for it.
 
     Returns:
         Dict with 'result' on success or 'error' on failure.
@@ -44,6 +109,8 @@ def send_email(to: str, subject: str, body: str, chart_path: str = "") -> dict:
     smtp_host: str = os.getenv("SMTP_HOST", "smtp.gmail.com")
     smtp_port_str: str = os.getenv("SMTP_PORT", "465")
     smtp_port: int = int(smtp_port_str)
+    # SMTP_SSL=0 speaks plain SMTP, e.g. to a local test sink
+    smtp_cls = smtplib.SMTP if os.getenv("SMTP_SSL", "1") == "0" else smtplib.SMTP_SSL
 
     if not sender or not password:
         missing = []
@@ -53,25 +120,24 @@ def send_email(to: str, subject: str, body: str, chart_path: str = "") -> dict:
             missing.append("GMAIL_APP_PASSWORD")
         return {"error": f"Missing environment variables: {', '.join(missing)}"}
 
-    msg = MIMEMultipart("mixed")
-    msg["Subject"] = subject
-    msg["From"] = sender
-    msg["To"] = to
-
-    msg.attach(MIMEText(body, "html"))
-
+    chart_png = None
     if chart_path and os.path.exists(chart_path):
         with open(chart_path, "rb") as f:
-            img_data = f.read()
-        attachment = MIMEImage(img_data, name="chart.png")
-        msg.attach(attachment)
+            chart_png = f.read()
         os.unlink(chart_path)
 
+    msg = _build_message(sender, to, subject, body, chart_png, attach_full_chart)
+    payload = msg.as_string()
+
+    t = time.perf_counter()
     try:
-        with smtplib.SMTP_SSL(smtp_host, smtp_port) as smtp:
+        with limit("smtp"), smtp_cls(smtp_host, smtp_port) as smtp:
             smtp.login(sender, password)
-            smtp.sendmail(sender, to, msg.as_string())
+            smtp.sendmail(sender, to, payload)
     except smtplib.SMTPException as e:
         return {"error": str(e)}
 
+    _logger.info(
+        "email sent: %d bytes in %.0f ms", len(payload), (time.perf_counter() - t) * 1000
+    )
     return {"result": f"Email sent to {to}"}
@@ -1,66 +1,157 @@
 from typing import Literal
 import logging
+import os
 
 import yfinance as yf
 from langchain_core.tools import tool
 
-from ._playwright_scraper import scrape_stock_history, use_scraper
-from pydantic import ValidationError
-
-from .validate import StockHistoryResult
+from . import _data_store
+from ._bar_store import BarStore, latest_session
+from ._hedge import hedged
+from ._ohlcv import FIELDS, is_columnar, sort_by_date, summarize, to_columnar, to_rows
+from ._playwright_scraper import _PERIOD_ROWS, scrape_stock_history, use_scraper
+from .validate import validate_stock_history
 
 _logger = logging.getLogger(__name__)
 
+# Series longer than this are returned by handle only, without the raw rows
+DATA_HANDLE_MIN_ROWS = int(os.getenv("DATA_HANDLE_MIN_ROWS", "30"))
+
+# Fetched live to bring stored bars up to the latest session; spans a long weekend
+_RECENT_PERIOD = "5d"
+
+_bars = BarStore()
+
 
 @tool
 def get_stock_history(
     symbol: str,
     period: Literal["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y"] = "5d",
+    layout: Literal["rows", "columnar"] = "rows",
 ) -> dict:
     """Fetch historical OHLCV data for a stock symbol.
 
     Use this tool when you need historical price data for a stock.
     Returns Open, High, Low, Close, and Volume for each day.
+    Served from the local bar store when prefetch.py has fetched the symbol recently.
     Falls back to Playwright scraping (Yahoo Finance) if yfinance fails or USE_SCRAPER=1.
 
+    The result always includes a 'handle' (e.g. 'handle:AAPL-1y:3fa2c1') and a
+    'summary'. Pass the handle as the data argument of generate_chart, or as a
+    value in python_analyzer's data JSON, instead of copying the data itself.
+    Long series omit 'data' entirely; use the handle.
+
     Args:
         symbol: Stock ticker symbol (e.g., 'AAPL', 'GOOGL', 'TSLA')
         period: Time period to fetch - '1d', '5d' (default), '1mo', or '1y'
+        layout: 'rows' (default) maps each date to an OHLCV dict.
+                'columnar' returns parallel arrays under data:
+                {"dates": [...], "open": [...], "high": [...], "low": [...],
+                "close": [...], "volume": [...]} — much smaller for long periods.
 
     Returns:
-        Dictionary with symbol, period, and OHLCV data indexed by date.
+        Dictionary with symbol, period, handle, summary, and (for short series)
+        OHLCV data in the requested layout.
         Returns {'error': message} if the symbol is invalid or data unavailable.
     """
+    return _publish(fetch_history(symbol, period), layout)
+
+
+def history_stats() -> dict:
+    return _bars.stats()
+
+
+def fetch_history(symbol: str, period: str, scrape: bool = True) -> dict:
+    """History for symbol from the bar store or live, as {symbol, period, data} with no handle.
+
+    data may be in rows or columnar layout, in the source's order. With
+    scrape=False, yfinance failures give {'error': message} instead of
+    starting the Playwright scraper (USE_SCRAPER=1 still scrapes).
+    """
+    stored = _bars.read(symbol.upper(), period)
+    if stored is not None:
+        if stored["dates"][-1] >= latest_session():
+            return {"symbol": symbol.upper(), "period": period, "data": stored}
+        # Prefetched before the latest session opened: keep the older bars and
+        # fetch only the recent ones live
+        recent = _fetch_live(symbol, _RECENT_PERIOD, scrape)
+        if recent.get("data"):
+            return {"symbol": symbol.upper(), "period": period, "data": _with_recent(stored, recent["data"], _PERIOD_ROWS[period])}
+    return _fetch_live(symbol, period, scrape)
+
+
+def _with_recent(stored: dict, recent: dict, n_rows: int) -> dict:
+    """The last n_rows of columnar stored bars, with those from recent's first date on replaced by recent."""
+    recent = sort_by_date(recent)
+    if not is_columnar(recent):
+        recent = to_columnar(recent)
+    keep = sum(date < recent["dates"][0] for date in stored["dates"])
+    return {key: (stored[key][:keep] + recent[key])[-n_rows:] for key in ("dates", *FIELDS)}
+
+
+def _fetch_live(symbol: str, period: str, scrape: bool = True) -> dict:
     if use_scraper():
         return scrape_stock_history(symbol, period)
 
-    try:
-        ticker = yf.Ticker(symbol.upper())
-        df = ticker.history(period=period)
-
-        if df.empty:
-            _logger.info("yfinance returned empty DataFrame for %s, falling back to scraper", symbol)
+    def fallback() -> dict:
+        if scrape:
             return scrape_stock_history(symbol, period)
+        return {"error": f"yfinance has no {period} history for {symbol.upper()}"}
 
-        data = {}
-        for date, row in df.iterrows():
-            date_str = date.strftime("%Y-%m-%d")
-            data[date_str] = {
-                "open": float(round(row["Open"], 2)),
-                "high": float(round(row["High"], 2)),
-                "low": float(round(row["Low"], 2)),
-                "close": float(round(row["Close"], 2)),
-                "volume": int(row["Volume"]),
-            }
-
-        result = {"symbol": symbol.upper(), "period": period, "data": data}
-        try:
-            StockHistoryResult(**result)
-            return result
-        except ValidationError as e:
-            messages = [f"{err['loc'][0]}: {err['msg']}" for err in e.errors()]
-            return {"error": "validation failed: " + ", ".join(messages)}
-
-    except Exception as e:
-        _logger.warning("yfinance failed for %s, falling back to scraper: %s", symbol, e)
-        return scrape_stock_history(symbol, period)
+    return hedged("history", lambda: _from_yfinance(symbol, period), fallback)
+
+
+def _from_yfinance(symbol: str, period: str) -> dict | None:
+    """Fetch via yfinance; None if it has nothing usable. Raises on yfinance errors."""
+    ticker = yf.Ticker(symbol.upper())
+    df = ticker.history(period=period)
+
+    if df.empty:
+        _logger.info("yfinance returned empty DataFrame for %s, falling back to scraper", symbol)
+        return None
+
+    return _from_dataframe(symbol, period, df)
+
+
+def _from_dataframe(symbol: str, period: str, df) -> dict:
+    """Convert a yfinance history DataFrame to a validated columnar result.
+
+    Raises ValueError if Volume contains NaN.
+    """
+    data = {
+        "dates": df.index.strftime("%Y-%m-%d").tolist(),
+        "open": [round(v, 2) for v in df["Open"].tolist()],
+        "high": [round(v, 2) for v in df["High"].tolist()],
+        "low": [round(v, 2) for v in df["Low"].tolist()],
+        "close": [round(v, 2) for v in df["Close"].tolist()],
+        "volume": df["Volume"].astype("int64").tolist(),
+    }
+
+    result = {"symbol": symbol.upper(), "period": period, "data": data}
+    messages = validate_stock_history(result)
+    if messages:
+        return {"error": "validation failed: " + ", ".join(messages)}
+    return result
+
+
+def _publish(result: dict, layout: str) -> dict:
+    """Convert result to the requested layout, oldest bar first, store it, and attach its handle.
+
+    Error results and results without rows are returned unchanged.
+    """
+    data = result.get("data")
+    if not data:
+        return result
+    data = sort_by_date(data)
+    if layout == "columnar" and not is_columnar(data):
+        data = to_columnar(data)
+    elif layout == "rows" and is_columnar(data):
+        data = to_rows(data)
+    result = {**result, "data": data}
+
+    handle = _data_store.put(result, f"{result['symbol']}-{result['period']}")
+    summary = summarize(data)
+    published = {"symbol": result["symbol"], "period": result["period"], "handle": handle, "summary": summary}
+    if summary["rows"] <= DATA_HANDLE_MIN_ROWS:
+        published["data"] = data
+    return published
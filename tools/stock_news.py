@@ -1,11 +1,23 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+import os
 
 import yfinance as yf
 from langchain_core.tools import tool
 
+from ._hedge import hedged
+from ._news_store import NewsStore
 from ._playwright_scraper import scrape_stock_news, use_scraper
+from ._sentiment import annotate_news
 from .top_gainers import get_top_gainers
 
+# Symbols fetched at once by get_news_batch
+NEWS_BATCH_WORKERS = int(os.getenv("NEWS_BATCH_WORKERS", "8"))
+# Items requested per fetch; wider than the 10 returned so duplicates can be dropped
+NEWS_FETCH_COUNT = int(os.getenv("NEWS_FETCH_COUNT", "30"))
+
+_store = NewsStore()
+
 
 @tool
 def get_stock_news(ticker: str | None = None) -> dict:
@@ -14,13 +26,21 @@ def get_stock_news(ticker: str | None = None) -> dict:
     Use this tool when you need to find news about a specific stock or the top gainer.
     If ticker is not provided, automatically fetches news for today's top NASDAQ gainer.
     Falls back to Yahoo Finance RSS if yfinance fails or USE_SCRAPER=1.
+    Headlines are remembered per symbol: ones not returned by an earlier call
+    are listed first and marked "new": true. The same story syndicated by
+    several publishers is returned once, with a count of its duplicates.
+    Each headline is pre-scored locally for sentiment and tagged with themes (earnings, analyst, macro).
 
     Args:
         ticker: Optional stock symbol (e.g. 'AAPL'). If omitted, uses the top gainer.
 
     Returns:
-        Dictionary with symbol, timestamp, and a list of up to 10 news items.
-        Each item contains title, publisher, published_at (ISO 8601), and url.
+        Dictionary with symbol, timestamp, new_count, and a list of up to 10
+        distinct news stories. Each item contains title, publisher, published_at
+        (ISO 8601), url, new, duplicates, sentiment (-1 bearish to 1 bullish)
+        and themes.
+        Also 'sentiment' {score, label, bullish, bearish, neutral} aggregated over
+        the items, and 'themes' {earnings, analyst, macro} headline counts.
         Returns {'error': message} if the fetch fails.
     """
     if ticker is None:
@@ -31,20 +51,42 @@ def get_stock_news(ticker: str | None = None) -> dict:
     else:
         symbol = ticker.upper()
 
+    return _get(symbol)
+
+
+def get_news_batch(symbols: list[str], max_workers: int = NEWS_BATCH_WORKERS) -> dict[str, dict]:
+    """Fetch news for many symbols concurrently. Returns {symbol: get_stock_news result}."""
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))
+    if not symbols:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as pool:
+        return dict(zip(symbols, pool.map(_get, symbols)))
+
+
+def news_stats() -> dict:
+    return _store.stats()
+
+
+def _get(symbol: str) -> dict:
+    return annotate_news(_store.get(symbol, _fetch))
+
+
+def _fetch(symbol: str) -> dict:
     if use_scraper():
         return scrape_stock_news(symbol)
+    return hedged("news", lambda: _from_yfinance(symbol), lambda: scrape_stock_news(symbol))
 
-    try:
-        ticker_obj = yf.Ticker(symbol)
-        raw_news = ticker_obj.news
-    except Exception:
-        return scrape_stock_news(symbol)
+
+def _from_yfinance(symbol: str) -> dict | None:
+    """Fetch via yfinance; None if it has no news. Raises on yfinance errors."""
+    ticker_obj = yf.Ticker(symbol)
+    raw_news = ticker_obj.get_news(count=NEWS_FETCH_COUNT)
 
     if not raw_news:
-        return scrape_stock_news(symbol)
+        return None
 
     news = []
-    for item in raw_news[:10]:
+    for item in raw_news:
         content = item.get("content", {})
         news.append({
             "title": content.get("title"),
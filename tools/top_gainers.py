@@ -1,14 +1,30 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import Literal
 import logging
+import math
+import os
 
 import yfinance as yf
 from langchain_core.tools import tool
 
+from ._breaker import SourceUnavailable, protected_call
+from ._hedge import hedged
 from ._playwright_scraper import scrape_top_gainer, use_scraper
+from ._screener import NASDAQ_EXCHANGES, QuoteScreener, QuoteSnapshot
 from pydantic import ValidationError
-from .validate import TopGainerResult
+from .validate import TopGainerResult, error_messages
+
+# Screener pages fetched at once when the quote snapshot is refreshed
+SCREENER_WORKERS = int(os.getenv("SCREENER_WORKERS", "4"))
+# The remote screener's minimum for a top gainer
+MIN_GAINER_PCT = 3.0
+# Quotes fetched by the single top-gainer query; a few spare for the client-side filters
+_GAINER_QUOTES = 25
+# Yahoo's maximum page size, and a cap on pages per refresh
+_PAGE_SIZE = 250
+_MAX_QUOTES = 10_000
 
-_NASDAQ_EXCHANGES = {"NMS", "NGM", "NCM"}
 _logger = logging.getLogger(__name__)
 
 
@@ -18,7 +34,9 @@ def get_top_gainers() -> dict:
 
     Use this tool when you need to find the best performing NASDAQ stock today.
     Queries Yahoo Finance screener filtered to NASDAQ exchanges (NMS, NGM, NCM),
-    then re-filters client-side to guard against server-side leakage.
+    then re-filters client-side to guard against server-side leakage; a gainer
+    must be up at least 3%. Ranks the local quote snapshot instead while
+    screen_stocks has loaded one in the last minute.
     Falls back to Playwright scraping (Futunn) if yfinance fails or USE_SCRAPER=1.
 
     Returns:
@@ -28,57 +46,118 @@ def get_top_gainers() -> dict:
     """
     if use_scraper():
         return scrape_top_gainer()
+    return hedged("top_gainers", _from_yfinance, scrape_top_gainer)
 
-    try:
-        query = yf.EquityQuery("and", [
-            yf.EquityQuery("is-in", ["exchange", "NMS", "NGM", "NCM"]),
-            yf.EquityQuery("gte", ["percentchange", 3]),
-        ])
-        response = yf.screen(
-            query,
-            sortField="percentchange",
-            sortAsc=False,
-            size=250,
-        )
-    except Exception as e:
-        _logger.warning("yfinance query failed, falling back to scraper: %s", e)
-        return scrape_top_gainer()
 
-    quotes = response.get("quotes", [])
-    if not quotes:
-        _logger.info("yfinance returned no quotes, falling back to scraper")
-        return scrape_top_gainer()
+def _load_universe() -> list[dict]:
+    """Every NASDAQ equity quote from the Yahoo screener, by market cap. Raises on yfinance errors."""
+    query = yf.EquityQuery("is-in", ["exchange", *NASDAQ_EXCHANGES])
 
-    # Client-side filter: guard against server-side leakage (yfinance issue #2218)
-    # Also exclude warrants (W), rights (R), units (U) — quoteType check alone isn't always reliable
-    nasdaq_quotes = [
-        q for q in quotes
-        if q.get("exchange") in _NASDAQ_EXCHANGES
-        and q.get("quoteType") == "EQUITY"
-        and not q.get("symbol", "").endswith(("W", "R", "U"))
-    ]
+    def page(offset: int) -> dict:
+        return yf.screen(query, offset=offset, size=_PAGE_SIZE, sortField="intradaymarketcap", sortAsc=False)
 
-    if not nasdaq_quotes:
-        _logger.info("No NASDAQ equities found after filtering, falling back to scraper")
-        return scrape_top_gainer()
+    # The first page says how many quotes there are; the rest are fetched concurrently
+    first = page(0)
+    quotes = list(first.get("quotes", []))
+    total = min(first.get("total") or len(quotes), _MAX_QUOTES)
+    offsets = range(_PAGE_SIZE, total, _PAGE_SIZE)
+    if offsets:
+        with ThreadPoolExecutor(max_workers=min(SCREENER_WORKERS, len(offsets))) as pool:
+            for response in pool.map(page, offsets):
+                quotes.extend(response.get("quotes", []))
+    return quotes
 
-    # Already sorted by percentchange descending — take the top one
-    top = nasdaq_quotes[0]
-
-    result = {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "symbol": top.get("symbol"),
-        "name": top.get("longName") or top.get("shortName"),
-        "exchange": top.get("exchange"),
-        "price": top.get("regularMarketPrice"),
-        "change_absolute": top.get("regularMarketChange"),
-        "change_pct": top.get("regularMarketChangePercent"),
-        "volume": top.get("regularMarketVolume"),
-        "market_cap": top.get("marketCap"),
-    }
+
+_screener = QuoteScreener(_load_universe)
+
+
+def _load_gainers() -> list[dict]:
+    """The top few NASDAQ gainers from one screener query, highest change first. Raises on yfinance errors."""
+    query = yf.EquityQuery("and", [
+        yf.EquityQuery("is-in", ["exchange", *NASDAQ_EXCHANGES]),
+        yf.EquityQuery("gte", ["percentchange", MIN_GAINER_PCT]),
+    ])
+    response = yf.screen(query, sortField="percentchange", sortAsc=False, size=_GAINER_QUOTES)
+    return response.get("quotes", [])
+
+
+def _from_yfinance() -> dict | None:
+    """Rank a warm quote snapshot, or else one small screener query; None if there is no gainer.
+
+    A bulk refresh takes longer than the hedge budget, so only screen_stocks
+    pays for one. Raises on yfinance errors.
+    """
+    snapshot = _screener.fresh()
+    if snapshot is None:
+        snapshot = QuoteSnapshot.from_quotes(_load_gainers())
+    top = snapshot.rank("gainers", limit=1, min_change_pct=MIN_GAINER_PCT)
+    if not top:
+        _logger.info("No NASDAQ equities up %.0f%% or more, falling back to scraper", MIN_GAINER_PCT)
+        return None
+
+    result = {"timestamp": datetime.now(timezone.utc).isoformat(), **snapshot.row(top[0])}
     try:
         TopGainerResult(**result)
         return result
     except ValidationError as e:
-        messages = [f"{err['loc'][0]}: {err['msg']}" for err in e.errors()]
-        return {"error": "validation failed: " + ", ".join(messages)}
+        return {"error": "validation failed: " + ", ".join(error_messages(e))}
+
+
+@tool
+def screen_stocks(
+    ranking: Literal["gainers", "losers", "unusual_volume"] = "gainers",
+    limit: int = 10,
+    min_change_pct: float | None = None,
+    max_change_pct: float | None = None,
+    min_market_cap: float | None = None,
+    max_market_cap: float | None = None,
+    min_volume: int | None = None,
+) -> dict:
+    """Rank NASDAQ equities by today's move or volume, with optional thresholds.
+
+    Use this tool to look beyond the single top gainer: the biggest losers,
+    unusual volume, or gainers within a market-cap band. Answers from a
+    local snapshot of every NASDAQ equity quote, refreshed in bulk when it
+    is over a minute old, so repeated calls are cheap.
+
+    Args:
+        ranking: 'gainers' (highest change_pct first), 'losers' (lowest first),
+                 or 'unusual_volume' (highest volume_ratio first).
+        limit: Number of stocks to return (default 10, at most 50).
+        min_change_pct / max_change_pct: Bounds on today's % change (e.g. 5 for +5%).
+        min_market_cap / max_market_cap: Bounds on market cap in USD.
+        min_volume: Minimum shares traded today.
+
+    Returns:
+        Dictionary with timestamp (when the snapshot was taken), ranking,
+        universe (quotes in the snapshot), and 'stocks': a list of dicts with
+        symbol, name, exchange, price, change_absolute, change_pct, volume,
+        market_cap and volume_ratio (today's volume / 3-month average).
+        Returns {'error': message} if quotes are unavailable.
+    """
+    if use_scraper():
+        return {"error": "screen_stocks needs yfinance quotes, which USE_SCRAPER=1 turns off"}
+    try:
+        snapshot = protected_call("yfinance", _screener.snapshot)
+    except SourceUnavailable as e:
+        return {"error": f"quote snapshot unavailable: {e}"}
+    except Exception as e:
+        return {"error": f"quote snapshot unavailable: {type(e).__name__}: {e}"}
+    indices = snapshot.rank(
+        ranking, min(limit, 50), min_change_pct, max_change_pct, min_market_cap, max_market_cap, min_volume
+    )
+    ratios = snapshot.volume_ratio
+    stocks = [
+        {**snapshot.row(i), "volume_ratio": None if math.isnan(ratios[i]) else round(float(ratios[i]), 2)}
+        for i in indices
+    ]
+    return {
+        "timestamp": datetime.fromtimestamp(snapshot.taken_at, timezone.utc).isoformat(),
+        "ranking": ranking,
+        "universe": len(snapshot),
+        "stocks": stocks,
+    }
+
+
+def screener_stats() -> dict:
+    return _screener.stats()
@@ -1,12 +1,25 @@
-from pydantic import BaseModel, ConfigDict, model_validator
+import operator
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, model_validator
+
+from ._ohlcv import FIELDS, has_columnar_shape, is_columnar, to_rows
 
 
 class OHLCVRow(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+
     open: float
     high: float
     low: float
     close: float
-    volume: int
+    volume: int = Field(ge=0)
+
+    @model_validator(mode="after")
+    def high_not_below_low(self) -> "OHLCVRow":
+        if self.high < self.low:
+            raise ValueError("high must be >= low")
+        return self
 
 
 class StockHistoryResult(BaseModel):
@@ -14,12 +27,30 @@ class StockHistoryResult(BaseModel):
     period: str
     data: dict[str, OHLCVRow]
 
+    @model_validator(mode="before")
+    @classmethod
+    def columnar_to_rows(cls, values: object) -> object:
+        if isinstance(values, dict) and is_columnar(values.get("data")):
+            columns = values["data"]
+            rows = to_rows(columns)
+            if len(rows) != len(columns["dates"]):
+                raise ValueError("dates must be in increasing order")
+            return {**values, "data": rows}
+        return values
+
     @model_validator(mode="after")
     def data_not_empty(self) -> "StockHistoryResult":
         if not self.data:
             raise ValueError("data has no rows")
         return self
 
+    @model_validator(mode="after")
+    def dates_increasing(self) -> "StockHistoryResult":
+        dates = list(self.data)
+        if not all(map(operator.lt, dates, dates[1:])):
+            raise ValueError("dates must be in increasing order")
+        return self
+
 
 class TopGainerResult(BaseModel):
     timestamp: str
@@ -35,3 +66,107 @@ class TopGainerResult(BaseModel):
 
 class AnalyzerInput(BaseModel):
     model_config = ConfigDict(extra="allow")
+
+
+def error_messages(e: ValidationError) -> list[str]:
+    """Format pydantic errors as 'field: message' (or just 'message' for model-level errors)."""
+    return [
+        f"{err['loc'][0]}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in e.errors()
+    ]
+
+
+_NUMBER_TYPES = {float, int}
+# Below this many rows the per-row models are faster than NumPy setup costs
+_COLUMNAR_MIN_ROWS = 32
+
+_MSG_NOT_FINITE = "data: Input should be a finite number"
+_MSG_FRACTIONAL = "data: Input should be a valid integer, got a number with a fractional part"
+_MSG_NEGATIVE = "data: Input should be greater than or equal to 0"
+_MSG_HIGH_LOW = "data: Value error, high must be >= low"
+
+
+def _model_errors(result: dict) -> list[str]:
+    try:
+        StockHistoryResult(**result)
+    except ValidationError as e:
+        return error_messages(e)
+    return []
+
+
+def validate_stock_history(result: dict) -> list[str]:
+    """Validate a get_stock_history result (rows or columnar layout) column-wise.
+
+    Equivalent to StockHistoryResult(**result) — same checks, same messages
+    as error_messages() — but checks each OHLCV field as one NumPy array
+    instead of building an OHLCVRow per trading day. Short series, and
+    inputs that are not plain numbers (strings, None, bools, missing keys),
+    are handed to the pydantic models, which also gives the latter their
+    exact error messages.
+
+    Returns an empty list if the result is valid.
+    """
+    data = result.get("data")
+    if not (
+        isinstance(result.get("symbol"), str)
+        and isinstance(result.get("period"), str)
+        and type(data) is dict
+    ):
+        return _model_errors(result)
+
+    if is_columnar(data):
+        if not has_columnar_shape(data):
+            return _model_errors(result)
+        dates = data["dates"]
+    else:
+        dates = list(data)
+
+    if not dates:
+        return ["Value error, data has no rows"]
+    if len(dates) < _COLUMNAR_MIN_ROWS:
+        return _model_errors(result)
+
+    if is_columnar(data):
+        if not all(type(d) is str for d in dates):
+            return _model_errors(result)
+        if len(set(dates)) != len(dates):
+            return ["Value error, dates must be in increasing order"]
+        columns = [data[f] for f in FIELDS]
+    else:
+        rows = list(data.values())
+        try:
+            columns = [[row[f] for row in rows] for f in FIELDS]
+        except (KeyError, TypeError):
+            return _model_errors(result)
+    if any(not set(map(type, col)) <= _NUMBER_TYPES for col in columns):
+        return _model_errors(result)
+
+    prices = np.array(columns[:4], dtype=float)
+    volume = np.array(columns[4], dtype=float)
+
+    price_bad = ~np.isfinite(prices)
+    volume_nonfinite = ~np.isfinite(volume)
+    with np.errstate(invalid="ignore"):
+        volume_fractional = ~volume_nonfinite & (volume != np.floor(volume))
+        volume_negative = ~volume_nonfinite & ~volume_fractional & (volume < 0)
+        field_bad = price_bad.any(axis=0) | volume_nonfinite | volume_fractional | volume_negative
+        high_below_low = ~field_bad & (prices[1] < prices[2])
+
+    errors = []
+    for i in np.flatnonzero(field_bad | high_below_low):
+        if high_below_low[i]:
+            errors.append(_MSG_HIGH_LOW)
+            continue
+        errors.extend(_MSG_NOT_FINITE for _ in range(int(price_bad[:, i].sum())))
+        if volume_nonfinite[i]:
+            errors.append(_MSG_NOT_FINITE)
+        elif volume_fractional[i]:
+            errors.append(_MSG_FRACTIONAL)
+        elif volume_negative[i]:
+            errors.append(_MSG_NEGATIVE)
+    if errors:
+        return errors
+
+    if not all(map(operator.lt, dates, dates[1:])):
+        return ["Value error, dates must be in increasing order"]
+    return []